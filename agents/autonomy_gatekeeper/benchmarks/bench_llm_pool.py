@@ -0,0 +1,154 @@
+"""Benchmark — pooled LLM client vs a new client per request.
+
+Usage:
+    python benchmarks/bench_llm_pool.py [--requests N] [--concurrency N] [--latency-ms MS]
+
+Starts the stub OpenAI server from ``stub_openai.py`` on localhost and
+sends the governance prompt through ``ChatOpenAI`` two ways:
+
+- ``per-request``: a new ``ChatOpenAI`` and prompt chain for every call, as
+  the graph did before models were pooled. Every call opens a new
+  connection.
+- ``pooled``: the prebuilt chain for the pooled model from ``create_llm``,
+  which reuses keep-alive connections.
+
+Each mode runs sequentially and then with ``--concurrency`` async calls in
+flight. The report shows per-call latency and the number of TCP connections
+the server accepted. The stub speaks plain HTTP, so this leaves out the TLS
+handshake that pooling also saves against the real API.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import statistics
+import time
+from collections.abc import Callable
+from typing import Any
+
+from stub_openai import StubOpenAIServer
+
+from autonomy_gatekeeper.config import Settings
+from autonomy_gatekeeper.llm.factory import clear_llm_pool, create_llm
+from autonomy_gatekeeper.llm.prompts import build_governance_prompt, governance_chain
+
+INPUTS = {
+    "request": "Rotate the API keys for the billing service",
+    "matched_policies": "- [CREDENTIALS] Touches secrets or credentials",
+}
+
+
+def per_request_chain(settings: Settings) -> Any:
+    """A fresh model, HTTP client and chain, as built before pooling."""
+    from langchain_openai import ChatOpenAI
+
+    llm = ChatOpenAI(
+        model=settings.openai_model,
+        api_key=settings.openai_api_key,  # type: ignore[arg-type]
+        base_url=settings.openai_base_url,
+        temperature=0.0,
+    )
+    return build_governance_prompt() | llm
+
+
+def pooled_chain(settings: Settings) -> Any:
+    """The prebuilt chain for the process-wide pooled model."""
+    return governance_chain(create_llm(settings))
+
+
+def summarize(latencies: list[float], elapsed: float) -> dict[str, float]:
+    """Per-call latency percentiles in ms and calls per second."""
+    ordered = sorted(latencies)
+    return {
+        "mean_ms": statistics.fmean(ordered) * 1e3,
+        "p50_ms": ordered[len(ordered) // 2] * 1e3,
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1e3,
+        "calls_per_s": len(ordered) / elapsed,
+    }
+
+
+def run_sync(make_chain: Callable[[], Any], requests: int) -> dict[str, float]:
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(requests):
+        call_started = time.perf_counter()
+        make_chain().invoke(INPUTS)
+        latencies.append(time.perf_counter() - call_started)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def run_async(
+    make_chain: Callable[[], Any], requests: int, concurrency: int
+) -> dict[str, float]:
+    async def run() -> dict[str, float]:
+        latencies: list[float] = []
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def call() -> None:
+            async with semaphore:
+                call_started = time.perf_counter()
+                await make_chain().ainvoke(INPUTS)
+                latencies.append(time.perf_counter() - call_started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(call() for _ in range(requests)))
+        elapsed = time.perf_counter() - started
+        # Let clients dropped by the per-request mode close on this loop.
+        gc.collect()
+        await asyncio.sleep(0.1)
+        return summarize(latencies, elapsed)
+
+    return asyncio.run(run())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = StubOpenAIServer(latency_ms=args.latency_ms).start()
+    settings = Settings(
+        llm_provider="openai",
+        openai_api_key="sk-stub",
+        openai_base_url=server.base_url,
+        llm_pool_max_keepalive=args.concurrency,
+    )
+    modes: dict[str, Callable[[], Any]] = {
+        "per-request": lambda: per_request_chain(settings),
+        "pooled": lambda: pooled_chain(settings),
+    }
+    runners: dict[str, Callable[[Callable[[], Any]], dict[str, float]]] = {
+        "sync": lambda make: run_sync(make, args.requests),
+        f"async x{args.concurrency}": lambda make: run_async(
+            make, args.requests, args.concurrency
+        ),
+    }
+
+    print(
+        f"{args.requests} calls per run, stub latency {args.latency_ms:g} ms "
+        f"({server.base_url})"
+    )
+    print(
+        f"{'run':<16} {'mode':<12} {'mean ms':>9} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'calls/s':>9} {'conns':>6}"
+    )
+    for run_name, runner in runners.items():
+        for mode, make_chain in modes.items():
+            clear_llm_pool()
+            make_chain().invoke(INPUTS)  # warm-up: imports and first connection
+            before = server.connections
+            stats = runner(make_chain)
+            print(
+                f"{run_name:<16} {mode:<12} {stats['mean_ms']:>9.2f} "
+                f"{stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} "
+                f"{stats['calls_per_s']:>9.0f} {server.connections - before:>6}"
+            )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Benchmark — compiled Aho-Corasick matcher vs. the per-rule keyword loop.
+
+Usage:
+    python benchmarks/bench_policy_matcher.py [--repeat N]
+
+Generates synthetic rule sets and requests of increasing size and reports the
+mean time per evaluation for both strategies.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import timeit
+from functools import partial
+from typing import Any
+
+from datagen import generate_request, generate_rules
+
+from autonomy_gatekeeper.policy.matcher import compile_policy
+
+RULE_COUNTS = [10, 100, 1_000, 5_000]
+REQUEST_LENGTHS = [100, 1_000, 8_000]
+
+
+def linear_scan(request: str, rules: list[dict[str, Any]]) -> list[str]:
+    """The original evaluate_policies loop, kept as the reference strategy."""
+    request_lower = request.lower()
+    matched = []
+    for rule in rules:
+        keywords = [kw.lower() for kw in rule.get("keywords", [])]
+        if any(kw in request_lower for kw in keywords):
+            matched.append(rule["id"])
+    return matched
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(1234)
+    header = f"{'rules':>6} {'chars':>6} {'linear (ms)':>12} {'compiled (ms)':>14} {'speedup':>8}"
+    print(header)
+    print("-" * len(header))
+    for rule_count in RULE_COUNTS:
+        rules = generate_rules(rule_count, rng)
+        policy = compile_policy(rules)
+        for length in REQUEST_LENGTHS:
+            request = generate_request(length, rules, rng)
+            assert [
+                rules[i]["id"] for i in policy.match_indices(request)
+            ] == linear_scan(request, rules)
+            linear = timeit.timeit(
+                partial(linear_scan, request, rules), number=args.repeat
+            )
+            compiled = timeit.timeit(
+                partial(policy.evaluate, request), number=args.repeat
+            )
+            print(
+                f"{rule_count:>6} {length:>6} "
+                f"{linear / args.repeat * 1e3:>12.3f} "
+                f"{compiled / args.repeat * 1e3:>14.3f} "
+                f"{linear / compiled:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
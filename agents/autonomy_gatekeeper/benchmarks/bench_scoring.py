@@ -0,0 +1,91 @@
+"""Benchmark — offline policy scoring throughput per worker count.
+
+Usage:
+    python benchmarks/bench_scoring.py [--requests N] [--rules N] [--workers 1,2,4]
+
+Writes a synthetic rule set and JSONL corpus, scores the corpus with
+:func:`autonomy_gatekeeper.scoring.score_file` at each worker count and
+reports requests/sec and speed-up over one worker. The precompiled policy
+artifact is written first so worker start-up cost stays small.
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import random
+import tempfile
+from pathlib import Path
+
+from datagen import generate_request, generate_rules, write_rules
+
+from autonomy_gatekeeper.policy.loader import write_artifact
+from autonomy_gatekeeper.scoring import default_workers, score_file
+
+
+def worker_counts(limit: int) -> list[int]:
+    """Powers of two up to ``limit``, plus ``limit`` itself."""
+    counts = [1]
+    while counts[-1] * 2 <= limit:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != limit:
+        counts.append(limit)
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200_000)
+    parser.add_argument("--rules", type=int, default=1_000)
+    parser.add_argument("--chars", type=int, default=512)
+    parser.add_argument("--chunk-size", type=int, default=1_000)
+    parser.add_argument(
+        "--workers",
+        default=None,
+        help="Comma-separated worker counts (default: powers of two up to the CPU count).",
+    )
+    args = parser.parse_args()
+
+    counts = (
+        [int(n) for n in args.workers.split(",")]
+        if args.workers
+        else worker_counts(default_workers())
+    )
+    rng = random.Random(2024)
+    rules = generate_rules(args.rules, rng)
+    # A pool of distinct requests, repeated to the requested corpus size.
+    pool = [generate_request(args.chars, rules, rng) for _ in range(1_000)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        policy_path = write_rules(rules, Path(tmp) / "rules.yaml")
+        write_artifact(policy_path)
+        corpus = Path(tmp) / "requests.jsonl"
+        with open(corpus, "w", encoding="utf-8") as f:
+            for i in range(args.requests):
+                f.write(json.dumps({"request": pool[i % len(pool)]}) + "\n")
+
+        print(
+            f"{args.requests} requests x {args.chars} chars, {args.rules} rules, "
+            f"chunks of {args.chunk_size}"
+        )
+        print(f"{'workers':>8} {'req/s':>12} {'speed-up':>9}")
+        baseline = 0.0
+        for workers in counts:
+            with open(corpus, encoding="utf-8") as source:
+                stats = score_file(
+                    str(policy_path),
+                    source,
+                    io.StringIO(),
+                    workers=workers,
+                    chunk_size=args.chunk_size,
+                )
+            baseline = baseline or stats.throughput
+            print(
+                f"{workers:>8} {stats.throughput:>12,.0f} "
+                f"{stats.throughput / baseline:>8.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
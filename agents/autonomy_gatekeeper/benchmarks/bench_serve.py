@@ -0,0 +1,141 @@
+"""Benchmark — `serve` HTTP service vs one CLI process per request.
+
+Usage:
+    python benchmarks/bench_serve.py [--requests N] [--cli-requests N] [--concurrency N]
+
+Sends the same mix of requests two ways, with the ``local`` LLM provider:
+
+- ``cli``: ``autonomy-gatekeeper evaluate --json-output`` in a new process
+  per request, which pays for interpreter start-up, imports, rule loading
+  and graph compilation every time.
+- ``http``: ``POST /v1/evaluate`` against an in-process ``serve`` instance,
+  sequentially and then with ``--concurrency`` clients so that policy
+  evaluation is coalesced into micro-batches.
+
+Latency is measured per request on the client side. The report shows p50,
+p99 and requests per second, plus the batching stats of the service.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from autonomy_gatekeeper.config import Settings
+from autonomy_gatekeeper.engine import Gatekeeper
+from autonomy_gatekeeper.server import create_server
+
+RULES_PATH = str(
+    Path(__file__).parent.parent
+    / "src"
+    / "autonomy_gatekeeper"
+    / "policy"
+    / "rules.yaml"
+)
+REQUESTS = [
+    "Drop the users table in production",
+    "Summarize yesterday's incident report",
+    "Rotate the API keys for the billing service",
+    "List all running services",
+]
+
+
+def summarize(latencies: list[float], elapsed: float) -> dict[str, float]:
+    """Per-request latency percentiles in ms and requests per second."""
+    ordered = sorted(latencies)
+    return {
+        "p50_ms": ordered[len(ordered) // 2] * 1e3,
+        "p99_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1e3,
+        "req_per_s": len(ordered) / elapsed,
+    }
+
+
+def timed(
+    call: Callable[[str], None], requests: int, concurrency: int
+) -> dict[str, float]:
+    def one(i: int) -> float:
+        started = time.perf_counter()
+        call(REQUESTS[i % len(REQUESTS)])
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(one, range(requests)))
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def cli_call(request: str) -> None:
+    subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "autonomy_gatekeeper.cli",
+            "evaluate",
+            "--request",
+            request,
+            "--json-output",
+            "-p",
+            RULES_PATH,
+        ],
+        check=True,
+        capture_output=True,
+        env={**os.environ, "LLM_PROVIDER": "local", "LOG_LEVEL": "WARNING"},
+    )
+
+
+def http_caller(url: str) -> Callable[[str], None]:
+    def call(request: str) -> None:
+        body = json.dumps({"request": request}).encode()
+        with urllib.request.urlopen(f"{url}/v1/evaluate", data=body) as response:
+            response.read()
+
+    return call
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--cli-requests", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    server = create_server(
+        Gatekeeper(
+            Settings(llm_provider="local", policy_path=RULES_PATH, log_level="WARNING")
+        ),
+        port=0,
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.ready.wait()
+    http = http_caller(server.url)
+
+    runs = {
+        "cli (process per request)": lambda: timed(cli_call, args.cli_requests, 1),
+        "http sequential": lambda: timed(http, args.requests, 1),
+        f"http x{args.concurrency}": lambda: timed(
+            http, args.requests, args.concurrency
+        ),
+    }
+    print(f"{'run':<28} {'p50 ms':>9} {'p99 ms':>9} {'req/s':>9}")
+    for name, run in runs.items():
+        stats = run()
+        print(
+            f"{name:<28} {stats['p50_ms']:>9.2f} {stats['p99_ms']:>9.2f} "
+            f"{stats['req_per_s']:>9.0f}"
+        )
+    print(f"batching: {server.batcher.stats.to_dict()}")
+    server.shutdown()
+    server.server_close()
+
+
+if __name__ == "__main__":
+    main()
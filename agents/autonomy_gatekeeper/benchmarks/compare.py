@@ -0,0 +1,76 @@
+"""Compare a benchmark run against a saved baseline.
+
+Usage:
+    python benchmarks/compare.py BASELINE RESULTS [--threshold 0.25]
+
+Exits with status 1 if any case shared by both files got slower than the
+baseline by more than ``threshold`` (best-of-N latency, relative, which is
+the least noisy statistic for CPU-bound code).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+METRIC = "min_ms"
+# Cases faster than this are dominated by timer noise; compare them loosely.
+NOISE_FLOOR_MS = 0.1
+
+
+def load(path: Path) -> dict[str, Any]:
+    results: dict[str, Any] = json.loads(path.read_text())["results"]
+    return results
+
+
+def compare(
+    baseline: dict[str, Any], results: dict[str, Any], threshold: float
+) -> list[tuple[str, float, float, float, bool]]:
+    """Return ``(case, baseline_ms, current_ms, change, regressed)`` rows."""
+    rows = []
+    for case in sorted(baseline.keys() & results.keys()):
+        before = baseline[case][METRIC]
+        after = results[case][METRIC]
+        change = (after - before) / before if before > 0 else 0.0
+        regressed = change > threshold and after - before > NOISE_FLOOR_MS
+        rows.append((case, before, after, change, regressed))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("results", type=Path)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Allowed relative slowdown before a case counts as a regression.",
+    )
+    args = parser.parse_args()
+
+    rows = compare(load(args.baseline), load(args.results), args.threshold)
+    if not rows:
+        print("No benchmark cases in common; nothing to compare.")
+        sys.exit(1)
+
+    print(f"{'case':<52} {'baseline':>10} {'current':>10} {'change':>8}")
+    for case, before, after, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{case:<52} {before:>10.3f} {after:>10.3f} {change:>+8.1%}{flag}")
+
+    regressions = [row for row in rows if row[4]]
+    if regressions:
+        print(
+            f"\n{len(regressions)} of {len(rows)} cases regressed by more than "
+            f"{args.threshold:.0%}."
+        )
+        sys.exit(1)
+    print(f"\nNo regressions across {len(rows)} cases.")
+
+
+if __name__ == "__main__":
+    main()
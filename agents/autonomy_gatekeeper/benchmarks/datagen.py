@@ -0,0 +1,81 @@
+"""Synthetic rule sets, request corpora and LLM replies for the benchmarks."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import random
+import string
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+from autonomy_gatekeeper.policy.matcher import DECISION_PRIORITY, RISK_PRIORITY
+
+KEYWORDS_PER_RULE = 5
+
+
+def generate_rules(count: int, rng: random.Random) -> list[dict[str, Any]]:
+    """Generate ``count`` rules with random lowercase keywords."""
+    decisions = list(DECISION_PRIORITY)
+    risks = list(RISK_PRIORITY)
+    return [
+        {
+            "id": f"RULE_{i}",
+            "description": f"Synthetic rule {i}",
+            "keywords": [
+                "".join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 10)))
+                for _ in range(KEYWORDS_PER_RULE)
+            ],
+            "decision": rng.choice(decisions),
+            "risk_level": rng.choice(risks),
+        }
+        for i in range(count)
+    ]
+
+
+def as_expressions(rules: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Rewrite keyword rules as equivalent ``match: {terms: [...]}`` rules."""
+    return [
+        {
+            **{k: v for k, v in rule.items() if k != "keywords"},
+            "match": {"terms": rule["keywords"]},
+        }
+        for rule in rules
+    ]
+
+
+def write_rules(rules: list[dict[str, Any]], path: Path) -> Path:
+    """Write ``rules`` as a policy YAML file."""
+    path.write_text(yaml.safe_dump({"rules": rules}, sort_keys=False))
+    return path
+
+
+def generate_request(
+    length: int, rules: list[dict[str, Any]], rng: random.Random
+) -> str:
+    """Generate a request of ``length`` characters sprinkled with rule keywords."""
+    words: list[str] = []
+    size = 0
+    while size < length:
+        if rules and rng.random() < 0.02:
+            word = rng.choice(rng.choice(rules)["keywords"]).upper()
+        else:
+            word = "".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 8)))
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)[:length]
+
+
+def fake_llm_reply(request: str) -> str:
+    """A schema-valid governance reply chosen deterministically from the request."""
+    digest = int(hashlib.sha256(request.encode("utf-8")).hexdigest(), 16)
+    return json.dumps(
+        {
+            "decision": list(DECISION_PRIORITY)[digest % 3],
+            "risk_level": list(RISK_PRIORITY)[digest % 4],
+            "reasoning": "Deterministic benchmark assessment.",
+            "recommended_action": "None.",
+        }
+    )
@@ -0,0 +1,386 @@
+"""Load generator — replay a request log open-loop at a fixed or ramping QPS.
+
+Usage:
+    python benchmarks/loadgen.py [--input LOG.jsonl] [--qps N] [--ramp-to N]
+        [--duration S] [--arrival uniform|poisson] [--api sync|async]
+        [--latency-ms MS] [--output PATH]
+
+Requests are sent on a schedule fixed before the run starts: the target rate
+goes linearly from ``--qps`` to ``--ramp-to`` (default: constant) over
+``--duration`` seconds, with evenly spaced or Poisson arrivals. A request is
+sent at its scheduled time whether or not earlier ones have finished, and
+its latency is measured from that scheduled time, so queueing behind a slow
+request is counted instead of hidden (no coordinated omission).
+
+``--input`` is a JSONL log in the ``evaluate-batch`` format, cycled through
+as often as needed. Without it a seeded synthetic mix is generated from
+templates that hit both critical escalations, which skip the LLM, and
+LLM-assessed requests; use ``--write-log`` to save it for replay. Requests
+run in-process through ``evaluate_request`` (or ``aevaluate_request`` with
+``--api async``) with the ``local`` LLM provider at the configured latency.
+
+The report shows achieved throughput, p50/p95/p99/max latency, the LLM skip
+rate and the LLM fallback rate, and is written as JSON to ``--output``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import platform
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from autonomy_gatekeeper.app import aevaluate_request, evaluate_request
+from autonomy_gatekeeper.batch import parse_request_line
+from autonomy_gatekeeper.config import Settings
+from autonomy_gatekeeper.schemas import DecisionCard
+
+RULES_PATH = str(
+    Path(__file__).parent.parent
+    / "src"
+    / "autonomy_gatekeeper"
+    / "policy"
+    / "rules.yaml"
+)
+DEFAULT_OUTPUT = Path(__file__).parent / "results" / "loadgen.json"
+
+TEMPLATES = [
+    "Drop the {table} table in production",
+    "Delete all {table} records older than {days} days in production",
+    "List all running services in {env}",
+    "Show the last {days} days of logs for the {service} service",
+    "Rotate the API keys for the {service} service",
+    "Deploy {service} v{major}.{minor} to {env}",
+    "Grant read access on {table} to the {team} team",
+    "Restart the {service} worker in {env}",
+    "Summarize yesterday's incident report for {service}",
+]
+FIELDS = {
+    "table": ["users", "orders", "payments", "sessions", "audit_log"],
+    "env": ["staging", "production", "dev"],
+    "service": ["billing", "search", "checkout", "auth", "notifications"],
+    "team": ["data", "support", "finance"],
+}
+
+
+def synthetic_log(count: int, rng: random.Random) -> list[str]:
+    """Generate ``count`` requests from :data:`TEMPLATES`."""
+    return [
+        rng.choice(TEMPLATES).format(
+            days=rng.randint(1, 90),
+            major=rng.randint(1, 9),
+            minor=rng.randint(0, 20),
+            **{name: rng.choice(values) for name, values in FIELDS.items()},
+        )
+        for _ in range(count)
+    ]
+
+
+def read_log(path: Path) -> list[str]:
+    """Read the requests of a JSONL log, skipping blank lines."""
+    requests = []
+    with path.open(encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            try:
+                request = parse_request_line(line)
+            except ValueError as e:
+                raise SystemExit(f"{path}:{number}: {e}") from e
+            if request is not None:
+                requests.append(request)
+    if not requests:
+        raise SystemExit(f"{path}: no requests")
+    return requests
+
+
+def schedule(
+    qps: float,
+    ramp_to: float,
+    duration: float,
+    arrival: str,
+    rng: random.Random,
+) -> list[float]:
+    """Send times in seconds from the start of the run.
+
+    The rate goes linearly from ``qps`` to ``ramp_to``, so the expected number
+    of requests sent by time ``t`` is ``qps*t + (ramp_to-qps)*t**2/(2*duration)``.
+    Request ``i`` is sent when that reaches ``i`` (``uniform``) or the
+    ``i``-th point of a unit-rate Poisson process (``poisson``).
+    """
+    slope = (ramp_to - qps) / duration
+    offsets: list[float] = []
+    count = 0.0
+    while True:
+        if slope == 0:
+            offset = count / qps
+        else:
+            # Positive root of slope/2*t**2 + qps*t - count = 0.
+            offset = 2 * count / (qps + math.sqrt(qps * qps + 2 * slope * count))
+        if offset >= duration:
+            return offsets
+        offsets.append(offset)
+        count += rng.expovariate(1.0) if arrival == "poisson" else 1.0
+
+
+@dataclass
+class Sample:
+    """Outcome of one request; times are in seconds from the start of the run."""
+
+    scheduled: float
+    started: float
+    finished: float
+    card: DecisionCard | None = None
+    error: str | None = None
+
+
+def percentile(ordered: list[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def latency_summary(latencies: list[float]) -> dict[str, float]:
+    """p50/p95/p99/max and mean of ``latencies`` in ms."""
+    if not latencies:
+        return {}
+    ordered = sorted(latencies)
+    return {
+        "p50": percentile(ordered, 0.50) * 1e3,
+        "p95": percentile(ordered, 0.95) * 1e3,
+        "p99": percentile(ordered, 0.99) * 1e3,
+        "max": ordered[-1] * 1e3,
+        "mean": sum(ordered) / len(ordered) * 1e3,
+    }
+
+
+def run_sync(
+    requests: list[str], offsets: list[float], settings: Settings, workers: int
+) -> tuple[list[Sample], float]:
+    """Send on a dispatcher thread and run each request on a thread pool."""
+    samples: list[Sample] = []
+    lock = threading.Lock()
+
+    def one(request: str, scheduled: float, start: float) -> None:
+        started = time.perf_counter() - start
+        card = error = None
+        try:
+            card = evaluate_request(request, settings)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        sample = Sample(scheduled, started, time.perf_counter() - start, card, error)
+        with lock:
+            samples.append(sample)
+
+    lag = 0.0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        start = time.perf_counter()
+        for i, offset in enumerate(offsets):
+            delay = offset - (time.perf_counter() - start)
+            if delay > 0:
+                time.sleep(delay)
+            lag = max(lag, time.perf_counter() - start - offset)
+            pool.submit(one, requests[i % len(requests)], offset, start)
+    return samples, lag
+
+
+async def run_async(
+    requests: list[str], offsets: list[float], settings: Settings
+) -> tuple[list[Sample], float]:
+    """Send each request as a task on one event loop."""
+    samples: list[Sample] = []
+
+    async def one(request: str, scheduled: float, start: float) -> None:
+        started = time.perf_counter() - start
+        card = error = None
+        try:
+            card = await aevaluate_request(request, settings)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        samples.append(
+            Sample(scheduled, started, time.perf_counter() - start, card, error)
+        )
+
+    lag = 0.0
+    tasks = []
+    start = time.perf_counter()
+    for i, offset in enumerate(offsets):
+        delay = offset - (time.perf_counter() - start)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        lag = max(lag, time.perf_counter() - start - offset)
+        tasks.append(
+            asyncio.create_task(one(requests[i % len(requests)], offset, start))
+        )
+    await asyncio.gather(*tasks)
+    return samples, lag
+
+
+def report(
+    samples: list[Sample], lag: float, duration: float, timeline: bool
+) -> dict[str, Any]:
+    """Throughput, latency and LLM path rates of a run."""
+    done = [s for s in samples if s.card is not None]
+    skipped = sum(1 for s in done if s.card and s.card.metadata.get("llm_skipped"))
+    assessed = len(done) - skipped
+    fallbacks = sum(1 for s in done if s.card and s.card.metadata.get("llm_fallback"))
+    decisions: dict[str, int] = {}
+    for s in done:
+        assert s.card is not None
+        decisions[s.card.decision.value] = decisions.get(s.card.decision.value, 0) + 1
+    elapsed = max((s.finished for s in samples), default=0.0)
+    result: dict[str, Any] = {
+        "sent": len(samples),
+        "completed": len(done),
+        "errors": len(samples) - len(done),
+        "elapsed_s": elapsed,
+        "offered_qps": len(samples) / duration,
+        "achieved_qps": len(done) / elapsed if elapsed else 0.0,
+        "latency_ms": latency_summary([s.finished - s.scheduled for s in done]),
+        "service_ms": latency_summary([s.finished - s.started for s in done]),
+        "max_send_lag_ms": lag * 1e3,
+        "llm_skip_rate": skipped / len(done) if done else 0.0,
+        "llm_fallback_rate": fallbacks / assessed if assessed else 0.0,
+        "decisions": dict(sorted(decisions.items())),
+    }
+    if timeline:
+        seconds: dict[int, list[Sample]] = {}
+        for s in samples:
+            seconds.setdefault(int(s.scheduled), []).append(s)
+        result["timeline"] = [
+            {
+                "second": second,
+                "sent": len(bucket),
+                "errors": sum(1 for s in bucket if s.card is None),
+                "latency_ms": latency_summary(
+                    [s.finished - s.scheduled for s in bucket if s.card is not None]
+                ),
+            }
+            for second, bucket in sorted(seconds.items())
+        ]
+    return result
+
+
+def print_summary(result: dict[str, Any]) -> None:
+    latency = result["latency_ms"]
+    print(
+        f"sent {result['sent']}  completed {result['completed']}  "
+        f"errors {result['errors']}  in {result['elapsed_s']:.2f}s"
+    )
+    print(
+        f"throughput    offered {result['offered_qps']:.1f}/s  "
+        f"achieved {result['achieved_qps']:.1f}/s"
+    )
+    if latency:
+        print(
+            "latency ms    "
+            + "  ".join(f"{k} {latency[k]:.1f}" for k in ("p50", "p95", "p99", "max"))
+        )
+    print(f"max send lag  {result['max_send_lag_ms']:.1f} ms")
+    print(
+        f"llm           skipped {result['llm_skip_rate']:.1%}  "
+        f"fallback {result['llm_fallback_rate']:.1%}"
+    )
+    print(f"decisions     {result['decisions']}")
+    for row in result.get("timeline", []):
+        p99 = row["latency_ms"].get("p99", float("nan"))
+        print(f"  t={row['second']:>4}s  sent {row['sent']:>5}  p99 {p99:>9.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--input", type=Path, help="JSONL request log to replay")
+    parser.add_argument("--synthetic", type=int, default=1000)
+    parser.add_argument("--write-log", type=Path)
+    parser.add_argument("--qps", type=float, default=50.0)
+    parser.add_argument("--ramp-to", type=float)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--arrival", choices=["uniform", "poisson"], default="uniform")
+    parser.add_argument("--api", choices=["sync", "async"], default="sync")
+    parser.add_argument("--workers", type=int, default=128)
+    parser.add_argument("--policy", default=RULES_PATH)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=50.0)
+    parser.add_argument(
+        "--latency-distribution",
+        choices=["constant", "uniform", "normal", "lognormal", "exponential"],
+        default="lognormal",
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeline", action="store_true")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+    ramp_to = args.qps if args.ramp_to is None else args.ramp_to
+    if args.qps <= 0 or ramp_to < 0 or args.duration <= 0:
+        parser.error("--qps and --duration must be positive, --ramp-to not negative")
+
+    rng = random.Random(args.seed)
+    if args.input:
+        requests = read_log(args.input)
+    else:
+        requests = synthetic_log(args.synthetic, rng)
+    if args.write_log:
+        args.write_log.write_text(
+            "".join(json.dumps({"request": r}) + "\n" for r in requests)
+        )
+    settings = Settings(
+        llm_provider="local",
+        policy_path=args.policy,
+        log_level="ERROR",
+        llm_cache_enabled=not args.no_cache,
+        local_llm_latency_ms=args.latency_ms,
+        local_llm_latency_jitter_ms=args.latency_jitter_ms,
+        local_llm_latency_distribution=args.latency_distribution,
+        local_llm_error_rate=args.error_rate,
+        local_llm_malformed_rate=args.malformed_rate,
+        local_llm_seed=args.seed,
+    )
+    # Build the engine and compile the graph before the clock starts.
+    evaluate_request("Summarize the release notes", settings)
+
+    offsets = schedule(args.qps, ramp_to, args.duration, args.arrival, rng)
+    if args.api == "async":
+        samples, lag = asyncio.run(run_async(requests, offsets, settings))
+    else:
+        samples, lag = run_sync(requests, offsets, settings, args.workers)
+
+    result = report(samples, lag, args.duration, args.timeline)
+    print_summary(result)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "meta": {
+            "created": datetime.now(UTC).isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "input": str(args.input) if args.input else f"synthetic:{len(requests)}",
+            "qps": args.qps,
+            "ramp_to": ramp_to,
+            "duration_s": args.duration,
+            "arrival": args.arrival,
+            "api": args.api,
+            "latency_ms": args.latency_ms,
+            "latency_jitter_ms": args.latency_jitter_ms,
+            "latency_distribution": args.latency_distribution,
+            "error_rate": args.error_rate,
+            "malformed_rate": args.malformed_rate,
+            "llm_cache": not args.no_cache,
+            "seed": args.seed,
+        },
+        **result,
+    }
+    args.output.write_text(json.dumps(payload, indent=2) + "\n")
+    print(f"Wrote {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
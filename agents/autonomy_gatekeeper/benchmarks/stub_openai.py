@@ -0,0 +1,121 @@
+"""A local stub of the OpenAI chat completions endpoint for benchmarks.
+
+Usage:
+    python benchmarks/stub_openai.py [--port 8099] [--latency-ms 0]
+
+Answers ``POST /v1/chat/completions`` with a fixed governance verdict and
+supports HTTP/1.1 keep-alive, so clients that pool connections reuse them.
+It counts the TCP connections it accepts, which shows whether a client is
+reconnecting for every request.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+REPLY = json.dumps(
+    {
+        "decision": "HOLD",
+        "risk_level": "medium",
+        "reasoning": "Stub verdict.",
+        "recommended_action": "None.",
+    }
+)
+
+
+class StubOpenAIServer(ThreadingHTTPServer):
+    """Threaded HTTP server that counts accepted connections."""
+
+    daemon_threads = True
+    # Clients that connect for every request can open many at once.
+    request_queue_size = 1024
+
+    def __init__(self, port: int = 0, latency_ms: float = 0.0) -> None:
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.latency_ms = latency_ms
+        self.connections = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        """The ``OPENAI_BASE_URL`` that points a client at this server."""
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+    def start(self) -> StubOpenAIServer:
+        """Serve on a daemon thread."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def count(self, connection: bool = False) -> None:
+        with self._lock:
+            if connection:
+                self.connections += 1
+            else:
+                self.requests += 1
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: StubOpenAIServer
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.count(connection=True)
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        self.server.count()
+        if self.server.latency_ms:
+            time.sleep(self.server.latency_ms / 1e3)
+        body = json.dumps(_completion(request)).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def _completion(request: dict[str, Any]) -> dict[str, Any]:
+    prompt_chars = sum(len(str(m.get("content", ""))) for m in request["messages"])
+    return {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": request.get("model", "stub"),
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": REPLY},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {
+            "prompt_tokens": prompt_chars // 4,
+            "completion_tokens": len(REPLY) // 4,
+            "total_tokens": (prompt_chars + len(REPLY)) // 4,
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    server = StubOpenAIServer(args.port, args.latency_ms)
+    print(f"Serving on {server.base_url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
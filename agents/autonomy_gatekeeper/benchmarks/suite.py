@@ -0,0 +1,192 @@
+"""Benchmark suite — policy engine and graph overhead offline, with the local stand-in LLM.
+
+Usage:
+    python benchmarks/suite.py [--quick] [--output PATH]
+
+Generates rule sets (10 to 10k rules) and request corpora (64 B to 64 KB),
+times each pipeline stage and writes machine-readable JSON. Compare two
+result files with ``benchmarks/compare.py`` (``make bench`` does both).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from datagen import (
+    as_expressions,
+    fake_llm_reply,
+    generate_request,
+    generate_rules,
+    write_rules,
+)
+
+from autonomy_gatekeeper.config import Settings
+from autonomy_gatekeeper.graph import (
+    build_decision_card,
+    build_graph,
+    evaluate_policies,
+    load_policy_rules,
+    new_state,
+)
+from autonomy_gatekeeper.policy.loader import load_policy, write_artifact
+from autonomy_gatekeeper.policy.matcher import compile_policy
+from autonomy_gatekeeper.schemas import DecisionCard
+
+RULE_COUNTS = [10, 100, 1_000, 10_000]
+REQUEST_LENGTHS = [64, 1_024, 8_192, 65_536]
+QUICK_RULE_COUNTS = [10, 1_000]
+QUICK_REQUEST_LENGTHS = [64, 8_192]
+
+DEFAULT_OUTPUT = Path(__file__).parent / "results" / "latest.json"
+
+
+def measure(
+    func: Callable[[], Any],
+    min_time: float = 0.2,
+    min_runs: int = 5,
+    max_runs: int = 1000,
+) -> dict[str, float | int]:
+    """Time ``func`` repeatedly and summarize the per-call latency in ms."""
+    samples: list[float] = []
+    started = time.perf_counter()
+    while len(samples) < min_runs or (
+        len(samples) < max_runs and time.perf_counter() - started < min_time
+    ):
+        t0 = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - t0) * 1e3)
+    samples.sort()
+    return {
+        "runs": len(samples),
+        "mean_ms": statistics.fmean(samples),
+        "median_ms": statistics.median(samples),
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        "min_ms": samples[0],
+    }
+
+
+def run_suite(rule_counts: list[int], request_lengths: list[int]) -> dict[str, Any]:
+    rng = random.Random(2024)
+    results: dict[str, Any] = {}
+
+    def record(name: str, func: Callable[[], Any], **kwargs: Any) -> None:
+        results[name] = measure(func, **kwargs)
+        print(f"{name:<48} {results[name]['median_ms']:>10.3f} ms", file=sys.stderr)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for rule_count in rule_counts:
+            rules = generate_rules(rule_count, rng)
+            path = write_rules(rules, Path(tmp) / f"rules_{rule_count}.yaml")
+            record(
+                f"load_policy_rules/rules={rule_count}",
+                lambda path=path: load_policy_rules(str(path)),
+                min_runs=3,
+            )
+            write_artifact(path)
+            record(
+                f"load_policy_artifact/rules={rule_count}",
+                lambda path=path: load_policy(str(path)),
+                min_runs=3,
+            )
+            record(
+                f"compile_policy/rules={rule_count}",
+                lambda rules=rules: compile_policy(rules),
+                min_runs=3,
+            )
+
+            policy = compile_policy(rules)
+            expression_policy = compile_policy(as_expressions(rules))
+            for length in request_lengths:
+                request = generate_request(length, rules, rng)
+                record(
+                    f"evaluate_policies/rules={rule_count}/chars={length}",
+                    lambda request=request, policy=policy: evaluate_policies(
+                        new_state(request), policy
+                    ),
+                )
+                record(
+                    f"evaluate_expressions/rules={rule_count}/chars={length}",
+                    lambda request=request, policy=expression_policy: evaluate_policies(
+                        new_state(request), policy
+                    ),
+                )
+
+    rules = generate_rules(100, rng)
+    policy = compile_policy(rules)
+    for length in request_lengths:
+        request = generate_request(length, rules, rng)
+        state = evaluate_policies(new_state(request), policy)
+        state["llm_response"] = json.loads(fake_llm_reply(request))
+        record(
+            f"build_decision_card/chars={length}",
+            lambda state=state: build_decision_card(dict(state)),  # type: ignore[arg-type]
+        )
+        card = DecisionCard(**build_decision_card(dict(state))["decision_card"])  # type: ignore[arg-type]
+        record(f"card_serialize_json/chars={length}", card.model_dump_json)
+
+    settings = Settings(llm_provider="local", llm_cache_enabled=False)
+    # Non-critical rules keep the LLM on the path; "llm: skip" takes it off.
+    llm_policy = compile_policy(
+        [{**rule, "decision": "HOLD", "risk_level": "medium"} for rule in rules]
+    )
+    skip_policy = compile_policy([{**rule, "llm": "skip"} for rule in rules])
+    keyword = rules[0]["keywords"][0]
+    for length in request_lengths:
+        # Lead with a keyword so that a rule always matches: an unmatched
+        # request is routed "auto" and would reach the LLM under skip_policy.
+        filler = generate_request(max(0, length - len(keyword) - 1), rules, rng)
+        request = f"{keyword} {filler}"[:length]
+        for label, case_policy, skipped in (
+            ("llm", llm_policy, False),
+            ("policy_only", skip_policy, True),
+        ):
+            compiled = build_graph(settings, policy=case_policy).compile()
+            card = compiled.invoke(new_state(request))["decision_card"]
+            assert card["metadata"]["llm_skipped"] is skipped, (label, length)
+            record(
+                f"graph_invoke_{label}/chars={length}",
+                lambda request=request, compiled=compiled: compiled.invoke(
+                    new_state(request)
+                ),
+            )
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--quick", action="store_true", help="Run a reduced matrix of sizes."
+    )
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    rule_counts = QUICK_RULE_COUNTS if args.quick else RULE_COUNTS
+    request_lengths = QUICK_REQUEST_LENGTHS if args.quick else REQUEST_LENGTHS
+    report = {
+        "meta": {
+            "created": datetime.now(UTC).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": args.quick,
+        },
+        "results": run_suite(rule_counts, request_lengths),
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f"Wrote {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,41 +3,128 @@
 from __future__ import annotations
 
 import json
+import sys
+from contextlib import ExitStack
+from pathlib import Path
 
+from autonomy_gatekeeper.batch import (
+    BatchStats,
+    evaluate_batch,
+    read_checkpoint,
+    truncate_output,
+)
 from autonomy_gatekeeper.config import Settings, load_settings
-from autonomy_gatekeeper.graph import GatekeeperState, build_graph
+from autonomy_gatekeeper.engine import get_engine
 from autonomy_gatekeeper.schemas import DecisionCard
-from autonomy_gatekeeper.utils.logging import setup_logging
+from autonomy_gatekeeper.scoring import DEFAULT_CHUNK_SIZE, ScoringStats, score_file
 
 
 def evaluate_request(
     request: str,
     settings: Settings | None = None,
+    tenant: str | None = None,
 ) -> DecisionCard:
-    """Run a request through the governance graph and return a DecisionCard."""
-    if settings is None:
-        settings = load_settings()
-
-    logger = setup_logging(settings.log_level)
-    logger.info("Evaluating request: %s", request[:120])
-
-    graph = build_graph(settings)
-    compiled = graph.compile()
-
-    initial_state: GatekeeperState = {
-        "request": request,
-        "matched_policies": [],
-        "policy_decision": "HOLD",
-        "policy_risk": "medium",
-        "llm_response": {},
-        "decision_card": {},
-    }
-
-    final_state = compiled.invoke(initial_state)
-    card = DecisionCard(**final_state["decision_card"])
-
-    logger.info("Decision: %s | Risk: %s", card.decision.value, card.risk_level.value)
-    return card
+    """Run a request through the governance graph and return a DecisionCard.
+
+    Uses a cached :class:`Gatekeeper` engine, so settings, rules and the
+    compiled graph are only built on the first call for a given configuration.
+    ``tenant`` selects a policy set from ``settings.policy_dir``.
+    """
+    return get_engine(settings).evaluate(request, tenant=tenant)
+
+
+def evaluate_request_file(
+    path: str,
+    settings: Settings | None = None,
+    tenant: str | None = None,
+) -> DecisionCard:
+    """Evaluate the contents of ``path`` as one request, reading it in chunks.
+
+    See :meth:`Gatekeeper.evaluate_file`.
+    """
+    return get_engine(settings).evaluate_file(path, tenant=tenant)
+
+
+async def aevaluate_request(
+    request: str,
+    settings: Settings | None = None,
+    tenant: str | None = None,
+) -> DecisionCard:
+    """Async variant of :func:`evaluate_request` that never blocks the loop on I/O."""
+    return await get_engine(settings).aevaluate(request, tenant=tenant)
+
+
+def evaluate_batch_file(
+    input_path: str,
+    output_path: str,
+    settings: Settings | None = None,
+    concurrency: int = 4,
+    checkpoint_path: str | None = None,
+    tenant: str | None = None,
+) -> BatchStats:
+    """Evaluate a JSONL request file and stream Decision Cards to a JSONL file.
+
+    Use ``"-"`` for stdin or stdout. When resuming from a checkpoint, the
+    output file is cut back to the checkpointed size and appended to rather
+    than overwritten.
+    """
+    resuming = checkpoint_path is not None and read_checkpoint(checkpoint_path) > 0
+    if resuming and checkpoint_path is not None and output_path != "-":
+        truncate_output(output_path, checkpoint_path)
+    with ExitStack() as stack:
+        source = (
+            sys.stdin
+            if input_path == "-"
+            else stack.enter_context(open(Path(input_path), encoding="utf-8"))
+        )
+        sink = (
+            sys.stdout
+            if output_path == "-"
+            else stack.enter_context(
+                open(Path(output_path), "a" if resuming else "w", encoding="utf-8")
+            )
+        )
+        return evaluate_batch(
+            get_engine(settings),
+            source,
+            sink,
+            concurrency=concurrency,
+            checkpoint_path=checkpoint_path,
+            tenant=tenant,
+        )
+
+
+def score_batch_file(
+    input_path: str,
+    output_path: str,
+    settings: Settings | None = None,
+    workers: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> ScoringStats:
+    """Re-score a JSONL request file against the policy alone, on all cores.
+
+    Writes one score record per request (see :mod:`autonomy_gatekeeper.scoring`)
+    in input order. Use ``"-"`` for stdin or stdout.
+    """
+    settings = settings or load_settings()
+    with ExitStack() as stack:
+        source = (
+            sys.stdin
+            if input_path == "-"
+            else stack.enter_context(open(Path(input_path), encoding="utf-8"))
+        )
+        sink = (
+            sys.stdout
+            if output_path == "-"
+            else stack.enter_context(open(Path(output_path), "w", encoding="utf-8"))
+        )
+        return score_file(
+            settings.policy_path,
+            source,
+            sink,
+            workers=workers,
+            chunk_size=chunk_size,
+        )
 
 
 def format_output(card: DecisionCard, output_json: bool = False) -> str:
@@ -0,0 +1,594 @@
+"""Decision audit store — every Decision Card, retained and queryable.
+
+:class:`AuditWriter` appends cards to a directory of NDJSON segment files
+(``segment-00000001.ndjson``, ...), one card per line. Cards are handed to a
+background thread and written in batches, so an evaluation only pays for a
+queue put. A segment is sealed when it reaches ``segment_max_bytes`` or the
+writer closes. Sealing writes a sidecar index (``segment-00000001.idx``).
+
+The index is columnar. It holds the timestamp, byte offset and length of
+every record, plus postings lists of record numbers keyed by decision, risk
+level and matched rule ID. :class:`AuditReader` uses the index to skip
+segments outside a time range and to intersect postings, then reads only the
+matching records from the memory-mapped segment. A segment with no index,
+or one that doesn't match its segment, is indexed on the fly by scanning it.
+This covers the segment being written and the last segment after a crash.
+"""
+
+from __future__ import annotations
+
+import atexit
+import bisect
+import json
+import logging
+import mmap
+import os
+import queue
+import re
+import struct
+import threading
+from array import array
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from autonomy_gatekeeper.config import Settings
+from autonomy_gatekeeper.schemas import DecisionCard
+
+logger = logging.getLogger("autonomy_gatekeeper")
+
+SEGMENT_GLOB = "segment-*.ndjson"
+INDEX_MAGIC = b"GKAUDIT1"
+INDEX_FIELDS = ("decision", "risk_level", "rule_id")
+DEFAULT_SEGMENT_MAX_BYTES = 64 * 1024 * 1024
+
+_HEADER = struct.Struct("<8sI")
+
+
+def segment_path(directory: Path, sequence: int) -> Path:
+    """Path of the segment numbered ``sequence``."""
+    return directory / f"segment-{sequence:08d}.ndjson"
+
+
+def index_path(segment: Path) -> Path:
+    """Path of the sidecar index for ``segment``."""
+    return segment.with_suffix(".idx")
+
+
+def _timestamp_us(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=UTC)
+    return int(value.timestamp() * 1_000_000)
+
+
+def _record_keys(card: dict[str, Any]) -> dict[str, list[str]]:
+    return {
+        "decision": [str(card.get("decision", ""))],
+        "risk_level": [str(card.get("risk_level", ""))],
+        "rule_id": [
+            str(match.get("rule_id", "")) for match in card.get("matched_policies", [])
+        ],
+    }
+
+
+class SegmentIndex:
+    """Record locations and postings lists for one segment."""
+
+    def __init__(
+        self,
+        size: int = 0,
+        timestamps: Sequence[int] | None = None,
+        offsets: Sequence[int] | None = None,
+        lengths: Sequence[int] | None = None,
+        postings: dict[str, dict[str, Sequence[int]]] | None = None,
+        ordered: bool = True,
+    ) -> None:
+        self.size = size
+        self.timestamps: Sequence[int] = (
+            array("q") if timestamps is None else timestamps
+        )
+        self.offsets: Sequence[int] = array("Q") if offsets is None else offsets
+        self.lengths: Sequence[int] = array("I") if lengths is None else lengths
+        self.postings: dict[str, dict[str, Sequence[int]]] = (
+            {name: {} for name in INDEX_FIELDS} if postings is None else postings
+        )
+        # Whether timestamps never decrease, so time ranges can be bisected.
+        self.ordered = ordered
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def time_range(self) -> tuple[int, int] | None:
+        """The earliest and latest record timestamps, or ``None`` if empty."""
+        if not len(self):
+            return None
+        if self.ordered:
+            return self.timestamps[0], self.timestamps[-1]
+        return min(self.timestamps), max(self.timestamps)
+
+    def add(self, timestamp_us: int, length: int, keys: dict[str, list[str]]) -> None:
+        """Index a record of ``length`` bytes appended at the current end."""
+        ordinal = len(self)
+        if ordinal and timestamp_us < self.timestamps[-1]:
+            self.ordered = False
+        self.timestamps.append(timestamp_us)  # type: ignore[attr-defined]
+        self.offsets.append(self.size)  # type: ignore[attr-defined]
+        self.lengths.append(length)  # type: ignore[attr-defined]
+        self.size += length
+        for name, values in keys.items():
+            postings = self.postings[name]
+            for value in dict.fromkeys(values):
+                postings.setdefault(value, array("I")).append(ordinal)  # type: ignore[attr-defined]
+
+    @classmethod
+    def scan(cls, data: bytes | mmap.mmap) -> SegmentIndex:
+        """Build an index by reading every complete line of a segment."""
+        index = cls()
+        end = data.rfind(b"\n") + 1
+        position = 0
+        while position < end:
+            newline = data.find(b"\n", position, end)
+            line = data[position : newline + 1]
+            try:
+                card = json.loads(line)
+                timestamp = _timestamp_us(datetime.fromisoformat(card["timestamp"]))
+                keys = _record_keys(card)
+            except (ValueError, KeyError, TypeError):
+                logger.warning("Skipping unreadable audit record at byte %d", position)
+                index.size += len(line)
+                position = newline + 1
+                continue
+            index.add(timestamp, len(line), keys)
+            position = newline + 1
+        return index
+
+    def to_bytes(self) -> bytes:
+        """Serialize as header, timestamp, offset and length columns, postings."""
+        count = len(self)
+        blocks = [
+            array("q", self.timestamps).tobytes(),
+            array("Q", self.offsets).tobytes(),
+            array("I", self.lengths).tobytes(),
+        ]
+        cursor = sum(map(len, blocks))
+        directory: dict[str, dict[str, list[int]]] = {}
+        for name, postings in self.postings.items():
+            directory[name] = {}
+            for value, ordinals in postings.items():
+                encoded = array("I", ordinals).tobytes()
+                directory[name][value] = [cursor, len(ordinals)]
+                blocks.append(encoded)
+                cursor += len(encoded)
+        header = json.dumps(
+            {
+                "size": self.size,
+                "count": count,
+                "ordered": self.ordered,
+                "postings": directory,
+            }
+        ).encode("utf-8")
+        # Pad so the 8-byte columns start aligned.
+        header += b" " * (-(_HEADER.size + len(header)) % 8)
+        return _HEADER.pack(INDEX_MAGIC, len(header)) + header + b"".join(blocks)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> SegmentIndex:
+        """Load an index written by :meth:`to_bytes` without copying columns."""
+        magic, header_size = _HEADER.unpack_from(data)
+        if magic != INDEX_MAGIC:
+            raise ValueError("not an audit index")
+        start = _HEADER.size + header_size
+        header = json.loads(data[_HEADER.size : start])
+        count = header["count"]
+        body = memoryview(data)[start:]
+        timestamps = body[: 8 * count].cast("q")
+        offsets = body[8 * count : 16 * count].cast("Q")
+        lengths = body[16 * count : 20 * count].cast("I")
+        postings: dict[str, dict[str, Sequence[int]]] = {
+            name: {
+                value: body[offset : offset + 4 * size].cast("I")
+                for value, (offset, size) in values.items()
+            }
+            for name, values in header["postings"].items()
+        }
+        return cls(
+            header["size"], timestamps, offsets, lengths, postings, header["ordered"]
+        )
+
+    def select(
+        self,
+        filters: Mapping[str, Iterable[str]],
+        since_us: int | None = None,
+        until_us: int | None = None,
+    ) -> list[int]:
+        """Ordinals of the records matching every filter and the time range.
+
+        Each filter matches any of its values. The time range is half-open:
+        ``since <= timestamp < until``.
+        """
+        candidates: set[int] | None = None
+        for name, values in sorted(
+            filters.items(), key=lambda item: self._estimate(item[0], item[1])
+        ):
+            postings = self.postings.get(name, {})
+            matched: set[int] = set()
+            for value in values:
+                matched.update(postings.get(value, ()))
+            candidates = matched if candidates is None else candidates & matched
+            if not candidates:
+                return []
+
+        timestamps = self.timestamps
+        if candidates is None:
+            if self.ordered:
+                low = (
+                    0 if since_us is None else bisect.bisect_left(timestamps, since_us)
+                )
+                high = (
+                    len(self)
+                    if until_us is None
+                    else bisect.bisect_left(timestamps, until_us)
+                )
+                return list(range(low, high))
+            ordinals: Iterable[int] = range(len(self))
+        else:
+            ordinals = sorted(candidates)
+        return [
+            i
+            for i in ordinals
+            if (since_us is None or timestamps[i] >= since_us)
+            and (until_us is None or timestamps[i] < until_us)
+        ]
+
+    def _estimate(self, name: str, values: Iterable[str]) -> int:
+        postings = self.postings.get(name, {})
+        return sum(len(postings.get(value, ())) for value in values)
+
+
+@dataclass
+class AuditStats:
+    """Counters for an :class:`AuditWriter`."""
+
+    queued: int = 0
+    written: int = 0
+    batches: int = 0
+    segments: int = 0
+    errors: int = 0
+
+    def to_dict(self) -> dict[str, int]:
+        """Return the counters as a plain dict."""
+        return asdict(self)
+
+
+@dataclass
+class _Flush:
+    done: threading.Event = field(default_factory=threading.Event)
+
+
+_STOP = object()
+
+
+class AuditWriter:
+    """Appends Decision Cards to segmented NDJSON files on a background thread.
+
+    :meth:`append` only enqueues the card. The writer thread serializes
+    whatever has queued up, up to ``batch_size`` cards, and writes it with a
+    single call, waiting at most ``flush_interval_seconds`` for more. Each
+    writer starts a new segment; existing segments are never modified,
+    apart from being indexed if they were left unsealed. Segments are
+    created exclusively, so writers sharing a directory never write to the
+    same one.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        segment_max_bytes: int = DEFAULT_SEGMENT_MAX_BYTES,
+        flush_interval_seconds: float = 0.5,
+        batch_size: int = 512,
+        fsync: bool = False,
+    ) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_max_bytes = segment_max_bytes
+        self.flush_interval_seconds = flush_interval_seconds
+        self.batch_size = max(1, batch_size)
+        self.fsync = fsync
+        self.stats = AuditStats()
+
+        existing = sorted(self.directory.glob(SEGMENT_GLOB))
+        for segment in existing:
+            if load_index(segment) is None:
+                seal_segment(segment)
+        self._sequence = int(existing[-1].stem.split("-")[1]) if existing else 0
+        self._file: Any = None
+        self._index = SegmentIndex()
+
+        self._queue: queue.SimpleQueue[Any] = queue.SimpleQueue()
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self._thread = threading.Thread(
+            target=self._run, name="gatekeeper-audit", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    def append(self, card: DecisionCard) -> None:
+        """Queue ``card`` to be written."""
+        if self._closed:
+            raise RuntimeError("audit writer is closed")
+        self.stats.queued += 1
+        self._queue.put(card)
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until every card queued so far has been written."""
+        if self._closed:
+            return True
+        marker = _Flush()
+        self._queue.put(marker)
+        return marker.done.wait(timeout)
+
+    def close(self) -> None:
+        """Write everything queued, seal the current segment and stop."""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+        atexit.unregister(self.close)
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=self.flush_interval_seconds)
+            except queue.Empty:
+                continue
+            batch: list[DecisionCard] = []
+            markers: list[_Flush] = []
+            while True:
+                if item is _STOP:
+                    stopping = True
+                elif isinstance(item, _Flush):
+                    markers.append(item)
+                else:
+                    batch.append(item)
+                if stopping or len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    self._write(batch)
+                except Exception:
+                    self.stats.errors += len(batch)
+                    logger.exception("Failed to write %d audit records", len(batch))
+            for marker in markers:
+                marker.done.set()
+        self._seal()
+
+    def _write(self, cards: list[DecisionCard]) -> None:
+        chunks: list[bytes] = []
+        for card in cards:
+            line = card.model_dump_json().encode("utf-8") + b"\n"
+            if self._file is None or (
+                len(self._index)
+                and self._index.size + len(line) > self.segment_max_bytes
+            ):
+                self._write_out(chunks)
+                chunks = []
+                self._roll()
+            self._index.add(
+                _timestamp_us(card.timestamp),
+                len(line),
+                {
+                    "decision": [card.decision.value],
+                    "risk_level": [card.risk_level.value],
+                    "rule_id": [match.rule_id for match in card.matched_policies],
+                },
+            )
+            chunks.append(line)
+        self._write_out(chunks)
+        self.stats.written += len(cards)
+        self.stats.batches += 1
+
+    def _write_out(self, chunks: list[bytes]) -> None:
+        if not chunks or self._file is None:
+            return
+        self._file.write(b"".join(chunks))
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def _roll(self) -> None:
+        self._seal()
+        # Other writers may share the directory: create the segment exclusively
+        # and take the next number if one of them got there first.
+        while True:
+            self._sequence += 1
+            try:
+                self._file = open(  # noqa: SIM115 - open until the segment is sealed
+                    segment_path(self.directory, self._sequence), "xb"
+                )
+            except FileExistsError:
+                continue
+            break
+        self._index = SegmentIndex()
+        self.stats.segments += 1
+
+    def _seal(self) -> None:
+        if self._file is None:
+            return
+        self._file.close()
+        _write_index(Path(self._file.name), self._index)
+        self._file = None
+
+
+def _write_index(segment: Path, index: SegmentIndex) -> None:
+    target = index_path(segment)
+    tmp = target.with_name(target.name + ".tmp")
+    tmp.write_bytes(index.to_bytes())
+    os.replace(tmp, target)
+
+
+def seal_segment(segment: Path) -> SegmentIndex:
+    """Index ``segment`` by scanning it and write its sidecar index."""
+    index = _scan_segment(segment)
+    _write_index(segment, index)
+    return index
+
+
+def load_index(segment: Path) -> SegmentIndex | None:
+    """The segment's sidecar index, or ``None`` if missing or out of date."""
+    try:
+        index = SegmentIndex.from_bytes(index_path(segment).read_bytes())
+    except FileNotFoundError:
+        return None
+    except (ValueError, KeyError, struct.error, TypeError) as e:
+        logger.warning("Ignoring unreadable audit index for %s: %s", segment, e)
+        return None
+    return index if index.size == segment.stat().st_size else None
+
+
+def _scan_segment(segment: Path) -> SegmentIndex:
+    with open(segment, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return SegmentIndex()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return SegmentIndex.scan(data)
+
+
+_DURATION = re.compile(r"^(\d+(?:\.\d+)?)([smhdw])$")
+_DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def parse_time(value: str, now: datetime | None = None) -> datetime:
+    """Parse an ISO timestamp or a duration ago such as ``30m``, ``24h``, ``7d``."""
+    match = _DURATION.match(value.strip())
+    if match:
+        seconds = float(match.group(1)) * _DURATION_UNITS[match.group(2)]
+        return (now or datetime.now(UTC)) - timedelta(seconds=seconds)
+    parsed = datetime.fromisoformat(value.strip())
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=UTC)
+
+
+class AuditReader:
+    """Indexed queries over an audit directory."""
+
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = Path(directory)
+
+    def segments(self) -> list[Path]:
+        """Segment files, oldest first."""
+        return sorted(self.directory.glob(SEGMENT_GLOB))
+
+    def query(
+        self,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        decisions: Iterable[str] = (),
+        risk_levels: Iterable[str] = (),
+        rule_ids: Iterable[str] = (),
+        limit: int | None = None,
+        newest_first: bool = False,
+    ) -> Iterator[dict[str, Any]]:
+        """Yield matching cards as dicts.
+
+        Each filter matches any of its values, and all the filters given
+        must match. ``until`` is exclusive.
+        """
+        for raw in self.query_raw(
+            since, until, decisions, risk_levels, rule_ids, limit, newest_first
+        ):
+            record: dict[str, Any] = json.loads(raw)
+            yield record
+
+    def query_raw(
+        self,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        decisions: Iterable[str] = (),
+        risk_levels: Iterable[str] = (),
+        rule_ids: Iterable[str] = (),
+        limit: int | None = None,
+        newest_first: bool = False,
+    ) -> Iterator[bytes]:
+        """Like :meth:`query`, but yield each card's JSON line undecoded."""
+        filters = {
+            name: list(values)
+            for name, values in zip(
+                INDEX_FIELDS,
+                (
+                    [d.upper() for d in decisions],
+                    [r.lower() for r in risk_levels],
+                    list(rule_ids),
+                ),
+                strict=True,
+            )
+            if values
+        }
+        since_us = None if since is None else _timestamp_us(since)
+        until_us = None if until is None else _timestamp_us(until)
+        remaining = limit
+
+        segments = self.segments()
+        if newest_first:
+            segments.reverse()
+        for segment in segments:
+            if remaining is not None and remaining <= 0:
+                return
+            index = load_index(segment) or _scan_segment(segment)
+            if not _overlaps(index, since_us, until_us):
+                continue
+            ordinals = index.select(filters, since_us, until_us)
+            if newest_first:
+                ordinals.reverse()
+            if remaining is not None:
+                ordinals = ordinals[:remaining]
+                remaining -= len(ordinals)
+            if ordinals:
+                yield from _read_records(segment, index, ordinals)
+
+    def count(self, **filters: Any) -> int:
+        """Number of cards matching the :meth:`query` filters."""
+        return sum(1 for _ in self.query_raw(**filters))
+
+
+def _overlaps(index: SegmentIndex, since_us: int | None, until_us: int | None) -> bool:
+    bounds = index.time_range()
+    if bounds is None:
+        return False
+    low, high = bounds
+    return (since_us is None or high >= since_us) and (
+        until_us is None or low < until_us
+    )
+
+
+def _read_records(
+    segment: Path, index: SegmentIndex, ordinals: list[int]
+) -> Iterator[bytes]:
+    with (
+        open(segment, "rb") as f,
+        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data,
+    ):
+        offsets, lengths = index.offsets, index.lengths
+        for i in ordinals:
+            start = offsets[i]
+            yield data[start : start + lengths[i]].rstrip(b"\n")
+
+
+def create_audit_writer(settings: Settings) -> AuditWriter | None:
+    """Build the audit writer configured in ``settings``, if auditing is enabled."""
+    if not settings.audit_dir:
+        return None
+    return AuditWriter(
+        settings.audit_dir,
+        segment_max_bytes=settings.audit_segment_max_bytes,
+        flush_interval_seconds=settings.audit_flush_interval_seconds,
+        fsync=settings.audit_fsync,
+    )
@@ -0,0 +1,219 @@
+"""Streaming batch evaluation — JSONL requests in, JSONL Decision Cards out.
+
+Requests are read lazily and evaluated on a bounded thread pool, so memory
+use stays constant regardless of input size. Results are written in input
+order, and a checkpoint records how many input lines have been fully written,
+and how large the output was then, so an interrupted run can resume where
+it stopped.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, TextIO
+
+from autonomy_gatekeeper import profiling
+from autonomy_gatekeeper.engine import Gatekeeper
+from autonomy_gatekeeper.schemas import DecisionCard
+
+logger = logging.getLogger("autonomy_gatekeeper")
+
+
+@dataclass
+class BatchStats:
+    """Summary of a batch evaluation run."""
+
+    processed: int = 0
+    llm_skipped: int = 0
+    errors: int = 0
+    resumed_from: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Requests processed per second."""
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return self.processed / self.elapsed_seconds
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the stats, including throughput, as a plain dict."""
+        return {**asdict(self), "throughput": round(self.throughput, 2)}
+
+
+def parse_request_line(line: str) -> str | None:
+    """Extract the request text from one JSONL line.
+
+    A line may be an object with a ``request`` field or a bare JSON string.
+    Blank lines yield ``None``.
+    """
+    line = line.strip()
+    if not line:
+        return None
+    data = json.loads(line)
+    if isinstance(data, str):
+        return data
+    if isinstance(data, dict):
+        request = data.get("request")
+        if isinstance(request, str):
+            return request
+    raise ValueError("expected a JSON string or an object with a 'request' field")
+
+
+def read_checkpoint(path: str | Path) -> int:
+    """Return the input offset stored in a checkpoint file (0 if absent)."""
+    path = Path(path)
+    if not path.exists():
+        return 0
+    return int(json.loads(path.read_text()).get("offset", 0))
+
+
+def read_checkpoint_output_size(path: str | Path) -> int | None:
+    """Return the output size in bytes stored in a checkpoint file, if any."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    size = json.loads(path.read_text()).get("output_bytes")
+    return None if size is None else int(size)
+
+
+def write_checkpoint(
+    path: str | Path, offset: int, output_bytes: int | None = None
+) -> None:
+    """Atomically record ``offset`` as the number of completed input lines.
+
+    ``output_bytes`` is the size of the output written for those lines, so a
+    resumed run can drop records written after the checkpoint.
+    """
+    path = Path(path)
+    state: dict[str, int] = {"offset": offset}
+    if output_bytes is not None:
+        state["output_bytes"] = output_bytes
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(state))
+    os.replace(tmp, path)
+
+
+def truncate_output(path: str | Path, checkpoint_path: str | Path) -> None:
+    """Cut ``path`` back to the size recorded in the checkpoint.
+
+    Cards are streamed out between checkpoints, so after a crash the output
+    can hold records the checkpoint does not cover; resuming would write
+    them again.
+    """
+    size = read_checkpoint_output_size(checkpoint_path)
+    path = Path(path)
+    if size is not None and path.exists() and path.stat().st_size > size:
+        os.truncate(path, size)
+
+
+def _output_size(sink: TextIO) -> int | None:
+    """The position of ``sink`` after a flush, or None if it can't seek."""
+    try:
+        return sink.tell()
+    except (OSError, ValueError):
+        return None
+
+
+def evaluate_stream(
+    engine: Gatekeeper,
+    requests: Iterable[str],
+    concurrency: int = 4,
+    tenant: str | None = None,
+) -> Iterator[Future[DecisionCard]]:
+    """Evaluate ``requests`` concurrently, yielding completed futures in order.
+
+    At most ``2 * concurrency`` requests are held in memory at any time.
+    ``tenant`` selects the policy set every request is evaluated against.
+    """
+    window = max(1, concurrency) * 2
+    pending: deque[Future[DecisionCard]] = deque()
+    with ThreadPoolExecutor(
+        max_workers=max(1, concurrency), thread_name_prefix="gatekeeper-batch"
+    ) as pool:
+        for request in requests:
+            pending.append(pool.submit(engine.evaluate, request, tenant=tenant))
+            if len(pending) >= window:
+                yield _wait(pending.popleft())
+        while pending:
+            yield _wait(pending.popleft())
+
+
+def _wait(future: Future[DecisionCard]) -> Future[DecisionCard]:
+    """Block until ``future`` has finished, successfully or not."""
+    future.exception()
+    return future
+
+
+def evaluate_batch(
+    engine: Gatekeeper,
+    source: TextIO,
+    sink: TextIO,
+    concurrency: int = 4,
+    checkpoint_path: str | Path | None = None,
+    checkpoint_every: int = 100,
+    tenant: str | None = None,
+) -> BatchStats:
+    """Stream requests from ``source`` and write Decision Cards to ``sink``.
+
+    Each output line is either a Decision Card or, if evaluation failed, an
+    object with ``request`` and ``error`` fields. If ``checkpoint_path`` is
+    set, input lines already recorded there are skipped and progress is saved
+    every ``checkpoint_every`` lines.
+    """
+    stats = BatchStats()
+    if checkpoint_path is not None:
+        stats.resumed_from = read_checkpoint(checkpoint_path)
+
+    # Line numbers ride alongside the requests so the checkpoint can record
+    # input offsets even when blank lines are skipped.
+    in_flight: deque[tuple[int, str]] = deque()
+
+    def requests() -> Iterator[str]:
+        for number, line in enumerate(source, start=1):
+            if number <= stats.resumed_from:
+                continue
+            try:
+                request = parse_request_line(line)
+            except ValueError as e:
+                logger.warning("Skipping malformed input line %d: %s", number, e)
+                continue
+            if request is not None:
+                in_flight.append((number, request))
+                yield request
+
+    offset = stats.resumed_from
+    started = time.perf_counter()
+    futures = evaluate_stream(engine, requests(), concurrency, tenant)
+    for future in futures:
+        offset, request = in_flight.popleft()
+        error = future.exception()
+        if error is None:
+            card = future.result()
+            if card.metadata.get("llm_skipped"):
+                stats.llm_skipped += 1
+            with profiling.stage("render"):
+                record = card.model_dump_json()
+        else:
+            stats.errors += 1
+            record = json.dumps({"request": request, "error": str(error)})
+        sink.write(record + "\n")
+        stats.processed += 1
+
+        if checkpoint_path is not None and stats.processed % checkpoint_every == 0:
+            sink.flush()
+            write_checkpoint(checkpoint_path, offset, _output_size(sink))
+
+    sink.flush()
+    if checkpoint_path is not None:
+        write_checkpoint(checkpoint_path, offset, _output_size(sink))
+    stats.elapsed_seconds = time.perf_counter() - started
+    return stats
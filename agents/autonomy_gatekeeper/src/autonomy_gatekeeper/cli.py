@@ -1,14 +1,71 @@
-"""CLI entrypoint for the Autonomy Gatekeeper."""
+"""CLI entrypoint for the Autonomy Gatekeeper.
+
+The CLI is often called from shell hooks, so startup time matters. Only
+``click`` is imported at module level; the application, settings and
+``rich`` are imported inside the commands that use them, and LangGraph and
+LangChain load only if a request actually needs the LLM.
+"""
 
 from __future__ import annotations
 
+from collections.abc import Iterator
+from contextlib import contextmanager
+from functools import cache
+from typing import TYPE_CHECKING
+
 import click
-from rich.console import Console
 
-from autonomy_gatekeeper.app import evaluate_request, format_output
-from autonomy_gatekeeper.config import load_settings
+if TYPE_CHECKING:
+    from rich.console import Console
+
+    from autonomy_gatekeeper.profiling import Profiler
+
+
+@cache
+def _console(stderr: bool = False) -> Console:
+    from rich.console import Console
+
+    return Console(stderr=stderr)
+
+
+@contextmanager
+def _profiled(profile_dir: str | None, allocation_sites: bool) -> Iterator[None]:
+    """Profile the enclosed code into ``profile_dir`` and print a breakdown."""
+    if profile_dir is None:
+        yield
+        return
+    from autonomy_gatekeeper.profiling import Profiler
+
+    profiler = Profiler(profile_dir, allocation_sites=allocation_sites)
+    try:
+        with profiler:
+            yield
+    finally:
+        _print_profile(profiler, len(profiler.write()))
+
+
+def _print_profile(profiler: Profiler, files: int) -> None:
+    from rich.table import Table
 
-console = Console()
+    stages = profiler.stats()
+    total = sum(s.wall_seconds for s in stages) or 1.0
+    table = Table(title=f"Profile ({profiler.wall_seconds * 1e3:.1f} ms wall)")
+    table.add_column("Stage")
+    for column in ("Calls", "Wall ms", "Share", "CPU ms", "Alloc KiB", "Peak KiB"):
+        table.add_column(column, justify="right")
+    for s in stages:
+        table.add_row(
+            s.name,
+            str(s.calls),
+            f"{s.wall_seconds * 1e3:.2f}",
+            f"{s.wall_seconds / total:.0%}",
+            f"{s.cpu_seconds * 1e3:.2f}",
+            f"{s.alloc_bytes / 1024:.1f}",
+            f"{s.peak_bytes / 1024:.1f}",
+        )
+    console = _console(stderr=True)
+    console.print(table)
+    console.print(f"Wrote {files} profile files to {profiler.output_dir}")
 
 
 @click.group()
@@ -21,9 +78,15 @@ def main() -> None:
 @click.option(
     "--request",
     "-r",
-    required=True,
+    default=None,
     help="The request text to evaluate.",
 )
+@click.option(
+    "--request-file",
+    "-f",
+    default=None,
+    help="Evaluate the contents of this file, read in chunks (for large payloads).",
+)
 @click.option(
     "--json-output",
     is_flag=True,
@@ -36,18 +99,476 @@ def main() -> None:
     default=None,
     help="Path to a custom policy rules YAML file.",
 )
-def evaluate(request: str, json_output: bool, policy: str | None) -> None:
-    """Evaluate a request and produce a Decision Card."""
+@click.option(
+    "--tenant",
+    "-t",
+    default=None,
+    help="Use this tenant's policy set from the policy directory.",
+)
+@click.option(
+    "--policy-dir",
+    default=None,
+    help="Directory of per-tenant policy files (<tenant>.yaml).",
+)
+@click.option(
+    "--profile",
+    "profile_dir",
+    default=None,
+    metavar="DIR",
+    help="Profile each pipeline stage and write the reports to DIR.",
+)
+@click.option(
+    "--profile-allocations",
+    is_flag=True,
+    default=False,
+    help="With --profile, also list each stage's allocation sites (slow).",
+)
+def evaluate(
+    request: str | None,
+    request_file: str | None,
+    json_output: bool,
+    policy: str | None,
+    tenant: str | None,
+    policy_dir: str | None,
+    profile_dir: str | None,
+    profile_allocations: bool,
+) -> None:
+    """Evaluate a request and produce a Decision Card.
+
+    Pass the request as text with --request, or as a file with --request-file.
+    With --profile, each pipeline stage's CPU profile and allocations are
+    written to a directory and a per-stage breakdown is printed to stderr.
+    """
+    if (request is None) == (request_file is None):
+        raise click.UsageError("Pass exactly one of --request or --request-file.")
+
+    with _profiled(profile_dir, profile_allocations):
+        from autonomy_gatekeeper import profiling
+        from autonomy_gatekeeper.app import (
+            evaluate_request,
+            evaluate_request_file,
+            format_output,
+        )
+        from autonomy_gatekeeper.config import load_settings
+
+        console = _console()
+        with profiling.stage("settings"):
+            settings = load_settings()
+        if policy:
+            settings.policy_path = policy
+        if policy_dir:
+            settings.policy_dir = policy_dir
+
+        try:
+            if request_file is not None:
+                card = evaluate_request_file(request_file, settings, tenant)
+            else:
+                card = evaluate_request(str(request), settings, tenant)
+            with profiling.stage("render"):
+                output = format_output(card, output_json=json_output)
+                console.print(output)
+        except Exception as e:
+            console.print(f"[red]Error:[/red] {e}")
+            raise SystemExit(1) from e
+
+
+@main.command("evaluate-batch")
+@click.option(
+    "--input",
+    "-i",
+    "input_path",
+    default="-",
+    show_default=True,
+    help="JSONL file of requests, or '-' for stdin.",
+)
+@click.option(
+    "--output",
+    "-o",
+    "output_path",
+    default="-",
+    show_default=True,
+    help="JSONL file for Decision Cards, or '-' for stdout.",
+)
+@click.option(
+    "--concurrency",
+    "-c",
+    default=4,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Maximum number of requests evaluated at once.",
+)
+@click.option(
+    "--checkpoint",
+    default=None,
+    help="Checkpoint file used to resume an interrupted run.",
+)
+@click.option(
+    "--policy",
+    "-p",
+    default=None,
+    help="Path to a custom policy rules YAML file.",
+)
+@click.option(
+    "--metrics",
+    "metrics_path",
+    default=None,
+    help="Write metrics here when done (.json for JSON, else Prometheus text).",
+)
+@click.option(
+    "--tenant",
+    "-t",
+    default=None,
+    help="Use this tenant's policy set from the policy directory.",
+)
+@click.option(
+    "--policy-dir",
+    default=None,
+    help="Directory of per-tenant policy files (<tenant>.yaml).",
+)
+@click.option(
+    "--profile",
+    "profile_dir",
+    default=None,
+    metavar="DIR",
+    help="Profile each pipeline stage and write the reports to DIR.",
+)
+@click.option(
+    "--profile-allocations",
+    is_flag=True,
+    default=False,
+    help="With --profile, also list each stage's allocation sites (slow).",
+)
+def evaluate_batch(
+    input_path: str,
+    output_path: str,
+    concurrency: int,
+    checkpoint: str | None,
+    policy: str | None,
+    metrics_path: str | None,
+    tenant: str | None,
+    policy_dir: str | None,
+    profile_dir: str | None,
+    profile_allocations: bool,
+) -> None:
+    """Evaluate a stream of JSONL requests and write Decision Cards as JSONL.
+
+    With --profile, the batch runs on one worker so that each stage's
+    profile and allocations are attributed exactly.
+    """
+    from autonomy_gatekeeper.engine import get_engine
+
+    err_console = _console(stderr=True)
+    if profile_dir is not None and concurrency > 1:
+        err_console.print("Profiling runs the batch with --concurrency 1.")
+        concurrency = 1
+
+    with _profiled(profile_dir, profile_allocations):
+        from autonomy_gatekeeper import profiling
+        from autonomy_gatekeeper.app import evaluate_batch_file
+        from autonomy_gatekeeper.config import load_settings
+
+        with profiling.stage("settings"):
+            settings = load_settings()
+        if policy:
+            settings.policy_path = policy
+        if metrics_path:
+            settings.metrics_enabled = True
+        if policy_dir:
+            settings.policy_dir = policy_dir
+
+        try:
+            stats = evaluate_batch_file(
+                input_path,
+                output_path,
+                settings=settings,
+                concurrency=concurrency,
+                checkpoint_path=checkpoint,
+                tenant=tenant,
+            )
+        except Exception as e:
+            err_console.print(f"[red]Error:[/red] {e}")
+            raise SystemExit(1) from e
+
+    if metrics_path:
+        metrics = get_engine(settings).metrics
+        if metrics is not None:
+            metrics.registry.write(metrics_path)
+
+    err_console.print(
+        f"Processed {stats.processed} requests in {stats.elapsed_seconds:.2f}s "
+        f"({stats.throughput:.1f} req/s) | LLM skipped: {stats.llm_skipped} | "
+        f"errors: {stats.errors}"
+    )
+
+
+@main.command()
+@click.option("--host", default="127.0.0.1", show_default=True, help="Address to bind.")
+@click.option(
+    "--port",
+    default=8080,
+    show_default=True,
+    type=click.IntRange(0, 65535),
+    help="Port to listen on.",
+)
+@click.option(
+    "--max-batch",
+    default=64,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Most concurrent requests whose policy evaluation is coalesced.",
+)
+@click.option(
+    "--batch-wait-ms",
+    default=0.0,
+    show_default=True,
+    type=click.FloatRange(min=0),
+    help="How long to hold a micro-batch open for more requests.",
+)
+@click.option(
+    "--policy",
+    "-p",
+    default=None,
+    help="Path to a custom policy rules YAML file.",
+)
+@click.option(
+    "--policy-dir",
+    default=None,
+    help="Directory of per-tenant policy files (<tenant>.yaml).",
+)
+def serve(
+    host: str,
+    port: int,
+    max_batch: int,
+    batch_wait_ms: float,
+    policy: str | None,
+    policy_dir: str | None,
+) -> None:
+    """Run a local HTTP/JSON service with a warm engine."""
+    from autonomy_gatekeeper.config import load_settings
+    from autonomy_gatekeeper.engine import Gatekeeper
+    from autonomy_gatekeeper.server import serve as run_server
+
+    err_console = _console(stderr=True)
     settings = load_settings()
     if policy:
         settings.policy_path = policy
+    if policy_dir:
+        settings.policy_dir = policy_dir
 
     try:
-        card = evaluate_request(request, settings=settings)
-        output = format_output(card, output_json=json_output)
-        console.print(output)
+        engine = Gatekeeper(settings)
     except Exception as e:
-        console.print(f"[red]Error:[/red] {e}")
+        err_console.print(f"[red]Error:[/red] {e}")
+        raise SystemExit(1) from e
+    err_console.print(f"Serving on http://{host}:{port} (Ctrl+C to stop)")
+    run_server(engine, host, port, max_batch, batch_wait_ms / 1e3)
+
+
+@main.command("score")
+@click.option(
+    "--input",
+    "-i",
+    "input_path",
+    default="-",
+    show_default=True,
+    help="JSONL file of requests, or '-' for stdin.",
+)
+@click.option(
+    "--output",
+    "-o",
+    "output_path",
+    default="-",
+    show_default=True,
+    help="JSONL file for score records, or '-' for stdout.",
+)
+@click.option(
+    "--workers",
+    "-w",
+    default=None,
+    type=click.IntRange(min=1),
+    help="Worker processes (defaults to one per CPU).",
+)
+@click.option(
+    "--chunk-size",
+    default=1000,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Input lines sent to a worker at a time.",
+)
+@click.option(
+    "--policy",
+    "-p",
+    default=None,
+    help="Path to a custom policy rules YAML file.",
+)
+def score(
+    input_path: str,
+    output_path: str,
+    workers: int | None,
+    chunk_size: int,
+    policy: str | None,
+) -> None:
+    """Re-score a JSONL request file against the policy alone, on all cores."""
+    from autonomy_gatekeeper.app import score_batch_file
+    from autonomy_gatekeeper.config import load_settings
+
+    err_console = _console(stderr=True)
+    settings = load_settings()
+    if policy:
+        settings.policy_path = policy
+
+    try:
+        stats = score_batch_file(
+            input_path,
+            output_path,
+            settings=settings,
+            workers=workers,
+            chunk_size=chunk_size,
+        )
+    except Exception as e:
+        err_console.print(f"[red]Error:[/red] {e}")
+        raise SystemExit(1) from e
+
+    err_console.print(
+        f"Scored {stats.processed} requests in {stats.elapsed_seconds:.2f}s "
+        f"({stats.throughput:.1f} req/s) on {stats.workers} workers | "
+        f"errors: {stats.errors}"
+    )
+
+
+@main.command("compile-policy")
+@click.option(
+    "--policy",
+    "-p",
+    default=None,
+    help="Policy rules YAML file to compile (defaults to POLICY_PATH).",
+)
+def compile_policy_command(policy: str | None) -> None:
+    """Validate a policy file and write its precompiled artifact next to it."""
+    import time
+
+    from autonomy_gatekeeper.config import load_settings
+    from autonomy_gatekeeper.policy.loader import write_artifact
+
+    err_console = _console(stderr=True)
+    policy_path = policy or load_settings().policy_path
+    started = time.perf_counter()
+    try:
+        target, compiled = write_artifact(policy_path)
+    except (OSError, ValueError) as e:
+        err_console.print(f"[red]Error:[/red] {e}")
+        raise SystemExit(1) from e
+
+    elapsed_ms = (time.perf_counter() - started) * 1e3
+    _console().print(
+        f"Compiled {len(compiled)} rules from {policy_path} to {target} "
+        f"in {elapsed_ms:.0f} ms"
+    )
+
+
+@main.group()
+def audit() -> None:
+    """Query the decision audit store."""
+
+
+@audit.command("query")
+@click.option(
+    "--dir",
+    "audit_dir",
+    default=None,
+    help="Audit directory (defaults to AUDIT_DIR).",
+)
+@click.option(
+    "--since", default=None, help="ISO timestamp or age such as 7d, 24h, 30m."
+)
+@click.option("--until", default=None, help="ISO timestamp or age (exclusive).")
+@click.option(
+    "--decision",
+    "decisions",
+    multiple=True,
+    type=click.Choice(["ACT", "HOLD", "ESCALATE"], case_sensitive=False),
+    help="Only these decisions (repeatable).",
+)
+@click.option(
+    "--risk",
+    "risk_levels",
+    multiple=True,
+    type=click.Choice(["low", "medium", "high", "critical"], case_sensitive=False),
+    help="Only these risk levels (repeatable).",
+)
+@click.option(
+    "--rule",
+    "rule_ids",
+    multiple=True,
+    help="Only cards that matched one of these rule IDs (repeatable).",
+)
+@click.option(
+    "--limit", default=None, type=click.IntRange(min=1), help="Maximum cards."
+)
+@click.option(
+    "--newest-first", is_flag=True, help="Return the most recent cards first."
+)
+@click.option("--json-output", is_flag=True, help="Print matching cards as JSONL.")
+@click.option(
+    "--count", "count_only", is_flag=True, help="Print only the number of matches."
+)
+def audit_query(
+    audit_dir: str | None,
+    since: str | None,
+    until: str | None,
+    decisions: tuple[str, ...],
+    risk_levels: tuple[str, ...],
+    rule_ids: tuple[str, ...],
+    limit: int | None,
+    newest_first: bool,
+    json_output: bool,
+    count_only: bool,
+) -> None:
+    """Find audited Decision Cards by time, decision, risk level and rule."""
+    import json
+    import sys
+
+    from autonomy_gatekeeper.audit import AuditReader, parse_time
+
+    err_console = _console(stderr=True)
+    if audit_dir is None:
+        from autonomy_gatekeeper.config import load_settings
+
+        audit_dir = load_settings().audit_dir
+    if not audit_dir:
+        err_console.print(
+            "[red]Error:[/red] no audit directory; pass --dir or set AUDIT_DIR"
+        )
+        raise SystemExit(1)
+
+    try:
+        records = AuditReader(audit_dir).query_raw(
+            since=parse_time(since) if since else None,
+            until=parse_time(until) if until else None,
+            decisions=decisions,
+            risk_levels=risk_levels,
+            rule_ids=rule_ids,
+            limit=limit,
+            newest_first=newest_first,
+        )
+        if count_only:
+            click.echo(sum(1 for _ in records))
+            return
+        out = sys.stdout.buffer
+        for raw in records:
+            if json_output:
+                out.write(raw + b"\n")
+                continue
+            card = json.loads(raw)
+            rules = ",".join(p["rule_id"] for p in card["matched_policies"]) or "-"
+            line = (
+                f"{card['timestamp']}  {card['decision']:<8}  {card['risk_level']:<8}  "
+                f"{rules}  {card['request'][:80]}"
+            )
+            out.write(line.encode("utf-8") + b"\n")
+        out.flush()
+    except ValueError as e:
+        err_console.print(f"[red]Error:[/red] {e}")
         raise SystemExit(1) from e
 
 
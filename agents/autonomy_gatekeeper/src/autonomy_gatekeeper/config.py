@@ -10,12 +10,52 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     """Application settings loaded from environment variables or .env file."""
 
+    llm_provider: str = "openai"
     openai_api_key: str = ""
     openai_model: str = "gpt-4o"
+    openai_base_url: str = ""
     log_level: str = "INFO"
     policy_path: str = str(
         Path(__file__).parent / "policy" / "rules.yaml"
     )
+    policy_watch: bool = False
+    policy_watch_interval_seconds: float = 2.0
+    policy_dir: str = ""
+    policy_cache_max_bytes: int = 256 * 1024 * 1024
+    llm_max_concurrency: int = 32
+    llm_pool_max_connections: int = 100
+    llm_pool_max_keepalive: int = 20
+    llm_pool_keepalive_seconds: float = 30.0
+    llm_deadline_seconds: float = 30.0
+    llm_max_retries: int = 2
+    llm_retry_backoff_seconds: float = 0.25
+    llm_adaptive_concurrency: bool = True
+    llm_min_concurrency: int = 1
+    llm_latency_target_seconds: float = 10.0
+    llm_breaker_failures: int = 5
+    llm_breaker_reset_seconds: float = 30.0
+    llm_streaming: bool = False
+    llm_request_token_budget: int = 4000
+    llm_cache_enabled: bool = True
+    llm_cache_max_entries: int = 1024
+    llm_cache_ttl_seconds: float = 3600.0
+    llm_cache_path: str = ""
+    similarity_enabled: bool = False
+    similarity_threshold: float = 0.9
+    similarity_max_entries: int = 4096
+    metrics_enabled: bool = False
+    audit_dir: str = ""
+    audit_segment_max_bytes: int = 64 * 1024 * 1024
+    audit_flush_interval_seconds: float = 0.5
+    audit_fsync: bool = False
+    tool_max_workers: int = 8
+    tool_timeout_seconds: float = 30.0
+    local_llm_latency_distribution: str = "constant"
+    local_llm_latency_ms: float = 0.0
+    local_llm_latency_jitter_ms: float = 0.0
+    local_llm_error_rate: float = 0.0
+    local_llm_malformed_rate: float = 0.0
+    local_llm_seed: int | None = None
 
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8"}
 
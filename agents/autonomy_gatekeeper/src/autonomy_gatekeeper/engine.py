@@ -0,0 +1,513 @@
+"""Gatekeeper engine — a long-lived, pre-compiled governance pipeline.
+
+Loading settings and parsing the policy file are done once when the engine
+is created, and the graph is compiled once on first use. Requests that policy
+alone decides never touch the graph, so they don't import LangGraph or
+LangChain at all.
+
+With ``policy_watch`` enabled the engine polls the policy file and swaps in a
+recompiled rule set when it changes. The swap is a single reference
+assignment: evaluations already in flight finish against the rule set they
+started with, and none of them wait for the recompile.
+
+With ``llm_streaming`` enabled, :meth:`Gatekeeper.stream` and
+:meth:`Gatekeeper.astream` yield the LLM's decision and risk level as soon
+as they have been parsed from the streamed reply, before the full Decision
+Card is ready.
+
+:meth:`Gatekeeper.evaluate_file` and :meth:`Gatekeeper.evaluate_chunks`
+evaluate requests too large to hold in memory, such as pasted diffs or SQL
+dumps. Policy is matched chunk by chunk and reading stops at a critical
+escalation; the LLM sees only an excerpt.
+
+An engine created with a :class:`~autonomy_gatekeeper.tools.registry.ToolRegistry`
+can act on approved requests: pass ``actions`` to :meth:`Gatekeeper.evaluate`
+and, if the decision is ACT, the tool calls run concurrently after the
+Decision Card is built (see :mod:`autonomy_gatekeeper.tools.executor`).
+
+With ``policy_dir`` set, each evaluation can name a ``tenant`` whose policy
+set, ``<policy_dir>/<tenant>.yaml``, is used instead of ``policy_path``.
+Tenant policy sets are loaded on first use and kept in a memory-bounded LRU
+cache (see :mod:`autonomy_gatekeeper.policy.tenants`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections.abc import AsyncIterator, Iterable, Iterator, Sequence
+from dataclasses import asdict, dataclass
+from typing import Any, cast
+
+from autonomy_gatekeeper import profiling
+from autonomy_gatekeeper.audit import create_audit_writer
+from autonomy_gatekeeper.config import Settings, load_settings
+from autonomy_gatekeeper.graph import (
+    GatekeeperState,
+    LLMResources,
+    aexecute_actions,
+    apply_policy_outcome,
+    build_graph,
+    build_nodes,
+    execute_actions,
+    new_state,
+    route_after_decision,
+    route_after_policy,
+)
+from autonomy_gatekeeper.llm.tokens import CHARS_PER_TOKEN
+from autonomy_gatekeeper.policy.loader import PolicyWatcher, load_policy
+from autonomy_gatekeeper.policy.matcher import DEFAULT_EXCERPT_CHARS, CompiledPolicy
+from autonomy_gatekeeper.policy.tenants import PolicySetCache
+from autonomy_gatekeeper.schemas import DecisionCard
+from autonomy_gatekeeper.tools.executor import ToolExecutor, parse_tool_calls
+from autonomy_gatekeeper.tools.registry import ToolRegistry
+from autonomy_gatekeeper.utils.files import DEFAULT_CHUNK_BYTES, read_text_chunks
+from autonomy_gatekeeper.utils.logging import setup_logging
+
+
+@dataclass
+class RoutingStats:
+    """Counts of how evaluations were routed around the LLM stage."""
+
+    evaluated: int = 0
+    llm_assessed: int = 0
+    llm_skipped: int = 0
+    skipped_by_rule: int = 0
+    skipped_by_escalation: int = 0
+
+    def record(self, card: DecisionCard) -> None:
+        """Count one finished evaluation."""
+        self.evaluated += 1
+        if not card.metadata.get("llm_skipped"):
+            self.llm_assessed += 1
+            return
+        self.llm_skipped += 1
+        if card.metadata.get("llm_route") == "skip":
+            self.skipped_by_rule += 1
+        else:
+            self.skipped_by_escalation += 1
+
+    def to_dict(self) -> dict[str, int]:
+        """Return the counters as a plain dict."""
+        return asdict(self)
+
+
+class Gatekeeper:
+    """Reusable governance engine holding settings, rules and the compiled graph."""
+
+    def __init__(
+        self, settings: Settings | None = None, tools: ToolRegistry | None = None
+    ) -> None:
+        self.settings = settings if settings is not None else load_settings()
+        self.logger = setup_logging(self.settings.log_level)
+        with profiling.stage("policy_load"):
+            self.policy: CompiledPolicy = load_policy(self.settings.policy_path)
+        self.resources = LLMResources.from_settings(self.settings)
+        self.metrics = self.resources.metrics
+        self.routing_stats = RoutingStats()
+        self.audit = create_audit_writer(self.settings)
+        self.policy_sets: PolicySetCache | None = None
+        if self.settings.policy_dir:
+            self.policy_sets = PolicySetCache(
+                self.settings.policy_dir,
+                max_bytes=self.settings.policy_cache_max_bytes,
+                recheck_seconds=self.settings.policy_watch_interval_seconds
+                if self.settings.policy_watch
+                else None,
+            )
+        self._stats_lock = threading.Lock()
+        self.executor: ToolExecutor | None = None
+        if tools is not None:
+            self.executor = ToolExecutor(
+                tools,
+                max_workers=self.settings.tool_max_workers,
+                timeout_seconds=self.settings.tool_timeout_seconds,
+                metrics=self.metrics,
+            )
+        self._nodes = build_nodes(
+            self.settings,
+            policy=self._current_policy,
+            resources=self.resources,
+            executor=self.executor,
+            tenant_policies=self.policy_for,
+        )
+        self._graph: Any = None
+        self._graph_lock = threading.Lock()
+        self._watcher: PolicyWatcher | None = None
+        if self.settings.policy_watch:
+            self._watcher = PolicyWatcher(
+                self.settings.policy_path,
+                self.reload_policy,
+                self.settings.policy_watch_interval_seconds,
+            )
+            self._watcher.start()
+
+    def _current_policy(self) -> CompiledPolicy:
+        return self.policy
+
+    def policy_for(self, tenant: str | None = None) -> CompiledPolicy:
+        """The compiled policy for ``tenant``, or the default policy for ``None``.
+
+        Raises :class:`~autonomy_gatekeeper.policy.tenants.UnknownTenantError`
+        if the tenant has no policy set, and ``ValueError`` if no
+        ``policy_dir`` is configured.
+        """
+        if tenant is None:
+            return self.policy
+        if self.policy_sets is None:
+            raise ValueError(f"Tenant {tenant!r} needs POLICY_DIR to be set")
+        return self.policy_sets.get(tenant)
+
+    def reload_policy(self) -> bool:
+        """Recompile the policy file and swap it in.
+
+        Returns ``False`` and keeps the current rules if the file can't be
+        loaded.
+        """
+        try:
+            policy = load_policy(self.settings.policy_path)
+        except Exception:
+            self.logger.exception("Policy reload failed; keeping the current rules")
+            return False
+        self.policy = policy
+        self.logger.info("Reloaded policy: %d rules", len(policy))
+        return True
+
+    def close(self) -> None:
+        """Stop the tool executor and policy watcher and flush pending audit records."""
+        if self.executor is not None:
+            self.executor.close()
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+        if self.audit is not None:
+            self.audit.close()
+
+    @property
+    def graph(self) -> Any:
+        """The compiled LangGraph pipeline, built on first access."""
+        if self._graph is None:
+            with self._graph_lock:
+                if self._graph is None:
+                    with profiling.stage("graph_compile"):
+                        self._graph = build_graph(
+                            self.settings,
+                            policy=self._current_policy,
+                            resources=self.resources,
+                            executor=self.executor,
+                            tenant_policies=self.policy_for,
+                        ).compile()
+        return self._graph
+
+    def _evaluate_policy(
+        self,
+        request: str,
+        actions: list[dict[str, Any]] | None = None,
+        tenant: str | None = None,
+    ) -> GatekeeperState:
+        if actions:
+            if self.executor is None:
+                raise ValueError("actions need an engine created with tools")
+            parse_tool_calls(actions)  # reject a malformed plan before deciding
+        evaluate_policy, _ = self._nodes["evaluate_policy"]
+        return evaluate_policy(new_state(request, actions, tenant))
+
+    def evaluate_policies(
+        self, requests: Sequence[str], tenant: str | None = None
+    ) -> list[GatekeeperState]:
+        """Run the policy stage for several requests at once.
+
+        Identical requests are matched once. Pass the states to
+        :meth:`complete` or :meth:`complete_many` to finish them.
+        """
+        evaluated: dict[str, GatekeeperState] = {}
+        states: list[GatekeeperState] = []
+        for request in requests:
+            state = evaluated.get(request)
+            if state is None:
+                state = evaluated[request] = self._evaluate_policy(
+                    request, tenant=tenant
+                )
+                states.append(state)
+            else:
+                # The graph mutates states, so duplicates get their own copy.
+                states.append(cast(GatekeeperState, dict(state)))
+        return states
+
+    def complete(self, state: GatekeeperState) -> DecisionCard:
+        """Finish a policy-evaluated state, calling the LLM if it needs one."""
+        final_state = self._decide_without_llm(state) or self.graph.invoke(state)
+        return self._to_card(final_state)
+
+    def complete_many(
+        self, states: Sequence[GatekeeperState], max_concurrency: int | None = None
+    ) -> list[DecisionCard]:
+        """Finish several policy-evaluated states, in order.
+
+        States that need the LLM go through the graph together, up to
+        ``max_concurrency`` at once.
+        """
+        final_states: list[GatekeeperState | None] = []
+        pending: list[tuple[int, GatekeeperState]] = []
+        for state in states:
+            final_state = self._decide_without_llm(state)
+            if final_state is None:
+                pending.append((len(final_states), state))
+            final_states.append(final_state)
+        if pending:
+            config = {"max_concurrency": max_concurrency} if max_concurrency else None
+            assessed = self.graph.batch([state for _, state in pending], config=config)
+            for (index, _), final_state in zip(pending, assessed, strict=True):
+                final_states[index] = final_state
+        return [self._to_card(state) for state in final_states if state is not None]
+
+    def _decide_without_llm(
+        self, state: GatekeeperState, act: bool = True
+    ) -> GatekeeperState | None:
+        """Finish ``state`` here if policy routing skips the LLM, else ``None``.
+
+        With ``act``, the tool calls of an approved request are run too.
+        """
+        if route_after_policy(state) != "build_decision":
+            return None
+        build_decision, _ = self._nodes["build_decision"]
+        state = build_decision(state)
+        if act and route_after_decision(state) != "end":
+            with profiling.stage("execute_actions"):
+                for _ in self._act(state):
+                    pass
+        return state
+
+    def _act(self, state: GatekeeperState) -> Iterator[dict[str, Any]]:
+        """Run the tool calls of an approved request outside the graph.
+
+        This keeps LangGraph unimported on the policy-only path.
+        """
+        if self.executor is None or route_after_decision(state) == "end":
+            return
+        started = time.perf_counter()
+        yield from execute_actions(state, self.executor)
+        if self.metrics is not None:
+            self.metrics.node_duration.observe(
+                time.perf_counter() - started, node="execute_actions"
+            )
+
+    async def _aact(self, state: GatekeeperState) -> AsyncIterator[dict[str, Any]]:
+        if self.executor is None or route_after_decision(state) == "end":
+            return
+        started = time.perf_counter()
+        async for event in aexecute_actions(state, self.executor):
+            yield event
+        if self.metrics is not None:
+            self.metrics.node_duration.observe(
+                time.perf_counter() - started, node="execute_actions"
+            )
+
+    def evaluate(
+        self,
+        request: str,
+        actions: list[dict[str, Any]] | None = None,
+        tenant: str | None = None,
+    ) -> DecisionCard:
+        """Evaluate a single request.
+
+        Policy runs first; the compiled graph is only invoked when the
+        request needs an LLM assessment. If ``actions`` are given and the
+        decision is ACT, they are run and their results recorded in the
+        card's ``metadata.actions``. ``tenant`` selects a policy set from
+        ``policy_dir``.
+        """
+        self.logger.info("Evaluating request: %s", request[:120])
+        return self.complete(self._evaluate_policy(request, actions, tenant))
+
+    def evaluate_chunks(
+        self, chunks: Iterable[str], tenant: str | None = None
+    ) -> DecisionCard:
+        """Evaluate one request given as consecutive chunks of text.
+
+        Policy is matched chunk by chunk (see
+        :meth:`~autonomy_gatekeeper.policy.matcher.CompiledPolicy.evaluate_chunks`),
+        so memory use depends on the chunk size, not the request size.
+        Reading stops once a critical escalation is certain. The card's
+        ``request``, which is also what the LLM sees, is an excerpt of the
+        start and end of the text. ``metadata.policy_scan`` records how much
+        was read.
+        """
+        budget = self.settings.llm_request_token_budget
+        excerpt_chars = budget * CHARS_PER_TOKEN // 2 or DEFAULT_EXCERPT_CHARS
+        started = time.perf_counter()
+        result = self.policy_for(tenant).evaluate_chunks(
+            chunks, excerpt_chars=excerpt_chars
+        )
+        if self.metrics is not None:
+            self.metrics.node_duration.observe(
+                time.perf_counter() - started, node="evaluate_policy"
+            )
+        self.logger.info(
+            "Evaluated %d chars in %d chunks%s",
+            result.chars,
+            result.chunks,
+            " (stopped early)" if result.stopped_early else "",
+        )
+        state = apply_policy_outcome(
+            new_state(result.excerpt, tenant=tenant), result.outcome
+        )
+        state["llm_meta"] = {"policy_scan": result.to_dict()}
+        return self.complete(state)
+
+    def evaluate_file(
+        self,
+        path: str,
+        chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+        tenant: str | None = None,
+    ) -> DecisionCard:
+        """Evaluate the contents of a (possibly very large) file as one request.
+
+        The file is memory-mapped and read in ``chunk_bytes`` pieces; see
+        :meth:`evaluate_chunks`.
+        """
+        self.logger.info("Evaluating request file: %s", path)
+        return self.evaluate_chunks(read_text_chunks(path, chunk_bytes), tenant)
+
+    def evaluate_many(
+        self,
+        requests: Iterable[str],
+        max_concurrency: int | None = None,
+        tenant: str | None = None,
+    ) -> list[DecisionCard]:
+        """Evaluate several requests, running up to ``max_concurrency`` at once.
+
+        Cards are returned in input order.
+        """
+        states = [self._evaluate_policy(r, tenant=tenant) for r in requests]
+        return self.complete_many(states, max_concurrency)
+
+    async def aevaluate(
+        self,
+        request: str,
+        actions: list[dict[str, Any]] | None = None,
+        tenant: str | None = None,
+    ) -> DecisionCard:
+        """Evaluate a single request on the event loop."""
+        self.logger.info("Evaluating request: %s", request[:120])
+        state = self._evaluate_policy(request, actions, tenant)
+        final_state = self._decide_without_llm(state, act=False)
+        if final_state is None:
+            final_state = await self.graph.ainvoke(state)
+        else:
+            async for _ in self._aact(final_state):
+                pass
+        return self._to_card(final_state)
+
+    def stream(
+        self,
+        request: str,
+        actions: list[dict[str, Any]] | None = None,
+        tenant: str | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Evaluate a request, yielding events as results become available.
+
+        When the LLM reply is streamed (``settings.llm_streaming``), a
+        ``{"event": "decision", "decision", "risk_level", "elapsed_seconds"}``
+        event arrives as soon as those fields are parsed. For an approved
+        request with ``actions``, a ``{"event": "tool_result", "id", "tool",
+        "status", ...}`` event arrives as each tool call finishes. The last
+        event is always ``{"event": "card", "card": DecisionCard}``.
+        """
+        self.logger.info("Evaluating request: %s", request[:120])
+        state = self._evaluate_policy(request, actions, tenant)
+        final_state = self._decide_without_llm(state, act=False)
+        if final_state is not None:
+            yield from self._act(final_state)
+        else:
+            for mode, chunk in self.graph.stream(
+                state, stream_mode=["custom", "values"]
+            ):
+                if mode == "custom":
+                    yield chunk
+                else:
+                    final_state = chunk
+        assert final_state is not None
+        yield {"event": "card", "card": self._to_card(final_state)}
+
+    async def astream(
+        self,
+        request: str,
+        actions: list[dict[str, Any]] | None = None,
+        tenant: str | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Async variant of :meth:`stream`."""
+        self.logger.info("Evaluating request: %s", request[:120])
+        state = self._evaluate_policy(request, actions, tenant)
+        final_state = self._decide_without_llm(state, act=False)
+        if final_state is not None:
+            async for event in self._aact(final_state):
+                yield event
+        else:
+            async for mode, chunk in self.graph.astream(
+                state, stream_mode=["custom", "values"]
+            ):
+                if mode == "custom":
+                    yield chunk
+                else:
+                    final_state = chunk
+        assert final_state is not None
+        yield {"event": "card", "card": self._to_card(final_state)}
+
+    async def aevaluate_many(
+        self, requests: Iterable[str], tenant: str | None = None
+    ) -> list[DecisionCard]:
+        """Evaluate several requests concurrently on the event loop.
+
+        In-flight LLM calls are capped by ``settings.llm_max_concurrency``.
+        Cards are returned in input order.
+        """
+        return list(
+            await asyncio.gather(
+                *(self.aevaluate(request, tenant=tenant) for request in requests)
+            )
+        )
+
+    def _to_card(self, final_state: GatekeeperState) -> DecisionCard:
+        with profiling.stage("decision_card"):
+            card = DecisionCard(**final_state["decision_card"])
+        with self._stats_lock:
+            self.routing_stats.record(card)
+        if self.audit is not None:
+            self.audit.append(card)
+        self.logger.info(
+            "Decision: %s | Risk: %s", card.decision.value, card.risk_level.value
+        )
+        return card
+
+
+_engines: dict[str, Gatekeeper] = {}
+_engines_lock = threading.Lock()
+
+
+def get_engine(settings: Settings | None = None) -> Gatekeeper:
+    """Return a cached engine for ``settings`` (the default settings if omitted).
+
+    Engines are keyed on the settings values, so callers that pass equal
+    settings share one warm engine.
+    """
+    key = "" if settings is None else settings.model_dump_json()
+    engine = _engines.get(key)
+    if engine is not None:
+        return engine
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            with profiling.stage("engine_init"):
+                engine = Gatekeeper(settings)
+            _engines[key] = engine
+    return engine
+
+
+def clear_engines() -> None:
+    """Drop all cached engines, forcing the next call to rebuild."""
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.close()
+        _engines.clear()
@@ -1,27 +1,76 @@
-"""LangGraph state machine — routes requests through policy evaluation and LLM assessment."""
+"""LangGraph state machine — routes requests through policy evaluation and LLM assessment.
+
+LangGraph and LangChain are imported only when a graph is built or the LLM
+is called, so evaluating a request that policy alone decides stays cheap to
+import (see :meth:`autonomy_gatekeeper.engine.Gatekeeper.evaluate`).
+"""
 
 from __future__ import annotations
 
 import json
 import logging
-from pathlib import Path
-from typing import Any, TypedDict
-
-import yaml
-from langgraph.graph import END, StateGraph
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, NotRequired, TypedDict, TypeVar
 
+from autonomy_gatekeeper import profiling
 from autonomy_gatekeeper.config import Settings
-from autonomy_gatekeeper.llm.factory import create_llm
-from autonomy_gatekeeper.llm.prompts import build_governance_prompt
+from autonomy_gatekeeper.llm.cache import (
+    DecisionCache,
+    create_decision_cache,
+    make_cache_key,
+)
+from autonomy_gatekeeper.llm.factory import create_llm, model_identity
+from autonomy_gatekeeper.llm.prompts import (
+    governance_chain,
+    prepare_prompt_inputs,
+    prompt_fingerprint,
+)
+from autonomy_gatekeeper.llm.resilience import (
+    LLMGuard,
+    LLMUnavailableError,
+    create_llm_guard,
+)
+from autonomy_gatekeeper.llm.similarity import (
+    SimilarityIndex,
+    create_similarity_index,
+    make_policy_key,
+)
+from autonomy_gatekeeper.llm.streaming import AssessmentStream, parse_assessment
+from autonomy_gatekeeper.llm.tokens import get_token_counter
+from autonomy_gatekeeper.metrics import GatekeeperMetrics
+from autonomy_gatekeeper.policy.loader import load_policy
+from autonomy_gatekeeper.policy.loader import (
+    load_policy_rules as load_policy_rules,  # re-exported for existing callers
+)
+from autonomy_gatekeeper.policy.matcher import (
+    DECISION_PRIORITY,
+    RISK_PRIORITY,
+    CompiledPolicy,
+    PolicyOutcome,
+    compile_policy,
+)
 from autonomy_gatekeeper.schemas import (
     Decision,
     DecisionCard,
     PolicyMatch,
     RiskLevel,
 )
+from autonomy_gatekeeper.tools.executor import (
+    ToolExecutor,
+    ToolResult,
+    parse_tool_calls,
+)
+from autonomy_gatekeeper.utils.concurrency import LoopLocalSemaphore
+
+if TYPE_CHECKING:
+    from langgraph.graph import StateGraph
 
 logger = logging.getLogger("autonomy_gatekeeper")
 
+T = TypeVar("T")
+
 
 class GatekeeperState(TypedDict):
     """State passed through the governance graph."""
@@ -32,102 +81,409 @@ class GatekeeperState(TypedDict):
     policy_risk: str
     llm_response: dict[str, Any]
     decision_card: dict[str, Any]
+    llm_route: NotRequired[str]
+    llm_meta: NotRequired[dict[str, Any]]
+    actions: NotRequired[list[dict[str, Any]]]
+    action_results: NotRequired[list[dict[str, Any]]]
+    tenant: NotRequired[str]
 
 
-def load_policy_rules(policy_path: str) -> list[dict[str, Any]]:
-    """Load policy rules from a YAML file."""
-    path = Path(policy_path)
-    if not path.exists():
-        logger.warning("Policy file not found at %s, using empty rules", policy_path)
-        return []
-    with open(path) as f:
-        data = yaml.safe_load(f)
-    return data.get("rules", []) if data else []
-
-
-def evaluate_policies(state: GatekeeperState, rules: list[dict[str, Any]]) -> GatekeeperState:
-    """Match request text against policy rules using keyword matching."""
-    request_lower = state["request"].lower()
-    matched: list[dict[str, Any]] = []
-    strongest_decision = "ACT"
-    strongest_risk = "low"
-
-    decision_priority = {"ACT": 0, "HOLD": 1, "ESCALATE": 2}
-    risk_priority = {"low": 0, "medium": 1, "high": 2, "critical": 3}
-
-    for rule in rules:
-        keywords = [kw.lower() for kw in rule.get("keywords", [])]
-        if any(kw in request_lower for kw in keywords):
-            matched.append(
-                {
-                    "rule_id": rule["id"],
-                    "description": rule["description"],
-                    "matched": True,
-                }
-            )
-            rule_decision = rule.get("decision", "HOLD")
-            rule_risk = rule.get("risk_level", "medium")
-
-            if decision_priority.get(rule_decision, 0) > decision_priority.get(
-                strongest_decision, 0
-            ):
-                strongest_decision = rule_decision
-
-            if risk_priority.get(rule_risk, 0) > risk_priority.get(
-                strongest_risk, 0
-            ):
-                strongest_risk = rule_risk
-
-    state["matched_policies"] = matched
-    state["policy_decision"] = strongest_decision
-    state["policy_risk"] = strongest_risk
+def evaluate_policies(
+    state: GatekeeperState, rules: list[dict[str, Any]] | CompiledPolicy
+) -> GatekeeperState:
+    """Match request text against policy rules using keyword matching.
+
+    Pass a :class:`CompiledPolicy` to reuse a prebuilt matcher; a plain rule
+    list is compiled on the fly.
+    """
+    policy = rules if isinstance(rules, CompiledPolicy) else compile_policy(rules)
+    return apply_policy_outcome(state, policy.evaluate(state["request"]))
+
+
+def apply_policy_outcome(
+    state: GatekeeperState, outcome: PolicyOutcome
+) -> GatekeeperState:
+    """Record a policy outcome in ``state``, ready for :func:`route_after_policy`."""
+    state["matched_policies"] = outcome.matched
+    state["policy_decision"] = outcome.decision
+    state["policy_risk"] = outcome.risk_level
+    state["llm_route"] = outcome.llm_route
     logger.info(
         "Policy evaluation: decision=%s risk=%s matched=%d rules",
-        strongest_decision,
-        strongest_risk,
-        len(matched),
+        outcome.decision,
+        outcome.risk_level,
+        len(outcome.matched),
     )
     return state
 
 
-def assess_with_llm(state: GatekeeperState, settings: Settings) -> GatekeeperState:
-    """Use the LLM to produce a governance assessment informed by policy matches."""
-    llm = create_llm(settings)
-    prompt = build_governance_prompt()
-
+def _format_policies(state: GatekeeperState) -> str:
+    """Render matched policies as the bullet list the prompt expects."""
     policies_text = "\n".join(
         f"- [{p['rule_id']}] {p['description']}" for p in state["matched_policies"]
     )
-    if not policies_text:
-        policies_text = "(no policy rules matched)"
+    return policies_text or "(no policy rules matched)"
 
-    chain = prompt | llm
-    response = chain.invoke(
-        {"request": state["request"], "matched_policies": policies_text}
-    )
 
-    try:
-        content = response.content if hasattr(response, "content") else str(response)
-        cleaned = content.strip()
-        if cleaned.startswith("```"):
-            cleaned = cleaned.split("\n", 1)[1] if "\n" in cleaned else cleaned
-            cleaned = cleaned.rsplit("```", 1)[0]
-        parsed = json.loads(cleaned)
-    except (json.JSONDecodeError, IndexError):
-        logger.warning("LLM returned non-JSON response, falling back to policy decision")
-        parsed = {
-            "decision": state["policy_decision"],
+def _parse_llm_response(response: Any, state: GatekeeperState) -> dict[str, Any]:
+    """Parse the LLM's JSON reply, salvaging or falling back to the policy decision.
+
+    A truncated or malformed reply that still carries a valid decision is
+    kept and marked ``partial``; missing or unknown fields come from the
+    policy outcome. Without a decision, the policy decision is used instead.
+    """
+    content = response.content if hasattr(response, "content") else str(response)
+    parsed, complete = parse_assessment(content if isinstance(content, str) else "")
+    if complete:
+        return parsed
+    if parsed.get("decision") not in DECISION_PRIORITY:
+        parsed.pop("decision", None)
+    if parsed.get("risk_level") not in RISK_PRIORITY:
+        parsed.pop("risk_level", None)
+    if "decision" in parsed:
+        logger.warning(
+            "LLM reply was incomplete; salvaged fields: %s", ", ".join(parsed)
+        )
+        return {
             "risk_level": state["policy_risk"],
-            "reasoning": "LLM response could not be parsed. Falling back to policy-based decision.",
+            "reasoning": "LLM response was incomplete.",
             "recommended_action": "Review the request manually.",
+            **parsed,
+            "partial": True,
         }
+    logger.warning("LLM returned non-JSON response, falling back to policy decision")
+    return _policy_fallback(
+        state,
+        "LLM response could not be parsed. Falling back to policy-based decision.",
+    )
+
+
+def _policy_fallback(
+    state: GatekeeperState, reasoning: str, reason: str = "parse_error"
+) -> dict[str, Any]:
+    """An assessment that defers to the policy decision when the LLM can't."""
+    return {
+        "decision": state["policy_decision"],
+        "risk_level": state["policy_risk"],
+        "reasoning": reasoning,
+        "recommended_action": "Review the request manually.",
+        "fallback": True,
+        "fallback_reason": reason,
+    }
+
+
+def _unavailable_fallback(
+    state: GatekeeperState, error: LLMUnavailableError
+) -> dict[str, Any]:
+    logger.warning("%s, falling back to policy decision", error)
+    return _policy_fallback(
+        state,
+        f"LLM unavailable ({error.reason}). Falling back to policy-based decision.",
+        error.reason,
+    )
+
+
+def _is_assessment(parsed: dict[str, Any]) -> bool:
+    """Whether ``parsed`` is a complete LLM verdict, safe to cache and reuse."""
+    return not parsed.get("fallback") and not parsed.get("partial")
+
+
+def _stream_writer() -> Callable[[Any], None] | None:
+    """The custom stream writer of the graph run we are inside, if any."""
+    from langgraph.config import get_stream_writer
+
+    try:
+        return get_stream_writer()
+    except RuntimeError:
+        return None
+
+
+def _early_decision(
+    state: GatekeeperState,
+) -> Callable[[dict[str, Any]], None]:
+    """Publish a streamed decision to graph ``custom`` stream consumers.
+
+    Only a known decision and risk level is published, and only once: a
+    retried round trip streams its decision again.
+    """
+    writer = _stream_writer()
+    published = False
+
+    def publish(fields: dict[str, Any]) -> None:
+        nonlocal published
+        if (
+            published
+            or fields["decision"] not in DECISION_PRIORITY
+            or fields["risk_level"] not in RISK_PRIORITY
+        ):
+            return
+        published = True
+        _llm_meta(state)["time_to_decision_ms"] = round(
+            fields["elapsed_seconds"] * 1e3, 1
+        )
+        if writer is not None:
+            writer({"event": "decision", **fields})
+
+    return publish
+
+
+def _rule_ids(state: GatekeeperState) -> list[str]:
+    return [p["rule_id"] for p in state["matched_policies"]]
+
+
+def _scoped_rule_ids(state: GatekeeperState) -> list[str]:
+    """Rule IDs qualified by tenant, so tenants never share LLM verdicts."""
+    tenant = state.get("tenant")
+    if tenant is None:
+        return _rule_ids(state)
+    return [f"{tenant}/{rule_id}" for rule_id in _rule_ids(state)]
+
+
+def _cache_key(state: GatekeeperState, settings: Settings) -> str:
+    return make_cache_key(
+        state["request"],
+        _scoped_rule_ids(state),
+        model_identity(settings),
+        prompt_fingerprint(settings.llm_request_token_budget),
+    )
+
+
+def _policy_key(state: GatekeeperState, settings: Settings) -> str:
+    return make_policy_key(
+        _scoped_rule_ids(state),
+        model_identity(settings),
+        prompt_fingerprint(settings.llm_request_token_budget),
+    )
+
+
+def _llm_meta(state: GatekeeperState) -> dict[str, Any]:
+    return state.setdefault("llm_meta", {})
+
+
+@dataclass
+class LLMResources:
+    """Long-lived helpers shared by every LLM assessment in a graph."""
+
+    cache: DecisionCache | None = None
+    similarity: SimilarityIndex | None = None
+    limiter: LoopLocalSemaphore | None = None
+    metrics: GatekeeperMetrics | None = None
+    guard: LLMGuard | None = None
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> LLMResources:
+        """Build the helpers enabled in ``settings``.
+
+        With adaptive concurrency the guard's limiter bounds calls in flight,
+        so the fixed semaphore is left out.
+        """
+        metrics = GatekeeperMetrics() if settings.metrics_enabled else None
+        return cls(
+            cache=create_decision_cache(settings),
+            similarity=create_similarity_index(settings),
+            limiter=None
+            if settings.llm_adaptive_concurrency
+            else LoopLocalSemaphore(settings.llm_max_concurrency),
+            metrics=metrics,
+            guard=create_llm_guard(settings, metrics),
+        )
+
+    def round_trip(self, func: Callable[[], T]) -> T:
+        """Run an LLM call under the guard, if there is one."""
+        if self.guard is None:
+            return func()
+        return self.guard.call(func)
+
+    async def around_trip(self, func: Callable[[], Awaitable[T]]) -> T:
+        """Async variant of :meth:`round_trip` that also waits for a limiter slot."""
+
+        async def limited() -> T:
+            if self.limiter is None:
+                return await func()
+            async with self.limiter.get():
+                return await func()
+
+        if self.guard is None:
+            return await limited()
+        return await self.guard.acall(limited)
+
+    def reuse_similar(
+        self, state: GatekeeperState, settings: Settings
+    ) -> dict[str, Any] | None:
+        """Return the verdict of a near-duplicate request with the same policies."""
+        if self.similarity is None:
+            return None
+        found = self.similarity.lookup(state["request"], _policy_key(state, settings))
+        if found is None:
+            _llm_meta(state)["similarity"] = {"status": "miss"}
+            return None
+        verdict, score = found
+        _llm_meta(state)["similarity"] = {"status": "hit", "score": round(score, 3)}
+        return verdict
+
+    def prompt_inputs(
+        self, state: GatekeeperState, settings: Settings
+    ) -> dict[str, str]:
+        """Prompt inputs for ``state``, with the request fitted to the token budget."""
+        inputs, usage = prepare_prompt_inputs(
+            state["request"],
+            _format_policies(state),
+            get_token_counter(settings),
+            settings.llm_request_token_budget,
+        )
+        _llm_meta(state)["prompt"] = usage.to_dict()
+        if self.metrics is not None:
+            self.metrics.record_prompt(usage)
+        return inputs
+
+    def remember(
+        self, state: GatekeeperState, settings: Settings, parsed: dict[str, Any]
+    ) -> None:
+        """Index a fresh LLM verdict for near-duplicate reuse."""
+        if self.similarity is not None and _is_assessment(parsed):
+            self.similarity.add(state["request"], _policy_key(state, settings), parsed)
+
+
+def assess_with_llm(
+    state: GatekeeperState,
+    settings: Settings,
+    resources: LLMResources | None = None,
+) -> GatekeeperState:
+    """Use the LLM to produce a governance assessment informed by policy matches.
+
+    With ``resources``, repeated requests reuse a cached verdict, concurrent
+    identical requests share one LLM call, and near-duplicates of earlier
+    requests can reuse their verdict. Its guard bounds the call by a
+    deadline; when the deadline passes or the circuit breaker is open, the
+    assessment falls back to the policy decision.
+    """
+    resources = resources or LLMResources()
+
+    def call_llm() -> dict[str, Any]:
+        reused = resources.reuse_similar(state, settings)
+        if reused is not None:
+            return reused
+        # Shared by every retry of the round trip below.
+        on_decision = _early_decision(state) if settings.llm_streaming else None
+
+        chain = governance_chain(create_llm(settings))
+        inputs = resources.prompt_inputs(state, settings)
+        stream: AssessmentStream | None = None
+
+        def round_trip() -> tuple[Any, float]:
+            nonlocal stream
+            started = time.perf_counter()
+            if on_decision is None:
+                response = chain.invoke(inputs)
+            else:
+                stream = AssessmentStream(on_decision)
+                for chunk in chain.stream(inputs):
+                    stream.add(chunk)
+                response = stream.message
+            return response, time.perf_counter() - started
+
+        try:
+            response, elapsed = resources.round_trip(round_trip)
+        except LLMUnavailableError as e:
+            return _unavailable_fallback(state, e)
+        parsed = _parse_llm_response(response, state)
+        if resources.metrics is not None:
+            resources.metrics.record_llm_call(
+                response,
+                elapsed,
+                parsed,
+                None if stream is None else stream.time_to_decision,
+            )
+        resources.remember(state, settings, parsed)
+        return parsed
+
+    if resources.cache is None:
+        state["llm_response"] = call_llm()
+        return state
 
+    parsed, info = resources.cache.get_or_compute(
+        _cache_key(state, settings), call_llm, should_store=_is_assessment
+    )
+    state["llm_response"] = parsed
+    _llm_meta(state)["cache"] = info
+    return state
+
+
+async def aassess_with_llm(
+    state: GatekeeperState,
+    settings: Settings,
+    resources: LLMResources | None = None,
+) -> GatekeeperState:
+    """Async variant of :func:`assess_with_llm`.
+
+    When ``resources`` has a limiter, the LLM round trip waits for a slot so
+    only a bounded number of calls are in flight on the event loop. A call
+    that outlives the guard's deadline is cancelled.
+    """
+    resources = resources or LLMResources()
+
+    async def call_llm() -> dict[str, Any]:
+        reused = resources.reuse_similar(state, settings)
+        if reused is not None:
+            return reused
+        # Shared by every retry of the round trip below.
+        on_decision = _early_decision(state) if settings.llm_streaming else None
+
+        chain = governance_chain(create_llm(settings))
+        inputs = resources.prompt_inputs(state, settings)
+        stream: AssessmentStream | None = None
+
+        async def round_trip() -> tuple[Any, float]:
+            nonlocal stream
+            started = time.perf_counter()
+            if on_decision is None:
+                response = await chain.ainvoke(inputs)
+            else:
+                stream = AssessmentStream(on_decision)
+                async for chunk in chain.astream(inputs):
+                    stream.add(chunk)
+                response = stream.message
+            return response, time.perf_counter() - started
+
+        try:
+            response, elapsed = await resources.around_trip(round_trip)
+        except LLMUnavailableError as e:
+            return _unavailable_fallback(state, e)
+        parsed = _parse_llm_response(response, state)
+        if resources.metrics is not None:
+            resources.metrics.record_llm_call(
+                response,
+                elapsed,
+                parsed,
+                None if stream is None else stream.time_to_decision,
+            )
+        resources.remember(state, settings, parsed)
+        return parsed
+
+    if resources.cache is None:
+        state["llm_response"] = await call_llm()
+        return state
+
+    parsed, info = await resources.cache.aget_or_compute(
+        _cache_key(state, settings), call_llm, should_store=_is_assessment
+    )
     state["llm_response"] = parsed
+    _llm_meta(state)["cache"] = info
     return state
 
 
+POLICY_ONLY_ACTIONS = {
+    Decision.ACT: "Proceed.",
+    Decision.HOLD: "Clarify the request before proceeding.",
+    Decision.ESCALATE: "Obtain explicit human approval before proceeding.",
+}
+
+
 def build_decision_card(state: GatekeeperState) -> GatekeeperState:
-    """Assemble the final Decision Card from policy and LLM outputs."""
+    """Assemble the final Decision Card from policy and LLM outputs.
+
+    When the LLM was skipped, the card is built from the policy outcome alone.
+    """
     llm_resp = state.get("llm_response", {})
 
     decision_str = llm_resp.get("decision", state["policy_decision"])
@@ -143,15 +499,34 @@ def build_decision_card(state: GatekeeperState) -> GatekeeperState:
     except ValueError:
         risk_level = RiskLevel.MEDIUM
 
+    if llm_resp:
+        reasoning = llm_resp.get("reasoning", "No reasoning provided.")
+        recommended_action = llm_resp.get("recommended_action", "")
+    else:
+        rule_ids = ", ".join(_rule_ids(state)) or "none"
+        reasoning = (
+            f"Decided by policy without LLM assessment (matched rules: {rule_ids})."
+        )
+        recommended_action = POLICY_ONLY_ACTIONS[decision]
+
     card = DecisionCard(
         request=state["request"],
         decision=decision,
         risk_level=risk_level,
-        reasoning=llm_resp.get("reasoning", "No reasoning provided."),
+        reasoning=reasoning,
         matched_policies=[
             PolicyMatch(**p) for p in state.get("matched_policies", [])
         ],
-        recommended_action=llm_resp.get("recommended_action", ""),
+        recommended_action=recommended_action,
+        metadata={
+            "llm_skipped": not llm_resp,
+            "llm_route": state.get("llm_route", "auto"),
+            "llm_fallback": bool(llm_resp.get("fallback")),
+            "llm_partial": bool(llm_resp.get("partial")),
+            "llm_fallback_reason": llm_resp.get("fallback_reason"),
+            **({"tenant": state["tenant"]} if "tenant" in state else {}),
+            **state.get("llm_meta", {}),
+        },
     )
 
     state["decision_card"] = card.model_dump(mode="json")
@@ -161,9 +536,18 @@ def build_decision_card(state: GatekeeperState) -> GatekeeperState:
 def route_after_policy(state: GatekeeperState) -> str:
     """Determine the next node based on policy evaluation.
 
-    If policy alone produces ESCALATE with critical risk, skip the LLM
-    to avoid unnecessary cost. Otherwise, proceed to LLM assessment.
+    Rules can declare their routing in the policy file (``llm: skip``,
+    ``required`` or ``auto``). A ``required`` match always goes to the LLM
+    and a unanimous ``skip`` match bypasses it. Otherwise, if policy alone
+    produces ESCALATE with critical risk, skip the LLM to avoid unnecessary
+    cost; in every other case proceed to LLM assessment.
     """
+    route = state.get("llm_route", "auto")
+    if route == "required":
+        return "llm_assess"
+    if route == "skip":
+        logger.info("Policy routing — skipping LLM, routing to decision card")
+        return "build_decision"
     if (
         state["policy_decision"] == "ESCALATE"
         and state["policy_risk"] == "critical"
@@ -173,32 +557,289 @@ def route_after_policy(state: GatekeeperState) -> str:
     return "llm_assess"
 
 
-def build_graph(settings: Settings) -> StateGraph:
-    """Construct the LangGraph governance state machine."""
-    rules = load_policy_rules(settings.policy_path)
+def new_state(
+    request: str,
+    actions: list[dict[str, Any]] | None = None,
+    tenant: str | None = None,
+) -> GatekeeperState:
+    """Create the initial graph state for a request.
+
+    ``actions`` are the tool calls to run if the request is approved, as
+    ``{"tool", "arguments", "id", "depends_on"}`` dicts. ``tenant`` selects
+    the policy set the request is evaluated against.
+    """
+    state: GatekeeperState = {
+        "request": request,
+        "matched_policies": [],
+        "policy_decision": "HOLD",
+        "policy_risk": "medium",
+        "llm_response": {},
+        "decision_card": {},
+    }
+    if actions:
+        state["actions"] = actions
+    if tenant is not None:
+        state["tenant"] = tenant
+    return state
+
+
+def route_after_decision(state: GatekeeperState) -> str:
+    """Run the requested tool calls only if the request was approved (ACT).
+
+    An ACT that the LLM did not confirm still goes to ``execute_actions``,
+    which records its calls as ``skipped`` (see :func:`_unreviewed`).
+    """
+    if state.get("actions") and state["decision_card"].get("decision") == "ACT":
+        return "execute_actions"
+    return "end"
+
+
+def _jsonable(value: Any) -> Any:
+    """``value`` if it serializes to JSON, else its ``repr``."""
+    try:
+        json.dumps(value)
+    except (TypeError, ValueError):
+        return repr(value)
+    return value
+
+
+def _unreviewed(state: GatekeeperState) -> str | None:
+    """Why the card's ACT must not be acted on, or ``None`` if it may be.
+
+    A fallback or partial card kept the policy default after the LLM failed,
+    so nobody reviewed the request. Policy-only cards (critical escalations
+    and ``llm: skip`` rules) never go through the LLM and are not affected.
+    """
+    metadata = state["decision_card"].get("metadata", {})
+    if metadata.get("llm_fallback"):
+        reason = metadata.get("llm_fallback_reason") or "error"
+        return f"not reviewed: LLM fallback ({reason})"
+    if metadata.get("llm_partial"):
+        return "not reviewed: partial LLM reply"
+    return None
+
+
+class _ActionRecorder:
+    """Collects tool results into the state and the Decision Card metadata."""
+
+    def __init__(self, state: GatekeeperState) -> None:
+        self.state = state
+        self.calls = parse_tool_calls(state.get("actions", []))
+        self.results: dict[str, ToolResult] = {}
+        self.started = time.perf_counter()
+
+    def skipped(self, reason: str) -> list[ToolResult]:
+        return [
+            ToolResult(id=call.id, tool=call.tool, status="skipped", error=reason)
+            for call in self.calls
+        ]
+
+    def add(self, result: ToolResult) -> dict[str, Any]:
+        self.results[result.id] = result
+        return {"event": "tool_result", **result.to_dict()}
+
+    def finish(self) -> None:
+        ordered = [self.results[call.id] for call in self.calls]
+        self.state["action_results"] = [r.to_dict() for r in ordered]
+        metadata = self.state["decision_card"].setdefault("metadata", {})
+        metadata["actions"] = [
+            {**r.to_dict(), "result": _jsonable(r.result)} for r in ordered
+        ]
+        metadata["actions_ms"] = round((time.perf_counter() - self.started) * 1e3, 3)
+
+
+def execute_actions(
+    state: GatekeeperState, executor: ToolExecutor
+) -> Iterator[dict[str, Any]]:
+    """Run the approved tool calls in ``state``, yielding ``tool_result`` events.
+
+    Events arrive as calls finish. When the generator is exhausted, the
+    results are recorded in input order in ``state["action_results"]`` and
+    the Decision Card's ``metadata.actions``, with the wall time of the
+    whole stage in ``metadata.actions_ms``. If the LLM fell back or replied
+    only in part, no call runs and each is recorded as ``skipped``.
+    """
+    recorder = _ActionRecorder(state)
+    reason = _unreviewed(state)
+    results = (
+        executor.run(recorder.calls) if reason is None else recorder.skipped(reason)
+    )
+    for result in results:
+        yield recorder.add(result)
+    recorder.finish()
+
+
+async def aexecute_actions(
+    state: GatekeeperState, executor: ToolExecutor
+) -> AsyncIterator[dict[str, Any]]:
+    """Async variant of :func:`execute_actions`."""
+    recorder = _ActionRecorder(state)
+    reason = _unreviewed(state)
+    if reason is not None:
+        for result in recorder.skipped(reason):
+            yield recorder.add(result)
+    else:
+        async for result in executor.arun(recorder.calls):
+            yield recorder.add(result)
+    recorder.finish()
+
+
+GraphNode = tuple[
+    Callable[[GatekeeperState], GatekeeperState],
+    Callable[[GatekeeperState], Awaitable[GatekeeperState]],
+]
+
+
+PolicySource = CompiledPolicy | Callable[[], CompiledPolicy]
+TenantPolicies = Callable[[str], CompiledPolicy]
+
+
+def build_nodes(
+    settings: Settings,
+    policy: PolicySource | None = None,
+    resources: LLMResources | None = None,
+    executor: ToolExecutor | None = None,
+    tenant_policies: TenantPolicies | None = None,
+) -> dict[str, GraphNode]:
+    """Build the ``(sync, async)`` callable pair for each graph node.
+
+    ``policy`` defaults to the rules at ``settings.policy_path``. Pass a
+    callable instead of a :class:`CompiledPolicy` to evaluate each request
+    against whatever it currently returns, e.g. a hot-reloaded rule set.
+    ``resources`` defaults to the LLM helpers enabled in ``settings``. With
+    an ``executor``, an ``execute_actions`` node runs the tool calls of
+    approved requests. A state with a ``tenant`` is evaluated against
+    ``tenant_policies(tenant)`` instead of ``policy``. With metrics enabled,
+    each node records its duration, and nodes built while a
+    :class:`~autonomy_gatekeeper.profiling.Profiler` runs are profiled as
+    stages of their own.
+    """
+    if policy is None:
+        policy = load_policy(settings.policy_path)
+    if resources is None:
+        resources = LLMResources.from_settings(settings)
+    metrics = resources.metrics
+    current_policy = policy if callable(policy) else lambda: policy
+
+    def policy_for(state: GatekeeperState) -> CompiledPolicy:
+        tenant = state.get("tenant")
+        if tenant is None:
+            return current_policy()
+        if tenant_policies is None:
+            raise ValueError(f"No policy sets are configured for tenant {tenant!r}")
+        return tenant_policies(tenant)
 
     def policy_node(state: GatekeeperState) -> GatekeeperState:
-        return evaluate_policies(state, rules)
+        return evaluate_policies(state, policy_for(state))
+
+    async def apolicy_node(state: GatekeeperState) -> GatekeeperState:
+        return evaluate_policies(state, policy_for(state))
 
     def llm_node(state: GatekeeperState) -> GatekeeperState:
-        return assess_with_llm(state, settings)
+        return assess_with_llm(state, settings, resources)
+
+    async def allm_node(state: GatekeeperState) -> GatekeeperState:
+        return await aassess_with_llm(state, settings, resources)
 
     def decision_node(state: GatekeeperState) -> GatekeeperState:
-        return build_decision_card(state)
+        state = build_decision_card(state)
+        if metrics is not None:
+            metrics.record_card(state["decision_card"])
+        return state
+
+    async def adecision_node(state: GatekeeperState) -> GatekeeperState:
+        return decision_node(state)
+
+    nodes: dict[str, GraphNode] = {
+        "evaluate_policy": (policy_node, apolicy_node),
+        "llm_assess": (llm_node, allm_node),
+        "build_decision": (decision_node, adecision_node),
+    }
+    if executor is not None:
+
+        def execute_node(state: GatekeeperState) -> GatekeeperState:
+            writer = _stream_writer()
+            for event in execute_actions(state, executor):
+                if writer is not None:
+                    writer(event)
+            return state
+
+        async def aexecute_node(state: GatekeeperState) -> GatekeeperState:
+            writer = _stream_writer()
+            async for event in aexecute_actions(state, executor):
+                if writer is not None:
+                    writer(event)
+            return state
+
+        nodes["execute_actions"] = (execute_node, aexecute_node)
+    if metrics is not None:
+        nodes = {
+            name: (metrics.time_node(name, func), metrics.atime_node(name, afunc))
+            for name, (func, afunc) in nodes.items()
+        }
+    if profiling.active() is not None:
+        nodes = {
+            name: (profiling.staged(name, func), afunc)
+            for name, (func, afunc) in nodes.items()
+        }
+    return nodes
+
+
+def route_entry(state: GatekeeperState) -> str:
+    """Start at policy evaluation unless the caller has already run it."""
+    if "llm_route" in state:
+        return route_after_policy(state)
+    return "evaluate_policy"
+
+
+def build_graph(
+    settings: Settings,
+    policy: PolicySource | None = None,
+    resources: LLMResources | None = None,
+    executor: ToolExecutor | None = None,
+    tenant_policies: TenantPolicies | None = None,
+) -> StateGraph:
+    """Construct the LangGraph governance state machine.
+
+    The graph accepts a fresh :func:`new_state` or a state that has already
+    been through :func:`evaluate_policies`, in which case it resumes at the
+    routing decision. With an ``executor``, approved requests continue to
+    ``execute_actions``; its ``tool_result`` events are published on the
+    ``custom`` stream as each call finishes.
+    """
+    from langchain_core.runnables import RunnableLambda
+    from langgraph.graph import END, StateGraph
 
+    nodes = build_nodes(settings, policy, resources, executor, tenant_policies)
     graph = StateGraph(GatekeeperState)
 
-    graph.add_node("evaluate_policy", policy_node)
-    graph.add_node("llm_assess", llm_node)
-    graph.add_node("build_decision", decision_node)
-
-    graph.set_entry_point("evaluate_policy")
+    # Each node carries a native coroutine so ``ainvoke`` never hops to a
+    # worker thread; the CPU-bound nodes just run inline on the loop.
+    for name, (func, afunc) in nodes.items():
+        graph.add_node(name, RunnableLambda(func, afunc=afunc))
+
+    graph.set_conditional_entry_point(
+        route_entry,
+        {
+            "evaluate_policy": "evaluate_policy",
+            "llm_assess": "llm_assess",
+            "build_decision": "build_decision",
+        },
+    )
     graph.add_conditional_edges(
         "evaluate_policy",
         route_after_policy,
         {"llm_assess": "llm_assess", "build_decision": "build_decision"},
     )
     graph.add_edge("llm_assess", "build_decision")
-    graph.add_edge("build_decision", END)
+    if executor is None:
+        graph.add_edge("build_decision", END)
+    else:
+        graph.add_conditional_edges(
+            "build_decision",
+            route_after_decision,
+            {"execute_actions": "execute_actions", "end": END},
+        )
+        graph.add_edge("execute_actions", END)
 
     return graph
@@ -0,0 +1,316 @@
+"""Decision cache — reuses LLM assessments for repeated requests.
+
+Entries are keyed on the normalized request, the matched rule IDs, the model
+name and a fingerprint of the prompt templates, so a change to any of them
+misses the cache. Lookups go to an in-memory LRU tier first, then to an
+optional SQLite tier that several processes can share. Identical requests
+that miss at the same time are coalesced onto one LLM call.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from autonomy_gatekeeper.config import Settings
+
+CacheValue = dict[str, Any]
+
+
+def normalize_request(request: str) -> str:
+    """Lowercase and collapse whitespace so trivially different texts share a key."""
+    return " ".join(request.lower().split())
+
+
+def make_cache_key(
+    request: str, rule_ids: Iterable[str], model: str, prompt_fingerprint: str
+) -> str:
+    """Build the cache key for one LLM assessment.
+
+    ``model`` should name the provider too (see
+    :func:`autonomy_gatekeeper.llm.factory.model_identity`).
+    """
+    payload = json.dumps(
+        [normalize_request(request), sorted(rule_ids), model, prompt_fingerprint]
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    """Running cache counters."""
+
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    memory_hits: int = 0
+    disk_hits: int = 0
+
+    def to_dict(self) -> dict[str, int]:
+        """Return the counters as a plain dict."""
+        return asdict(self)
+
+
+class MemoryTier:
+    """Thread-safe LRU mapping with a per-entry time-to-live."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, CacheValue]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> CacheValue | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: CacheValue, expires_at: float | None = None) -> None:
+        if expires_at is None:
+            expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class SQLiteTier:
+    """On-disk tier shared between processes through a SQLite database."""
+
+    def __init__(self, path: str | Path, ttl_seconds: float) -> None:
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.path, timeout=30.0, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS decisions ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def get(self, key: str) -> tuple[CacheValue, float] | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM decisions WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[1] <= time.time():
+            return None
+        return json.loads(row[0]), row[1]
+
+    def put(self, key: str, value: CacheValue) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO decisions (key, value, expires_at) "
+                "VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time() + self.ttl_seconds),
+            )
+
+    def purge_expired(self) -> int:
+        """Delete expired rows and return how many were removed."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM decisions WHERE expires_at <= ?", (time.time(),)
+            )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class DecisionCache:
+    """Two-tier LLM assessment cache with in-flight request coalescing."""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 3600.0,
+        path: str | Path | None = None,
+    ) -> None:
+        self.memory = MemoryTier(max_entries, ttl_seconds)
+        self.disk = SQLiteTier(path, ttl_seconds) if path else None
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._inflight: dict[str, Future[CacheValue]] = {}
+        self._ainflight: dict[str, asyncio.Future[CacheValue]] = {}
+
+    def lookup(self, key: str) -> tuple[CacheValue, str] | None:
+        """Return ``(value, tier)`` for a cached entry, or ``None``."""
+        value = self.memory.get(key)
+        if value is not None:
+            return value, "memory"
+        if self.disk is not None:
+            found = self.disk.get(key)
+            if found is not None:
+                value, expires_at = found
+                self.memory.put(key, value, expires_at)
+                return value, "disk"
+        return None
+
+    def store(self, key: str, value: CacheValue) -> None:
+        """Write ``value`` to every tier."""
+        self.memory.put(key, value)
+        if self.disk is not None:
+            self.disk.put(key, value)
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], CacheValue],
+        should_store: Callable[[CacheValue], bool] = lambda value: True,
+    ) -> tuple[CacheValue, dict[str, Any]]:
+        """Return the cached value for ``key`` or compute it once.
+
+        Concurrent callers that miss on the same key wait for the first
+        caller's result instead of computing it again. Returns the value and
+        a small dict describing how it was obtained.
+        """
+        found = self.lookup(key)
+        if found is not None:
+            return self._hit(*found)
+
+        with self._lock:
+            leader = self._inflight.get(key)
+            # A leader may have stored its result since the lookup above.
+            late = None if leader is not None else self.memory.get(key)
+            if leader is None and late is None:
+                future: Future[CacheValue] = Future()
+                self._inflight[key] = future
+
+        if late is not None:
+            return self._hit(late, "memory")
+        if leader is not None:
+            return dict(leader.result()), self._count("coalesced")
+
+        info = self._count("miss")
+        try:
+            value = compute()
+            if should_store(value):
+                self.store(key, value)
+            future.set_result(value)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        return value, info
+
+    async def aget_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[CacheValue]],
+        should_store: Callable[[CacheValue], bool] = lambda value: True,
+    ) -> tuple[CacheValue, dict[str, Any]]:
+        """Async variant of :meth:`get_or_compute`.
+
+        Coalescing applies to callers on the same event loop.
+        """
+        found = self.lookup(key)
+        if found is not None:
+            return self._hit(*found)
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            leader = self._ainflight.get(key)
+            if leader is not None and leader.get_loop() is not loop:
+                leader = None
+            late = None if leader is not None else self.memory.get(key)
+            if leader is None and late is None:
+                future: asyncio.Future[CacheValue] = loop.create_future()
+                self._ainflight[key] = future
+
+        if late is not None:
+            return self._hit(late, "memory")
+        if leader is not None:
+            try:
+                value = await asyncio.shield(leader)
+            except asyncio.CancelledError:
+                if not leader.cancelled():
+                    raise
+                # The leading caller was cancelled; take over the computation.
+                return await self.aget_or_compute(key, compute, should_store)
+            return dict(value), self._count("coalesced")
+
+        info = self._count("miss")
+        try:
+            value = await compute()
+            if should_store(value):
+                self.store(key, value)
+            future.set_result(value)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception retrieved so a future nobody awaited doesn't warn.
+            future.exception()
+            raise
+        finally:
+            with self._lock:
+                if self._ainflight.get(key) is future:
+                    del self._ainflight[key]
+        return value, info
+
+    def _hit(self, value: CacheValue, tier: str) -> tuple[CacheValue, dict[str, Any]]:
+        with self._lock:
+            self.stats.hits += 1
+            if tier == "memory":
+                self.stats.memory_hits += 1
+            else:
+                self.stats.disk_hits += 1
+            info = self._info("hit", tier)
+        return dict(value), info
+
+    def _count(self, status: str) -> dict[str, Any]:
+        with self._lock:
+            if status == "miss":
+                self.stats.misses += 1
+            else:
+                self.stats.coalesced += 1
+            return self._info(status)
+
+    def _info(self, status: str, tier: str | None = None) -> dict[str, Any]:
+        info: dict[str, Any] = {
+            "status": status,
+            "hits": self.stats.hits,
+            "misses": self.stats.misses,
+        }
+        if tier is not None:
+            info["tier"] = tier
+        return info
+
+
+def create_decision_cache(settings: Settings) -> DecisionCache | None:
+    """Build the decision cache described by ``settings`` (``None`` if disabled)."""
+    if not settings.llm_cache_enabled:
+        return None
+    return DecisionCache(
+        max_entries=settings.llm_cache_max_entries,
+        ttl_seconds=settings.llm_cache_ttl_seconds,
+        path=settings.llm_cache_path or None,
+    )
@@ -1,16 +1,190 @@
-"""LLM factory — creates configured language model instances."""
+"""LLM factory — creates configured language model instances.
+
+Providers are registered by name and selected with ``settings.llm_provider``.
+Two are built in: ``openai`` (``ChatOpenAI``) and ``local``, a deterministic
+stand-in for offline load testing (see :mod:`autonomy_gatekeeper.llm.local`).
+Provider modules are imported only when a model is first created.
+
+Models are pooled process-wide. ``openai`` keeps one ``ChatOpenAI`` per
+model, credentials and pool settings, sharing a keep-alive ``httpx``
+connection pool of ``LLM_POOL_MAX_CONNECTIONS`` connections. Repeated
+evaluations then reuse open connections (and TLS sessions) instead of
+connecting again for every request. asyncio connections can't move between
+event loops, so async callers get a model and connection pool per loop.
+"""
 
 from __future__ import annotations
 
-from langchain_openai import ChatOpenAI
+import asyncio
+import threading
+import weakref
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
 
 from autonomy_gatekeeper.config import Settings
 
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseChatModel
+
+LLMProvider = Callable[[Settings], "BaseChatModel"]
+
+_providers: dict[str, LLMProvider] = {}
+
+
+def register_provider(name: str) -> Callable[[LLMProvider], LLMProvider]:
+    """Register a provider under ``name``; use as a decorator."""
+
+    def decorator(provider: LLMProvider) -> LLMProvider:
+        _providers[name] = provider
+        return provider
+
+    return decorator
+
+
+def available_providers() -> list[str]:
+    """Return the names of all registered providers."""
+    return sorted(_providers)
+
+
+def create_llm(settings: Settings) -> BaseChatModel:
+    """Create a chat model with the provider named by ``settings.llm_provider``."""
+    provider = _providers.get(settings.llm_provider)
+    if provider is None:
+        raise ValueError(
+            f"Unknown LLM provider {settings.llm_provider!r}. "
+            f"Available: {', '.join(available_providers())}"
+        )
+    return provider(settings)
+
+
+def model_identity(settings: Settings) -> str:
+    """``provider/model`` for the model :func:`create_llm` returns.
+
+    Cached verdicts are keyed by this, so answers from one provider or model
+    are never served for another. ``local`` ignores ``openai_model``.
+    """
+    if settings.llm_provider == "local":
+        return "local/local-governance"
+    return f"{settings.llm_provider}/{settings.openai_model}"
+
+
+OpenAIKey = tuple[object, ...]
+
+_openai_models: dict[OpenAIKey, BaseChatModel] = {}
+_openai_loop_models: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[OpenAIKey, BaseChatModel]
+] = weakref.WeakKeyDictionary()
+_http_clients: dict[OpenAIKey, Any] = {}
+_openai_lock = threading.Lock()
+
+
+def _openai_key(settings: Settings) -> OpenAIKey:
+    return (
+        settings.openai_model,
+        settings.openai_api_key,
+        settings.openai_base_url,
+        settings.llm_pool_max_connections,
+        settings.llm_pool_max_keepalive,
+        settings.llm_pool_keepalive_seconds,
+        settings.llm_deadline_seconds,
+    )
+
+
+def _http_limits(settings: Settings) -> Any:
+    import httpx
+
+    return httpx.Limits(
+        max_connections=settings.llm_pool_max_connections,
+        max_keepalive_connections=settings.llm_pool_max_keepalive,
+        keepalive_expiry=settings.llm_pool_keepalive_seconds,
+    )
+
+
+def _new_openai_model(
+    settings: Settings, http_client: Any, http_async_client: Any
+) -> BaseChatModel:
+    from langchain_openai import ChatOpenAI
 
-def create_llm(settings: Settings) -> ChatOpenAI:
-    """Create a ChatOpenAI instance from application settings."""
     return ChatOpenAI(
         model=settings.openai_model,
         api_key=settings.openai_api_key,
+        base_url=settings.openai_base_url or None,
         temperature=0.0,
+        # Retries and timeouts are handled by the graph's LLM guard.
+        max_retries=0,
+        timeout=settings.llm_deadline_seconds or None,
+        http_client=http_client,
+        http_async_client=http_async_client,
     )
+
+
+@register_provider("openai")
+def _openai(settings: Settings) -> BaseChatModel:
+    import httpx
+
+    key = _openai_key(settings)
+    try:
+        loop: asyncio.AbstractEventLoop | None = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    with _openai_lock:
+        if loop is None:
+            models = _openai_models
+        else:
+            models = _openai_loop_models.setdefault(loop, {})
+        model = models.get(key)
+        if model is None:
+            limits = _http_limits(settings)
+            http_client = _http_clients.get(key)
+            if http_client is None:
+                http_client = _http_clients[key] = httpx.Client(limits=limits)
+            model = _new_openai_model(
+                settings, http_client, httpx.AsyncClient(limits=limits)
+            )
+            models[key] = model
+    return model
+
+
+_local_models: dict[tuple[object, ...], BaseChatModel] = {}
+_local_lock = threading.Lock()
+
+
+@register_provider("local")
+def _local(settings: Settings) -> BaseChatModel:
+    from autonomy_gatekeeper.llm.local import LocalGovernanceModel
+
+    # One model per configuration, so a seeded random stream carries on
+    # across calls instead of restarting every time a model is requested.
+    key = (
+        settings.local_llm_latency_distribution,
+        settings.local_llm_latency_ms,
+        settings.local_llm_latency_jitter_ms,
+        settings.local_llm_error_rate,
+        settings.local_llm_malformed_rate,
+        settings.local_llm_seed,
+    )
+    with _local_lock:
+        model = _local_models.get(key)
+        if model is None:
+            model = LocalGovernanceModel(
+                latency_distribution=settings.local_llm_latency_distribution,
+                latency_ms=settings.local_llm_latency_ms,
+                latency_jitter_ms=settings.local_llm_latency_jitter_ms,
+                error_rate=settings.local_llm_error_rate,
+                malformed_rate=settings.local_llm_malformed_rate,
+                seed=settings.local_llm_seed,
+            )
+            _local_models[key] = model
+    return model
+
+
+def clear_llm_pool() -> None:
+    """Drop every pooled model and close the shared HTTP connection pools."""
+    with _openai_lock:
+        for client in _http_clients.values():
+            client.close()
+        _http_clients.clear()
+        _openai_models.clear()
+        _openai_loop_models.clear()
+    with _local_lock:
+        _local_models.clear()
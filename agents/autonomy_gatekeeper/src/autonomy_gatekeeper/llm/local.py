@@ -0,0 +1,186 @@
+"""Local stand-in LLM — schema-valid governance replies without a network.
+
+:class:`LocalGovernanceModel` answers every prompt with a governance JSON
+verdict chosen deterministically from the prompt text, after sleeping for a
+latency drawn from a configurable distribution. A configurable fraction of
+calls raise :class:`LocalLLMError` or return malformed output, so the
+throughput, tail latency and fallback behaviour of the whole graph can be
+measured offline.
+
+Streaming (``stream``/``astream``) yields the reply a few characters at a
+time, spreading the sampled latency evenly over the chunks like a model
+generating tokens.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+import time
+from collections.abc import AsyncIterator, Iterator
+from typing import Any
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+LATENCY_DISTRIBUTIONS = ("constant", "uniform", "normal", "lognormal", "exponential")
+
+_DECISIONS = ("ACT", "HOLD", "ESCALATE")
+_RISK_LEVELS = ("low", "medium", "high", "critical")
+
+# Characters per streamed chunk, roughly one token.
+STREAM_CHUNK_CHARS = 4
+
+
+class LocalLLMError(RuntimeError):
+    """Simulated provider failure raised by :class:`LocalGovernanceModel`."""
+
+    # Treated like a provider 503, so it is retried and trips the breaker.
+    status_code = 503
+
+
+def governance_reply(prompt: str) -> str:
+    """A schema-valid governance verdict chosen deterministically from ``prompt``."""
+    digest = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest(), 16)
+    return json.dumps(
+        {
+            "decision": _DECISIONS[digest % len(_DECISIONS)],
+            "risk_level": _RISK_LEVELS[(digest >> 8) % len(_RISK_LEVELS)],
+            "reasoning": "Assessment produced by the local stand-in model.",
+            "recommended_action": "None; this verdict is synthetic.",
+        }
+    )
+
+
+class LocalGovernanceModel(BaseChatModel):
+    """Chat model that simulates a governance LLM locally.
+
+    ``latency_ms`` is the mean latency and ``latency_jitter_ms`` its spread:
+    the half-width for ``uniform`` and the standard deviation for ``normal``
+    and ``lognormal``. ``exponential`` uses only the mean.
+    """
+
+    latency_distribution: str = "constant"
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    malformed_rate: float = 0.0
+    seed: int | None = None
+
+    _rng: random.Random = PrivateAttr()
+
+    def model_post_init(self, context: Any) -> None:
+        if self.latency_distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(
+                f"Unknown latency distribution {self.latency_distribution!r}; "
+                f"expected one of {', '.join(LATENCY_DISTRIBUTIONS)}"
+            )
+        self._rng = random.Random(self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "local-governance"
+
+    def sample_latency(self) -> float:
+        """Draw one latency in seconds from the configured distribution."""
+        mean, spread = self.latency_ms, self.latency_jitter_ms
+        rng = self._rng
+        kind = self.latency_distribution
+        if kind == "uniform":
+            value = rng.uniform(mean - spread, mean + spread)
+        elif kind == "normal":
+            value = rng.gauss(mean, spread)
+        elif kind == "lognormal" and mean > 0:
+            sigma2 = math.log1p((spread / mean) ** 2)
+            value = rng.lognormvariate(math.log(mean) - sigma2 / 2, math.sqrt(sigma2))
+        elif kind == "exponential" and mean > 0:
+            value = rng.expovariate(1 / mean)
+        else:
+            value = mean
+        return max(0.0, value) / 1e3
+
+    def _reply(self, messages: list[BaseMessage]) -> ChatResult:
+        roll = self._rng.random()
+        if roll < self.error_rate:
+            raise LocalLLMError("Simulated LLM provider error")
+        prompt = "\n".join(str(message.content) for message in messages)
+        text = governance_reply(prompt)
+        if roll < self.error_rate + self.malformed_rate:
+            text = text[: len(text) // 2]
+        message = AIMessage(
+            content=text,
+            usage_metadata={
+                "input_tokens": len(prompt) // 4,
+                "output_tokens": len(text) // 4,
+                "total_tokens": (len(prompt) + len(text)) // 4,
+            },
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        time.sleep(self.sample_latency())
+        return self._reply(messages)
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        await asyncio.sleep(self.sample_latency())
+        return self._reply(messages)
+
+    def _chunks(
+        self, messages: list[BaseMessage]
+    ) -> Iterator[tuple[float, ChatGenerationChunk]]:
+        """Split a reply into ``(delay_seconds, chunk)`` pairs."""
+        latency = self.sample_latency()
+        message = self._reply(messages).generations[0].message
+        text = str(message.content)
+        pieces = [
+            text[i : i + STREAM_CHUNK_CHARS]
+            for i in range(0, len(text), STREAM_CHUNK_CHARS)
+        ] or [""]
+        for index, piece in enumerate(pieces):
+            chunk = AIMessageChunk(content=piece)
+            if index == len(pieces) - 1:
+                chunk.usage_metadata = getattr(message, "usage_metadata", None)
+            yield latency / len(pieces), ChatGenerationChunk(message=chunk)
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        for delay, chunk in self._chunks(messages):
+            time.sleep(delay)
+            yield chunk
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        for delay, chunk in self._chunks(messages):
+            await asyncio.sleep(delay)
+            yield chunk
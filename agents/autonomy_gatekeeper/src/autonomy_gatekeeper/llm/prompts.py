@@ -1,14 +1,39 @@
-"""Prompt templates for governance evaluation."""
+"""Prompt templates for governance evaluation.
+
+The system message is the same for every request, and everything that
+varies (the matched policies and the request) comes after it in the user
+message. Providers that cache prompt prefixes, such as OpenAI for shared
+prefixes of :data:`MIN_CACHEABLE_PROMPT_TOKENS` or more, can then reuse the
+system message instead of processing it on every call.
+"""
 
 from __future__ import annotations
 
-from langchain_core.prompts import ChatPromptTemplate
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any
+
+from autonomy_gatekeeper.llm.tokens import TokenCounter, truncate_to_budget
+
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseChatModel
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_core.runnables import Runnable
+
+# OpenAI caches a prompt prefix only once the shared part is at least this long.
+MIN_CACHEABLE_PROMPT_TOKENS = 1024
+
+# Prebuilt chains kept by governance_chain(), most recently used last.
+MAX_CHAINS = 32
 
 GOVERNANCE_SYSTEM_PROMPT = """\
 You are an AI governance evaluator. Your role is to assess incoming requests
 and determine the appropriate level of autonomy.
 
-You must return a JSON object with these fields:
+You must return a JSON object with these fields, in this order:
 - decision: one of "ACT", "HOLD", or "ESCALATE"
 - risk_level: one of "low", "medium", "high", or "critical"
 - reasoning: a concise explanation of your assessment
@@ -19,23 +44,126 @@ Decision guidelines:
 - HOLD: The request is ambiguous or medium-risk. Ask for clarification before proceeding.
 - ESCALATE: The request is high-risk or irreversible. Require explicit human approval.
 
-Policy rules that matched this request:
-{matched_policies}
-
-Evaluate the following request strictly. When in doubt, choose the more
+Each message lists the policy rules that matched the request, then the
+request itself. Evaluate the request strictly. When in doubt, choose the more
 cautious option. Never default to ACT for ambiguous requests."""
 
 GOVERNANCE_USER_PROMPT = """\
+Policy rules that matched this request:
+{matched_policies}
+
 Request: {request}
 
 Provide your governance evaluation as JSON."""
 
 
+@dataclass(frozen=True)
+class PromptUsage:
+    """Estimated token accounting for one governance prompt.
+
+    ``tokens_saved`` counts the request tokens cut by the token budget, plus
+    the static prefix when it is long enough on its own for the provider to
+    serve it from its prefix cache. A long request after a short prefix
+    shares nothing cacheable with other prompts.
+    """
+
+    prompt_tokens: int
+    prefix_tokens: int
+    truncated_tokens: int = 0
+
+    @property
+    def prefix_cacheable(self) -> bool:
+        """Whether the static prefix is long enough for prefix caching."""
+        return self.prefix_tokens >= MIN_CACHEABLE_PROMPT_TOKENS
+
+    @property
+    def tokens_saved(self) -> int:
+        """Estimated input tokens not sent or served from the prefix cache."""
+        cached = self.prefix_tokens if self.prefix_cacheable else 0
+        return self.truncated_tokens + cached
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the usage, including derived fields, as a plain dict."""
+        return {
+            **asdict(self),
+            "prefix_cacheable": self.prefix_cacheable,
+            "tokens_saved": self.tokens_saved,
+        }
+
+
 def build_governance_prompt() -> ChatPromptTemplate:
     """Build the governance evaluation prompt template."""
+    from langchain_core.prompts import ChatPromptTemplate
+
     return ChatPromptTemplate.from_messages(
         [
             ("system", GOVERNANCE_SYSTEM_PROMPT),
             ("human", GOVERNANCE_USER_PROMPT),
         ]
     )
+
+
+@functools.lru_cache(maxsize=1)
+def governance_prompt() -> ChatPromptTemplate:
+    """The governance prompt template, built once per process."""
+    return build_governance_prompt()
+
+
+_chains: OrderedDict[int, tuple[BaseChatModel, Runnable[Any, Any]]] = OrderedDict()
+_chains_lock = threading.Lock()
+
+
+def governance_chain(llm: BaseChatModel) -> Runnable[Any, Any]:
+    """The prebuilt ``prompt | llm`` chain for ``llm``.
+
+    Chains are kept for the :data:`MAX_CHAINS` most recently used models, so
+    pooled models from :func:`autonomy_gatekeeper.llm.factory.create_llm`
+    reuse one chain rather than composing a new one for every call.
+    """
+    key = id(llm)
+    with _chains_lock:
+        entry = _chains.get(key)
+        if entry is not None and entry[0] is llm:
+            _chains.move_to_end(key)
+            return entry[1]
+        chain = governance_prompt() | llm
+        _chains[key] = (llm, chain)
+        if len(_chains) > MAX_CHAINS:
+            _chains.popitem(last=False)
+        return chain
+
+
+def prepare_prompt_inputs(
+    request: str,
+    matched_policies: str,
+    counter: TokenCounter,
+    request_token_budget: int = 0,
+) -> tuple[dict[str, str], PromptUsage]:
+    """Template inputs for one request, truncated to the token budget."""
+    request, truncated = truncate_to_budget(request, request_token_budget, counter)
+    inputs = {"request": request, "matched_policies": matched_policies}
+    prefix_tokens = counter.count(GOVERNANCE_SYSTEM_PROMPT)
+    user_tokens = counter.count(GOVERNANCE_USER_PROMPT.format(**inputs))
+    return inputs, PromptUsage(
+        prompt_tokens=prefix_tokens + user_tokens,
+        prefix_tokens=prefix_tokens,
+        truncated_tokens=truncated,
+    )
+
+
+def prompt_fingerprint(request_token_budget: int = 0) -> str:
+    """Short hash of the prompt templates, used to invalidate cached verdicts.
+
+    The request token budget is included because it changes what the LLM
+    sees for long requests.
+    """
+    digest = hashlib.sha256(
+        (
+            GOVERNANCE_SYSTEM_PROMPT
+            + "\0"
+            + GOVERNANCE_USER_PROMPT
+            + "\0"
+            + str(request_token_budget)
+        ).encode("utf-8")
+    )
+    return digest.hexdigest()[:16]
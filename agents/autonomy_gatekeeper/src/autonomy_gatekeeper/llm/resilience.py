@@ -0,0 +1,503 @@
+"""Bounded-latency LLM calls — deadlines, adaptive concurrency, retries, breaker.
+
+:class:`LLMGuard` wraps each LLM round trip:
+
+- **Deadline.** Every assessment gets ``llm_deadline_seconds``, which covers
+  waiting for a concurrency slot, every attempt and the back-off between
+  them. Async calls are cancelled when it passes. A sync call can't be
+  interrupted, so it runs on a worker thread and is abandoned; its slot is
+  held until it really finishes.
+- **Adaptive concurrency.** :class:`AdaptiveLimiter` caps calls in flight
+  with an AIMD rule. Each call that finishes under the latency target adds
+  ``1 / limit``, so the limit grows by about one per round of calls. A 429,
+  a timeout or a slow call halves it, at most once per cool-down.
+- **Retries.** Throttling, timeouts, connection failures and 5xx errors are
+  retried with full-jitter exponential back-off, but only while the next
+  attempt can still start before the deadline.
+- **Circuit breaker.** :class:`CircuitBreaker` opens after consecutive
+  failures and rejects calls at once until its reset time has passed. Then
+  it lets one probe through.
+
+A call that can't produce a reply raises :class:`LLMUnavailableError`, and the
+graph falls back to the policy decision. Other errors, such as a rejected
+API key, propagate unchanged.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import random
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import asdict, dataclass
+from typing import Any, TypeVar
+
+from autonomy_gatekeeper.config import Settings
+from autonomy_gatekeeper.metrics import GatekeeperMetrics
+
+T = TypeVar("T")
+
+MAX_BACKOFF_SECONDS = 5.0
+_RETRYABLE_NAMES = {"APITimeoutError", "APIConnectionError"}
+
+
+class LLMUnavailableError(RuntimeError):
+    """The LLM gave no usable reply within the deadline.
+
+    ``reason`` is ``deadline``, ``circuit_open`` or ``error`` (retries
+    exhausted).
+    """
+
+    def __init__(self, reason: str, message: str) -> None:
+        super().__init__(message)
+        self.reason = reason
+
+
+def status_code(exc: BaseException) -> int | None:
+    """The HTTP status carried by a provider error, if any."""
+    status = getattr(exc, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_overload(exc: BaseException) -> bool:
+    """Whether ``exc`` means the provider is throttling or too slow."""
+    return status_code(exc) == 429 or isinstance(exc, TimeoutError)
+
+
+def is_client_error(exc: BaseException) -> bool:
+    """Whether ``exc`` is an HTTP 4xx other than 429: the provider is up."""
+    status = status_code(exc)
+    return status is not None and 400 <= status < 500 and status != 429
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Whether ``exc`` is a transient provider failure worth retrying."""
+    status = status_code(exc)
+    if status is not None:
+        return status == 429 or status >= 500
+    return (
+        isinstance(exc, TimeoutError | ConnectionError)
+        or type(exc).__name__ in _RETRYABLE_NAMES
+    )
+
+
+def backoff_delay(attempt: int, base: float, rng: random.Random | None = None) -> float:
+    """Full-jitter exponential back-off before retry number ``attempt`` (from 0)."""
+    ceiling = min(MAX_BACKOFF_SECONDS, base * 2**attempt)
+    return (rng or random).uniform(0, ceiling)
+
+
+class AdaptiveLimiter:
+    """An AIMD concurrency limit shared by sync and async callers.
+
+    The limit starts at ``maximum`` and moves between ``minimum`` and
+    ``maximum``. Async waiters are woken on their own event loops.
+    """
+
+    def __init__(
+        self,
+        maximum: int,
+        minimum: int = 1,
+        latency_target: float = 10.0,
+        backoff: float = 0.5,
+        cooldown_seconds: float = 1.0,
+    ) -> None:
+        self.maximum = max(1, maximum)
+        self.minimum = max(1, min(minimum, self.maximum))
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.cooldown_seconds = cooldown_seconds
+        self._limit = float(self.maximum)
+        self._in_flight = 0
+        self._last_decrease = float("-inf")
+        self._cond = threading.Condition()
+        self._async_waiters: list[
+            tuple[asyncio.AbstractEventLoop, asyncio.Future[None]]
+        ] = []
+
+    @property
+    def limit(self) -> int:
+        """The current number of calls allowed in flight."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """Calls currently holding a slot."""
+        return self._in_flight
+
+    def _available(self) -> bool:
+        return self._in_flight < int(self._limit)
+
+    def acquire(self, timeout: float | None = None) -> bool:
+        """Wait up to ``timeout`` seconds for a slot; ``False`` if none freed up."""
+        with self._cond:
+            if not self._cond.wait_for(self._available, timeout):
+                return False
+            self._in_flight += 1
+            return True
+
+    async def aacquire(self, timeout: float | None = None) -> bool:
+        """Async variant of :meth:`acquire`."""
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while True:
+            with self._cond:
+                if self._available():
+                    self._in_flight += 1
+                    return True
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            remaining = None if deadline is None else deadline - loop.time()
+            try:
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError
+                await asyncio.wait_for(waiter, remaining)
+            except TimeoutError:
+                with self._cond:
+                    if (loop, waiter) in self._async_waiters:
+                        self._async_waiters.remove((loop, waiter))
+                return False
+
+    def release(self) -> None:
+        """Give a slot back."""
+        with self._cond:
+            self._in_flight -= 1
+            self._wake()
+
+    def record_latency(self, seconds: float) -> None:
+        """Adjust the limit for a call that succeeded in ``seconds``."""
+        with self._cond:
+            if seconds > self.latency_target:
+                self._decrease()
+                return
+            self._limit = min(self.maximum, self._limit + 1 / self._limit)
+            self._wake()
+
+    def record_overload(self) -> None:
+        """Back off after a 429 or a timeout."""
+        with self._cond:
+            self._decrease()
+
+    def _decrease(self) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown_seconds:
+            return
+        self._last_decrease = now
+        self._limit = max(self.minimum, self._limit * self.backoff)
+
+    def _wake(self) -> None:
+        self._cond.notify_all()
+        waiters, self._async_waiters = self._async_waiters, []
+        for loop, waiter in waiters:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(_set_done, waiter)
+
+
+def _set_done(waiter: asyncio.Future[None]) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class CircuitBreaker:
+    """Opens after ``failure_threshold`` consecutive failures.
+
+    While open, :meth:`allow` refuses calls. After ``reset_seconds`` one probe
+    call is allowed (half-open): success closes the breaker, failure opens it
+    again for another ``reset_seconds``.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.opened = 0
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """``closed``, ``open`` or ``half_open``."""
+        if self._opened_at is None:
+            return "closed"
+        if self._probing or time.monotonic() - self._opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now."""
+        return self.admit() is not None
+
+    def admit(self) -> bool | None:
+        """Admit a call: ``None`` if refused, ``True`` if it is the half-open probe.
+
+        A probe must end in :meth:`record_success`, :meth:`record_failure` or,
+        if the call never got a verdict, :meth:`release_probe`.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            if self._probing:
+                return None
+            if time.monotonic() - self._opened_at < self.reset_seconds:
+                return None
+            self._probing = True
+            return True
+
+    def release_probe(self) -> None:
+        """Give back a probe whose call ended without a verdict."""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self) -> None:
+        """Close the breaker and reset the failure count."""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        """Count a failure, opening the breaker at the threshold."""
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                if not self._probing:
+                    self.opened += 1
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+
+@dataclass
+class GuardStats:
+    """A snapshot of an :class:`LLMGuard`'s state."""
+
+    concurrency_limit: int | None
+    in_flight: int | None
+    breaker_state: str
+    breaker_opened: int
+    retries: int
+    fallbacks: int
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the snapshot as a plain dict."""
+        return asdict(self)
+
+
+class LLMGuard:
+    """Runs LLM round trips under a deadline, retry policy and circuit breaker."""
+
+    def __init__(
+        self,
+        deadline_seconds: float = 30.0,
+        max_retries: int = 2,
+        retry_backoff_seconds: float = 0.25,
+        limiter: AdaptiveLimiter | None = None,
+        breaker: CircuitBreaker | None = None,
+        metrics: GatekeeperMetrics | None = None,
+        max_workers: int = 32,
+    ) -> None:
+        self.deadline_seconds = deadline_seconds
+        self.max_retries = max(0, max_retries)
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.limiter = limiter
+        self.breaker = breaker or CircuitBreaker()
+        self.metrics = metrics
+        self.retries = 0
+        self.fallbacks = 0
+        self._max_workers = max_workers
+        self._executor: ThreadPoolExecutor | None = None
+        self._executor_lock = threading.Lock()
+
+    def stats(self) -> GuardStats:
+        """The limiter, breaker and retry state right now."""
+        return GuardStats(
+            concurrency_limit=None if self.limiter is None else self.limiter.limit,
+            in_flight=None if self.limiter is None else self.limiter.in_flight,
+            breaker_state=self.breaker.state,
+            breaker_opened=self.breaker.opened,
+            retries=self.retries,
+            fallbacks=self.fallbacks,
+        )
+
+    def _deadline(self) -> float | None:
+        if self.deadline_seconds <= 0:
+            return None
+        return time.monotonic() + self.deadline_seconds
+
+    @staticmethod
+    def _remaining(deadline: float | None) -> float | None:
+        return None if deadline is None else deadline - time.monotonic()
+
+    def _unavailable(self, reason: str, message: str) -> LLMUnavailableError:
+        self.fallbacks += 1
+        if self.metrics is not None:
+            self.metrics.llm_fallbacks.inc(reason=reason)
+        return LLMUnavailableError(reason, message)
+
+    def _admit(self, deadline: float | None) -> float | None:
+        """Check the deadline before an attempt."""
+        remaining = self._remaining(deadline)
+        if remaining is not None and remaining <= 0:
+            raise self._unavailable("deadline", "LLM deadline exceeded")
+        return remaining
+
+    def _probe(self) -> bool:
+        """Ask the breaker once the attempt holds its slot; True for a probe.
+
+        Asking last means a probe is only taken by a call that will run.
+        """
+        probe = self.breaker.admit()
+        if probe is None:
+            if self.limiter is not None:
+                self.limiter.release()
+            raise self._unavailable("circuit_open", "LLM circuit breaker is open")
+        return probe
+
+    def _failed(
+        self, exc: BaseException, attempt: int, deadline: float | None
+    ) -> float:
+        """Record a failed attempt and return the back-off before the next one."""
+        overload = is_overload(exc)
+        if self.limiter is not None and overload:
+            self.limiter.record_overload()
+        if not is_retryable(exc):
+            # A 4xx means the provider answered. Anything else, such as a
+            # bug in the caller, says nothing about its health.
+            if is_client_error(exc):
+                self.breaker.record_success()
+            raise exc
+        self.breaker.record_failure()
+        remaining = self._remaining(deadline)
+        if remaining is not None and remaining <= 0:
+            raise self._unavailable("deadline", "LLM deadline exceeded") from exc
+        delay = backoff_delay(attempt, self.retry_backoff_seconds)
+        if attempt >= self.max_retries or (
+            remaining is not None and delay >= remaining
+        ):
+            raise self._unavailable("error", f"LLM call failed: {exc}") from exc
+        self.retries += 1
+        if self.metrics is not None:
+            self.metrics.llm_retries.inc()
+        return delay
+
+    def _succeeded(self, seconds: float) -> None:
+        self.breaker.record_success()
+        if self.limiter is not None:
+            self.limiter.record_latency(seconds)
+
+    def call(self, func: Callable[[], T]) -> T:
+        """Run ``func`` under the guard from synchronous code."""
+        deadline = self._deadline()
+        attempt = 0
+        while True:
+            remaining = self._admit(deadline)
+            if self.limiter is not None and not self.limiter.acquire(remaining):
+                raise self._unavailable(
+                    "deadline", "No LLM concurrency slot before the deadline"
+                )
+            probe = self._probe()
+            settled = False
+            started = time.monotonic()
+            try:
+                try:
+                    result = self._run(func, self._remaining(deadline))
+                except Exception as e:
+                    settled = is_retryable(e) or is_client_error(e)
+                    delay = self._failed(e, attempt, deadline)
+                else:
+                    settled = True
+                    self._succeeded(time.monotonic() - started)
+                    return result
+            finally:
+                if probe and not settled:
+                    self.breaker.release_probe()
+            time.sleep(delay)
+            attempt += 1
+
+    def _run(self, func: Callable[[], T], timeout: float | None) -> T:
+        limiter = self.limiter
+        if timeout is None:
+            try:
+                return func()
+            finally:
+                if limiter is not None:
+                    limiter.release()
+        context = contextvars.copy_context()
+        future: Future[T] = self._pool().submit(context.run, func)
+        if limiter is not None:
+            future.add_done_callback(lambda _: limiter.release())
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            raise TimeoutError("LLM call exceeded its deadline") from None
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self._max_workers,
+                        thread_name_prefix="gatekeeper-llm",
+                    )
+        return self._executor
+
+    async def acall(self, func: Callable[[], Awaitable[T]]) -> T:
+        """Run the coroutine function ``func`` under the guard."""
+        deadline = self._deadline()
+        attempt = 0
+        while True:
+            remaining = self._admit(deadline)
+            if self.limiter is not None and not await self.limiter.aacquire(remaining):
+                raise self._unavailable(
+                    "deadline", "No LLM concurrency slot before the deadline"
+                )
+            probe = self._probe()
+            settled = False
+            started = time.monotonic()
+            try:
+                try:
+                    result = await asyncio.wait_for(func(), self._remaining(deadline))
+                except Exception as e:
+                    settled = is_retryable(e) or is_client_error(e)
+                    delay = self._failed(e, attempt, deadline)
+                else:
+                    settled = True
+                    self._succeeded(time.monotonic() - started)
+                    return result
+                finally:
+                    if self.limiter is not None:
+                        self.limiter.release()
+            finally:
+                # Cancelled, or interrupted before the breaker heard back.
+                if probe and not settled:
+                    self.breaker.release_probe()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+def create_llm_guard(
+    settings: Settings, metrics: GatekeeperMetrics | None = None
+) -> LLMGuard:
+    """Build the guard configured in ``settings``."""
+    limiter = None
+    if settings.llm_adaptive_concurrency:
+        limiter = AdaptiveLimiter(
+            maximum=settings.llm_max_concurrency,
+            minimum=settings.llm_min_concurrency,
+            latency_target=settings.llm_latency_target_seconds,
+        )
+    return LLMGuard(
+        deadline_seconds=settings.llm_deadline_seconds,
+        max_retries=settings.llm_max_retries,
+        retry_backoff_seconds=settings.llm_retry_backoff_seconds,
+        limiter=limiter,
+        breaker=CircuitBreaker(
+            settings.llm_breaker_failures, settings.llm_breaker_reset_seconds
+        ),
+        metrics=metrics,
+        max_workers=max(4, 2 * settings.llm_max_concurrency),
+    )
@@ -0,0 +1,164 @@
+"""Near-duplicate verdict reuse — a local MinHash/LSH index of past requests.
+
+Templated traffic ("Grant admin access to user 1234" / "... user 5678")
+misses an exact-match cache even though the governance outcome is the same.
+This index stores a MinHash signature of each assessed request. It returns an
+earlier verdict when a new request is similar enough and matched exactly the
+same policy rules. Everything is computed locally; memory is bounded by an
+LRU cap on the number of indexed requests.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import random
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from autonomy_gatekeeper.config import Settings
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_DIGITS = re.compile(r"\d+")
+
+
+def shingles(text: str, size: int = 5) -> set[int]:
+    """Hash the character n-grams of ``text`` after normalization.
+
+    Case and whitespace are normalized and digit runs are collapsed, so
+    requests that differ only in IDs or counts share most shingles.
+    """
+    normalized = _DIGITS.sub("0", " ".join(text.lower().split()))
+    if len(normalized) <= size:
+        return {zlib.crc32(normalized.encode("utf-8"))}
+    return {
+        zlib.crc32(normalized[i : i + size].encode("utf-8"))
+        for i in range(len(normalized) - size + 1)
+    }
+
+
+def make_policy_key(
+    rule_ids: Iterable[str], model: str, prompt_fingerprint: str
+) -> str:
+    """Identify the policy context a verdict is valid for."""
+    payload = "\0".join([*sorted(rule_ids), model, prompt_fingerprint])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+@dataclass
+class _Entry:
+    policy_key: str
+    signature: tuple[int, ...]
+    verdict: dict[str, Any]
+
+
+class SimilarityIndex:
+    """Bounded MinHash/LSH index mapping past requests to their LLM verdicts."""
+
+    def __init__(
+        self,
+        threshold: float = 0.9,
+        max_entries: int = 4096,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 5,
+        seed: int = 1,
+    ) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.max_entries = max(1, max_entries)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        rng = random.Random(seed)
+        self._perms = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+        self._entries: OrderedDict[int, _Entry] = OrderedDict()
+        self._buckets: dict[tuple[str, int, tuple[int, ...]], set[int]] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def signature(self, text: str) -> tuple[int, ...]:
+        """Compute the MinHash signature of ``text``."""
+        hashed = shingles(text, self.shingle_size)
+        prime = _MERSENNE_PRIME
+        return tuple(min((a * h + b) % prime for h in hashed) for a, b in self._perms)
+
+    def _band_keys(
+        self, policy_key: str, signature: tuple[int, ...]
+    ) -> list[tuple[str, int, tuple[int, ...]]]:
+        rows = self.rows
+        return [
+            (policy_key, band, signature[band * rows : (band + 1) * rows])
+            for band in range(self.bands)
+        ]
+
+    def lookup(self, text: str, policy_key: str) -> tuple[dict[str, Any], float] | None:
+        """Return ``(verdict, similarity)`` for the closest indexed request.
+
+        Only requests indexed under the same ``policy_key`` are considered,
+        and only when their estimated Jaccard similarity reaches the
+        threshold.
+        """
+        signature = self.signature(text)
+        best: tuple[float, int] | None = None
+        with self._lock:
+            candidates: set[int] = set()
+            for key in self._band_keys(policy_key, signature):
+                candidates |= self._buckets.get(key, set())
+            for entry_id in candidates:
+                entry = self._entries[entry_id]
+                score = sum(
+                    x == y for x, y in zip(signature, entry.signature, strict=True)
+                ) / len(signature)
+                if score >= self.threshold and (best is None or score > best[0]):
+                    best = (score, entry_id)
+            if best is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(best[1])
+            return dict(self._entries[best[1]].verdict), best[0]
+
+    def add(self, text: str, policy_key: str, verdict: dict[str, Any]) -> None:
+        """Index ``text`` with its verdict, evicting the least recently used entry."""
+        signature = self.signature(text)
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = _Entry(policy_key, signature, dict(verdict))
+            for key in self._band_keys(policy_key, signature):
+                self._buckets.setdefault(key, set()).add(entry_id)
+            while len(self._entries) > self.max_entries:
+                self._evict()
+
+    def _evict(self) -> None:
+        entry_id, entry = self._entries.popitem(last=False)
+        for key in self._band_keys(entry.policy_key, entry.signature):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[key]
+
+
+def create_similarity_index(settings: Settings) -> SimilarityIndex | None:
+    """Build the similarity index described by ``settings`` (``None`` if disabled)."""
+    if not settings.similarity_enabled:
+        return None
+    return SimilarityIndex(
+        threshold=settings.similarity_threshold,
+        max_entries=settings.similarity_max_entries,
+    )
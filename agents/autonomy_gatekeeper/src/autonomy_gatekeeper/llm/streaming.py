@@ -0,0 +1,256 @@
+"""Incremental parsing of the LLM's governance JSON reply.
+
+:class:`AssessmentParser` consumes the reply text as it streams in and
+records each top-level field of the JSON object once its value is complete.
+``decision`` and ``risk_level`` come first in the prompt's schema, so they
+are usually known long before ``reasoning`` finishes. :class:`AssessmentStream`
+feeds it from LangChain message chunks and reports when the decision is
+ready.
+
+The same parser salvages replies that are cut off or broken part-way
+through. :func:`parse_assessment` returns the fields that were complete,
+plus the text of a string value other than ``decision`` or ``risk_level``
+that was still being written.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from collections.abc import Callable
+from typing import Any
+
+DECISION_FIELDS = ("decision", "risk_level")
+
+_WHITESPACE = " \t\r\n"
+_DELIMITERS = ",}" + _WHITESPACE
+_decoder = json.JSONDecoder()
+
+
+def _string_end(buffer: str, start: int, scan_from: int) -> int:
+    """Index just past the closing quote of the string at ``start``, or -1."""
+    pos = max(start + 1, scan_from)
+    while True:
+        pos = buffer.find('"', pos)
+        if pos < 0:
+            return -1
+        backslashes = 0
+        while buffer[pos - 1 - backslashes] == "\\":
+            backslashes += 1
+        if backslashes % 2 == 0:
+            return pos + 1
+        pos += 1
+
+
+def _decode_partial_string(fragment: str) -> str:
+    """Decode the body of an unterminated JSON string as far as possible."""
+    # Drop at most a dangling escape such as "\\" or "\\u00".
+    for cut in range(min(len(fragment), 6) + 1):
+        try:
+            value: str = json.loads('"' + fragment[: len(fragment) - cut] + '"')
+            return value
+        except json.JSONDecodeError:
+            continue
+    return fragment
+
+
+class AssessmentParser:
+    """Parses a JSON object's top-level fields as its text arrives.
+
+    Text before the opening ``{`` (such as a Markdown code fence) and after
+    the closing ``}`` is ignored. :attr:`failed` is set if the text stops
+    being a JSON object; fields completed before that point are kept.
+    """
+
+    def __init__(self) -> None:
+        self.fields: dict[str, Any] = {}
+        self.done = False
+        self.failed = False
+        self._buffer = ""
+        self._pos = 0
+        self._started = False
+        self._key: str | None = None
+        self._colon = False
+        self._scan = 0
+
+    @property
+    def decision_ready(self) -> bool:
+        """Whether ``decision`` and ``risk_level`` have both been parsed."""
+        return all(name in self.fields for name in DECISION_FIELDS)
+
+    def feed(self, text: str) -> dict[str, Any]:
+        """Consume more reply text and return the fields it completed."""
+        completed: dict[str, Any] = {}
+        if self.done or self.failed:
+            return completed
+        self._buffer += text
+        buffer = self._buffer
+        size = len(buffer)
+        pos = self._pos
+
+        while True:
+            if not self._started:
+                start = buffer.find("{", pos)
+                if start < 0:
+                    pos = size
+                    break
+                self._started = True
+                pos = start + 1
+                continue
+
+            while pos < size and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos >= size:
+                break
+            char = buffer[pos]
+
+            if self._key is None:
+                if char == ",":
+                    pos += 1
+                    continue
+                if char == "}":
+                    self.done = True
+                    pos += 1
+                    break
+                if char != '"':
+                    self.failed = True
+                    break
+                end = _string_end(buffer, pos, self._scan)
+                if end < 0:
+                    self._scan = size
+                    break
+                self._key = json.loads(buffer[pos:end])
+                self._scan = 0
+                pos = end
+                continue
+
+            if not self._colon:
+                if char != ":":
+                    self.failed = True
+                    break
+                self._colon = True
+                pos += 1
+                continue
+
+            if char == '"':
+                end = _string_end(buffer, pos, self._scan)
+                if end < 0:
+                    self._scan = size
+                    break
+                value = json.loads(buffer[pos:end])
+                self._scan = 0
+            else:
+                try:
+                    value, end = _decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    break  # incomplete; malformed values surface in finish()
+                if char not in "{[" and (end == size or buffer[end] not in _DELIMITERS):
+                    break  # a number or literal may still be growing
+            self.fields[self._key] = completed[self._key] = value
+            self._key = None
+            self._colon = False
+            pos = end
+
+        self._pos = pos
+        return completed
+
+    def finish(self) -> dict[str, Any]:
+        """Signal the end of the reply and return any last completed field."""
+        key = self._key
+        if self.done or self.failed or key is None or not self._colon:
+            return {}
+        # Only a trailing number or literal can be complete yet unparsed here.
+        try:
+            value, _ = _decoder.raw_decode(self._buffer.rstrip(), self._pos)
+        except json.JSONDecodeError:
+            return {}
+        self.fields[key] = value
+        self._key = None
+        self._colon = False
+        return {key: value}
+
+    def salvage(self) -> dict[str, Any]:
+        """The completed fields plus the text of an unfinished string value.
+
+        An unfinished ``decision`` or ``risk_level`` is dropped: ``"ESCAL"`` or
+        ``"crit"`` is not a verdict.
+        """
+        fields = dict(self.fields)
+        if (
+            self._key is not None
+            and self._key not in DECISION_FIELDS
+            and self._colon
+            and not self.failed
+        ):
+            start = self._pos
+            while start < len(self._buffer) and self._buffer[start] in _WHITESPACE:
+                start += 1
+            if self._buffer[start : start + 1] == '"':
+                fields[self._key] = _decode_partial_string(self._buffer[start + 1 :])
+        return fields
+
+
+def _strip_fences(text: str) -> str:
+    cleaned = text.strip()
+    if cleaned.startswith("```"):
+        cleaned = cleaned.split("\n", 1)[1] if "\n" in cleaned else cleaned
+        cleaned = cleaned.rsplit("```", 1)[0]
+    return cleaned
+
+
+def parse_assessment(text: str) -> tuple[dict[str, Any], bool]:
+    """Parse a complete LLM reply.
+
+    Returns the parsed fields and whether the reply was a well-formed JSON
+    object. For a broken reply, the fields are whatever could be salvaged.
+    """
+    try:
+        parsed = json.loads(_strip_fences(text))
+    except json.JSONDecodeError:
+        pass
+    else:
+        if isinstance(parsed, dict):
+            return parsed, True
+    parser = AssessmentParser()
+    parser.feed(text)
+    parser.finish()
+    return parser.salvage(), False
+
+
+def _chunk_text(chunk: Any) -> str:
+    content = getattr(chunk, "content", chunk)
+    return content if isinstance(content, str) else ""
+
+
+class AssessmentStream:
+    """Collects a streamed LLM reply and parses it as chunks arrive.
+
+    ``on_decision`` is called once, with ``decision``, ``risk_level`` and the
+    seconds elapsed since the stream started, as soon as both fields have
+    been parsed.
+    """
+
+    def __init__(
+        self, on_decision: Callable[[dict[str, Any]], None] | None = None
+    ) -> None:
+        self.parser = AssessmentParser()
+        self.on_decision = on_decision
+        self.message: Any = None
+        self.time_to_decision: float | None = None
+        self._started = time.perf_counter()
+
+    def add(self, chunk: Any) -> None:
+        """Append one message chunk to the reply."""
+        self.message = chunk if self.message is None else self.message + chunk
+        self.parser.feed(_chunk_text(chunk))
+        if self.time_to_decision is None and self.parser.decision_ready:
+            self.time_to_decision = time.perf_counter() - self._started
+            if self.on_decision is not None:
+                fields = self.parser.fields
+                self.on_decision(
+                    {
+                        "decision": fields["decision"],
+                        "risk_level": fields["risk_level"],
+                        "elapsed_seconds": self.time_to_decision,
+                    }
+                )
@@ -0,0 +1,133 @@
+"""Token counting and request truncation for LLM prompts.
+
+The ``openai`` provider counts with the model's ``tiktoken`` encoding. Other
+providers, and ``openai`` when the encoding can't be loaded (``tiktoken``
+downloads it on first use), fall back to an estimate of one token per
+:data:`CHARS_PER_TOKEN` characters. That is the same estimate the ``local``
+stand-in model reports as its usage.
+"""
+
+from __future__ import annotations
+
+import functools
+import logging
+import math
+from typing import Any, Protocol
+
+from autonomy_gatekeeper.config import Settings
+
+logger = logging.getLogger("autonomy_gatekeeper")
+
+CHARS_PER_TOKEN = 4
+DEFAULT_ENCODING = "o200k_base"
+TRUNCATION_MARKER = "\n[... {count} tokens truncated ...]\n"
+
+
+class TokenCounter(Protocol):
+    """Counts and truncates text in a model's tokens."""
+
+    name: str
+
+    def count(self, text: str) -> int:
+        """Number of tokens in ``text``."""
+        ...
+
+    def head(self, text: str, tokens: int) -> str:
+        """The first ``tokens`` tokens of ``text``."""
+        ...
+
+    def tail(self, text: str, tokens: int) -> str:
+        """The last ``tokens`` tokens of ``text``."""
+        ...
+
+
+class ApproximateTokenCounter:
+    """Estimates tokens as one per :data:`CHARS_PER_TOKEN` characters."""
+
+    name = "approximate"
+
+    def count(self, text: str) -> int:
+        """Number of tokens in ``text``, rounded up."""
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+    def head(self, text: str, tokens: int) -> str:
+        """The first ``tokens`` tokens of ``text``."""
+        return text[: tokens * CHARS_PER_TOKEN]
+
+    def tail(self, text: str, tokens: int) -> str:
+        """The last ``tokens`` tokens of ``text``."""
+        return text[len(text) - tokens * CHARS_PER_TOKEN :] if tokens > 0 else ""
+
+
+class TiktokenCounter:
+    """Exact token counts with a ``tiktoken`` encoding."""
+
+    def __init__(self, encoding: Any) -> None:
+        self.encoding = encoding
+        self.name = str(encoding.name)
+
+    def count(self, text: str) -> int:
+        """Number of tokens in ``text``."""
+        return len(self.encoding.encode_ordinary(text))
+
+    def head(self, text: str, tokens: int) -> str:
+        """The first ``tokens`` tokens of ``text``."""
+        decoded: str = self.encoding.decode(
+            self.encoding.encode_ordinary(text)[:tokens]
+        )
+        return decoded
+
+    def tail(self, text: str, tokens: int) -> str:
+        """The last ``tokens`` tokens of ``text``."""
+        if tokens <= 0:
+            return ""
+        decoded: str = self.encoding.decode(
+            self.encoding.encode_ordinary(text)[-tokens:]
+        )
+        return decoded
+
+
+@functools.lru_cache(maxsize=8)
+def _tiktoken_counter(model: str) -> TokenCounter:
+    try:
+        import tiktoken
+
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception as e:
+        logger.warning(
+            "Could not load a tiktoken encoding for %s (%s); estimating tokens instead",
+            model,
+            e,
+        )
+        return ApproximateTokenCounter()
+    return TiktokenCounter(encoding)
+
+
+def get_token_counter(settings: Settings) -> TokenCounter:
+    """The token counter for the configured provider and model."""
+    if settings.llm_provider == "openai":
+        return _tiktoken_counter(settings.openai_model)
+    return ApproximateTokenCounter()
+
+
+def truncate_to_budget(
+    text: str, budget: int, counter: TokenCounter
+) -> tuple[str, int]:
+    """Fit ``text`` into ``budget`` tokens, returning it and the tokens removed.
+
+    Over-long text keeps its beginning and end, joined by a marker saying how
+    many tokens were cut. The marker counts towards the budget. A budget of
+    0 or less means no limit.
+    """
+    total = counter.count(text)
+    if budget <= 0 or total <= budget:
+        return text, 0
+    marker = TRUNCATION_MARKER.format(count=total - budget)
+    keep = max(0, budget - counter.count(marker))
+    head = keep - keep // 2
+    removed = total - keep
+    marker = TRUNCATION_MARKER.format(count=removed)
+    return counter.head(text, head) + marker + counter.tail(text, keep // 2), removed
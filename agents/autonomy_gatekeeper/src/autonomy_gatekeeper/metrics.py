@@ -0,0 +1,408 @@
+"""Metrics — in-process counters and histograms for the governance pipeline.
+
+A :class:`MetricsRegistry` holds labelled counters and histograms and can be
+dumped in the Prometheus text exposition format or as JSON. The pipeline's
+instruments are bundled in :class:`GatekeeperMetrics`. When metrics are
+disabled none of this is constructed and the graph nodes run unwrapped, so
+the only cost is a ``None`` check around each LLM call.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import math
+import threading
+import time
+from collections.abc import Awaitable, Callable, Iterator, Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, TypeVar
+
+if TYPE_CHECKING:
+    from autonomy_gatekeeper.llm.prompts import PromptUsage
+
+T = TypeVar("T")
+
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+Labels = tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)
+    )
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> Labels:
+        if labels.keys() != set(self.labelnames):
+            raise ValueError(
+                f"Metric {self.name} expects labels {list(self.labelnames)}, "
+                f"got {sorted(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def exposition(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+
+
+class Counter(_Metric):
+    """A monotonically increasing value per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Add ``amount`` to the counter for ``labels``."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        """Return the current value for ``labels`` (0 if never incremented)."""
+        return self._values.get(self._key(labels), 0.0)
+
+    def exposition(self) -> Iterator[str]:
+        yield from super().exposition()
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}{labels} {_format_value(value)}"
+
+    def to_dict(self) -> list[dict[str, Any]]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            {"labels": dict(zip(self.labelnames, key, strict=True)), "value": value}
+            for key, value in items
+        ]
+
+
+class Histogram(_Metric):
+    """Observations counted into cumulative buckets per label set."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [bucket counts..., +Inf count], sum.
+        self._values: dict[Labels, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record one observation of ``value`` for ``labels``."""
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = ([0] * (len(self.buckets) + 1), [0.0])
+                self._values[key] = entry
+            entry[0][index] += 1
+            entry[1][0] += value
+
+    def snapshot(self, **labels: str) -> dict[str, Any]:
+        """Return ``count``, ``sum`` and cumulative ``buckets`` for ``labels``."""
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+            counts = list(entry[0]) if entry else [0] * (len(self.buckets) + 1)
+            total = entry[1][0] if entry else 0.0
+        return self._summarize(counts, total)
+
+    def _summarize(self, counts: list[int], total: float) -> dict[str, Any]:
+        cumulative: dict[str, int] = {}
+        running = 0
+        for bound, count in zip((*self.buckets, math.inf), counts, strict=True):
+            running += count
+            cumulative[_format_value(bound)] = running
+        return {"count": running, "sum": total, "buckets": cumulative}
+
+    def _items(self) -> list[tuple[Labels, dict[str, Any]]]:
+        with self._lock:
+            raw = [(key, list(c), s[0]) for key, (c, s) in self._values.items()]
+        return [(key, self._summarize(c, s)) for key, c, s in sorted(raw)]
+
+    def exposition(self) -> Iterator[str]:
+        yield from super().exposition()
+        for key, summary in self._items():
+            for bound, count in summary["buckets"].items():
+                labels = _format_labels((*self.labelnames, "le"), (*key, bound))
+                yield f"{self.name}_bucket{labels} {count}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(summary['sum'])}"
+            yield f"{self.name}_count{labels} {summary['count']}"
+
+    def to_dict(self) -> list[dict[str, Any]]:
+        return [
+            {"labels": dict(zip(self.labelnames, key, strict=True)), **summary}
+            for key, summary in self._items()
+        ]
+
+
+class MetricsRegistry:
+    """A named collection of metrics with Prometheus and JSON exposition."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Counter | Histogram] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Return the counter called ``name``, creating it if needed."""
+        metric = self._register(name, lambda: Counter(name, help, labelnames))
+        if not isinstance(metric, Counter):
+            raise ValueError(f"Metric {name} is already registered as a {metric.kind}")
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Return the histogram called ``name``, creating it if needed."""
+        metric = self._register(
+            name, lambda: Histogram(name, help, labelnames, buckets)
+        )
+        if not isinstance(metric, Histogram):
+            raise ValueError(f"Metric {name} is already registered as a {metric.kind}")
+        return metric
+
+    def _register(
+        self, name: str, factory: Callable[[], Counter | Histogram]
+    ) -> Counter | Histogram:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = factory()
+                self._metrics[name] = metric
+            return metric
+
+    def to_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = [line for metric in metrics for line in metric.exposition()]
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return every metric as JSON-serializable data."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {
+            metric.name: {
+                "type": metric.kind,
+                "help": metric.help,
+                "samples": metric.to_dict(),
+            }
+            for metric in metrics
+        }
+
+    def write(self, path: str | Path) -> None:
+        """Dump the registry to ``path`` — JSON for ``.json``, Prometheus text otherwise."""
+        path = Path(path)
+        if path.suffix == ".json":
+            path.write_text(json.dumps(self.to_dict(), indent=2))
+        else:
+            path.write_text(self.to_prometheus())
+
+
+def token_usage(response: Any) -> tuple[int, int] | None:
+    """Return ``(prompt_tokens, completion_tokens)`` reported by a chat model."""
+    usage = getattr(response, "usage_metadata", None)
+    if usage:
+        return int(usage.get("input_tokens", 0)), int(usage.get("output_tokens", 0))
+    metadata = getattr(response, "response_metadata", None) or {}
+    usage = metadata.get("token_usage") or metadata.get("usage")
+    if usage:
+        return (
+            int(usage.get("prompt_tokens", 0)),
+            int(usage.get("completion_tokens", 0)),
+        )
+    return None
+
+
+class GatekeeperMetrics:
+    """The instruments recorded by the governance graph."""
+
+    def __init__(self, registry: MetricsRegistry | None = None) -> None:
+        self.registry = registry if registry is not None else MetricsRegistry()
+        r = self.registry
+        self.node_duration = r.histogram(
+            "gatekeeper_node_duration_seconds",
+            "Time spent in each graph node.",
+            ["node"],
+        )
+        self.llm_latency = r.histogram(
+            "gatekeeper_llm_request_duration_seconds",
+            "Round-trip time of LLM calls.",
+        )
+        self.llm_tokens = r.counter(
+            "gatekeeper_llm_tokens_total",
+            "Tokens reported by the LLM provider.",
+            ["kind"],
+        )
+        self.llm_parse_fallbacks = r.counter(
+            "gatekeeper_llm_parse_fallbacks_total",
+            "LLM replies that could not be parsed and fell back to the policy decision.",
+        )
+        self.llm_partial_replies = r.counter(
+            "gatekeeper_llm_partial_replies_total",
+            "Truncated or malformed LLM replies whose decision was salvaged.",
+        )
+        self.llm_time_to_decision = r.histogram(
+            "gatekeeper_llm_time_to_decision_seconds",
+            "Time from the start of a streamed LLM call until its decision was parsed.",
+        )
+        self.llm_prompt_tokens_saved = r.counter(
+            "gatekeeper_llm_prompt_tokens_saved_total",
+            "Estimated prompt tokens saved, by source (truncation or prefix_cache).",
+            ["source"],
+        )
+        self.llm_truncated_requests = r.counter(
+            "gatekeeper_llm_truncated_requests_total",
+            "Requests truncated to the token budget before the LLM call.",
+        )
+        self.llm_fallbacks = r.counter(
+            "gatekeeper_llm_fallbacks_total",
+            "LLM calls abandoned for the policy decision, by reason "
+            "(deadline, circuit_open or error).",
+            ["reason"],
+        )
+        self.llm_retries = r.counter(
+            "gatekeeper_llm_retries_total",
+            "LLM calls retried after a transient failure.",
+        )
+        self.decisions = r.counter(
+            "gatekeeper_decisions_total",
+            "Decision Cards produced, by decision and risk level.",
+            ["decision", "risk_level"],
+        )
+        self.llm_skipped = r.counter(
+            "gatekeeper_llm_skipped_total",
+            "Evaluations decided without an LLM call, by reason.",
+            ["reason"],
+        )
+        self.tool_duration = r.histogram(
+            "gatekeeper_tool_call_duration_seconds",
+            "Time spent in each tool call of an approved request, by tool and "
+            "status (ok, error or timeout).",
+            ["tool", "status"],
+        )
+
+    def time_node(self, node: str, func: Callable[[T], T]) -> Callable[[T], T]:
+        """Wrap a sync node so its duration is recorded."""
+        observe = self.node_duration.observe
+
+        def timed(state: T) -> T:
+            started = time.perf_counter()
+            try:
+                return func(state)
+            finally:
+                observe(time.perf_counter() - started, node=node)
+
+        return timed
+
+    def atime_node(
+        self, node: str, func: Callable[[T], Awaitable[T]]
+    ) -> Callable[[T], Awaitable[T]]:
+        """Wrap an async node so its duration is recorded."""
+        observe = self.node_duration.observe
+
+        async def timed(state: T) -> T:
+            started = time.perf_counter()
+            try:
+                return await func(state)
+            finally:
+                observe(time.perf_counter() - started, node=node)
+
+        return timed
+
+    def record_llm_call(
+        self,
+        response: Any,
+        seconds: float,
+        parsed: dict[str, Any],
+        time_to_decision: float | None = None,
+    ) -> None:
+        """Record latency, token usage and parse outcome of one LLM call."""
+        self.llm_latency.observe(seconds)
+        if time_to_decision is not None:
+            self.llm_time_to_decision.observe(time_to_decision)
+        usage = token_usage(response)
+        if usage is not None:
+            self.llm_tokens.inc(usage[0], kind="prompt")
+            self.llm_tokens.inc(usage[1], kind="completion")
+        if parsed.get("fallback"):
+            self.llm_parse_fallbacks.inc()
+        elif parsed.get("partial"):
+            self.llm_partial_replies.inc()
+
+    def record_prompt(self, usage: PromptUsage) -> None:
+        """Record the estimated token savings of one prompt."""
+        if usage.truncated_tokens:
+            self.llm_truncated_requests.inc()
+            self.llm_prompt_tokens_saved.inc(
+                usage.truncated_tokens, source="truncation"
+            )
+        if usage.prefix_cacheable:
+            self.llm_prompt_tokens_saved.inc(usage.prefix_tokens, source="prefix_cache")
+
+    def record_card(self, card: dict[str, Any]) -> None:
+        """Count a finished Decision Card by outcome and LLM routing."""
+        self.decisions.inc(decision=card["decision"], risk_level=card["risk_level"])
+        metadata = card.get("metadata", {})
+        if metadata.get("llm_skipped"):
+            reason = "rule" if metadata.get("llm_route") == "skip" else "escalation"
+            self.llm_skipped.inc(reason=reason)
@@ -0,0 +1,354 @@
+"""Rule match expressions — word-aware predicates evaluated through a token index.
+
+A rule's ``match`` field is an expression tree. Its leaves are:
+
+- ``term``: a whole word, case-insensitive. A trailing ``*`` makes it a
+  prefix (``permission*`` also matches ``permissions``).
+- ``terms``: shorthand for "any of these terms".
+- ``phrase``: consecutive words (``environment variable``).
+- ``regex``: a regular expression searched in the request, case-insensitive.
+
+The ``all``, ``any`` and ``none`` combinators each take a list of
+expressions. Several keys in one mapping must all hold. A bare string is a
+term, or a phrase if it contains spaces. A bare list means "any of".
+
+Requests are tokenized once. :class:`TokenIndex` maps each word to the
+rules that cannot match without it, so full predicates only run for rules
+whose anchor words appear in the request. Rules that can't be anchored,
+such as a lone regex or ``none``, are always checked.
+
+Every leaf tests whether something occurs anywhere in the request, so an
+expression is a boolean formula over its leaves. :class:`ChunkedMatcher`
+uses this to evaluate text that arrives in pieces: it records which leaves
+occurred in any piece and resolves the formulas from that set.
+"""
+
+from __future__ import annotations
+
+import re
+from abc import ABC, abstractmethod
+from collections.abc import Container, Iterable, Iterator
+from typing import Any
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+COMBINATORS = ("all", "any", "none")
+LEAVES = ("term", "terms", "phrase", "regex")
+
+
+def tokenize(text: str) -> list[str]:
+    """Split ``text`` into lowercase word tokens."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class RequestText:
+    """A request prepared once for evaluating many expressions."""
+
+    __slots__ = ("_positions", "text", "token_set", "tokens")
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.tokens = tokenize(text)
+        self.token_set = frozenset(self.tokens)
+        self._positions: dict[str, list[int]] | None = None
+
+    def positions(self, token: str) -> list[int]:
+        """Indices at which ``token`` occurs in :attr:`tokens`."""
+        if self._positions is None:
+            positions: dict[str, list[int]] = {}
+            for index, tok in enumerate(self.tokens):
+                positions.setdefault(tok, []).append(index)
+            self._positions = positions
+        return self._positions.get(token, [])
+
+
+class Expression(ABC):
+    """Base class for compiled match expressions."""
+
+    @abstractmethod
+    def matches(self, request: RequestText) -> bool:
+        """Whether the expression holds for ``request``."""
+
+    def anchors(self) -> frozenset[str] | None:
+        """Words of which at least one must occur for a match.
+
+        Prefix anchors end in ``*``. ``None`` means the expression can't be
+        anchored and must always be evaluated.
+        """
+        return None
+
+    def leaves(self) -> Iterator[Expression]:
+        """The leaf expressions this one is built from (itself for a leaf)."""
+        yield self
+
+    def resolve(self, seen: Container[Expression]) -> bool:
+        """Evaluate from the set of leaves known to occur in the request."""
+        return self in seen
+
+    def monotone(self) -> bool:
+        """Whether more request text can only turn a match on, never off."""
+        return True
+
+
+class _Combinator(Expression):
+    def __init__(self, children: list[Expression]) -> None:
+        self.children = children
+
+    def leaves(self) -> Iterator[Expression]:
+        for child in self.children:
+            yield from child.leaves()
+
+    def monotone(self) -> bool:
+        return all(child.monotone() for child in self.children)
+
+
+class Term(Expression):
+    """A whole word, or a word prefix when ``prefix`` is set."""
+
+    def __init__(self, word: str, prefix: bool = False) -> None:
+        self.word = word
+        self.prefix = prefix
+
+    def matches(self, request: RequestText) -> bool:
+        if not self.prefix:
+            return self.word in request.token_set
+        return any(token.startswith(self.word) for token in request.token_set)
+
+    def anchors(self) -> frozenset[str]:
+        return frozenset({self.word + "*" if self.prefix else self.word})
+
+
+class Phrase(Expression):
+    """Consecutive words."""
+
+    def __init__(self, words: tuple[str, ...]) -> None:
+        self.words = words
+
+    def matches(self, request: RequestText) -> bool:
+        first, size = self.words[0], len(self.words)
+        if not set(self.words) <= request.token_set:
+            return False
+        tokens = request.tokens
+        return any(
+            tuple(tokens[start : start + size]) == self.words
+            for start in request.positions(first)
+        )
+
+    def anchors(self) -> frozenset[str]:
+        # Every word is required; the longest is likely the rarest.
+        return frozenset({max(self.words, key=len)})
+
+
+class Regex(Expression):
+    """A case-insensitive regular expression search."""
+
+    def __init__(self, pattern: re.Pattern[str]) -> None:
+        self.pattern = pattern
+
+    def matches(self, request: RequestText) -> bool:
+        return self.pattern.search(request.text) is not None
+
+
+class AllOf(_Combinator):
+    """Every child expression holds."""
+
+    def matches(self, request: RequestText) -> bool:
+        return all(child.matches(request) for child in self.children)
+
+    def resolve(self, seen: Container[Expression]) -> bool:
+        return all(child.resolve(seen) for child in self.children)
+
+    def anchors(self) -> frozenset[str] | None:
+        # Any single child's anchors are necessary; keep the most selective.
+        options = [a for a in (c.anchors() for c in self.children) if a is not None]
+        return min(options, key=len) if options else None
+
+
+class AnyOf(_Combinator):
+    """At least one child expression holds."""
+
+    def matches(self, request: RequestText) -> bool:
+        return any(child.matches(request) for child in self.children)
+
+    def resolve(self, seen: Container[Expression]) -> bool:
+        return any(child.resolve(seen) for child in self.children)
+
+    def anchors(self) -> frozenset[str] | None:
+        merged: set[str] = set()
+        for child in self.children:
+            anchors = child.anchors()
+            if anchors is None:
+                return None
+            merged |= anchors
+        return frozenset(merged)
+
+
+class NoneOf(_Combinator):
+    """No child expression holds."""
+
+    def matches(self, request: RequestText) -> bool:
+        return not any(child.matches(request) for child in self.children)
+
+    def resolve(self, seen: Container[Expression]) -> bool:
+        return not any(child.resolve(seen) for child in self.children)
+
+    def monotone(self) -> bool:
+        return False
+
+
+def _words(text: str, rule_id: str) -> tuple[str, ...]:
+    words = tuple(tokenize(text))
+    if not words:
+        raise ValueError(f"Rule {rule_id} has an empty term or phrase {text!r}")
+    return words
+
+
+def _term(text: Any, rule_id: str) -> Expression:
+    text = str(text).strip()
+    prefix = text.endswith("*")
+    words = _words(text.rstrip("*"), rule_id)
+    if len(words) == 1:
+        return Term(words[0], prefix=prefix)
+    if prefix:
+        raise ValueError(f"Rule {rule_id} has a multi-word prefix term {text!r}")
+    return Phrase(words)
+
+
+def _children(node: Any, key: str, rule_id: str) -> list[Expression]:
+    if not isinstance(node, list) or not node:
+        raise ValueError(f"Rule {rule_id}: '{key}' needs a non-empty list")
+    return [parse_expression(child, rule_id) for child in node]
+
+
+def parse_expression(node: Any, rule_id: str = "?") -> Expression:
+    """Compile one ``match`` node, raising ``ValueError`` if it is malformed."""
+    if isinstance(node, str):
+        return _term(node, rule_id)
+    if isinstance(node, list):
+        return AnyOf(_children(node, "any", rule_id))
+    if not isinstance(node, dict) or not node:
+        raise ValueError(f"Rule {rule_id} has an invalid match expression {node!r}")
+
+    unknown = set(node) - set(COMBINATORS) - set(LEAVES)
+    if unknown:
+        raise ValueError(
+            f"Rule {rule_id} has unknown match keys {sorted(unknown)}; "
+            f"expected {', '.join(LEAVES + COMBINATORS)}"
+        )
+
+    parts: list[Expression] = []
+    for key, value in node.items():
+        if key == "term":
+            parts.append(_term(value, rule_id))
+        elif key == "terms":
+            if not isinstance(value, list) or not value:
+                raise ValueError(f"Rule {rule_id}: 'terms' needs a non-empty list")
+            parts.append(AnyOf([_term(v, rule_id) for v in value]))
+        elif key == "phrase":
+            parts.append(Phrase(_words(str(value), rule_id)))
+        elif key == "regex":
+            try:
+                parts.append(Regex(re.compile(str(value), re.IGNORECASE)))
+            except re.error as e:
+                raise ValueError(
+                    f"Rule {rule_id} has invalid regex {value!r}: {e}"
+                ) from e
+        elif key == "all":
+            parts.append(AllOf(_children(value, key, rule_id)))
+        elif key == "any":
+            parts.append(AnyOf(_children(value, key, rule_id)))
+        else:
+            parts.append(NoneOf(_children(value, key, rule_id)))
+    return parts[0] if len(parts) == 1 else AllOf(parts)
+
+
+class TokenIndex:
+    """Inverted index from anchor words to the expressions they gate."""
+
+    def __init__(self, expressions: Iterable[tuple[int, Expression]]) -> None:
+        self._expressions: dict[int, Expression] = {}
+        self._exact: dict[str, list[int]] = {}
+        self._prefix: dict[str, list[int]] = {}
+        self._always: list[int] = []
+        for index, expression in expressions:
+            self._expressions[index] = expression
+            anchors = expression.anchors()
+            if anchors is None:
+                self._always.append(index)
+                continue
+            for anchor in anchors:
+                if anchor.endswith("*"):
+                    self._prefix.setdefault(anchor[:-1], []).append(index)
+                else:
+                    self._exact.setdefault(anchor, []).append(index)
+        self._prefix_lengths = sorted({len(p) for p in self._prefix})
+
+    def __len__(self) -> int:
+        return len(self._expressions)
+
+    def items(self) -> Iterable[tuple[int, Expression]]:
+        """The ``(index, expression)`` pairs in the index."""
+        return self._expressions.items()
+
+    def candidates(self, request: RequestText) -> set[int]:
+        """Indices of expressions whose anchors occur in ``request``."""
+        found: set[int] = set(self._always)
+        exact, prefix, lengths = self._exact, self._prefix, self._prefix_lengths
+        for token in request.token_set:
+            hit = exact.get(token)
+            if hit:
+                found.update(hit)
+            for length in lengths:
+                if length > len(token):
+                    break
+                hit = prefix.get(token[:length])
+                if hit:
+                    found.update(hit)
+        return found
+
+    def find(self, request: RequestText) -> set[int]:
+        """Indices of expressions that match ``request``."""
+        expressions = self._expressions
+        return {
+            index
+            for index in self.candidates(request)
+            if expressions[index].matches(request)
+        }
+
+
+class ChunkedMatcher:
+    """Evaluates expressions over text that is scanned one window at a time.
+
+    Each window is matched against an index of the distinct leaves, and the
+    leaves found are added to a caller-held set. :meth:`matched` resolves
+    every expression from that set. A phrase or regex match is only found if
+    it lies within one window, so consecutive windows should overlap.
+    """
+
+    def __init__(self, expressions: Iterable[tuple[int, Expression]]) -> None:
+        self._expressions = dict(expressions)
+        leaves: dict[int, Expression] = {}
+        for expression in self._expressions.values():
+            for leaf in expression.leaves():
+                leaves.setdefault(id(leaf), leaf)
+        self._leaves = list(leaves.values())
+        self._index = TokenIndex(enumerate(self._leaves))
+        self.monotone = frozenset(
+            index for index, e in self._expressions.items() if e.monotone()
+        )
+
+    def __len__(self) -> int:
+        return len(self._expressions)
+
+    def scan(self, window: RequestText, seen: set[Expression]) -> None:
+        """Add the leaves occurring in ``window`` to ``seen``."""
+        leaves = self._leaves
+        seen.update(leaves[index] for index in self._index.find(window))
+
+    def matched(self, seen: Container[Expression]) -> set[int]:
+        """Indices of expressions that hold given the leaves in ``seen``."""
+        return {
+            index
+            for index, expression in self._expressions.items()
+            if expression.resolve(seen)
+        }
@@ -0,0 +1,222 @@
+"""Policy loading — YAML rules, precompiled artifacts and change detection.
+
+``compile-policy`` writes a precompiled artifact next to the policy file
+(``rules.yaml`` → ``rules.yaml.compiled``). It holds the validated rules and
+the prebuilt :class:`CompiledPolicy`. :func:`load_policy` uses the artifact
+when it was built from the current version of the YAML file, and otherwise
+parses and compiles the YAML. :class:`PolicyWatcher` polls the files so a
+long-running engine can pick up rule edits.
+
+The artifact is a pickle. Treat it with the same trust as the policy file
+itself and never load one from an untrusted location.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import pickle
+import threading
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+from autonomy_gatekeeper.policy.expressions import parse_expression
+from autonomy_gatekeeper.policy.matcher import (
+    DECISION_PRIORITY,
+    RISK_PRIORITY,
+    CompiledPolicy,
+    compile_policy,
+)
+
+logger = logging.getLogger("autonomy_gatekeeper")
+
+ARTIFACT_SUFFIX = ".compiled"
+# Bump when CompiledPolicy's layout changes so stale artifacts are ignored.
+ARTIFACT_VERSION = 3
+
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def load_policy_rules(policy_path: str) -> list[dict[str, Any]]:
+    """Load policy rules from a YAML file."""
+    path = Path(policy_path)
+    if not path.exists():
+        logger.warning("Policy file not found at %s, using empty rules", policy_path)
+        return []
+    with open(path) as f:
+        data = yaml.load(f, Loader=_YAML_LOADER)
+    return data.get("rules", []) if data else []
+
+
+def validate_rules(rules: list[dict[str, Any]]) -> None:
+    """Check that every rule is well formed, raising ``ValueError`` if not."""
+    seen: set[str] = set()
+    for position, rule in enumerate(rules, start=1):
+        if not isinstance(rule, dict):
+            raise ValueError(f"Rule #{position} is not a mapping")
+        rule_id = rule.get("id")
+        if not rule_id:
+            raise ValueError(f"Rule #{position} has no id")
+        if rule_id in seen:
+            raise ValueError(f"Duplicate rule id {rule_id}")
+        seen.add(rule_id)
+        if "description" not in rule:
+            raise ValueError(f"Rule {rule_id} has no description")
+        if not isinstance(rule.get("keywords", []) or [], list):
+            raise ValueError(f"Rule {rule_id} keywords must be a list")
+        if rule.get("match") is not None:
+            parse_expression(rule["match"], rule_id)
+        if rule.get("decision", "HOLD") not in DECISION_PRIORITY:
+            raise ValueError(
+                f"Rule {rule_id} has invalid decision {rule['decision']!r}"
+            )
+        if rule.get("risk_level", "medium") not in RISK_PRIORITY:
+            raise ValueError(
+                f"Rule {rule_id} has invalid risk level {rule['risk_level']!r}"
+            )
+
+
+def artifact_path(policy_path: str | Path) -> Path:
+    """Where the precompiled artifact for ``policy_path`` lives."""
+    path = Path(policy_path)
+    return path.with_name(path.name + ARTIFACT_SUFFIX)
+
+
+def _source_stamp(path: Path) -> tuple[int, int]:
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def write_artifact(policy_path: str | Path) -> tuple[Path, CompiledPolicy]:
+    """Validate and compile ``policy_path`` and write its artifact atomically."""
+    source = Path(policy_path)
+    stamp = _source_stamp(source)
+    rules = load_policy_rules(str(source))
+    validate_rules(rules)
+    policy = compile_policy(rules)
+
+    target = artifact_path(source)
+    tmp = target.with_name(target.name + ".tmp")
+    payload = {"version": ARTIFACT_VERSION, "source": stamp, "policy": policy}
+    with open(tmp, "wb") as f:
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, target)
+    return target, policy
+
+
+def read_artifact(policy_path: str | Path) -> CompiledPolicy | None:
+    """Return the artifact's policy if it was built from the current YAML."""
+    source = Path(policy_path)
+    target = artifact_path(source)
+    try:
+        stamp = _source_stamp(source)
+        if target.stat().st_mtime_ns < stamp[0]:
+            return None
+        with open(target, "rb") as f:
+            payload = pickle.load(f)  # trusted like the policy file itself
+        if not isinstance(payload, dict):
+            raise TypeError(f"expected a dict, got {type(payload).__name__}")
+        if payload.get("version") != ARTIFACT_VERSION:
+            return None
+        if payload.get("source") != stamp:
+            return None
+        policy = payload["policy"]
+        if not isinstance(policy, CompiledPolicy):
+            raise TypeError(f"expected a CompiledPolicy, got {type(policy).__name__}")
+    except FileNotFoundError:
+        return None
+    except (
+        OSError,
+        pickle.UnpicklingError,
+        EOFError,
+        AttributeError,
+        KeyError,
+        TypeError,
+    ) as e:
+        logger.warning("Ignoring unreadable policy artifact %s: %s", target, e)
+        return None
+    return policy
+
+
+def load_policy(policy_path: str) -> CompiledPolicy:
+    """Load a compiled policy, preferring an up-to-date precompiled artifact.
+
+    The YAML rules are validated first, so a malformed file raises
+    ``ValueError`` rather than failing later during evaluation.
+    """
+    policy = read_artifact(policy_path)
+    if policy is not None:
+        logger.debug("Loaded precompiled policy artifact for %s", policy_path)
+        return policy
+    rules = load_policy_rules(policy_path)
+    validate_rules(rules)
+    return compile_policy(rules)
+
+
+def _file_stamp(path: Path) -> tuple[int, int] | None:
+    try:
+        return _source_stamp(path)
+    except FileNotFoundError:
+        return None
+
+
+class PolicyWatcher:
+    """Polls a policy file and its artifact, calling ``on_change`` on edits.
+
+    Polling keeps this dependency-free and works on network filesystems
+    where change notifications are unreliable.
+    """
+
+    def __init__(
+        self,
+        policy_path: str | Path,
+        on_change: Callable[[], object],
+        interval_seconds: float = 2.0,
+    ) -> None:
+        self.policy_path = Path(policy_path)
+        self.on_change = on_change
+        self.interval_seconds = interval_seconds
+        self._stamp = self._current_stamp()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _current_stamp(self) -> tuple[object, ...]:
+        return (
+            _file_stamp(self.policy_path),
+            _file_stamp(artifact_path(self.policy_path)),
+        )
+
+    def check(self) -> bool:
+        """Call ``on_change`` if the files changed since the last check."""
+        stamp = self._current_stamp()
+        if stamp == self._stamp:
+            return False
+        self._stamp = stamp
+        self.on_change()
+        return True
+
+    def start(self) -> None:
+        """Start polling on a daemon thread."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="gatekeeper-policy-watch", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop polling and wait for the thread to exit."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.check()
+            except Exception:
+                logger.exception("Policy watcher check failed")
@@ -0,0 +1,525 @@
+"""Compiled policy matcher — finds every keyword hit in a single pass.
+
+Rules are compiled once into an Aho-Corasick automaton over their lowercased
+keywords. Evaluating a request walks the lowercased text exactly once,
+regardless of how many rules or keywords the policy set contains.
+
+Rules may instead (or also) declare a ``match`` expression; those are
+evaluated word-wise through a token index (see
+:mod:`autonomy_gatekeeper.policy.expressions`).
+
+:class:`PolicyScanner` evaluates a request that arrives in chunks, such as
+a large file, without holding all of it in memory. See
+:meth:`CompiledPolicy.evaluate_chunks`.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from autonomy_gatekeeper.policy.expressions import (
+    ChunkedMatcher,
+    Expression,
+    RequestText,
+    TokenIndex,
+    parse_expression,
+)
+
+DECISION_PRIORITY = {"ACT": 0, "HOLD": 1, "ESCALATE": 2}
+RISK_PRIORITY = {"low": 0, "medium": 1, "high": 2, "critical": 3}
+
+LLM_ROUTES = ("auto", "skip", "required")
+
+# Below this many keywords, C-level substring checks beat walking the
+# automaton in pure Python (see benchmarks/bench_policy_matcher.py).
+LINEAR_SCAN_MAX_KEYWORDS = 64
+
+# Characters of already-scanned text kept in front of each chunk, so that
+# phrases and regex matches that straddle a chunk boundary are still found.
+CHUNK_OVERLAP_CHARS = 256
+# A word longer than this is split at a chunk boundary rather than carried.
+MAX_CARRY_CHARS = 4096
+# Characters kept from each end of a chunked request as its excerpt.
+DEFAULT_EXCERPT_CHARS = 8192
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton mapping keywords to the rule indices that own them."""
+
+    def __init__(self, patterns: Iterable[tuple[str, int]]) -> None:
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[tuple[int, ...]] = [()]
+        self._always: frozenset[int] = frozenset()
+
+        always: set[int] = set()
+        outputs: list[set[int]] = [set()]
+        for pattern, payload in patterns:
+            if not pattern:
+                # An empty keyword is a substring of every request.
+                always.add(payload)
+                continue
+            state = 0
+            for ch in pattern:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    outputs.append(set())
+                state = nxt
+            outputs[state].add(payload)
+
+        self._always = frozenset(always)
+        self._link(outputs)
+
+    def _link(self, outputs: list[set[int]]) -> None:
+        """Compute failure links and fold outputs along them (BFS order)."""
+        queue: deque[int] = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(ch, 0)
+                outputs[nxt] |= outputs[self._fail[nxt]]
+        self._out = [tuple(sorted(o)) for o in outputs]
+
+    @property
+    def state_count(self) -> int:
+        """Number of automaton states (a rough measure of its memory size)."""
+        return len(self._goto)
+
+    def find(self, text: str) -> set[int]:
+        """Return the payloads of every pattern occurring in ``text``.
+
+        ``text`` must already be lowercased.
+        """
+        hits: set[int] = set(self._always)
+        self.scan(text, hits)
+        return hits
+
+    def scan(self, text: str, hits: set[int], state: int = 0) -> int:
+        """Add the payloads of patterns ending in ``text`` to ``hits``.
+
+        Starts from automaton ``state`` and returns the state after ``text``,
+        so a long text can be fed piece by piece. Doesn't add the payloads of
+        empty patterns; :meth:`find` does.
+        """
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        root = goto[0]
+        for ch in text:
+            if state == 0:
+                state = root.get(ch, 0)
+            else:
+                nxt = goto[state].get(ch)
+                while nxt is None and state:
+                    state = fail[state]
+                    nxt = goto[state].get(ch)
+                state = nxt or 0
+            if out[state]:
+                hits.update(out[state])
+        return state
+
+    @property
+    def always(self) -> frozenset[int]:
+        """Payloads of empty patterns, which match every text."""
+        return self._always
+
+
+@dataclass(frozen=True)
+class RuleRouting:
+    """A rule's declared say over whether the LLM is consulted.
+
+    ``skip`` rules vote to bypass the LLM, optionally only when every matched
+    rule is in ``only_rules`` and the request is at most ``max_request_chars``
+    long. ``required`` rules always send the request to the LLM. ``auto``
+    rules leave the choice to the default routing.
+    """
+
+    mode: str = "auto"
+    only_rules: frozenset[str] | None = None
+    max_request_chars: int | None = None
+
+    @classmethod
+    def from_rule(cls, rule: dict[str, Any]) -> RuleRouting:
+        """Read and validate the ``llm`` and ``skip_when`` fields of a rule."""
+        mode = str(rule.get("llm", "auto")).lower()
+        if mode not in LLM_ROUTES:
+            raise ValueError(
+                f"Rule {rule.get('id', '?')} has invalid llm route {mode!r}; "
+                f"expected one of {', '.join(LLM_ROUTES)}"
+            )
+        conditions = rule.get("skip_when") or {}
+        only_rules = conditions.get("only_rules")
+        max_chars = conditions.get("max_request_chars")
+        return cls(
+            mode=mode,
+            only_rules=frozenset(only_rules) if only_rules is not None else None,
+            max_request_chars=int(max_chars) if max_chars is not None else None,
+        )
+
+    def allows_skip(self, matched_ids: set[str], request_chars: int) -> bool:
+        """Whether this rule votes to skip the LLM for the given match."""
+        if self.mode != "skip":
+            return False
+        if self.only_rules is not None and not matched_ids <= self.only_rules:
+            return False
+        return self.max_request_chars is None or request_chars <= self.max_request_chars
+
+
+@dataclass(frozen=True)
+class PolicyOutcome:
+    """Result of evaluating a request against a compiled policy set.
+
+    ``llm_route`` is ``required`` when a matched rule demands an LLM
+    assessment, ``skip`` when every matched rule votes to bypass it, and
+    ``auto`` otherwise.
+    """
+
+    matched: list[dict[str, Any]] = field(default_factory=list)
+    decision: str = "ACT"
+    risk_level: str = "low"
+    llm_route: str = "auto"
+
+
+class CompiledPolicy:
+    """A policy rule set compiled for single-pass evaluation.
+
+    Keywords are lowercased once at compile time. Large rule sets are matched
+    with a :class:`KeywordMatcher`; small ones keep a precomputed keyword list
+    because substring checks are cheaper at that size. ``match`` expressions
+    go into a :class:`TokenIndex`. A rule matches if any of its keywords
+    occurs as a substring or its expression holds.
+    """
+
+    def __init__(self, rules: list[dict[str, Any]]) -> None:
+        self.rules = rules
+        self._keywords: list[tuple[str, ...]] = [
+            tuple(str(kw).lower() for kw in rule.get("keywords", []) or [])
+            for rule in rules
+        ]
+        self._routing = [RuleRouting.from_rule(rule) for rule in rules]
+        self._expressions = TokenIndex(
+            (index, parse_expression(rule["match"], rule.get("id", "?")))
+            for index, rule in enumerate(rules)
+            if rule.get("match") is not None
+        )
+        self._matcher: KeywordMatcher | None = None
+        self._chunked: ChunkedMatcher | None = None
+        if sum(map(len, self._keywords)) > LINEAR_SCAN_MAX_KEYWORDS:
+            self._matcher = KeywordMatcher(
+                (kw, index)
+                for index, keywords in enumerate(self._keywords)
+                for kw in keywords
+            )
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def match_indices(self, request: str) -> list[int]:
+        """Return the indices of matching rules, in rule-file order."""
+        text = request.lower()
+        if self._matcher is None:
+            hits = {
+                index
+                for index, keywords in enumerate(self._keywords)
+                if keywords and any(kw in text for kw in keywords)
+            }
+        else:
+            hits = self._matcher.find(text)
+        if len(self._expressions):
+            hits |= self._expressions.find(RequestText(request))
+        return sorted(hits)
+
+    def evaluate(self, request: str) -> PolicyOutcome:
+        """Match ``request`` and resolve the strongest decision and risk level."""
+        return self.resolve(self.match_indices(request), len(request))
+
+    def scanner(self, excerpt_chars: int = DEFAULT_EXCERPT_CHARS) -> PolicyScanner:
+        """A :class:`PolicyScanner` that evaluates a request chunk by chunk."""
+        if self._chunked is None:
+            self._chunked = ChunkedMatcher(self._expressions.items())
+        return PolicyScanner(self, self._chunked, excerpt_chars)
+
+    def evaluate_chunks(
+        self,
+        chunks: Iterable[str],
+        stop_early: bool = True,
+        excerpt_chars: int = DEFAULT_EXCERPT_CHARS,
+    ) -> ScanResult:
+        """Evaluate a request given as consecutive chunks of text.
+
+        Gives the same outcome as :meth:`evaluate` on the joined text, except
+        that phrase and regex matches longer than ``CHUNK_OVERLAP_CHARS`` can
+        be missed at a chunk boundary. With ``stop_early``, reading stops as
+        soon as a critical ESCALATE is certain (see
+        :attr:`PolicyScanner.decided`).
+        """
+        scanner = self.scanner(excerpt_chars)
+        for chunk in chunks:
+            scanner.feed(chunk)
+            if stop_early and scanner.decided:
+                return scanner.finish(stopped_early=True)
+        return scanner.finish()
+
+    def is_critical_escalation(self, index: int) -> bool:
+        """Whether rule ``index`` alone forces ESCALATE with critical risk."""
+        rule = self.rules[index]
+        return bool(
+            rule.get("decision", "HOLD") == "ESCALATE"
+            and rule.get("risk_level", "medium") == "critical"
+        )
+
+    @property
+    def keywords(self) -> list[tuple[str, ...]]:
+        """Each rule's lowercased keywords, in rule-file order."""
+        return self._keywords
+
+    @property
+    def keyword_matcher(self) -> KeywordMatcher | None:
+        """The keyword automaton, or ``None`` when keywords are scanned linearly."""
+        return self._matcher
+
+    def route_of(self, index: int) -> RuleRouting:
+        """The LLM routing declared by rule ``index``."""
+        return self._routing[index]
+
+    def resolve(self, indices: Iterable[int], request_chars: int = 0) -> PolicyOutcome:
+        """Combine the matched rules into a :class:`PolicyOutcome`."""
+        indices = list(indices)
+        matched: list[dict[str, Any]] = []
+        strongest_decision = "ACT"
+        strongest_risk = "low"
+
+        for index in indices:
+            rule = self.rules[index]
+            matched.append(
+                {
+                    "rule_id": rule["id"],
+                    "description": rule["description"],
+                    "matched": True,
+                }
+            )
+            rule_decision = rule.get("decision", "HOLD")
+            rule_risk = rule.get("risk_level", "medium")
+
+            if DECISION_PRIORITY.get(rule_decision, 0) > DECISION_PRIORITY.get(
+                strongest_decision, 0
+            ):
+                strongest_decision = rule_decision
+
+            if RISK_PRIORITY.get(rule_risk, 0) > RISK_PRIORITY.get(strongest_risk, 0):
+                strongest_risk = rule_risk
+
+        return PolicyOutcome(
+            matched=matched,
+            decision=strongest_decision,
+            risk_level=strongest_risk,
+            llm_route=self._route(indices, request_chars),
+        )
+
+    def _route(self, indices: list[int], request_chars: int) -> str:
+        routes = [self._routing[index] for index in indices]
+        if any(route.mode == "required" for route in routes):
+            return "required"
+        matched_ids = {self.rules[index]["id"] for index in indices}
+        if routes and all(
+            route.allows_skip(matched_ids, request_chars) for route in routes
+        ):
+            return "skip"
+        return "auto"
+
+
+def compile_policy(rules: list[dict[str, Any]]) -> CompiledPolicy:
+    """Compile a list of policy rules into a reusable matcher."""
+    return CompiledPolicy(rules)
+
+
+@dataclass(frozen=True)
+class ScanResult:
+    """The outcome of a chunked evaluation and how much text it read.
+
+    When ``stopped_early`` is set, ``chars`` counts only the text read before
+    a critical escalation was certain, and ``outcome.matched`` lists the
+    rules matched up to that point. ``excerpt`` is the start and end of the
+    text read, joined by a marker when the middle was left out.
+    """
+
+    outcome: PolicyOutcome
+    chars: int
+    chunks: int
+    stopped_early: bool
+    excerpt: str
+
+    def to_dict(self) -> dict[str, Any]:
+        """Scan statistics for Decision Card metadata."""
+        return {
+            "chars": self.chars,
+            "chunks": self.chunks,
+            "stopped_early": self.stopped_early,
+        }
+
+
+class PolicyScanner:
+    """Evaluates one request fed to it as a sequence of chunks.
+
+    Memory stays bounded by the chunk size: keywords are matched by carrying
+    the automaton state (or, for small rule sets, a short tail of the last
+    chunk) across boundaries, and ``match`` expressions see each chunk with
+    ``CHUNK_OVERLAP_CHARS`` of the preceding text in front of it. A word cut
+    by a boundary is carried into the next chunk, so words are never split.
+    The first and last ``excerpt_chars`` characters are kept for the
+    excerpt.
+    """
+
+    def __init__(
+        self,
+        policy: CompiledPolicy,
+        expressions: ChunkedMatcher,
+        excerpt_chars: int = DEFAULT_EXCERPT_CHARS,
+    ) -> None:
+        self.policy = policy
+        self.chars = 0
+        self.chunks = 0
+        self._expressions = expressions
+        self._matcher = policy.keyword_matcher
+        self._keyword_hits: set[int] = (
+            set(self._matcher.always) if self._matcher is not None else set()
+        )
+        self._state = 0
+        self._keyword_tail = ""
+        longest = max((len(kw) for kws in policy.keywords for kw in kws), default=0)
+        self._keyword_overlap = max(0, longest - 1)
+        self._seen: set[Expression] = set()
+        self._pending = ""
+        self._window_tail = ""
+        self._excerpt_chars = excerpt_chars
+        self._head: list[str] = []
+        self._head_chars = 0
+        self._tail = ""
+        self._decided = False
+
+    def feed(self, chunk: str) -> None:
+        """Scan the next chunk of the request."""
+        if not chunk:
+            return
+        self.chunks += 1
+        self.chars += len(chunk)
+        self._keep_excerpt(chunk)
+        text = self._pending + chunk
+        cut = _word_boundary(text)
+        self._pending = text[cut:]
+        self._scan(text[:cut])
+
+    def finish(self, stopped_early: bool = False) -> ScanResult:
+        """Scan any carried text and resolve the outcome."""
+        if self._pending:
+            self._scan(self._pending)
+            self._pending = ""
+        indices = self._keyword_hits
+        if len(self._expressions):
+            indices = indices | self._expressions.matched(self._seen)
+        return ScanResult(
+            outcome=self.policy.resolve(sorted(indices), self.chars),
+            chars=self.chars,
+            chunks=self.chunks,
+            stopped_early=stopped_early,
+            excerpt=self.excerpt,
+        )
+
+    @property
+    def decided(self) -> bool:
+        """Whether the outcome is already ESCALATE/critical whatever follows.
+
+        That holds once a critical ESCALATE rule has matched in a way more
+        text can't undo, and every rule that requires the LLM has matched
+        too, since one matching later would change the routing.
+        """
+        return self._decided
+
+    @property
+    def excerpt(self) -> str:
+        """The start and end of the text fed so far."""
+        head = "".join(self._head)
+        if self.chars <= len(head) + len(self._tail):
+            return head + self._tail[len(head) + len(self._tail) - self.chars :]
+        omitted = self.chars - len(head) - len(self._tail)
+        return f"{head}\n[... {omitted} characters omitted ...]\n{self._tail}"
+
+    def _keep_excerpt(self, chunk: str) -> None:
+        room = self._excerpt_chars - self._head_chars
+        if room > 0:
+            self._head.append(chunk[:room])
+            self._head_chars += min(room, len(chunk))
+        self._tail = (self._tail + chunk)[-self._excerpt_chars :]
+
+    def _scan(self, text: str) -> None:
+        if not text:
+            return
+        lowered = text.lower()
+        if self._matcher is not None:
+            self._state = self._matcher.scan(lowered, self._keyword_hits, self._state)
+        else:
+            self._scan_keywords(lowered)
+        if len(self._expressions):
+            window = self._window_tail + text
+            self._expressions.scan(RequestText(window), self._seen)
+            self._window_tail = _overlap(window)
+        if not self._decided:
+            self._decided = self._check_decided()
+
+    def _scan_keywords(self, lowered: str) -> None:
+        window = self._keyword_tail + lowered
+        for index, keywords in enumerate(self.policy.keywords):
+            if index not in self._keyword_hits and any(kw in window for kw in keywords):
+                self._keyword_hits.add(index)
+        overlap = self._keyword_overlap
+        self._keyword_tail = window[len(window) - overlap :] if overlap else ""
+
+    def _check_decided(self) -> bool:
+        certain = set(self._keyword_hits)
+        if len(self._expressions):
+            certain |= (
+                self._expressions.matched(self._seen) & self._expressions.monotone
+            )
+        policy = self.policy
+        if not any(policy.is_critical_escalation(index) for index in certain):
+            return False
+        return all(
+            index in certain
+            for index in range(len(policy))
+            if policy.route_of(index).mode == "required"
+        )
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def _word_boundary(text: str) -> int:
+    """Index at which a trailing partial word starts, to carry it forward."""
+    end = len(text)
+    cut = end
+    while cut > 0 and end - cut < MAX_CARRY_CHARS and _is_word_char(text[cut - 1]):
+        cut -= 1
+    return end if end - cut >= MAX_CARRY_CHARS else cut
+
+
+def _overlap(window: str) -> str:
+    """The end of ``window`` to put before the next chunk, starting at a word."""
+    tail = window[-CHUNK_OVERLAP_CHARS:]
+    if len(tail) == len(window):
+        return tail
+    for index, ch in enumerate(tail):
+        if not _is_word_char(ch):
+            return tail[index:]
+    return ""
@@ -0,0 +1,272 @@
+"""Per-tenant policy sets — a memory-bounded LRU cache of compiled policies.
+
+Each tenant (team) has its own rules file in a policy directory,
+``<policy_dir>/<tenant>.yaml``, optionally with a precompiled artifact next
+to it (see :mod:`autonomy_gatekeeper.policy.loader`). A policy set is loaded
+and compiled the first time one of its requests arrives. It is kept in an
+LRU cache whose budget is in bytes rather than entries, since one team's
+rules can be a hundred times the size of another's. When the budget is
+exceeded, the least recently used policy sets are evicted and reloaded on
+their next use.
+
+Sizes are estimated by walking the compiled policy's object graph with
+:func:`sys.getsizeof`. This counts every container and string the matcher
+holds, but not allocator overhead, so treat the budget as approximate.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from autonomy_gatekeeper import profiling
+from autonomy_gatekeeper.policy.loader import artifact_path, load_policy
+from autonomy_gatekeeper.policy.matcher import CompiledPolicy
+
+logger = logging.getLogger("autonomy_gatekeeper")
+
+POLICY_SUFFIX = ".yaml"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# Tenant names become file names, so keep them to a safe alphabet.
+TENANT_PATTERN = re.compile(r"[A-Za-z0-9][A-Za-z0-9_.-]{0,127}")
+
+
+class UnknownTenantError(LookupError):
+    """No policy set exists for the requested tenant."""
+
+    def __init__(self, tenant: str) -> None:
+        super().__init__(f"Unknown tenant {tenant!r}")
+        self.tenant = tenant
+
+
+def estimate_size(obj: object) -> int:
+    """Approximate the memory held by ``obj`` and everything it references.
+
+    Objects shared within the graph are counted once. Classes, functions and
+    modules are skipped, since they are shared with the rest of the process.
+    """
+    seen: set[int] = set()
+    stack = [obj]
+    total = 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen or isinstance(item, type | type(sys)) or callable(item):
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, list | tuple | set | frozenset):
+            stack.extend(item)
+        elif not isinstance(item, str | bytes | int | float | bool | re.Pattern):
+            if hasattr(item, "__dict__"):
+                stack.append(vars(item))
+            for slot in getattr(type(item), "__slots__", ()):
+                if hasattr(item, slot):
+                    stack.append(getattr(item, slot))
+    return total
+
+
+@dataclass
+class PolicyCacheStats:
+    """Counters and current occupancy of a :class:`PolicySetCache`."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    reloads: int = 0
+    load_errors: int = 0
+    load_seconds: float = 0.0
+    entries: int = 0
+    bytes: int = 0
+    max_bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the stats, including the hit rate, as a plain dict."""
+        return {
+            **asdict(self),
+            "load_seconds": round(self.load_seconds, 4),
+            "hit_rate": round(self.hit_rate, 4),
+        }
+
+
+@dataclass
+class _Entry:
+    policy: CompiledPolicy
+    size: int
+    stamp: tuple[object, ...]
+    checked_at: float
+
+
+def _stamp(path: Path) -> tuple[object, ...]:
+    stamps: list[object] = []
+    for file in (path, artifact_path(path)):
+        try:
+            stat = file.stat()
+        except FileNotFoundError:
+            stamps.append(None)
+        else:
+            stamps.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(stamps)
+
+
+class PolicySetCache:
+    """Lazily loaded, LRU-evicted compiled policy sets keyed by tenant.
+
+    Lookups are thread-safe. Concurrent first requests for the same tenant
+    share one load. With ``recheck_seconds``, an entry's files are checked
+    at most that often on lookup, and an edited policy set is reloaded.
+    """
+
+    def __init__(
+        self,
+        policy_dir: str | Path,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        recheck_seconds: float | None = None,
+    ) -> None:
+        self.policy_dir = Path(policy_dir)
+        self.max_bytes = max_bytes
+        self.recheck_seconds = recheck_seconds
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._bytes = 0
+        self._stats = PolicyCacheStats(max_bytes=max_bytes)
+        self._lock = threading.Lock()
+        self._loading: dict[str, threading.Lock] = {}
+
+    def path_for(self, tenant: str) -> Path:
+        """The rules file of ``tenant``, raising if the name is not allowed."""
+        if not TENANT_PATTERN.fullmatch(tenant):
+            raise UnknownTenantError(tenant)
+        return self.policy_dir / f"{tenant}{POLICY_SUFFIX}"
+
+    def tenants(self) -> list[str]:
+        """Every tenant with a rules file in the policy directory."""
+        return sorted(
+            path.stem
+            for path in self.policy_dir.glob(f"*{POLICY_SUFFIX}")
+            if TENANT_PATTERN.fullmatch(path.stem)
+        )
+
+    def get(self, tenant: str) -> CompiledPolicy:
+        """Return the compiled policy of ``tenant``, loading it if needed.
+
+        Raises :class:`UnknownTenantError` if the tenant has no rules file.
+        """
+        with self._lock:
+            entry = self._entries.get(tenant)
+            if entry is not None and not self._is_stale(tenant, entry):
+                self._entries.move_to_end(tenant)
+                self._stats.hits += 1
+                return entry.policy
+            loading = self._loading.setdefault(tenant, threading.Lock())
+        with loading:
+            # Another thread may have loaded it while we waited. Compare the
+            # stamps directly: the check above already reset checked_at.
+            with self._lock:
+                entry = self._entries.get(tenant)
+                if entry is not None and _stamp(self.path_for(tenant)) == entry.stamp:
+                    self._entries.move_to_end(tenant)
+                    self._stats.hits += 1
+                    return entry.policy
+                self._stats.misses += 1
+            return self._load(tenant, reload=entry is not None)
+
+    def _is_stale(self, tenant: str, entry: _Entry) -> bool:
+        if self.recheck_seconds is None:
+            return False
+        now = time.monotonic()
+        if now - entry.checked_at < self.recheck_seconds:
+            return False
+        entry.checked_at = now
+        return _stamp(self.path_for(tenant)) != entry.stamp
+
+    def _load(self, tenant: str, reload: bool) -> CompiledPolicy:
+        path = self.path_for(tenant)
+        started = time.perf_counter()
+        stamp = _stamp(path)
+        if stamp[0] is None:
+            with self._lock:
+                self._stats.load_errors += 1
+                self._loading.pop(tenant, None)
+            raise UnknownTenantError(tenant)
+        try:
+            with profiling.stage("policy_load"):
+                policy = load_policy(str(path))
+        except Exception:
+            with self._lock:
+                self._stats.load_errors += 1
+                self._loading.pop(tenant, None)
+            raise
+        size = estimate_size(policy)
+        elapsed = time.perf_counter() - started
+        logger.info(
+            "Loaded policy set %s: %d rules, ~%d KiB in %.1f ms",
+            tenant,
+            len(policy),
+            size // 1024,
+            elapsed * 1e3,
+        )
+        with self._lock:
+            old = self._entries.pop(tenant, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._entries[tenant] = _Entry(policy, size, stamp, time.monotonic())
+            self._bytes += size
+            self._stats.load_seconds += elapsed
+            if reload:
+                self._stats.reloads += 1
+            self._evict()
+            self._loading.pop(tenant, None)
+        return policy
+
+    def _evict(self) -> None:
+        """Drop least recently used sets until within budget (caller holds lock).
+
+        The most recently used set is always kept, even if it alone exceeds
+        the budget.
+        """
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            tenant, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+            self._stats.evictions += 1
+            logger.debug("Evicted policy set %s (~%d KiB)", tenant, entry.size // 1024)
+
+    def invalidate(self, tenant: str | None = None) -> None:
+        """Drop one tenant's policy set, or all of them, from the cache."""
+        with self._lock:
+            if tenant is None:
+                self._entries.clear()
+                self._bytes = 0
+                return
+            entry = self._entries.pop(tenant, None)
+            if entry is not None:
+                self._bytes -= entry.size
+
+    def __contains__(self, tenant: object) -> bool:
+        return tenant in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def stats(self) -> PolicyCacheStats:
+        """A snapshot of the cache counters."""
+        with self._lock:
+            snapshot = PolicyCacheStats(**asdict(self._stats))
+            snapshot.entries = len(self._entries)
+            snapshot.bytes = self._bytes
+            return snapshot
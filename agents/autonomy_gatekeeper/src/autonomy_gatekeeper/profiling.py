@@ -0,0 +1,369 @@
+"""Profiling — per-stage CPU profiles and allocation snapshots of the pipeline.
+
+A :class:`Profiler` splits a run into named stages (settings, policy
+loading, graph compilation, each graph node, Decision Card validation and
+rendering) and gives each its own :mod:`cProfile` profile, wall and CPU
+time and :mod:`tracemalloc` allocation figures. Times are exclusive: a
+stage's figures leave out the stages nested inside it, and everything
+outside a named stage is counted as ``other``, so the stages add up to the
+whole run.
+
+Instrumented code marks stages with :func:`stage`, which costs a global
+lookup when no profiler is running. Graph nodes are wrapped with
+:func:`staged` only when they are built during a profiling session.
+
+Collapsed stacks for flame graphs come from sampling the stack of every
+profiled thread each millisecond, tagged with the thread's current stage.
+cProfile only records caller/callee pairs, which can't be folded back into
+real call paths once imports and other recursion are involved.
+
+Profiles are per thread. Memory figures come from process-wide tracemalloc
+counters, so they are exact only when stages don't run concurrently.
+Listing each stage's allocation sites needs two full tracemalloc snapshots
+per stage, which takes seconds in a large process, so it is opt-in.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, TypeVar
+
+if TYPE_CHECKING:
+    import cProfile
+    import pstats
+    import tracemalloc
+    from types import FrameType
+
+T = TypeVar("T")
+
+ROOT_STAGE = "other"
+# Allocation sites listed per stage in ``<stage>.alloc.txt``.
+TOP_ALLOCATIONS = 25
+SAMPLE_INTERVAL_SECONDS = 0.001
+
+_active: Profiler | None = None
+_NO_STAGE = nullcontext()
+
+
+def active() -> Profiler | None:
+    """The running profiler, if any."""
+    return _active
+
+
+def stage(name: str) -> AbstractContextManager[object]:
+    """Attribute the enclosed code to stage ``name`` of the running profiler."""
+    profiler = _active
+    return _NO_STAGE if profiler is None else profiler.stage(name)
+
+
+def staged(name: str, func: Callable[[T], T]) -> Callable[[T], T]:
+    """Wrap a sync graph node so each call is profiled as stage ``name``."""
+
+    def run(state: T) -> T:
+        profiler = _active
+        if profiler is None:
+            return func(state)
+        with profiler.stage(name):
+            return func(state)
+
+    return run
+
+
+@dataclass
+class StageStats:
+    """Exclusive totals for one stage across all of its calls.
+
+    ``alloc_bytes`` is the net growth of traced memory and ``peak_bytes``
+    the highest traced memory above the stage's starting point, including
+    nested stages.
+    """
+
+    name: str
+    calls: int = 0
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    alloc_bytes: int = 0
+    peak_bytes: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the stats as a plain dict, with times in milliseconds."""
+        data = asdict(self)
+        data["wall_ms"] = round(data.pop("wall_seconds") * 1e3, 3)
+        data["cpu_ms"] = round(data.pop("cpu_seconds") * 1e3, 3)
+        return data
+
+
+@dataclass
+class _Frame:
+    name: str
+    profile: cProfile.Profile | None
+    wall: float
+    cpu: float
+    memory: int
+    peak: int
+    before: tracemalloc.Snapshot | None = None
+    child_wall: float = 0.0
+    child_cpu: float = 0.0
+    child_alloc: int = 0
+
+
+class Profiler:
+    """Collects per-stage profiles between ``start()`` and ``stop()``.
+
+    Use it as a context manager. Only one profiler can run at a time.
+    """
+
+    def __init__(
+        self,
+        output_dir: str | Path,
+        trace_memory: bool = True,
+        allocation_sites: bool = False,
+        sample_interval: float = SAMPLE_INTERVAL_SECONDS,
+    ) -> None:
+        self.output_dir = Path(output_dir)
+        self.trace_memory = trace_memory
+        self.allocation_sites = allocation_sites and trace_memory
+        self.sample_interval = sample_interval
+        self._stats: dict[str, StageStats] = {}
+        # (stage, thread id) -> profile; cProfile can't be shared by threads.
+        self._profiles: dict[tuple[str, int], cProfile.Profile] = {}
+        # stage -> snapshots around its first call
+        self._snapshots: dict[str, tuple[tracemalloc.Snapshot, ...]] = {}
+        # thread id -> stack of running stages
+        self._stacks: dict[int, list[_Frame]] = {}
+        # stage -> folded stack -> samples
+        self._samples: dict[str, Counter[str]] = {}
+        self._lock = threading.Lock()
+        self._sampler: threading.Thread | None = None
+        self._stopping = threading.Event()
+        self._root: AbstractContextManager[None] | None = None
+        self._started_tracing = False
+        self.wall_seconds = 0.0
+        self._started = 0.0
+
+    def __enter__(self) -> Profiler:
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        """Start profiling; code outside any stage counts as ``other``."""
+        global _active
+        import tracemalloc
+
+        if _active is not None:
+            raise RuntimeError("A profiler is already running")
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        _active = self
+        self._started = time.perf_counter()
+        self._root = self.stage(ROOT_STAGE)
+        self._root.__enter__()
+        self._stopping.clear()
+        self._sampler = threading.Thread(
+            target=self._sample, name="gatekeeper-profiler", daemon=True
+        )
+        self._sampler.start()
+
+    def stop(self) -> None:
+        """Stop profiling. Stages still running on other threads are dropped."""
+        global _active
+        import tracemalloc
+
+        self._stopping.set()
+        if self._sampler is not None:
+            self._sampler.join()
+            self._sampler = None
+        if self._root is not None:
+            self._root.__exit__(None, None, None)
+            self._root = None
+        self.wall_seconds = time.perf_counter() - self._started
+        _active = None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def _stack(self) -> list[_Frame]:
+        ident = threading.get_ident()
+        stack = self._stacks.get(ident)
+        if stack is None:
+            with self._lock:
+                stack = self._stacks.setdefault(ident, [])
+        return stack
+
+    def _sample(self) -> None:
+        """Record the folded stack of every thread that is inside a stage."""
+        while not self._stopping.wait(self.sample_interval):
+            frames = sys._current_frames()
+            with self._lock:
+                stacks = list(self._stacks.items())
+            for ident, stack in stacks:
+                frame = frames.get(ident)
+                if not stack or frame is None:
+                    continue
+                name = stack[-1].name
+                samples = self._samples.get(name)
+                if samples is None:
+                    samples = self._samples.setdefault(name, Counter())
+                samples[_fold(frame)] += 1
+
+    def _profile(self, name: str) -> cProfile.Profile:
+        import cProfile
+
+        key = (name, threading.get_ident())
+        with self._lock:
+            profile = self._profiles.get(key)
+            if profile is None:
+                profile = self._profiles[key] = cProfile.Profile()
+            return profile
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Attribute the enclosed code to stage ``name`` on this thread."""
+        import tracemalloc
+
+        stack = self._stack()
+        parent = stack[-1] if stack else None
+        if parent is not None and parent.profile is not None:
+            parent.profile.disable()
+        tracing = tracemalloc.is_tracing()
+        before = None
+        if self.allocation_sites and tracing and name != ROOT_STAGE:
+            with self._lock:
+                first = name not in self._snapshots
+                if first:
+                    self._snapshots[name] = ()
+            if first:
+                before = tracemalloc.take_snapshot()
+        memory, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+        if parent is not None:
+            parent.peak = max(parent.peak, peak)
+        if tracing:
+            tracemalloc.reset_peak()
+        profile = self._profile(name)
+        frame = _Frame(name, profile, 0.0, 0.0, memory, memory, before)
+        stack.append(frame)
+        frame.wall = time.perf_counter()
+        frame.cpu = time.thread_time()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another thread's profile is active (Python 3.12+ allows only
+            # one); keep the timings and skip the CPU profile.
+            frame.profile = None
+        try:
+            yield
+        finally:
+            if frame.profile is not None:
+                frame.profile.disable()
+            wall = time.perf_counter() - frame.wall
+            cpu = time.thread_time() - frame.cpu
+            memory, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+            frame.peak = max(frame.peak, peak)
+            alloc = memory - frame.memory
+            if frame.before is not None:
+                after = tracemalloc.take_snapshot()
+                with self._lock:
+                    self._snapshots[name] = (frame.before, after)
+            stack.pop()
+            with self._lock:
+                stats = self._stats.setdefault(name, StageStats(name))
+                stats.calls += 1
+                stats.wall_seconds += wall - frame.child_wall
+                stats.cpu_seconds += cpu - frame.child_cpu
+                stats.alloc_bytes += alloc - frame.child_alloc
+                stats.peak_bytes = max(stats.peak_bytes, frame.peak - frame.memory)
+            if parent is not None:
+                # Time spent here, including snapshots, belongs to neither.
+                parent.child_wall += time.perf_counter() - frame.wall
+                parent.child_cpu += time.thread_time() - frame.cpu
+                parent.child_alloc += alloc
+                parent.peak = max(parent.peak, frame.peak)
+                if parent.profile is not None:
+                    parent.profile.enable()
+
+    def stats(self) -> list[StageStats]:
+        """Per-stage totals, slowest first."""
+        with self._lock:
+            stages = [StageStats(**asdict(s)) for s in self._stats.values()]
+        return sorted(stages, key=lambda s: s.wall_seconds, reverse=True)
+
+    def _merged(self) -> dict[str, pstats.Stats]:
+        import pstats
+
+        merged: dict[str, pstats.Stats] = {}
+        with self._lock:
+            profiles = list(self._profiles.items())
+        for (name, _), profile in profiles:
+            if name in merged:
+                merged[name].add(profile)
+            else:
+                merged[name] = pstats.Stats(profile)
+        return merged
+
+    def write(self) -> list[Path]:
+        """Write the profiles to ``output_dir`` and return the files written.
+
+        Each stage gets ``<stage>.pstats`` (for ``pstats``, snakeviz and
+        similar), ``<stage>.collapsed`` (sample counts per folded stack, for
+        flamegraph.pl or speedscope) and, with ``allocation_sites``,
+        ``<stage>.alloc.txt``. ``all.collapsed`` holds every stage under a
+        root frame named after it, and ``profile.json`` the per-stage
+        breakdown.
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        written: list[Path] = []
+        for name, stats in sorted(self._merged().items()):
+            path = self.output_dir / f"{name}.pstats"
+            stats.dump_stats(path)
+            written.append(path)
+        every_stage: list[str] = []
+        for name, samples in sorted(self._samples.items()):
+            stacks = [f"{stack} {count}" for stack, count in sorted(samples.items())]
+            written.append(self._write_lines(f"{name}.collapsed", stacks))
+            every_stage += [f"{name};{line}" for line in stacks]
+        with self._lock:
+            snapshots = [(k, v) for k, v in self._snapshots.items() if v]
+        for name, (before, after) in sorted(snapshots):
+            # Sites of the first call, including any nested stages.
+            diff = after.compare_to(before, "lineno")[:TOP_ALLOCATIONS]
+            lines = [str(stat) for stat in diff]
+            written.append(self._write_lines(f"{name}.alloc.txt", lines))
+        written.append(self._write_lines("all.collapsed", every_stage))
+        summary = {
+            "wall_ms": round(self.wall_seconds * 1e3, 3),
+            "stages": [s.to_dict() for s in self.stats()],
+        }
+        path = self.output_dir / "profile.json"
+        path.write_text(json.dumps(summary, indent=2) + "\n", encoding="utf-8")
+        written.append(path)
+        return written
+
+    def _write_lines(self, name: str, lines: list[str]) -> Path:
+        path = self.output_dir / name
+        path.write_text("".join(f"{line}\n" for line in lines), encoding="utf-8")
+        return path
+
+
+def _fold(frame: FrameType | None) -> str:
+    """``outer;...;inner`` frames of a stack, leaving out the profiler's own."""
+    labels = []
+    while frame is not None:
+        code = frame.f_code
+        if code.co_filename != __file__:
+            name = os.path.basename(code.co_filename)
+            labels.append(f"{code.co_name} ({name}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(labels))
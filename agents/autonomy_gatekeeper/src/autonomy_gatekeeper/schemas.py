@@ -4,6 +4,7 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 from enum import Enum
+from typing import Any
 
 from pydantic import BaseModel, Field
 
@@ -52,6 +53,10 @@ class DecisionCard(BaseModel):
         default_factory=lambda: datetime.now(timezone.utc),
         description="UTC timestamp of the evaluation",
     )
+    metadata: dict[str, Any] = Field(
+        default_factory=dict,
+        description="Pipeline details about how the decision was produced",
+    )
 
     def to_human_readable(self) -> str:
         """Render the decision card as human-readable text."""
@@ -0,0 +1,177 @@
+"""Offline policy scoring — re-score large request corpora on every core.
+
+Policy-only evaluation is pure Python, so threads can't use more than one
+core. :func:`score_lines` splits JSONL input into chunks and sends them to a
+process pool. Each worker loads the compiled policy once, when it starts.
+Workers parse, evaluate and serialize a whole chunk, so the parent only
+moves text. Results stream back in input order, and at most
+``2 * workers`` chunks are in flight at any time.
+
+Each output line is a compact score record rather than a Decision Card:
+
+    {"line": 12, "decision": "ESCALATE", "risk_level": "critical",
+     "llm_route": "auto", "matched_rules": ["PROD_DEPLOY"]}
+
+Malformed input lines produce ``{"line": N, "error": "..."}``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from itertools import islice
+from typing import Any, TextIO
+
+from autonomy_gatekeeper.batch import parse_request_line
+from autonomy_gatekeeper.policy.loader import load_policy
+from autonomy_gatekeeper.policy.matcher import CompiledPolicy
+
+DEFAULT_CHUNK_SIZE = 1_000
+
+# The policy a pool worker loaded in _init_worker.
+_worker_policy: CompiledPolicy | None = None
+
+
+@dataclass
+class ScoringStats:
+    """Summary of an offline scoring run."""
+
+    processed: int = 0
+    errors: int = 0
+    workers: int = 1
+    elapsed_seconds: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Requests scored per second."""
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return self.processed / self.elapsed_seconds
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the stats, including throughput, as a plain dict."""
+        return {**asdict(self), "throughput": round(self.throughput, 2)}
+
+
+@dataclass(frozen=True)
+class ScoredChunk:
+    """The serialized results for one chunk of input lines."""
+
+    text: str
+    processed: int
+    errors: int
+
+
+def score_request(policy: CompiledPolicy, request: str) -> dict[str, Any]:
+    """Evaluate ``request`` against ``policy`` without the LLM."""
+    outcome = policy.evaluate(request)
+    return {
+        "decision": outcome.decision,
+        "risk_level": outcome.risk_level,
+        "llm_route": outcome.llm_route,
+        "matched_rules": [match["rule_id"] for match in outcome.matched],
+    }
+
+
+def score_chunk(
+    policy: CompiledPolicy, first_line: int, lines: list[str]
+) -> ScoredChunk:
+    """Score consecutive input lines, numbered from ``first_line``."""
+    records: list[str] = []
+    errors = 0
+    for number, line in enumerate(lines, start=first_line):
+        try:
+            request = parse_request_line(line)
+        except ValueError as e:
+            errors += 1
+            records.append(json.dumps({"line": number, "error": str(e)}))
+            continue
+        if request is not None:
+            records.append(
+                json.dumps({"line": number, **score_request(policy, request)})
+            )
+    text = "".join(record + "\n" for record in records)
+    return ScoredChunk(text=text, processed=len(records), errors=errors)
+
+
+def _init_worker(policy_path: str) -> None:
+    global _worker_policy
+    _worker_policy = load_policy(policy_path)
+
+
+def _score_in_worker(first_line: int, lines: list[str]) -> ScoredChunk:
+    assert _worker_policy is not None, "worker started without a policy"
+    return score_chunk(_worker_policy, first_line, lines)
+
+
+def _chunks(lines: Iterable[str], size: int) -> Iterator[tuple[int, list[str]]]:
+    iterator = iter(lines)
+    first_line = 1
+    while chunk := list(islice(iterator, size)):
+        yield first_line, chunk
+        first_line += len(chunk)
+
+
+def default_workers() -> int:
+    """One worker per CPU available to this process."""
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return os.cpu_count() or 1
+
+
+def score_lines(
+    policy_path: str,
+    lines: Iterable[str],
+    workers: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[ScoredChunk]:
+    """Score JSONL ``lines`` on ``workers`` processes, yielding chunks in order.
+
+    With ``workers=1`` everything runs in this process, which avoids the
+    pool start-up cost for small inputs.
+    """
+    workers = workers or default_workers()
+    chunks = _chunks(lines, max(1, chunk_size))
+    if workers == 1:
+        policy = load_policy(policy_path)
+        for first_line, chunk in chunks:
+            yield score_chunk(policy, first_line, chunk)
+        return
+
+    window = workers * 2
+    pending: deque[Future[ScoredChunk]] = deque()
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(policy_path,)
+    ) as pool:
+        for first_line, chunk in chunks:
+            pending.append(pool.submit(_score_in_worker, first_line, chunk))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def score_file(
+    policy_path: str,
+    source: TextIO,
+    sink: TextIO,
+    workers: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> ScoringStats:
+    """Score every request in ``source`` and write score records to ``sink``."""
+    stats = ScoringStats(workers=workers or default_workers())
+    started = time.perf_counter()
+    for chunk in score_lines(
+        policy_path, source, workers=stats.workers, chunk_size=chunk_size
+    ):
+        sink.write(chunk.text)
+        stats.processed += chunk.processed
+        stats.errors += chunk.errors
+    sink.flush()
+    stats.elapsed_seconds = time.perf_counter() - started
+    return stats
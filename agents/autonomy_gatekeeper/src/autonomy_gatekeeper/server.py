@@ -0,0 +1,474 @@
+"""HTTP service mode — a warm engine behind a small JSON API.
+
+``autonomy-gatekeeper serve`` keeps one :class:`~autonomy_gatekeeper.engine.Gatekeeper`
+in memory for the life of the process, so rules, the compiled graph and the
+pooled LLM clients are built once rather than per call. It uses only the
+standard library's threaded HTTP server.
+
+Endpoints:
+
+- ``POST /v1/evaluate`` with ``{"request": "..."}`` returns a Decision Card.
+- ``POST /v1/evaluate/batch`` with ``{"requests": [...]}`` returns
+  ``{"cards": [...]}`` in request order.
+- Both accept an optional ``"tenant"`` naming a policy set in the engine's
+  policy directory; an unknown tenant gets a 404.
+- ``GET /healthz`` answers as long as the process is serving.
+- ``GET /readyz`` returns 503 until the graph and LLM client are warm.
+- ``GET /stats`` reports request counts, latency percentiles, batching,
+  routing, tenant policy cache and LLM guard state.
+- ``GET /metrics`` returns Prometheus text when metrics are enabled.
+
+Each HTTP request runs on its own thread. Their policy evaluations are
+coalesced by a :class:`PolicyBatcher`: one worker thread matches everything
+queued at once against a single snapshot of the rules, matching identical
+requests only once. Requests that then need the LLM continue on their own
+threads, so a slow LLM call never holds up a fast policy-only decision.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import signal
+import threading
+import time
+from collections import deque
+from collections.abc import Sequence
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from autonomy_gatekeeper.engine import Gatekeeper
+from autonomy_gatekeeper.graph import GatekeeperState
+from autonomy_gatekeeper.llm.factory import create_llm
+from autonomy_gatekeeper.policy.tenants import UnknownTenantError
+
+logger = logging.getLogger("autonomy_gatekeeper")
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_MAX_BATCH = 64
+MAX_BODY_BYTES = 4 * 1024 * 1024
+MAX_BATCH_REQUESTS = 1000
+# Latency samples kept for the percentiles in /stats.
+LATENCY_WINDOW = 10_000
+
+
+@dataclass
+class BatchStats:
+    """Counts of the micro-batches a :class:`PolicyBatcher` has run."""
+
+    batches: int = 0
+    requests: int = 0
+    largest_batch: int = 0
+
+    @property
+    def mean_batch_size(self) -> float:
+        """Average requests per batch."""
+        return self.requests / self.batches if self.batches else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the counters, with the mean batch size, as a plain dict."""
+        return {**asdict(self), "mean_batch_size": round(self.mean_batch_size, 2)}
+
+
+# A queued request: (request, tenant, future for its policy-evaluated state).
+_Item = tuple[str, str | None, Future[GatekeeperState]]
+
+
+class PolicyBatcher:
+    """Coalesces policy evaluation from concurrent callers into micro-batches.
+
+    A worker thread takes everything queued, up to ``max_batch`` requests,
+    and evaluates it with :meth:`Gatekeeper.evaluate_policies`. With
+    ``max_wait_seconds`` at 0 it never waits for a batch to fill: requests
+    that arrive while a batch is running form the next one. A small wait
+    trades latency for larger batches.
+    """
+
+    def __init__(
+        self,
+        engine: Gatekeeper,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        max_wait_seconds: float = 0.0,
+    ) -> None:
+        self.engine = engine
+        self.max_batch = max(1, max_batch)
+        self.max_wait_seconds = max_wait_seconds
+        self.stats = BatchStats()
+        self._queue: queue.Queue[_Item | None] = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run, name="gatekeeper-policy-batcher", daemon=True
+        )
+        self._thread.start()
+
+    def submit(
+        self, request: str, tenant: str | None = None
+    ) -> Future[GatekeeperState]:
+        """Queue ``request``; the future resolves to its policy-evaluated state."""
+        future: Future[GatekeeperState] = Future()
+        self._queue.put((request, tenant, future))
+        return future
+
+    def evaluate(
+        self, requests: Sequence[str], tenant: str | None = None
+    ) -> list[GatekeeperState]:
+        """Evaluate ``requests`` through the batcher and wait for the states."""
+        futures = [self.submit(request, tenant) for request in requests]
+        return [future.result() for future in futures]
+
+    def close(self) -> None:
+        """Stop the worker after the queued requests are done."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _collect(self) -> list[_Item] | None:
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait_seconds
+        while len(batch) < self.max_batch:
+            try:
+                remaining = deadline - time.monotonic()
+                item = (
+                    self._queue.get(timeout=remaining)
+                    if remaining > 0
+                    else self._queue.get_nowait()
+                )
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)  # stop after this batch
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self) -> None:
+        while (batch := self._collect()) is not None:
+            self.stats.batches += 1
+            self.stats.requests += len(batch)
+            self.stats.largest_batch = max(self.stats.largest_batch, len(batch))
+            # Each tenant's requests are matched against its own policy set;
+            # one tenant failing to load doesn't fail the others.
+            by_tenant: dict[str | None, list[_Item]] = {}
+            for item in batch:
+                by_tenant.setdefault(item[1], []).append(item)
+            for tenant, items in by_tenant.items():
+                try:
+                    states = self.engine.evaluate_policies(
+                        [request for request, _, _ in items], tenant
+                    )
+                except Exception as e:
+                    for _, _, future in items:
+                        future.set_exception(e)
+                    continue
+                for (_, _, future), state in zip(items, states, strict=True):
+                    future.set_result(state)
+
+
+class LatencyWindow:
+    """The most recent request latencies, for percentile reporting."""
+
+    def __init__(self, size: int = LATENCY_WINDOW) -> None:
+        self._samples: deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        """Record one latency."""
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentiles(self) -> dict[str, float]:
+        """p50, p95, p99 and max of the window in milliseconds."""
+        with self._lock:
+            ordered = sorted(self._samples)
+        if not ordered:
+            return {}
+        last = len(ordered) - 1
+        return {
+            f"p{p}_ms": round(ordered[min(last, int(len(ordered) * p / 100))] * 1e3, 3)
+            for p in (50, 95, 99)
+        } | {"max_ms": round(ordered[-1] * 1e3, 3), "samples": len(ordered)}
+
+
+class RequestError(ValueError):
+    """A client error, reported with ``status``."""
+
+    def __init__(self, status: HTTPStatus, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class GatekeeperServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding a warm engine and a policy batcher."""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(
+        self,
+        engine: Gatekeeper,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        batch_wait_seconds: float = 0.0,
+    ) -> None:
+        super().__init__((host, port), GatekeeperHandler)
+        self.engine = engine
+        self.batcher = PolicyBatcher(engine, max_batch, batch_wait_seconds)
+        self.latency = LatencyWindow()
+        self.started = time.monotonic()
+        self.ready = threading.Event()
+        self.counts: dict[str, int] = {}
+        self._counts_lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        """The base URL the server listens on."""
+        host, port = self.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def warm_up(self) -> None:
+        """Compile the graph and create the LLM client, then mark the server ready."""
+        try:
+            _ = self.engine.graph
+            create_llm(self.engine.settings)
+        except Exception:
+            logger.exception("Warm-up failed; /readyz will keep reporting 503")
+            return
+        self.ready.set()
+        logger.info("Gatekeeper service ready at %s", self.url)
+
+    def count(self, key: str) -> None:
+        """Increment a request counter shown in /stats."""
+        with self._counts_lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def stats(self) -> dict[str, Any]:
+        """The service's counters and the engine's state."""
+        engine = self.engine
+        with self._counts_lock:
+            counts = dict(self.counts)
+        stats: dict[str, Any] = {
+            "uptime_seconds": round(time.monotonic() - self.started, 3),
+            "ready": self.ready.is_set(),
+            "requests": counts,
+            "latency": self.latency.percentiles(),
+            "batching": self.batcher.stats.to_dict(),
+            "routing": engine.routing_stats.to_dict(),
+            "policy_rules": len(engine.policy),
+        }
+        if engine.policy_sets is not None:
+            stats["policy_sets"] = engine.policy_sets.stats.to_dict()
+        if engine.resources.guard is not None:
+            stats["llm_guard"] = engine.resources.guard.stats().to_dict()
+        return stats
+
+    def server_close(self) -> None:
+        self.batcher.close()
+        super().server_close()
+
+
+class GatekeeperHandler(BaseHTTPRequestHandler):
+    """Routes the JSON API to the server's engine."""
+
+    protocol_version = "HTTP/1.1"
+    server: GatekeeperServer
+
+    def do_GET(self) -> None:
+        server = self.server
+        if self.path == "/healthz":
+            self._send(HTTPStatus.OK, {"status": "ok"})
+        elif self.path == "/readyz":
+            ready = server.ready.is_set()
+            self._send(
+                HTTPStatus.OK if ready else HTTPStatus.SERVICE_UNAVAILABLE,
+                {"status": "ready" if ready else "warming"},
+            )
+        elif self.path == "/stats":
+            self._send(HTTPStatus.OK, server.stats())
+        elif self.path == "/metrics":
+            metrics = server.engine.metrics
+            if metrics is None:
+                self._error(HTTPStatus.NOT_FOUND, "Metrics are disabled.")
+            else:
+                self._send_text(metrics.registry.to_prometheus())
+        else:
+            self._error(HTTPStatus.NOT_FOUND, f"No route for GET {self.path}.")
+
+    def do_POST(self) -> None:
+        route = {
+            "/v1/evaluate": self._evaluate,
+            "/v1/evaluate/batch": self._evaluate_batch,
+        }.get(self.path)
+        if route is None:
+            try:
+                self._discard_body()
+            except RequestError as e:
+                self._error(e.status, str(e))
+                return
+            self._error(HTTPStatus.NOT_FOUND, f"No route for POST {self.path}.")
+            return
+        started = time.perf_counter()
+        try:
+            body = route(self._read_json())
+        except RequestError as e:
+            self.server.count("client_errors")
+            self._error(e.status, str(e))
+            return
+        except UnknownTenantError as e:
+            self.server.count("client_errors")
+            self._error(HTTPStatus.NOT_FOUND, str(e))
+            return
+        except Exception as e:
+            logger.exception("Evaluation failed")
+            self.server.count("server_errors")
+            self._error(HTTPStatus.INTERNAL_SERVER_ERROR, str(e))
+            return
+        self.server.latency.observe(time.perf_counter() - started)
+        self._send(HTTPStatus.OK, body)
+
+    def _evaluate(self, payload: Any) -> dict[str, Any]:
+        request = payload.get("request") if isinstance(payload, dict) else None
+        if not isinstance(request, str) or not request:
+            raise RequestError(
+                HTTPStatus.BAD_REQUEST, 'Expected {"request": "<non-empty string>"}.'
+            )
+        tenant = self._tenant(payload)
+        self.server.count("evaluate")
+        server = self.server
+        [state] = server.batcher.evaluate([request], tenant)
+        return server.engine.complete(state).model_dump(mode="json")
+
+    def _evaluate_batch(self, payload: Any) -> dict[str, Any]:
+        requests = payload.get("requests") if isinstance(payload, dict) else None
+        if (
+            not isinstance(requests, list)
+            or not requests
+            or not all(isinstance(r, str) and r for r in requests)
+        ):
+            raise RequestError(
+                HTTPStatus.BAD_REQUEST,
+                'Expected {"requests": [<non-empty strings>]}.',
+            )
+        if len(requests) > MAX_BATCH_REQUESTS:
+            raise RequestError(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                f"At most {MAX_BATCH_REQUESTS} requests per batch.",
+            )
+        tenant = self._tenant(payload)
+        self.server.count("evaluate_batch")
+        server = self.server
+        states = server.batcher.evaluate(requests, tenant)
+        cards = server.engine.complete_many(states)
+        return {"cards": [card.model_dump(mode="json") for card in cards]}
+
+    def _tenant(self, payload: dict[str, Any]) -> str | None:
+        tenant = payload.get("tenant")
+        if tenant is None:
+            return None
+        if not isinstance(tenant, str) or not tenant:
+            raise RequestError(HTTPStatus.BAD_REQUEST, '"tenant" must be a string.')
+        if self.server.engine.policy_sets is None:
+            raise RequestError(
+                HTTPStatus.BAD_REQUEST,
+                "Tenants need the server to run with a policy directory.",
+            )
+        return tenant
+
+    def _content_length(self) -> int:
+        value = self.headers.get("Content-Length") or "0"
+        if not (value.isascii() and value.isdigit()):
+            # The body can't be found, so the connection can't be reused.
+            self.close_connection = True
+            raise RequestError(
+                HTTPStatus.BAD_REQUEST, f"Invalid Content-Length: {value!r}."
+            )
+        return int(value)
+
+    def _read_json(self) -> Any:
+        length = self._content_length()
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True
+            raise RequestError(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                f"Request body is larger than {MAX_BODY_BYTES} bytes.",
+            )
+        try:
+            return json.loads(self.rfile.read(length) or b"null")
+        except ValueError as e:
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"Invalid JSON: {e}") from e
+
+    def _discard_body(self) -> None:
+        length = self._content_length()
+        if 0 < length <= MAX_BODY_BYTES:
+            self.rfile.read(length)
+        elif length:
+            self.close_connection = True
+
+    def _error(self, status: HTTPStatus, message: str) -> None:
+        self._send(status, {"error": message})
+
+    def _send(self, status: HTTPStatus, body: Any) -> None:
+        self._write(status, json.dumps(body).encode(), "application/json")
+
+    def _send_text(self, text: str) -> None:
+        self._write(HTTPStatus.OK, text.encode(), "text/plain; version=0.0.4")
+
+    def _write(self, status: HTTPStatus, data: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def create_server(
+    engine: Gatekeeper,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    max_batch: int = DEFAULT_MAX_BATCH,
+    batch_wait_seconds: float = 0.0,
+) -> GatekeeperServer:
+    """Bind a server for ``engine`` and start warming it up in the background.
+
+    Call ``serve_forever()`` to handle requests.
+    """
+    server = GatekeeperServer(engine, host, port, max_batch, batch_wait_seconds)
+    threading.Thread(
+        target=server.warm_up, name="gatekeeper-warm-up", daemon=True
+    ).start()
+    return server
+
+
+def serve(
+    engine: Gatekeeper,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    max_batch: int = DEFAULT_MAX_BATCH,
+    batch_wait_seconds: float = 0.0,
+) -> None:
+    """Serve until interrupted or sent SIGTERM, then close the engine."""
+    server = create_server(engine, host, port, max_batch, batch_wait_seconds)
+
+    def stop(signum: int, frame: Any) -> None:
+        # shutdown() waits for serve_forever(), which runs on this thread.
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, stop)
+    logger.info("Serving the gatekeeper API on %s", server.url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        engine.close()
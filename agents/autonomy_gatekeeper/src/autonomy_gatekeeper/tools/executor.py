@@ -0,0 +1,311 @@
+"""Tool executor — runs the tool calls of an approved request concurrently.
+
+Calls that don't depend on each other are dispatched together to a managed
+thread pool, so the time to act on a request is roughly that of its slowest
+chain of dependent calls rather than the sum of every call. Each tool can
+set its own timeout and cap on concurrent calls (see
+:meth:`ToolRegistry.register`). Results are yielded as calls finish.
+
+A call that outlives its timeout is reported as ``timeout`` and its
+dependents are skipped. Python threads can't be interrupted, so the call
+keeps its pool thread and its tool's concurrency slot until it returns.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import threading
+import time
+from collections.abc import AsyncIterator, Iterable, Iterator, Mapping
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from autonomy_gatekeeper.metrics import GatekeeperMetrics
+from autonomy_gatekeeper.tools.registry import Tool, ToolRegistry
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_TIMEOUT_SECONDS = 30.0
+
+
+@dataclass(frozen=True)
+class ToolCall:
+    """One requested tool invocation."""
+
+    id: str
+    tool: str
+    arguments: dict[str, Any] = field(default_factory=dict)
+    depends_on: tuple[str, ...] = ()
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any], position: int) -> ToolCall:
+        """Build a call from ``{"tool", "arguments", "id", "depends_on"}``.
+
+        ``id`` defaults to the call's position in the list.
+        """
+        if not isinstance(data, Mapping) or not data.get("tool"):
+            raise ValueError(f"Action #{position} has no tool")
+        arguments = data.get("arguments") or {}
+        if not isinstance(arguments, Mapping):
+            raise ValueError(f"Action #{position} arguments must be a mapping")
+        depends_on = data.get("depends_on") or ()
+        if isinstance(depends_on, str):
+            depends_on = (depends_on,)
+        return cls(
+            id=str(data.get("id", position)),
+            tool=str(data["tool"]),
+            arguments=dict(arguments),
+            depends_on=tuple(str(d) for d in depends_on),
+        )
+
+
+@dataclass
+class ToolResult:
+    """The outcome of one tool call.
+
+    ``status`` is ``ok``, ``error``, ``timeout`` or ``skipped`` (a call it
+    depends on did not succeed, or the LLM never confirmed the decision).
+    """
+
+    id: str
+    tool: str
+    status: str
+    result: Any = None
+    error: str | None = None
+    duration_ms: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the result as a plain dict."""
+        return asdict(self)
+
+
+def parse_tool_calls(actions: Iterable[Mapping[str, Any]]) -> list[ToolCall]:
+    """Parse and check a list of action dicts, raising ``ValueError`` if invalid.
+
+    Ids must be unique and ``depends_on`` may only name earlier calls, which
+    also rules out cycles.
+    """
+    calls: list[ToolCall] = []
+    seen: set[str] = set()
+    for position, action in enumerate(actions):
+        call = ToolCall.from_dict(action, position)
+        if call.id in seen:
+            raise ValueError(f"Duplicate action id {call.id}")
+        for dependency in call.depends_on:
+            if dependency not in seen:
+                raise ValueError(
+                    f"Action {call.id} depends on {dependency}, "
+                    "which is not an earlier action"
+                )
+        seen.add(call.id)
+        calls.append(call)
+    return calls
+
+
+def _invoke(tool: Tool, arguments: dict[str, Any]) -> Any:
+    result = tool(**arguments)
+    if inspect.isawaitable(result):
+        # Coroutine tools get a private event loop on their worker thread.
+        async def await_result() -> Any:
+            return await result
+
+        return asyncio.run(await_result())
+    return result
+
+
+class ToolExecutor:
+    """Dispatches tool calls from a registry onto a shared thread pool."""
+
+    def __init__(
+        self,
+        registry: ToolRegistry,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        timeout_seconds: float = DEFAULT_TIMEOUT_SECONDS,
+        metrics: GatekeeperMetrics | None = None,
+    ) -> None:
+        self.registry = registry
+        self.max_workers = max_workers
+        self.timeout_seconds = timeout_seconds
+        self.metrics = metrics
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="gatekeeper-tool"
+        )
+        # Calls in flight per tool, across runs and including timed-out calls
+        # that are still running.
+        self._in_flight: dict[str, int] = {}
+        self._lock = threading.Lock()
+        # Notified whenever a call gives back its slot; ``_releases`` counts
+        # them so a run can tell whether one happened since it last looked.
+        self._released = threading.Condition(self._lock)
+        self._releases = 0
+
+    def close(self) -> None:
+        """Stop accepting calls. Calls still running are not waited for."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _try_start(self, call: ToolCall, tool: Tool) -> Future[Any] | None:
+        """Submit ``call`` if a pool thread and a slot for its tool are free."""
+        cap = self.registry.limits(call.tool).max_concurrency
+        with self._lock:
+            if sum(self._in_flight.values()) >= self.max_workers:
+                return None
+            if cap is not None and self._in_flight.get(call.tool, 0) >= cap:
+                return None
+            self._in_flight[call.tool] = self._in_flight.get(call.tool, 0) + 1
+        try:
+            future = self._pool.submit(_invoke, tool, call.arguments)
+        except BaseException:
+            self._release(call.tool)
+            raise
+        future.add_done_callback(lambda _: self._release(call.tool))
+        return future
+
+    def _release(self, tool: str) -> None:
+        with self._released:
+            self._in_flight[tool] -= 1
+            self._releases += 1
+            self._released.notify_all()
+
+    def _wait_for_release(self, seen: int, timeout: float | None) -> None:
+        """Block until a slot is given back after ``seen`` releases, or timeout."""
+        with self._released:
+            self._released.wait_for(lambda: self._releases != seen, timeout)
+
+    def _finish(
+        self,
+        call: ToolCall,
+        status: str,
+        started: float | None = None,
+        result: Any = None,
+        error: str | None = None,
+    ) -> ToolResult:
+        elapsed = 0.0 if started is None else time.perf_counter() - started
+        if self.metrics is not None and started is not None:
+            self.metrics.tool_duration.observe(elapsed, tool=call.tool, status=status)
+        return ToolResult(
+            id=call.id,
+            tool=call.tool,
+            status=status,
+            result=result,
+            error=error,
+            duration_ms=round(elapsed * 1e3, 3),
+        )
+
+    def run(self, calls: Iterable[ToolCall]) -> Iterator[ToolResult]:
+        """Run ``calls``, yielding each result as soon as it is known.
+
+        A call starts once everything it depends on has succeeded, a pool
+        thread is free and its tool is under its concurrency cap, so its
+        timeout measures only its own run time. Results arrive in
+        completion order, one per call.
+        """
+        waiting = list(calls)
+        done: dict[str, ToolResult] = {}
+        # future -> (call, start time, deadline)
+        running: dict[Future[Any], tuple[ToolCall, float, float]] = {}
+
+        while waiting or running:
+            with self._lock:
+                seen = self._releases
+            blocked = False
+            progressed = True
+            while progressed:
+                progressed = False
+                for call in list(waiting):
+                    dependencies = [done.get(d) for d in call.depends_on]
+                    if any(result is None for result in dependencies):
+                        continue
+                    failed = [r.id for r in dependencies if r is not None and not r.ok]
+                    tool = self.registry.get(call.tool)
+                    if failed or tool is None:
+                        waiting.remove(call)
+                        if failed:
+                            error = f"depends on {', '.join(failed)}"
+                            result = self._finish(call, "skipped", error=error)
+                        else:
+                            error = f"unknown tool {call.tool}"
+                            result = self._finish(call, "error", error=error)
+                        done[call.id] = result
+                        progressed = True
+                        yield result
+                    elif (future := self._try_start(call, tool)) is not None:
+                        waiting.remove(call)
+                        limit = self.registry.limits(call.tool).timeout_seconds
+                        started = time.perf_counter()
+                        deadline = started + (
+                            self.timeout_seconds if limit is None else limit
+                        )
+                        running[future] = (call, started, deadline)
+                    else:
+                        blocked = True
+
+            timeout: float | None = None
+            if running:
+                next_deadline = min(deadline for _, _, deadline in running.values())
+                timeout = max(0.0, next_deadline - time.perf_counter())
+            if blocked:
+                # Slots held by other runs or by timed-out calls are given
+                # back without finishing any of our futures. Our own calls
+                # give theirs back too, so this also wakes when one finishes.
+                finished = {future for future in running if future.done()}
+                if not finished:
+                    self._wait_for_release(seen, timeout)
+                    finished = {future for future in running if future.done()}
+            elif running:
+                finished, _ = wait(
+                    running, timeout=timeout, return_when=FIRST_COMPLETED
+                )
+            else:
+                continue
+
+            now = time.perf_counter()
+            for future in list(running):
+                call, started, deadline = running[future]
+                if future in finished:
+                    del running[future]
+                    exc = future.exception()
+                    if exc is None:
+                        result = self._finish(call, "ok", started, future.result())
+                    else:
+                        error = f"{type(exc).__name__}: {exc}"
+                        result = self._finish(call, "error", started, error=error)
+                elif now >= deadline:
+                    del running[future]
+                    error = f"timed out after {deadline - started:g}s"
+                    result = self._finish(call, "timeout", started, error=error)
+                else:
+                    continue
+                done[call.id] = result
+                yield result
+
+    async def arun(self, calls: Iterable[ToolCall]) -> AsyncIterator[ToolResult]:
+        """Async variant of :meth:`run` that keeps the event loop free.
+
+        Scheduling happens on a helper thread and results are handed back to
+        the loop as they arrive.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue[ToolResult | BaseException | None] = asyncio.Queue()
+
+        def produce() -> None:
+            try:
+                for result in self.run(calls):
+                    loop.call_soon_threadsafe(queue.put_nowait, result)
+            except BaseException as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+            else:
+                loop.call_soon_threadsafe(queue.put_nowait, None)
+
+        producer = threading.Thread(
+            target=produce, name="gatekeeper-tool-scheduler", daemon=True
+        )
+        producer.start()
+        while (item := await queue.get()) is not None:
+            if isinstance(item, BaseException):
+                raise item
+            yield item
@@ -2,7 +2,9 @@
 
 In this governance agent, tools are intentionally minimal. The agent's
 primary function is evaluation, not execution. This registry exists as
-a pattern for extending the agent with action capabilities when needed.
+a pattern for extending the agent with action capabilities when needed;
+:mod:`autonomy_gatekeeper.tools.executor` runs the registered tools once a
+request is approved.
 """
 
 from __future__ import annotations
@@ -12,7 +14,10 @@ from typing import Any, Protocol
 
 
 class Tool(Protocol):
-    """Protocol for a callable tool."""
+    """Protocol for a callable tool.
+
+    A tool may also be an ``async`` callable.
+    """
 
     name: str
     description: str
@@ -20,20 +25,46 @@ class Tool(Protocol):
     def __call__(self, **kwargs: Any) -> Any: ...
 
 
+@dataclass(frozen=True)
+class ToolLimits:
+    """Per-tool execution limits; ``None`` means the executor default."""
+
+    timeout_seconds: float | None = None
+    max_concurrency: int | None = None
+
+
 @dataclass
 class ToolRegistry:
     """Registry of tools available to the agent."""
 
     _tools: dict[str, Tool] = field(default_factory=dict)
+    _limits: dict[str, ToolLimits] = field(default_factory=dict)
+
+    def register(
+        self,
+        tool: Tool,
+        timeout_seconds: float | None = None,
+        max_concurrency: int | None = None,
+    ) -> None:
+        """Register a tool by name.
 
-    def register(self, tool: Tool) -> None:
-        """Register a tool by name."""
+        ``timeout_seconds`` bounds each call and ``max_concurrency`` caps how
+        many calls to this tool run at once, e.g. to protect a rate-limited
+        API.
+        """
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
         self._tools[tool.name] = tool
+        self._limits[tool.name] = ToolLimits(timeout_seconds, max_concurrency)
 
     def get(self, name: str) -> Tool | None:
         """Retrieve a tool by name."""
         return self._tools.get(name)
 
+    def limits(self, name: str) -> ToolLimits:
+        """Return the execution limits registered for a tool."""
+        return self._limits.get(name, ToolLimits())
+
     def list_tools(self) -> list[str]:
         """List all registered tool names."""
         return list(self._tools.keys())
@@ -0,0 +1,30 @@
+"""Concurrency helpers shared by the sync and async evaluation paths."""
+
+from __future__ import annotations
+
+import asyncio
+import weakref
+
+
+class LoopLocalSemaphore:
+    """An ``asyncio.Semaphore`` per running event loop, all with the same limit.
+
+    asyncio primitives are bound to the loop that first waits on them, so a
+    single semaphore cannot be shared by engines used from several loops (or
+    from successive ``asyncio.run`` calls). This hands out one per loop.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = max(1, limit)
+        self._semaphores: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, asyncio.Semaphore
+        ] = weakref.WeakKeyDictionary()
+
+    def get(self) -> asyncio.Semaphore:
+        """Return the semaphore for the currently running loop."""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.limit)
+            self._semaphores[loop] = semaphore
+        return semaphore
@@ -0,0 +1,38 @@
+"""File helpers for reading large request payloads."""
+
+from __future__ import annotations
+
+import codecs
+import mmap
+from collections.abc import Iterator
+from pathlib import Path
+
+DEFAULT_CHUNK_BYTES = 1024 * 1024
+
+
+def read_text_chunks(
+    path: str | Path,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    encoding: str = "utf-8",
+) -> Iterator[str]:
+    """Yield the decoded text of ``path`` in chunks of about ``chunk_bytes``.
+
+    The file is memory-mapped, so only the chunk being decoded is copied
+    into the process. A multi-byte character split between chunks is
+    decoded whole, and undecodable bytes become U+FFFD.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    with open(path, "rb") as f:
+        size = Path(path).stat().st_size
+        if size == 0:  # empty files can't be mapped
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            for start in range(0, size, chunk_bytes):
+                text = decoder.decode(mapped[start : start + chunk_bytes])
+                if text:
+                    yield text
+    text = decoder.decode(b"", final=True)
+    if text:
+        yield text
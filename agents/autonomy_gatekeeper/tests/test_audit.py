@@ -0,0 +1,271 @@
+"""Tests for the segmented decision audit store."""
+
+from __future__ import annotations
+
+import json
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from autonomy_gatekeeper.audit import (
+    AuditReader,
+    AuditWriter,
+    SegmentIndex,
+    index_path,
+    parse_time,
+)
+from autonomy_gatekeeper.cli import main
+from autonomy_gatekeeper.config import Settings
+from autonomy_gatekeeper.engine import Gatekeeper
+from autonomy_gatekeeper.schemas import Decision, DecisionCard, PolicyMatch, RiskLevel
+
+RULES_PATH = str(
+    Path(__file__).parent.parent
+    / "src"
+    / "autonomy_gatekeeper"
+    / "policy"
+    / "rules.yaml"
+)
+
+START = datetime(2025, 1, 1, tzinfo=UTC)
+
+# (decision, risk level, matched rule IDs), cycled over the test cards.
+SHAPES = [
+    (Decision.ACT, RiskLevel.LOW, ["READ_ONLY"]),
+    (Decision.HOLD, RiskLevel.MEDIUM, ["DATA_MODIFICATION"]),
+    (Decision.ESCALATE, RiskLevel.CRITICAL, ["PROD_DEPLOY", "DATA_DELETION"]),
+    (Decision.HOLD, RiskLevel.HIGH, []),
+]
+
+
+def _card(i: int) -> DecisionCard:
+    decision, risk, rules = SHAPES[i % len(SHAPES)]
+    return DecisionCard(
+        request=f"request {i}",
+        decision=decision,
+        risk_level=risk,
+        reasoning="test",
+        matched_policies=[PolicyMatch(rule_id=r, description=r) for r in rules],
+        timestamp=START + timedelta(minutes=i),
+    )
+
+
+def _write(directory: Path, count: int, **kwargs: object) -> AuditWriter:
+    writer = AuditWriter(directory, **kwargs)  # type: ignore[arg-type]
+    for i in range(count):
+        writer.append(_card(i))
+    writer.close()
+    return writer
+
+
+def _requests(records: list[dict]) -> list[str]:
+    return [r["request"] for r in records]
+
+
+class TestAuditWriter:
+    """Test batching, segment rolling and sealing."""
+
+    def test_flush_writes_queued_cards(self, tmp_path: Path) -> None:
+        writer = AuditWriter(tmp_path, flush_interval_seconds=10)
+        for i in range(5):
+            writer.append(_card(i))
+        assert writer.flush(timeout=5)
+        assert AuditReader(tmp_path).count() == 5
+        writer.close()
+        assert writer.stats.written == 5
+        assert writer.stats.batches <= 5
+
+    def test_segments_roll_and_are_sealed(self, tmp_path: Path) -> None:
+        writer = _write(tmp_path, 40, segment_max_bytes=2_000)
+        segments = AuditReader(tmp_path).segments()
+        assert len(segments) > 1
+        assert writer.stats.segments == len(segments)
+        for segment in segments:
+            index = SegmentIndex.from_bytes(index_path(segment).read_bytes())
+            assert index.size == segment.stat().st_size
+        assert AuditReader(tmp_path).count() == 40
+
+    def test_new_writer_starts_a_new_segment(self, tmp_path: Path) -> None:
+        _write(tmp_path, 3)
+        _write(tmp_path, 3)
+        assert len(AuditReader(tmp_path).segments()) == 2
+        assert AuditReader(tmp_path).count() == 6
+
+    def test_writers_sharing_a_directory_use_their_own_segments(
+        self, tmp_path: Path
+    ) -> None:
+        first = AuditWriter(tmp_path, segment_max_bytes=600)
+        second = AuditWriter(tmp_path, segment_max_bytes=600)
+        for i in range(20):
+            (first if i % 2 else second).append(_card(i))
+            assert (first if i % 2 else second).flush(timeout=5)
+        first.close()
+        second.close()
+        segments = sorted(tmp_path.glob("segment-*.ndjson"))
+        assert len(segments) == first.stats.segments + second.stats.segments
+        for segment in segments:
+            index = SegmentIndex.from_bytes(index_path(segment).read_bytes())
+            assert index.size == segment.stat().st_size
+            assert len(index) == len(segment.read_bytes().splitlines())
+        assert sorted(_requests(list(AuditReader(tmp_path).query()))) == sorted(
+            f"request {i}" for i in range(20)
+        )
+
+    def test_append_after_close_fails(self, tmp_path: Path) -> None:
+        writer = _write(tmp_path, 1)
+        with pytest.raises(RuntimeError):
+            writer.append(_card(1))
+
+
+class TestAuditReader:
+    """Test indexed queries."""
+
+    @pytest.fixture
+    def reader(self, tmp_path: Path) -> AuditReader:
+        _write(tmp_path, 40, segment_max_bytes=3_000)
+        return AuditReader(tmp_path)
+
+    def test_filter_by_decision(self, reader: AuditReader) -> None:
+        records = list(reader.query(decisions=["escalate"]))
+        assert len(records) == 10
+        assert {r["decision"] for r in records} == {"ESCALATE"}
+
+    def test_filters_combine(self, reader: AuditReader) -> None:
+        records = list(reader.query(decisions=["HOLD"], risk_levels=["high"]))
+        assert _requests(records) == [f"request {i}" for i in range(3, 40, 4)]
+
+    def test_filter_by_rule(self, reader: AuditReader) -> None:
+        assert reader.count(rule_ids=["DATA_DELETION"]) == 10
+        assert reader.count(rule_ids=["READ_ONLY", "DATA_DELETION"]) == 20
+        assert reader.count(rule_ids=["MISSING"]) == 0
+
+    def test_time_range_is_half_open(self, reader: AuditReader) -> None:
+        records = list(
+            reader.query(
+                since=START + timedelta(minutes=10),
+                until=START + timedelta(minutes=15),
+            )
+        )
+        assert _requests(records) == [f"request {i}" for i in range(10, 15)]
+
+    def test_limit_and_newest_first(self, reader: AuditReader) -> None:
+        records = list(reader.query(decisions=["ACT"], limit=3, newest_first=True))
+        assert _requests(records) == ["request 36", "request 32", "request 28"]
+
+    def test_raw_records_are_card_json(self, reader: AuditReader) -> None:
+        raw = next(reader.query_raw(limit=1))
+        card = DecisionCard.model_validate_json(raw)
+        assert card.request == "request 0"
+
+
+class TestRecovery:
+    """Test segments without a usable index."""
+
+    def test_unsealed_segment_is_scanned(self, tmp_path: Path) -> None:
+        writer = AuditWriter(tmp_path)
+        for i in range(4):
+            writer.append(_card(i))
+        assert writer.flush(timeout=5)
+        assert not index_path(AuditReader(tmp_path).segments()[0]).exists()
+        assert AuditReader(tmp_path).count(decisions=["HOLD"]) == 2
+        writer.close()
+
+    def test_stale_index_is_rebuilt(self, tmp_path: Path) -> None:
+        _write(tmp_path, 4)
+        segment = AuditReader(tmp_path).segments()[0]
+        with open(segment, "ab") as f:
+            f.write(_card(4).model_dump_json().encode() + b"\n")
+        assert AuditReader(tmp_path).count() == 5
+
+        AuditWriter(tmp_path).close()
+        index = SegmentIndex.from_bytes(index_path(segment).read_bytes())
+        assert len(index) == 5
+
+    def test_corrupt_index_is_ignored(self, tmp_path: Path) -> None:
+        _write(tmp_path, 4)
+        segment = AuditReader(tmp_path).segments()[0]
+        index_path(segment).write_bytes(b"not an index")
+        assert AuditReader(tmp_path).count(risk_levels=["low"]) == 1
+
+
+class TestParseTime:
+    """Test --since/--until parsing."""
+
+    NOW = datetime(2025, 6, 1, 12, 0, tzinfo=UTC)
+
+    @pytest.mark.parametrize(
+        ("value", "delta"),
+        [
+            ("30s", timedelta(seconds=30)),
+            ("15m", timedelta(minutes=15)),
+            ("24h", timedelta(hours=24)),
+            ("7d", timedelta(days=7)),
+            ("1w", timedelta(weeks=1)),
+        ],
+    )
+    def test_durations(self, value: str, delta: timedelta) -> None:
+        assert parse_time(value, now=self.NOW) == self.NOW - delta
+
+    def test_iso_timestamp_defaults_to_utc(self) -> None:
+        assert parse_time("2025-01-02T03:04:05") == datetime(
+            2025, 1, 2, 3, 4, 5, tzinfo=UTC
+        )
+
+    def test_invalid(self) -> None:
+        with pytest.raises(ValueError):
+            parse_time("yesterday")
+
+
+class TestEngineAudit:
+    """Test that the engine audits every card."""
+
+    def test_cards_are_audited(self, tmp_path: Path) -> None:
+        settings = Settings(
+            llm_provider="local",
+            policy_path=RULES_PATH,
+            llm_cache_enabled=False,
+            audit_dir=str(tmp_path),
+        )
+        engine = Gatekeeper(settings)
+        engine.evaluate("Drop the production database")
+        engine.evaluate("List all running services")
+        engine.close()
+
+        reader = AuditReader(tmp_path)
+        assert reader.count() == 2
+        [record] = reader.query(rule_ids=["DATA_DELETE"])
+        assert record["request"] == "Drop the production database"
+
+
+class TestAuditCli:
+    """Test the audit query command."""
+
+    def test_query(self, tmp_path: Path) -> None:
+        _write(tmp_path, 8)
+        result = CliRunner().invoke(
+            main,
+            ["audit", "query", "--dir", str(tmp_path), "--decision", "ESCALATE"],
+        )
+        assert result.exit_code == 0, result.output
+        lines = result.output.splitlines()
+        assert len(lines) == 2
+        assert "PROD_DEPLOY,DATA_DELETION" in lines[0]
+
+    def test_json_output_and_count(self, tmp_path: Path) -> None:
+        _write(tmp_path, 8)
+        args = ["audit", "query", "--dir", str(tmp_path), "--rule", "READ_ONLY"]
+        result = CliRunner().invoke(main, [*args, "--json-output"])
+        assert [json.loads(line)["request"] for line in result.output.splitlines()] == [
+            "request 0",
+            "request 4",
+        ]
+        result = CliRunner().invoke(main, [*args, "--count"])
+        assert result.output.strip() == "2"
+
+    def test_bad_time_is_an_error(self, tmp_path: Path) -> None:
+        result = CliRunner().invoke(
+            main, ["audit", "query", "--dir", str(tmp_path), "--since", "soon"]
+        )
+        assert result.exit_code == 1
@@ -0,0 +1,154 @@
+"""Tests for streaming batch evaluation."""
+
+from __future__ import annotations
+
+import io
+import json
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from autonomy_gatekeeper import graph
+from autonomy_gatekeeper.app import evaluate_batch_file
+from autonomy_gatekeeper.batch import (
+    evaluate_batch,
+    parse_request_line,
+    read_checkpoint,
+    write_checkpoint,
+)
+from autonomy_gatekeeper.config import Settings
+from autonomy_gatekeeper.engine import Gatekeeper
+
+RULES_PATH = str(
+    Path(__file__).parent.parent
+    / "src"
+    / "autonomy_gatekeeper"
+    / "policy"
+    / "rules.yaml"
+)
+
+LLM_REPLY = json.dumps(
+    {
+        "decision": "ACT",
+        "risk_level": "low",
+        "reasoning": "Read-only request.",
+        "recommended_action": "Proceed.",
+    }
+)
+
+
+@pytest.fixture()
+def engine(monkeypatch: pytest.MonkeyPatch) -> Gatekeeper:
+    monkeypatch.setattr(
+        graph, "create_llm", lambda settings: FakeListChatModel(responses=[LLM_REPLY])
+    )
+    return Gatekeeper(Settings(openai_api_key="test", policy_path=RULES_PATH))
+
+
+def _jsonl(*requests: str) -> io.StringIO:
+    return io.StringIO("".join(json.dumps({"request": r}) + "\n" for r in requests))
+
+
+class TestParseRequestLine:
+    """Test JSONL input parsing."""
+
+    def test_object_line(self) -> None:
+        assert parse_request_line('{"request": "List services"}') == "List services"
+
+    def test_string_line(self) -> None:
+        assert parse_request_line('"List services"') == "List services"
+
+    def test_blank_line(self) -> None:
+        assert parse_request_line("  \n") is None
+
+    def test_invalid_line(self) -> None:
+        with pytest.raises(ValueError):
+            parse_request_line('{"text": "missing request"}')
+
+
+class TestEvaluateBatch:
+    """Test streaming evaluation and checkpointing."""
+
+    def test_writes_cards_in_order(self, engine: Gatekeeper) -> None:
+        requests = ["Deploy to production", "Summarize the report", "Drop the table"]
+        sink = io.StringIO()
+        stats = evaluate_batch(engine, _jsonl(*requests), sink, concurrency=2)
+
+        cards = [json.loads(line) for line in sink.getvalue().splitlines()]
+        assert [c["request"] for c in cards] == requests
+        assert stats.processed == 3
+        assert stats.llm_skipped == 2
+        assert stats.errors == 0
+
+    def test_skips_blank_and_malformed_lines(self, engine: Gatekeeper) -> None:
+        source = io.StringIO('\n"Deploy to production"\nnot json\n')
+        sink = io.StringIO()
+        stats = evaluate_batch(engine, source, sink)
+        assert stats.processed == 1
+
+    def test_resumes_from_checkpoint(self, engine: Gatekeeper, tmp_path: Path) -> None:
+        checkpoint = tmp_path / "batch.ckpt"
+        write_checkpoint(checkpoint, 2)
+        source = _jsonl("Deploy to production", "Drop the table", "Purge old logs")
+        sink = io.StringIO()
+
+        stats = evaluate_batch(engine, source, sink, checkpoint_path=checkpoint)
+
+        cards = [json.loads(line) for line in sink.getvalue().splitlines()]
+        assert [c["request"] for c in cards] == ["Purge old logs"]
+        assert stats.resumed_from == 2
+        assert read_checkpoint(checkpoint) == 3
+
+    def test_resume_after_crash_writes_no_duplicates(
+        self, engine: Gatekeeper, tmp_path: Path
+    ) -> None:
+        requests = [f"Drop table {i}" for i in range(6)]
+        input_path = tmp_path / "in.jsonl"
+        input_path.write_text(_jsonl(*requests).getvalue())
+        output = tmp_path / "out.jsonl"
+        checkpoint = tmp_path / "batch.ckpt"
+
+        def crashing() -> Iterator[str]:
+            yield from _jsonl(*requests).readlines()[:5]
+            raise KeyboardInterrupt
+
+        # Card 4 reaches the output after the checkpoint at card 3.
+        with (
+            pytest.raises(KeyboardInterrupt),
+            output.open("w", encoding="utf-8") as sink,
+        ):
+            evaluate_batch(
+                engine,
+                crashing(),  # type: ignore[arg-type]
+                sink,
+                concurrency=1,
+                checkpoint_path=checkpoint,
+                checkpoint_every=3,
+            )
+        assert read_checkpoint(checkpoint) == 3
+        assert len(output.read_text().splitlines()) == 4
+
+        evaluate_batch_file(
+            str(input_path),
+            str(output),
+            Settings(openai_api_key="test", policy_path=RULES_PATH),
+            checkpoint_path=str(checkpoint),
+        )
+        cards = [json.loads(line) for line in output.read_text().splitlines()]
+        assert [c["request"] for c in cards] == requests
+        assert read_checkpoint(checkpoint) == 6
+
+    def test_failed_request_is_recorded(
+        self, engine: Gatekeeper, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        def boom(settings: Settings) -> None:
+            raise RuntimeError("LLM unavailable")
+
+        monkeypatch.setattr(graph, "create_llm", boom)
+        sink = io.StringIO()
+        stats = evaluate_batch(engine, _jsonl("Summarize the report"), sink)
+        record = json.loads(sink.getvalue())
+        assert record == {"request": "Summarize the report", "error": "LLM unavailable"}
+        assert stats.errors == 1
@@ -0,0 +1,175 @@
+"""Tests for the long-lived Gatekeeper engine."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+import yaml
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.runnables import RunnableLambda
+
+from autonomy_gatekeeper import graph
+from autonomy_gatekeeper.app import aevaluate_request, evaluate_request
+from autonomy_gatekeeper.config import Settings
+from autonomy_gatekeeper.engine import Gatekeeper, clear_engines, get_engine
+from autonomy_gatekeeper.schemas import Decision, RiskLevel
+
+RULES_PATH = str(
+    Path(__file__).parent.parent
+    / "src"
+    / "autonomy_gatekeeper"
+    / "policy"
+    / "rules.yaml"
+)
+
+LLM_REPLY = json.dumps(
+    {
+        "decision": "ACT",
+        "risk_level": "low",
+        "reasoning": "Read-only request.",
+        "recommended_action": "Proceed.",
+    }
+)
+
+
+@pytest.fixture()
+def settings() -> Settings:
+    return Settings(openai_api_key="test", policy_path=RULES_PATH)
+
+
+@pytest.fixture()
+def fake_llm(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(
+        graph, "create_llm", lambda settings: FakeListChatModel(responses=[LLM_REPLY])
+    )
+
+
+@pytest.fixture(autouse=True)
+def _reset_engines() -> None:
+    clear_engines()
+
+
+class TestGatekeeper:
+    """Test evaluation against a warm engine."""
+
+    def test_policy_loaded_once(
+        self, settings: Settings, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        engine = Gatekeeper(settings)
+        calls: list[str] = []
+        monkeypatch.setattr(
+            graph, "load_policy_rules", lambda path: calls.append(path) or []
+        )
+        engine.evaluate("Deploy model v2.3 to production")
+        engine.evaluate("Delete all user records")
+        assert calls == []
+
+    def test_critical_escalation(self, settings: Settings) -> None:
+        card = Gatekeeper(settings).evaluate("Deploy model v2.3 to production")
+        assert card.decision == Decision.ESCALATE
+        assert card.risk_level == RiskLevel.CRITICAL
+
+    def test_llm_path(self, settings: Settings, fake_llm: None) -> None:
+        card = Gatekeeper(settings).evaluate("Summarize the quarterly report")
+        assert card.decision == Decision.ACT
+        assert card.reasoning == "Read-only request."
+
+    def test_evaluate_many_preserves_order(
+        self, settings: Settings, fake_llm: None
+    ) -> None:
+        requests = ["Deploy to production", "Summarize the report", "Drop the table"]
+        cards = Gatekeeper(settings).evaluate_many(requests, max_concurrency=2)
+        assert [c.request for c in cards] == requests
+        assert [c.decision for c in cards] == [
+            Decision.ESCALATE,
+            Decision.ACT,
+            Decision.ESCALATE,
+        ]
+
+    def test_evaluate_many_empty(self, settings: Settings) -> None:
+        assert Gatekeeper(settings).evaluate_many([]) == []
+
+    def test_routing_stats(self, tmp_path: Path, fake_llm: None) -> None:
+        policy = yaml.safe_load(Path(RULES_PATH).read_text())
+        for rule in policy["rules"]:
+            if rule["id"] == "MONITORING":
+                rule["llm"] = "skip"
+        rules = tmp_path / "rules.yaml"
+        rules.write_text(yaml.safe_dump(policy))
+        engine = Gatekeeper(Settings(openai_api_key="test", policy_path=str(rules)))
+        engine.evaluate("Check health of the payment service")
+        engine.evaluate("Drop the users table")
+        engine.evaluate("Summarize the quarterly report")
+        assert engine.routing_stats.to_dict() == {
+            "evaluated": 3,
+            "llm_assessed": 1,
+            "llm_skipped": 2,
+            "skipped_by_rule": 1,
+            "skipped_by_escalation": 1,
+        }
+
+
+class TestEngineCache:
+    """Test the cached default engine behind evaluate_request."""
+
+    def test_equal_settings_share_engine(self, settings: Settings) -> None:
+        other = Settings(openai_api_key="test", policy_path=RULES_PATH)
+        assert get_engine(settings) is get_engine(other)
+
+    def test_different_settings_get_new_engine(self, settings: Settings) -> None:
+        other = Settings(openai_api_key="other", policy_path=RULES_PATH)
+        assert get_engine(settings) is not get_engine(other)
+
+    def test_evaluate_request_reuses_engine(self, settings: Settings) -> None:
+        evaluate_request("Deploy to production", settings=settings)
+        engine = get_engine(settings)
+        evaluate_request("Deploy to production", settings=settings)
+        assert get_engine(settings) is engine
+
+
+class TestAsyncEvaluation:
+    """Test the native asyncio evaluation path."""
+
+    def test_aevaluate(self, settings: Settings, fake_llm: None) -> None:
+        card = asyncio.run(
+            Gatekeeper(settings).aevaluate("Summarize the quarterly report")
+        )
+        assert card.decision == Decision.ACT
+        assert card.reasoning == "Read-only request."
+
+    def test_aevaluate_request_policy_only(self, settings: Settings) -> None:
+        card = asyncio.run(aevaluate_request("Drop the users table", settings))
+        assert card.decision == Decision.ESCALATE
+
+    def test_llm_concurrency_is_bounded(
+        self, settings: Settings, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        in_flight = 0
+        peak = 0
+
+        async def slow_reply(_: object) -> str:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return LLM_REPLY
+
+        monkeypatch.setattr(
+            graph,
+            "create_llm",
+            lambda settings: RunnableLambda(lambda _: LLM_REPLY, afunc=slow_reply),
+        )
+        settings.llm_max_concurrency = 3
+        settings.llm_cache_enabled = False
+        engine = Gatekeeper(settings)
+
+        # Successive event loops on one engine each get their own semaphore.
+        cards = asyncio.run(engine.aevaluate_many(["Summarize the report"] * 12))
+        cards += asyncio.run(engine.aevaluate_many(["Summarize the report"] * 12))
+        assert len(cards) == 24
+        assert all(card.decision == Decision.ACT for card in cards)
+        assert peak == 3
@@ -149,3 +149,103 @@ class TestDecisionCard:
         # Invalid values should fall back to HOLD / MEDIUM
         assert card_data["decision"] == Decision.HOLD.value
         assert card_data["risk_level"] == RiskLevel.MEDIUM.value
+
+
+class TestDeclarativeRouting:
+    """Test per-rule LLM routing declared in the policy file."""
+
+    @pytest.fixture()
+    def routed_rules(self) -> list[dict]:
+        return [
+            {
+                "id": "READ",
+                "description": "Reads",
+                "keywords": ["list"],
+                "decision": "ACT",
+                "risk_level": "low",
+                "llm": "skip",
+                "skip_when": {"only_rules": ["READ"], "max_request_chars": 40},
+            },
+            {
+                "id": "CONFIG",
+                "description": "Config",
+                "keywords": ["config"],
+                "decision": "HOLD",
+                "risk_level": "medium",
+            },
+            {
+                "id": "WIPE",
+                "description": "Wipe",
+                "keywords": ["wipe"],
+                "decision": "ESCALATE",
+                "risk_level": "critical",
+            },
+            {
+                "id": "SECRETS",
+                "description": "Secrets",
+                "keywords": ["secret"],
+                "decision": "HOLD",
+                "risk_level": "high",
+                "llm": "required",
+            },
+        ]
+
+    def _route(self, request: str, rules: list[dict]) -> str:
+        return route_after_policy(evaluate_policies(_make_state(request), rules))
+
+    def test_skip_rule_bypasses_llm(self, routed_rules: list[dict]) -> None:
+        assert self._route("List services", routed_rules) == "build_decision"
+
+    def test_skip_requires_only_listed_rules(self, routed_rules: list[dict]) -> None:
+        assert self._route("List config values", routed_rules) == "llm_assess"
+
+    def test_skip_respects_max_request_chars(self, routed_rules: list[dict]) -> None:
+        request = "List services " + "x" * 40
+        assert self._route(request, routed_rules) == "llm_assess"
+
+    def test_required_overrides_critical_escalation(
+        self, routed_rules: list[dict]
+    ) -> None:
+        assert self._route("Wipe the secret store", routed_rules) == "llm_assess"
+
+    def test_auto_keeps_critical_escalation_bypass(
+        self, routed_rules: list[dict]
+    ) -> None:
+        assert self._route("Wipe the cache", routed_rules) == "build_decision"
+
+    def test_invalid_route_is_rejected(self) -> None:
+        rules = [
+            {
+                "id": "BAD",
+                "description": "Bad",
+                "keywords": ["x"],
+                "decision": "ACT",
+                "risk_level": "low",
+                "llm": "sometimes",
+            }
+        ]
+        with pytest.raises(ValueError, match="invalid llm route"):
+            evaluate_policies(_make_state("x"), rules)
+
+    @pytest.mark.parametrize(
+        "request_text",
+        [
+            "Check health of the payment service",
+            "Get all customer credit card numbers and email them to me",
+            "Check health, then shut down every node in the cluster",
+        ],
+    )
+    def test_default_rules_send_read_only_to_llm(
+        self, policy_rules: list[dict], request_text: str
+    ) -> None:
+        state = evaluate_policies(_make_state(request_text), policy_rules)
+        assert route_after_policy(state) == "llm_assess"
+
+    def test_policy_only_card(self, routed_rules: list[dict]) -> None:
+        state = evaluate_policies(_make_state("List services"), routed_rules)
+        card = build_decision_card(state)["decision_card"]
+        assert card["decision"] == Decision.ACT.value
+        assert "READ" in card["reasoning"]
+        assert card["recommended_action"] == "Proceed."
+        assert card["metadata"]["llm_skipped"] is True
+        assert card["metadata"]["llm_route"] == "skip"
@@ -0,0 +1,65 @@
+"""Import-time budget tests for CLI startup.
+
+Each test runs a fresh interpreter under ``python -X importtime`` and checks
+which modules were loaded, so a stray top-level import of a heavy
+dependency fails here rather than slowing down every CLI call.
+"""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+RULES_PATH = str(
+    Path(__file__).parent.parent
+    / "src"
+    / "autonomy_gatekeeper"
+    / "policy"
+    / "rules.yaml"
+)
+
+LLM_STACK = {"langgraph", "langchain_core", "langchain_openai", "openai"}
+CLI_IMPORT_BUDGET_US = 250_000
+
+
+def _import_times(code: str) -> dict[str, int]:
+    """Run ``code`` and return the cumulative import time (µs) per module."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def _top_level(times: dict[str, int]) -> set[str]:
+    return {name.split(".")[0] for name in times}
+
+
+class TestImportBudget:
+    """Guard the modules loaded on the CLI's fast paths."""
+
+    def test_cli_import_is_light(self) -> None:
+        times = _import_times("import autonomy_gatekeeper.cli")
+        assert not _top_level(times) & (LLM_STACK | {"rich", "pydantic_settings"})
+        assert times["autonomy_gatekeeper.cli"] < CLI_IMPORT_BUDGET_US
+
+    def test_policy_only_evaluation_skips_llm_stack(self) -> None:
+        times = _import_times(
+            "from autonomy_gatekeeper.config import Settings\n"
+            "from autonomy_gatekeeper.engine import Gatekeeper\n"
+            f"settings = Settings(policy_path={RULES_PATH!r})\n"
+            "card = Gatekeeper(settings).evaluate("
+            "'Delete all production data and drop the database')\n"
+            "assert card.metadata['llm_skipped']\n"
+        )
+        assert "autonomy_gatekeeper.engine" in times
+        assert not _top_level(times) & LLM_STACK
@@ -0,0 +1,184 @@
+"""Tests for the LLM decision cache."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from autonomy_gatekeeper import graph
+from autonomy_gatekeeper.config import Settings
+from autonomy_gatekeeper.engine import Gatekeeper
+from autonomy_gatekeeper.llm.cache import DecisionCache, MemoryTier, make_cache_key
+
+RULES_PATH = str(
+    Path(__file__).parent.parent
+    / "src"
+    / "autonomy_gatekeeper"
+    / "policy"
+    / "rules.yaml"
+)
+
+VERDICT = {"decision": "ACT", "risk_level": "low", "reasoning": "ok"}
+
+
+class TestCacheKey:
+    """Test cache key construction."""
+
+    def test_whitespace_and_case_are_normalized(self) -> None:
+        a = make_cache_key("Check  health\n", ["MONITORING"], "gpt-4o", "p1")
+        b = make_cache_key("check health", ["MONITORING"], "gpt-4o", "p1")
+        assert a == b
+
+    def test_rule_order_is_ignored(self) -> None:
+        a = make_cache_key("x", ["A", "B"], "gpt-4o", "p1")
+        b = make_cache_key("x", ["B", "A"], "gpt-4o", "p1")
+        assert a == b
+
+    @pytest.mark.parametrize(
+        "other",
+        [
+            ("x", ["A"], "gpt-4o-mini", "p1"),
+            ("x", ["A"], "gpt-4o", "p2"),
+            ("x", [], "gpt-4o", "p1"),
+        ],
+    )
+    def test_model_prompt_and_rules_change_key(self, other: tuple) -> None:
+        assert make_cache_key("x", ["A"], "gpt-4o", "p1") != make_cache_key(*other)
+
+    def test_graph_keys_include_the_provider(self) -> None:
+        local = Settings(llm_provider="local", openai_model="gpt-4o")
+        remote = Settings(llm_provider="openai", openai_model="gpt-4o")
+        state = Gatekeeper(local)._evaluate_policy("restart the service")
+        assert graph._cache_key(state, local) != graph._cache_key(state, remote)
+        assert graph._policy_key(state, local) != graph._policy_key(state, remote)
+
+
+class TestTiers:
+    """Test eviction, expiry and the shared disk tier."""
+
+    def test_lru_eviction(self) -> None:
+        tier = MemoryTier(max_entries=2, ttl_seconds=60)
+        tier.put("a", {"v": 1})
+        tier.put("b", {"v": 2})
+        tier.get("a")
+        tier.put("c", {"v": 3})
+        assert tier.get("b") is None
+        assert tier.get("a") == {"v": 1}
+
+    def test_ttl_expiry(self) -> None:
+        tier = MemoryTier(max_entries=2, ttl_seconds=0)
+        tier.put("a", {"v": 1})
+        assert tier.get("a") is None
+
+    def test_disk_tier_shared_between_caches(self, tmp_path: Path) -> None:
+        path = tmp_path / "decisions.sqlite"
+        DecisionCache(path=path).store("k", VERDICT)
+        value, info = DecisionCache(path=path).get_or_compute("k", lambda: {})
+        assert value == VERDICT
+        assert info["status"] == "hit"
+        assert info["tier"] == "disk"
+
+
+class TestCoalescing:
+    """Test that concurrent misses share one computation."""
+
+    def test_threads_share_one_call(self) -> None:
+        cache = DecisionCache()
+        calls = 0
+        lock = threading.Lock()
+
+        def compute() -> dict:
+            nonlocal calls
+            with lock:
+                calls += 1
+            time.sleep(0.05)
+            return VERDICT
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(
+                pool.map(lambda _: cache.get_or_compute("k", compute), range(8))
+            )
+
+        assert calls == 1
+        assert all(value == VERDICT for value, _ in results)
+        assert cache.stats.misses == 1
+        assert cache.stats.coalesced + cache.stats.hits == 7
+
+    def test_async_callers_share_one_call(self) -> None:
+        cache = DecisionCache()
+        calls = 0
+
+        async def compute() -> dict:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return VERDICT
+
+        async def run() -> list:
+            return await asyncio.gather(
+                *(cache.aget_or_compute("k", compute) for _ in range(10))
+            )
+
+        results = asyncio.run(run())
+        assert calls == 1
+        assert [info["status"] for _, info in results].count("coalesced") == 9
+
+    def test_unstorable_values_are_not_cached(self) -> None:
+        cache = DecisionCache()
+        cache.get_or_compute(
+            "k", lambda: {"fallback": True}, should_store=lambda v: False
+        )
+        _, info = cache.get_or_compute("k", lambda: VERDICT)
+        assert info["status"] == "miss"
+
+
+class TestEngineIntegration:
+    """Test cache metadata on Decision Cards."""
+
+    def test_repeated_request_hits_cache(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        calls = 0
+
+        def fake_llm(settings: Settings) -> FakeListChatModel:
+            nonlocal calls
+            calls += 1
+            return FakeListChatModel(
+                responses=[
+                    '{"decision": "ACT", "risk_level": "low", "reasoning": "ok"}'
+                ]
+            )
+
+        monkeypatch.setattr(graph, "create_llm", fake_llm)
+        engine = Gatekeeper(Settings(openai_api_key="test", policy_path=RULES_PATH))
+
+        first = engine.evaluate("Update the cache configuration")
+        second = engine.evaluate("update the  cache configuration")
+
+        assert calls == 1
+        assert first.metadata["cache"]["status"] == "miss"
+        assert second.metadata["cache"] == {
+            "status": "hit",
+            "tier": "memory",
+            "hits": 1,
+            "misses": 1,
+        }
+        assert second.decision == first.decision
+
+    def test_fallback_is_not_cached(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(
+            graph,
+            "create_llm",
+            lambda settings: FakeListChatModel(responses=["not json"]),
+        )
+        engine = Gatekeeper(Settings(openai_api_key="test", policy_path=RULES_PATH))
+
+        first = engine.evaluate("Update the cache configuration")
+        second = engine.evaluate("Update the cache configuration")
+
+        assert first.metadata["llm_fallback"] is True
+        assert second.metadata["cache"]["status"] == "miss"
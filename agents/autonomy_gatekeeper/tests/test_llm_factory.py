@@ -0,0 +1,255 @@
+"""Tests for the LLM provider registry and the local stand-in model."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import statistics
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from autonomy_gatekeeper.config import Settings
+from autonomy_gatekeeper.engine import Gatekeeper
+from autonomy_gatekeeper.llm import factory
+from autonomy_gatekeeper.llm.local import LocalGovernanceModel, LocalLLMError
+from autonomy_gatekeeper.llm.prompts import governance_chain
+from autonomy_gatekeeper.schemas import Decision, RiskLevel
+
+RULES_PATH = str(
+    Path(__file__).parent.parent
+    / "src"
+    / "autonomy_gatekeeper"
+    / "policy"
+    / "rules.yaml"
+)
+
+
+def _local_settings(**overrides: object) -> Settings:
+    return Settings(
+        llm_provider="local",
+        policy_path=RULES_PATH,
+        llm_cache_enabled=False,
+        **overrides,  # type: ignore[arg-type]
+    )
+
+
+class TestRegistry:
+    """Test provider selection through settings."""
+
+    def test_builtin_providers(self) -> None:
+        assert {"openai", "local"} <= set(factory.available_providers())
+
+    def test_unknown_provider(self) -> None:
+        with pytest.raises(ValueError, match="Unknown LLM provider 'nope'"):
+            factory.create_llm(Settings(llm_provider="nope"))
+
+    def test_custom_provider(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(factory, "_providers", dict(factory._providers))
+        model = LocalGovernanceModel()
+        factory.register_provider("custom")(lambda settings: model)
+        assert factory.create_llm(Settings(llm_provider="custom")) is model
+
+    def test_local_model_reused_per_configuration(self) -> None:
+        settings = _local_settings(local_llm_seed=7)
+        assert factory.create_llm(settings) is factory.create_llm(settings)
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Answers chat completions with a fixed verdict over keep-alive HTTP/1.1."""
+
+    protocol_version = "HTTP/1.1"
+    connections = 0
+
+    def setup(self) -> None:
+        super().setup()
+        type(self).connections += 1
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers["Content-Length"]))
+        content = json.dumps({"decision": "HOLD", "risk_level": "medium"})
+        body = json.dumps(
+            {
+                "id": "stub",
+                "object": "chat.completion",
+                "created": 0,
+                "model": "gpt-4o",
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class _StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+@pytest.fixture
+def stub_openai() -> Iterator[str]:
+    """Base URL of a local stub of the OpenAI chat completions API."""
+    _StubHandler.connections = 0
+    server = _StubServer(("127.0.0.1", 0), _StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    factory.clear_llm_pool()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1"
+    factory.clear_llm_pool()
+    server.shutdown()
+    server.server_close()
+
+
+def _openai_settings(base_url: str, **overrides: object) -> Settings:
+    values: dict[str, object] = {
+        "llm_provider": "openai",
+        "openai_api_key": "sk-test",
+        "openai_base_url": base_url,
+        "policy_path": RULES_PATH,
+        "llm_cache_enabled": False,
+        **overrides,
+    }
+    return Settings(**values)  # type: ignore[arg-type]
+
+
+class TestOpenAIPool:
+    """Test process-wide pooling of OpenAI models and connections."""
+
+    def test_model_reused_per_configuration(self, stub_openai: str) -> None:
+        settings = _openai_settings(stub_openai)
+        model = factory.create_llm(settings)
+        assert factory.create_llm(settings) is model
+        other = factory.create_llm(_openai_settings(stub_openai, openai_model="o1"))
+        assert other is not model
+
+    def test_pool_size_is_configurable(self, stub_openai: str) -> None:
+        settings = _openai_settings(stub_openai, llm_pool_max_connections=3)
+        model = factory.create_llm(settings)
+        assert model is not factory.create_llm(_openai_settings(stub_openai))
+        pool = model.http_client._transport._pool  # type: ignore[attr-defined]
+        assert pool._max_connections == 3
+
+    def test_event_loops_get_their_own_model(self, stub_openai: str) -> None:
+        settings = _openai_settings(stub_openai)
+
+        async def in_loop() -> tuple[object, object]:
+            return factory.create_llm(settings), factory.create_llm(settings)
+
+        first, again = asyncio.run(in_loop())
+        assert first is again
+        assert first is not factory.create_llm(settings)
+        assert asyncio.run(in_loop())[0] is not first
+
+    def test_chain_is_prebuilt_per_model(self) -> None:
+        model = LocalGovernanceModel()
+        assert governance_chain(model) is governance_chain(model)
+        assert governance_chain(model) is not governance_chain(LocalGovernanceModel())
+
+    def test_evaluations_share_one_connection(self, stub_openai: str) -> None:
+        engine = Gatekeeper(_openai_settings(stub_openai))
+        for i in range(5):
+            card = engine.evaluate(f"Summarize the quarterly report {i}")
+            assert card.decision == Decision.HOLD
+            assert card.metadata["llm_skipped"] is False
+        assert _StubHandler.connections == 1
+
+    def test_async_evaluations_reuse_connections(self, stub_openai: str) -> None:
+        engine = Gatekeeper(_openai_settings(stub_openai))
+        requests = [f"Summarize the quarterly report {i}" for i in range(12)]
+
+        async def run() -> None:
+            for _ in range(2):
+                await engine.aevaluate_many(requests)
+
+        asyncio.run(run())
+        assert 1 <= _StubHandler.connections <= len(requests)
+
+
+class TestLocalModel:
+    """Test the deterministic stand-in model."""
+
+    def test_reply_is_deterministic_and_schema_valid(self) -> None:
+        model = LocalGovernanceModel()
+        prompt = [HumanMessage(content="Request: restart the web tier")]
+        first = json.loads(str(model.invoke(prompt).content))
+        second = json.loads(str(model.invoke(prompt).content))
+        assert first == second
+        assert Decision(first["decision"])
+        assert RiskLevel(first["risk_level"])
+
+    def test_reports_token_usage(self) -> None:
+        reply = LocalGovernanceModel().invoke([HumanMessage(content="x" * 400)])
+        assert reply.usage_metadata is not None
+        assert reply.usage_metadata["input_tokens"] == 100
+
+    def test_error_rate(self) -> None:
+        model = LocalGovernanceModel(error_rate=1.0)
+        with pytest.raises(LocalLLMError):
+            model.invoke([HumanMessage(content="hi")])
+
+    def test_malformed_rate(self) -> None:
+        reply = LocalGovernanceModel(malformed_rate=1.0).invoke(
+            [HumanMessage(content="hi")]
+        )
+        with pytest.raises(json.JSONDecodeError):
+            json.loads(str(reply.content))
+
+    @pytest.mark.parametrize(
+        "distribution", ["uniform", "normal", "lognormal", "exponential"]
+    )
+    def test_latency_distribution_mean(self, distribution: str) -> None:
+        model = LocalGovernanceModel(
+            latency_distribution=distribution,
+            latency_ms=20.0,
+            latency_jitter_ms=5.0,
+            seed=1,
+        )
+        samples = [model.sample_latency() for _ in range(4000)]
+        assert min(samples) >= 0
+        assert statistics.fmean(samples) == pytest.approx(0.020, rel=0.1)
+
+    def test_unknown_distribution(self) -> None:
+        with pytest.raises(ValueError, match="Unknown latency distribution"):
+            LocalGovernanceModel(latency_distribution="pareto")
+
+    def test_async_sleeps_for_latency(self) -> None:
+        model = LocalGovernanceModel(latency_ms=30.0)
+
+        async def run() -> float:
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            await model.ainvoke([HumanMessage(content="hi")])
+            return loop.time() - started
+
+        assert asyncio.run(run()) >= 0.025
+
+
+class TestEngineWithLocalProvider:
+    """Test the whole graph offline with the local provider."""
+
+    def test_evaluates_without_api_key(self) -> None:
+        card = Gatekeeper(_local_settings()).evaluate("Summarize the quarterly report")
+        assert card.metadata["llm_skipped"] is False
+        assert card.metadata["llm_fallback"] is False
+
+    def test_truncated_output_is_salvaged(self) -> None:
+        engine = Gatekeeper(_local_settings(local_llm_malformed_rate=1.0))
+        card = engine.evaluate("Summarize the quarterly report")
+        assert card.metadata["llm_fallback"] is False
+        assert card.metadata["llm_partial"] is True
@@ -0,0 +1,168 @@
+"""Tests for prompt layout, token counting and request truncation."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from autonomy_gatekeeper.config import Settings
+from autonomy_gatekeeper.engine import Gatekeeper
+from autonomy_gatekeeper.llm.prompts import (
+    GOVERNANCE_SYSTEM_PROMPT,
+    MIN_CACHEABLE_PROMPT_TOKENS,
+    PromptUsage,
+    build_governance_prompt,
+    prepare_prompt_inputs,
+    prompt_fingerprint,
+)
+from autonomy_gatekeeper.llm.tokens import (
+    ApproximateTokenCounter,
+    TiktokenCounter,
+    get_token_counter,
+    truncate_to_budget,
+)
+
+RULES_PATH = str(
+    Path(__file__).parent.parent
+    / "src"
+    / "autonomy_gatekeeper"
+    / "policy"
+    / "rules.yaml"
+)
+
+
+class WordEncoding:
+    """A stand-in for a tiktoken encoding with one token per word."""
+
+    name = "words"
+
+    def encode_ordinary(self, text: str) -> list[str]:
+        return text.split(" ")
+
+    def decode(self, tokens: list[str]) -> str:
+        return " ".join(tokens)
+
+
+def _words(count: int) -> str:
+    return " ".join(f"w{i}" for i in range(count))
+
+
+class TestPromptLayout:
+    """Test that the variable parts of the prompt come after a static prefix."""
+
+    def test_system_message_is_static(self) -> None:
+        prompt = build_governance_prompt()
+        first = prompt.format_messages(request="List services", matched_policies="-")
+        second = prompt.format_messages(
+            request="Drop the users table", matched_policies="- [DATA_DELETION] x"
+        )
+        assert first[0].content == second[0].content == GOVERNANCE_SYSTEM_PROMPT
+        assert "{" not in GOVERNANCE_SYSTEM_PROMPT
+
+    def test_user_message_holds_policies_then_request(self) -> None:
+        messages = build_governance_prompt().format_messages(
+            request="Drop the users table", matched_policies="- [DATA_DELETION] x"
+        )
+        content = str(messages[1].content)
+        assert content.index("[DATA_DELETION]") < content.index("Drop the users table")
+
+    def test_fingerprint_tracks_the_budget(self) -> None:
+        assert prompt_fingerprint(100) != prompt_fingerprint(200)
+        assert prompt_fingerprint(100) == prompt_fingerprint(100)
+
+
+class TestTruncation:
+    """Test fitting requests into a token budget."""
+
+    def test_short_text_is_unchanged(self) -> None:
+        counter = ApproximateTokenCounter()
+        assert truncate_to_budget("short request", 100, counter) == ("short request", 0)
+
+    def test_no_budget_means_no_limit(self) -> None:
+        text = "x" * 10_000
+        assert truncate_to_budget(text, 0, ApproximateTokenCounter()) == (text, 0)
+
+    def test_keeps_head_and_tail_within_budget(self) -> None:
+        counter = ApproximateTokenCounter()
+        text = "START " + "filler " * 2_000 + "END"
+        truncated, removed = truncate_to_budget(text, 100, counter)
+        assert truncated.startswith("START ")
+        assert truncated.endswith("END")
+        assert f"[... {removed} tokens truncated ...]" in truncated
+        assert counter.count(truncated) <= 100
+        assert removed > counter.count(text) - 100
+
+    def test_tiktoken_counter_cuts_on_token_boundaries(self) -> None:
+        counter = TiktokenCounter(WordEncoding())
+        truncated, removed = truncate_to_budget(_words(1_000), 50, counter)
+        head, _, tail = truncated.partition("\n")
+        assert head.split(" ")[0] == "w0"
+        assert tail.split(" ")[-1] == "w999"
+        kept = [w for w in truncated.split() if w.startswith("w")]
+        # 50 tokens, less 5 for the marker.
+        assert len(kept) == 45
+        assert removed == 1_000 - len(kept)
+
+    def test_local_provider_uses_the_estimate(self) -> None:
+        counter = get_token_counter(Settings(llm_provider="local"))
+        assert isinstance(counter, ApproximateTokenCounter)
+
+
+class TestPromptUsage:
+    """Test token accounting for a prompt."""
+
+    def test_short_prompt_is_not_cacheable(self) -> None:
+        _, usage = prepare_prompt_inputs(
+            "List services", "-", ApproximateTokenCounter()
+        )
+        assert usage.prefix_tokens > 0
+        assert usage.prompt_tokens > usage.prefix_tokens
+        assert not usage.prefix_cacheable
+        assert usage.tokens_saved == 0
+
+    def test_long_prompt_saves_truncated_tokens_only(self) -> None:
+        counter = ApproximateTokenCounter()
+        inputs, usage = prepare_prompt_inputs("x" * 40_000, "-", counter, 2_000)
+        assert counter.count(inputs["request"]) <= 2_000
+        assert usage.prompt_tokens >= MIN_CACHEABLE_PROMPT_TOKENS
+        # The shared system prefix is too short for the provider to cache.
+        assert usage.prefix_tokens < MIN_CACHEABLE_PROMPT_TOKENS
+        assert not usage.prefix_cacheable
+        assert usage.tokens_saved == usage.truncated_tokens
+
+    def test_long_prefix_is_cacheable(self) -> None:
+        usage = PromptUsage(prompt_tokens=3_000, prefix_tokens=1_500)
+        assert usage.prefix_cacheable
+        assert usage.tokens_saved == 1_500
+
+    def test_to_dict(self) -> None:
+        usage = PromptUsage(prompt_tokens=2_000, prefix_tokens=300, truncated_tokens=50)
+        assert usage.to_dict() == {
+            "prompt_tokens": 2_000,
+            "prefix_tokens": 300,
+            "truncated_tokens": 50,
+            "prefix_cacheable": False,
+            "tokens_saved": 50,
+        }
+
+
+class TestEngineTokenBudget:
+    """Test that the engine applies the budget and reports savings."""
+
+    def test_long_request_is_truncated(self) -> None:
+        settings = Settings(
+            llm_provider="local",
+            policy_path=RULES_PATH,
+            llm_cache_enabled=False,
+            metrics_enabled=True,
+            llm_request_token_budget=200,
+        )
+        engine = Gatekeeper(settings)
+        card = engine.evaluate("Summarize the quarterly report. " + "detail " * 5_000)
+        prompt = card.metadata["prompt"]
+        assert prompt["truncated_tokens"] > 0
+        assert prompt["tokens_saved"] == prompt["truncated_tokens"]
+        assert engine.metrics is not None
+        saved = engine.metrics.llm_prompt_tokens_saved
+        assert saved.value(source="truncation") == prompt["truncated_tokens"]
+        assert saved.value(source="prefix_cache") == 0
+        assert engine.metrics.llm_truncated_requests.value() == 1
@@ -0,0 +1,315 @@
+"""Tests for LLM deadlines, adaptive concurrency, retries and the circuit breaker."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from pathlib import Path
+
+import pytest
+
+from autonomy_gatekeeper.config import Settings
+from autonomy_gatekeeper.engine import Gatekeeper
+from autonomy_gatekeeper.llm.resilience import (
+    AdaptiveLimiter,
+    CircuitBreaker,
+    LLMGuard,
+    LLMUnavailableError,
+    backoff_delay,
+    is_retryable,
+)
+
+RULES_PATH = str(
+    Path(__file__).parent.parent
+    / "src"
+    / "autonomy_gatekeeper"
+    / "policy"
+    / "rules.yaml"
+)
+LLM_REQUEST = "Summarize the quarterly report"
+
+
+class ProviderError(Exception):
+    """An error carrying an HTTP status, like the OpenAI SDK's."""
+
+    def __init__(self, status_code: int) -> None:
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def _flaky(failures: list[Exception]) -> tuple[list[int], object]:
+    calls: list[int] = []
+
+    def call() -> str:
+        calls.append(1)
+        if failures:
+            raise failures.pop(0)
+        return "ok"
+
+    return calls, call
+
+
+def _settings(**overrides: object) -> Settings:
+    return Settings(
+        llm_provider="local",
+        policy_path=RULES_PATH,
+        llm_cache_enabled=False,
+        metrics_enabled=True,
+        **overrides,  # type: ignore[arg-type]
+    )
+
+
+class TestAdaptiveLimiter:
+    """Test the AIMD concurrency limit."""
+
+    def test_fast_calls_grow_the_limit(self) -> None:
+        limiter = AdaptiveLimiter(maximum=8, latency_target=1.0, cooldown_seconds=0)
+        limiter.record_overload()
+        assert limiter.limit == 4
+        for _ in range(5):
+            limiter.record_latency(0.1)
+        assert limiter.limit == 5
+
+    def test_overload_halves_down_to_minimum(self) -> None:
+        limiter = AdaptiveLimiter(maximum=8, minimum=3, cooldown_seconds=0)
+        limiter.record_overload()
+        limiter.record_overload()
+        assert limiter.limit == 3
+
+    def test_slow_calls_decrease_once_per_cooldown(self) -> None:
+        limiter = AdaptiveLimiter(maximum=8, latency_target=0.5, cooldown_seconds=60)
+        limiter.record_latency(2.0)
+        limiter.record_latency(2.0)
+        assert limiter.limit == 4
+
+    def test_acquire_times_out_at_the_limit(self) -> None:
+        limiter = AdaptiveLimiter(maximum=1)
+        assert limiter.acquire(0)
+        assert not limiter.acquire(0.01)
+        limiter.release()
+        assert limiter.acquire(0)
+
+    def test_async_waiter_is_woken_by_release(self) -> None:
+        limiter = AdaptiveLimiter(maximum=1)
+
+        async def run() -> bool:
+            assert await limiter.aacquire()
+            asyncio.get_running_loop().call_later(0.01, limiter.release)
+            return await limiter.aacquire(1.0)
+
+        assert asyncio.run(run())
+        assert limiter.in_flight == 1
+
+
+class TestCircuitBreaker:
+    """Test breaker state transitions."""
+
+    def test_opens_after_consecutive_failures(self) -> None:
+        breaker = CircuitBreaker(failure_threshold=2, reset_seconds=60)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == "open"
+        assert not breaker.allow()
+        assert breaker.opened == 1
+
+    def test_half_open_allows_one_probe(self) -> None:
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.01)
+        breaker.record_failure()
+        time.sleep(0.02)
+        assert breaker.allow()
+        assert not breaker.allow()
+        breaker.record_success()
+        assert breaker.state == "closed"
+
+    def test_failed_probe_reopens(self) -> None:
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.01)
+        breaker.record_failure()
+        time.sleep(0.02)
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == "open"
+
+
+class TestLLMGuard:
+    """Test retries and deadlines around a call."""
+
+    def test_retryable_errors(self) -> None:
+        assert is_retryable(ProviderError(429))
+        assert is_retryable(ProviderError(503))
+        assert is_retryable(TimeoutError())
+        assert not is_retryable(ProviderError(401))
+        assert not is_retryable(ValueError())
+
+    def test_backoff_is_capped(self) -> None:
+        assert all(0 <= backoff_delay(a, 0.1) <= 0.1 * 2**a for a in range(4))
+        assert backoff_delay(20, 1.0) <= 5.0
+
+    def test_retries_transient_errors(self) -> None:
+        guard = LLMGuard(max_retries=2, retry_backoff_seconds=0)
+        calls, call = _flaky([ProviderError(429), ProviderError(500)])
+        assert guard.call(call) == "ok"  # type: ignore[arg-type]
+        assert len(calls) == 3
+        assert guard.retries == 2
+
+    def test_gives_up_after_max_retries(self) -> None:
+        guard = LLMGuard(max_retries=1, retry_backoff_seconds=0)
+        _, call = _flaky([ProviderError(503)] * 3)
+        with pytest.raises(LLMUnavailableError) as info:
+            guard.call(call)  # type: ignore[arg-type]
+        assert info.value.reason == "error"
+
+    def test_other_errors_propagate(self) -> None:
+        guard = LLMGuard(retry_backoff_seconds=0)
+        calls, call = _flaky([ProviderError(401)])
+        with pytest.raises(ProviderError):
+            guard.call(call)  # type: ignore[arg-type]
+        assert len(calls) == 1
+
+    def test_caller_bug_leaves_the_breaker_alone(self) -> None:
+        guard = LLMGuard(breaker=CircuitBreaker(failure_threshold=2, reset_seconds=0))
+        guard.breaker.record_failure()
+        guard.breaker.record_failure()
+        _, call = _flaky([TypeError("bad prompt input")])
+        with pytest.raises(TypeError):
+            guard.call(call)  # type: ignore[arg-type]
+        # Still half-open, and the probe was given back for the next call.
+        assert guard.breaker.state == "half_open"
+        assert guard.breaker.admit() is True
+
+    def test_client_error_closes_a_half_open_breaker(self) -> None:
+        guard = LLMGuard(breaker=CircuitBreaker(failure_threshold=1, reset_seconds=0))
+        guard.breaker.record_failure()
+        _, call = _flaky([ProviderError(400)])
+        with pytest.raises(ProviderError):
+            guard.call(call)  # type: ignore[arg-type]
+        assert guard.breaker.state == "closed"
+
+    def test_does_not_back_off_past_the_deadline(self) -> None:
+        guard = LLMGuard(deadline_seconds=0.2, max_retries=5, retry_backoff_seconds=60)
+        started = time.monotonic()
+        _, call = _flaky([ProviderError(429)] * 6)
+        with pytest.raises(LLMUnavailableError):
+            guard.call(call)  # type: ignore[arg-type]
+        assert time.monotonic() - started < 0.2
+
+    def test_sync_call_is_abandoned_at_the_deadline(self) -> None:
+        limiter = AdaptiveLimiter(maximum=4, cooldown_seconds=0)
+        guard = LLMGuard(deadline_seconds=0.05, limiter=limiter)
+        with pytest.raises(LLMUnavailableError) as info:
+            guard.call(lambda: time.sleep(0.3))
+        assert info.value.reason == "deadline"
+        assert limiter.limit == 2
+        # The slot is held until the abandoned call really finishes.
+        assert limiter.in_flight == 1
+        time.sleep(0.4)
+        assert limiter.in_flight == 0
+
+    def test_async_call_is_cancelled_at_the_deadline(self) -> None:
+        guard = LLMGuard(deadline_seconds=0.05, limiter=AdaptiveLimiter(maximum=2))
+        cancelled = []
+
+        async def slow() -> None:
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        with pytest.raises(LLMUnavailableError) as info:
+            asyncio.run(guard.acall(slow))
+        assert info.value.reason == "deadline"
+        assert cancelled
+        assert guard.limiter is not None and guard.limiter.in_flight == 0
+
+    def test_open_breaker_rejects_without_calling(self) -> None:
+        guard = LLMGuard(breaker=CircuitBreaker(failure_threshold=1))
+        guard.breaker.record_failure()
+        calls, call = _flaky([])
+        with pytest.raises(LLMUnavailableError) as info:
+            guard.call(call)  # type: ignore[arg-type]
+        assert info.value.reason == "circuit_open"
+        assert not calls
+
+    def test_probe_that_never_runs_is_not_stuck_half_open(self) -> None:
+        limiter = AdaptiveLimiter(maximum=1)
+        guard = LLMGuard(
+            deadline_seconds=0.05,
+            limiter=limiter,
+            breaker=CircuitBreaker(failure_threshold=1, reset_seconds=0.05),
+        )
+        guard.breaker.record_failure()
+        time.sleep(0.06)
+        assert limiter.acquire(None)  # No slot for the would-be probe.
+        with pytest.raises(LLMUnavailableError) as info:
+            guard.call(lambda: "ok")
+        assert info.value.reason == "deadline"
+        assert guard.breaker.state == "half_open"
+        limiter.release()
+        assert guard.call(lambda: "ok") == "ok"
+        assert guard.breaker.state == "closed"
+
+    def test_cancelled_probe_is_given_back(self) -> None:
+        guard = LLMGuard(breaker=CircuitBreaker(failure_threshold=1, reset_seconds=0))
+        guard.breaker.record_failure()
+
+        async def run() -> str:
+            task = asyncio.create_task(guard.acall(lambda: asyncio.sleep(1)))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+            async def ok() -> str:
+                return "ok"
+
+            return await guard.acall(ok)
+
+        assert asyncio.run(run()) == "ok"
+        assert guard.breaker.state == "closed"
+
+
+class TestEngineFallback:
+    """Test that the graph falls back to the policy decision."""
+
+    def test_deadline_falls_back_to_policy_card(self) -> None:
+        engine = Gatekeeper(
+            _settings(local_llm_latency_ms=500, llm_deadline_seconds=0.05)
+        )
+        assert engine.graph is not None  # compile outside the timed call
+        started = time.monotonic()
+        card = engine.evaluate(LLM_REQUEST)
+        assert time.monotonic() - started < 0.4
+        assert card.metadata["llm_fallback"]
+        assert card.metadata["llm_fallback_reason"] == "deadline"
+        assert card.recommended_action == "Review the request manually."
+        assert engine.metrics is not None
+        assert engine.metrics.llm_fallbacks.value(reason="deadline") == 1
+
+    def test_open_breaker_falls_back_without_calling(self) -> None:
+        engine = Gatekeeper(
+            _settings(
+                local_llm_error_rate=1.0,
+                llm_max_retries=0,
+                llm_breaker_failures=2,
+            )
+        )
+        reasons = [
+            engine.evaluate(f"{LLM_REQUEST} {i}").metadata["llm_fallback_reason"]
+            for i in range(3)
+        ]
+        assert reasons == ["error", "error", "circuit_open"]
+
+    def test_async_deadline_falls_back(self) -> None:
+        engine = Gatekeeper(
+            _settings(local_llm_latency_ms=500, llm_deadline_seconds=0.05)
+        )
+        cards = asyncio.run(engine.aevaluate_many([LLM_REQUEST, f"{LLM_REQUEST} 2"]))
+        assert [c.metadata["llm_fallback_reason"] for c in cards] == ["deadline"] * 2
+
+    def test_healthy_call_has_no_fallback_reason(self) -> None:
+        card = Gatekeeper(_settings()).evaluate(LLM_REQUEST)
+        assert not card.metadata["llm_fallback"]
+        assert card.metadata["llm_fallback_reason"] is None
@@ -0,0 +1,94 @@
+"""Tests for near-duplicate verdict reuse."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from autonomy_gatekeeper import graph
+from autonomy_gatekeeper.config import Settings
+from autonomy_gatekeeper.engine import Gatekeeper
+from autonomy_gatekeeper.llm.similarity import SimilarityIndex
+
+RULES_PATH = str(
+    Path(__file__).parent.parent
+    / "src"
+    / "autonomy_gatekeeper"
+    / "policy"
+    / "rules.yaml"
+)
+
+VERDICT = {"decision": "HOLD", "risk_level": "high", "reasoning": "Access change."}
+
+
+class TestSimilarityIndex:
+    """Test MinHash lookup, policy scoping and eviction."""
+
+    def test_templated_request_is_reused(self) -> None:
+        index = SimilarityIndex(threshold=0.9)
+        index.add("Grant admin access to user 1234", "policy", VERDICT)
+        found = index.lookup("Grant admin access to user 5678", "policy")
+        assert found is not None
+        assert found[0] == VERDICT
+
+    def test_near_duplicate_above_threshold(self) -> None:
+        index = SimilarityIndex(threshold=0.6)
+        index.add("Grant admin access to the billing dashboard for alice", "p", VERDICT)
+        assert index.lookup("Grant admin access to the billing dashboard for bob", "p")
+
+    def test_unrelated_request_misses(self) -> None:
+        index = SimilarityIndex(threshold=0.9)
+        index.add("Grant admin access to user 1234", "policy", VERDICT)
+        assert (
+            index.lookup("Revoke read permission on the audit bucket", "policy") is None
+        )
+
+    def test_different_policy_set_misses(self) -> None:
+        index = SimilarityIndex(threshold=0.9)
+        index.add("Grant admin access to user 1234", "policy-a", VERDICT)
+        assert index.lookup("Grant admin access to user 1234", "policy-b") is None
+
+    def test_memory_is_bounded(self) -> None:
+        index = SimilarityIndex(max_entries=3)
+        for i in range(10):
+            index.add(f"request number {'x' * i} about topic {i}", "p", VERDICT)
+        assert len(index) == 3
+        indexed = {
+            entry_id for bucket in index._buckets.values() for entry_id in bucket
+        }
+        assert indexed == set(index._entries)
+
+
+class TestEngineIntegration:
+    """Test the similarity tier in front of the LLM."""
+
+    def test_templated_requests_share_one_llm_call(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        calls = 0
+
+        def fake_llm(settings: Settings) -> FakeListChatModel:
+            nonlocal calls
+            calls += 1
+            return FakeListChatModel(
+                responses=[
+                    '{"decision": "HOLD", "risk_level": "high", "reasoning": "x"}'
+                ]
+            )
+
+        monkeypatch.setattr(graph, "create_llm", fake_llm)
+        engine = Gatekeeper(
+            Settings(
+                openai_api_key="test", policy_path=RULES_PATH, similarity_enabled=True
+            )
+        )
+
+        first = engine.evaluate("Grant admin access to user 1234")
+        second = engine.evaluate("Grant admin access to user 5678")
+
+        assert calls == 1
+        assert first.metadata["similarity"] == {"status": "miss"}
+        assert second.metadata["similarity"]["status"] == "hit"
+        assert second.decision == first.decision
@@ -0,0 +1,242 @@
+"""Tests for incremental LLM reply parsing and streamed evaluation."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from autonomy_gatekeeper import graph
+from autonomy_gatekeeper.config import Settings
+from autonomy_gatekeeper.engine import Gatekeeper
+from autonomy_gatekeeper.graph import _parse_llm_response, new_state
+from autonomy_gatekeeper.llm.streaming import AssessmentParser, parse_assessment
+
+RULES_PATH = str(
+    Path(__file__).parent.parent
+    / "src"
+    / "autonomy_gatekeeper"
+    / "policy"
+    / "rules.yaml"
+)
+
+REPLY = {
+    "decision": "HOLD",
+    "risk_level": "high",
+    "confidence": 0.75,
+    "reasoning": 'Owner is "unclear" \\ needs review — ask first.',
+    "recommended_action": "Ask the requester.",
+    "tags": ["access", {"scope": "prod"}],
+}
+
+
+def _local_settings(**overrides: object) -> Settings:
+    values: dict[str, object] = {
+        "llm_provider": "local",
+        "policy_path": RULES_PATH,
+        "llm_cache_enabled": False,
+        "llm_streaming": True,
+        **overrides,
+    }
+    return Settings(**values)  # type: ignore[arg-type]
+
+
+class ScriptedStreamModel(BaseChatModel):
+    """Streams one scripted reply per call; an exception chunk is raised."""
+
+    replies: list[list[Any]]
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-stream"
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        text = "".join(c.text for c in self._stream(messages))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(text))])
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        reply = self.replies[min(self.calls, len(self.replies) - 1)]
+        self.calls += 1
+        for chunk in reply:
+            if isinstance(chunk, BaseException):
+                raise chunk
+            yield ChatGenerationChunk(message=AIMessageChunk(content=chunk))
+
+
+class TestAssessmentParser:
+    """Test incremental parsing of the governance JSON."""
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 5, 64])
+    def test_any_chunking_yields_the_full_object(self, chunk_size: int) -> None:
+        text = "```json\n" + json.dumps(REPLY, ensure_ascii=False) + "\n```"
+        parser = AssessmentParser()
+        order: list[str] = []
+        for start in range(0, len(text), chunk_size):
+            order.extend(parser.feed(text[start : start + chunk_size]))
+        assert parser.done
+        assert parser.fields == REPLY
+        assert order == list(REPLY)
+
+    def test_decision_ready_before_reasoning_ends(self) -> None:
+        text = json.dumps(REPLY)
+        parser = AssessmentParser()
+        parser.feed(text[: text.index("reasoning") + 20])
+        assert parser.decision_ready
+        assert "reasoning" not in parser.fields
+
+    def test_number_at_chunk_boundary_waits(self) -> None:
+        parser = AssessmentParser()
+        assert parser.feed('{"confidence": 0') == {}
+        assert parser.feed(".75,") == {"confidence": 0.75}
+
+
+class TestSalvage:
+    """Test recovering fields from broken replies."""
+
+    def test_well_formed_reply(self) -> None:
+        assert parse_assessment(json.dumps(REPLY)) == (REPLY, True)
+
+    def test_truncated_string_is_kept(self) -> None:
+        text = json.dumps(REPLY)
+        cut = text.index("needs review")
+        parsed, complete = parse_assessment(text[:cut])
+        assert not complete
+        assert parsed["decision"] == "HOLD"
+        assert parsed["reasoning"] == 'Owner is "unclear" \\ '
+
+    def test_trailing_number_completes(self) -> None:
+        parsed, _ = parse_assessment('{"decision": "ACT", "confidence": 0.9')
+        assert parsed == {"decision": "ACT", "confidence": 0.9}
+
+    def test_broken_structure_keeps_earlier_fields(self) -> None:
+        parsed, complete = parse_assessment('{"decision": "ACT", risk_level: low}')
+        assert parsed == {"decision": "ACT"} and not complete
+
+    def test_salvaged_reply_is_partial(self) -> None:
+        state = new_state("x")
+        state["policy_risk"] = "medium"
+        parsed = _parse_llm_response('{"decision": "ESCALATE", "reason', state)
+        assert parsed["decision"] == "ESCALATE"
+        assert parsed["risk_level"] == "medium"
+        assert parsed["partial"] is True
+
+    def test_no_decision_falls_back(self) -> None:
+        parsed = _parse_llm_response('{"risk_level": "low"', new_state("x"))
+        assert parsed["fallback"] is True
+
+    def test_unfinished_decision_fields_are_not_salvaged(self) -> None:
+        parsed, _ = parse_assessment('{"decision": "ACT", "risk_level": "crit')
+        assert parsed == {"decision": "ACT"}
+        assert parse_assessment('{"decision": "ESCAL')[0] == {}
+
+    @pytest.mark.parametrize(
+        "reply",
+        [
+            '{"decision": "ESCAL',
+            '{"decision": "ESCALATE", "risk_level": "crit',
+            '{"decision": "MAYBE", "reasoning": "fine',
+        ],
+    )
+    def test_truncated_escalation_keeps_the_policy_verdict(self, reply: str) -> None:
+        state = new_state("x")
+        state["policy_decision"] = "ESCALATE"
+        state["policy_risk"] = "critical"
+        parsed = _parse_llm_response(reply, state)
+        assert parsed["decision"] == "ESCALATE"
+        assert parsed["risk_level"] == "critical"
+
+    def test_truncated_risk_keeps_the_policy_risk(self) -> None:
+        state = new_state("x")
+        state["policy_risk"] = "critical"
+        parsed = _parse_llm_response('{"decision": "ACT", "risk_level": "crit', state)
+        assert parsed["risk_level"] == "critical"
+        assert parsed["partial"] is True
+
+
+class TestStreamedEvaluation:
+    """Test early decision events from the engine."""
+
+    def test_decision_event_precedes_card(self) -> None:
+        engine = Gatekeeper(_local_settings(metrics_enabled=True))
+        events = list(engine.stream("Summarize the quarterly report"))
+        assert [e["event"] for e in events] == ["decision", "card"]
+        card = events[-1]["card"]
+        assert events[0]["decision"] == card.decision.value
+        assert events[0]["risk_level"] == card.risk_level.value
+        assert "time_to_decision_ms" in card.metadata
+        assert engine.metrics is not None
+        assert engine.metrics.llm_time_to_decision.snapshot()["count"] == 1
+
+    def test_async_stream(self) -> None:
+        engine = Gatekeeper(_local_settings())
+
+        async def collect() -> list[dict]:
+            return [e async for e in engine.astream("Summarize the quarterly report")]
+
+        events = asyncio.run(collect())
+        assert [e["event"] for e in events] == ["decision", "card"]
+
+    def test_policy_decided_request_yields_only_card(self) -> None:
+        engine = Gatekeeper(_local_settings())
+        events = list(engine.stream("Drop the production database"))
+        assert [e["event"] for e in events] == ["card"]
+        assert events[0]["card"].metadata["llm_skipped"] is True
+
+    def test_non_streaming_engine_has_no_decision_event(self) -> None:
+        engine = Gatekeeper(_local_settings(llm_streaming=False))
+        events = list(engine.stream("Summarize the quarterly report"))
+        assert [e["event"] for e in events] == ["card"]
+
+    def _scripted(
+        self, monkeypatch: pytest.MonkeyPatch, *replies: list[Any]
+    ) -> ScriptedStreamModel:
+        model = ScriptedStreamModel(replies=list(replies))
+        monkeypatch.setattr(graph, "create_llm", lambda settings: model)
+        return model
+
+    def test_unknown_decision_is_not_published(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        self._scripted(
+            monkeypatch,
+            ['{"decision": "MAYBE", ', '"risk_level": "low", "reasoning": "?"}'],
+        )
+        engine = Gatekeeper(_local_settings())
+        events = list(engine.stream("Summarize the quarterly report"))
+        assert [e["event"] for e in events] == ["card"]
+        assert "time_to_decision_ms" not in events[0]["card"].metadata
+
+    def test_retried_round_trip_publishes_once(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        reply = '{"decision": "ACT", "risk_level": "low", "reasoning": "ok"}'
+        model = self._scripted(
+            monkeypatch,
+            ['{"decision": "ACT", "risk_level": "low", ', ConnectionError("reset")],
+            [reply],
+        )
+        engine = Gatekeeper(_local_settings(llm_retry_backoff_seconds=0))
+        events = list(engine.stream("Summarize the quarterly report"))
+        assert model.calls == 2
+        assert [e["event"] for e in events] == ["decision", "card"]
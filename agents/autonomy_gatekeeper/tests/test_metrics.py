@@ -0,0 +1,137 @@
+"""Tests for pipeline metrics."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage
+
+from autonomy_gatekeeper import graph
+from autonomy_gatekeeper.config import Settings
+from autonomy_gatekeeper.engine import Gatekeeper
+from autonomy_gatekeeper.metrics import MetricsRegistry, token_usage
+
+RULES_PATH = str(
+    Path(__file__).parent.parent
+    / "src"
+    / "autonomy_gatekeeper"
+    / "policy"
+    / "rules.yaml"
+)
+
+LLM_REPLY = '{"decision": "ACT", "risk_level": "low", "reasoning": "ok"}'
+
+
+def _engine(monkeypatch: pytest.MonkeyPatch, reply: str = LLM_REPLY) -> Gatekeeper:
+    monkeypatch.setattr(
+        graph, "create_llm", lambda settings: FakeListChatModel(responses=[reply])
+    )
+    return Gatekeeper(
+        Settings(
+            openai_api_key="test",
+            policy_path=RULES_PATH,
+            metrics_enabled=True,
+            llm_cache_enabled=False,
+        )
+    )
+
+
+class TestRegistry:
+    """Test counters, histograms and exposition formats."""
+
+    def test_counter_by_labels(self) -> None:
+        counter = MetricsRegistry().counter("hits_total", "Hits.", ["tier"])
+        counter.inc(tier="memory")
+        counter.inc(2, tier="memory")
+        assert counter.value(tier="memory") == 3
+        assert counter.value(tier="disk") == 0
+
+    def test_wrong_labels_rejected(self) -> None:
+        counter = MetricsRegistry().counter("hits_total", "Hits.", ["tier"])
+        with pytest.raises(ValueError, match="expects labels"):
+            counter.inc(node="x")
+
+    def test_histogram_buckets_are_cumulative(self) -> None:
+        histogram = MetricsRegistry().histogram("latency", "L.", buckets=[0.1, 1.0])
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value)
+        snapshot = histogram.snapshot()
+        assert snapshot["count"] == 3
+        assert snapshot["buckets"] == {"0.1": 1, "1": 2, "+Inf": 3}
+
+    def test_prometheus_text(self) -> None:
+        registry = MetricsRegistry()
+        registry.counter("decisions_total", "Decisions.", ["decision"]).inc(
+            decision="ACT"
+        )
+        registry.histogram("latency_seconds", "Latency.", buckets=[1.0]).observe(0.5)
+        text = registry.to_prometheus()
+        assert "# TYPE decisions_total counter" in text
+        assert 'decisions_total{decision="ACT"} 1' in text
+        assert 'latency_seconds_bucket{le="+Inf"} 1' in text
+        assert "latency_seconds_count 1" in text
+
+    def test_kind_conflict(self) -> None:
+        registry = MetricsRegistry()
+        registry.counter("x", "X.")
+        with pytest.raises(ValueError, match="already registered"):
+            registry.histogram("x", "X.")
+
+    def test_token_usage_from_message(self) -> None:
+        message = AIMessage(
+            content="{}",
+            usage_metadata={"input_tokens": 12, "output_tokens": 5, "total_tokens": 17},
+        )
+        assert token_usage(message) == (12, 5)
+        assert token_usage(AIMessage(content="{}")) is None
+
+
+class TestPipelineMetrics:
+    """Test instrumentation of the governance graph."""
+
+    def test_disabled_by_default(self) -> None:
+        engine = Gatekeeper(Settings(openai_api_key="test", policy_path=RULES_PATH))
+        assert engine.metrics is None
+
+    def test_records_nodes_decisions_and_skips(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        engine = _engine(monkeypatch)
+        engine.evaluate("Summarize the quarterly report")
+        engine.evaluate("Delete all production data and drop the database")
+        metrics = engine.metrics
+        assert metrics is not None
+
+        assert metrics.node_duration.snapshot(node="evaluate_policy")["count"] == 2
+        assert metrics.node_duration.snapshot(node="llm_assess")["count"] == 1
+        assert metrics.llm_latency.snapshot()["count"] == 1
+        assert metrics.decisions.value(decision="ACT", risk_level="low") == 1
+        assert metrics.llm_skipped.value(reason="escalation") == 1
+
+    def test_counts_parse_fallbacks(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        engine = _engine(monkeypatch, reply="not json")
+        engine.evaluate("Summarize the quarterly report")
+        assert engine.metrics is not None
+        assert engine.metrics.llm_parse_fallbacks.value() == 1
+
+    def test_async_path_is_timed(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        engine = _engine(monkeypatch)
+        asyncio.run(engine.aevaluate("Summarize the quarterly report"))
+        assert engine.metrics is not None
+        assert (
+            engine.metrics.node_duration.snapshot(node="build_decision")["count"] == 1
+        )
+
+    def test_json_dump(self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+        engine = _engine(monkeypatch)
+        engine.evaluate("Summarize the quarterly report")
+        assert engine.metrics is not None
+        path = tmp_path / "metrics.json"
+        engine.metrics.registry.write(path)
+        data = json.loads(path.read_text())
+        assert data["gatekeeper_decisions_total"]["type"] == "counter"
+        assert data["gatekeeper_node_duration_seconds"]["samples"]
@@ -0,0 +1,214 @@
+"""Tests for chunked policy evaluation of large requests."""
+
+from __future__ import annotations
+
+import random
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+from click.testing import CliRunner
+
+from autonomy_gatekeeper.cli import main
+from autonomy_gatekeeper.config import Settings
+from autonomy_gatekeeper.engine import Gatekeeper
+from autonomy_gatekeeper.policy.matcher import (
+    LINEAR_SCAN_MAX_KEYWORDS,
+    compile_policy,
+)
+from autonomy_gatekeeper.utils.files import read_text_chunks
+
+RULES_PATH = str(
+    Path(__file__).parent.parent
+    / "src"
+    / "autonomy_gatekeeper"
+    / "policy"
+    / "rules.yaml"
+)
+WORDS = ["alpha", "beta", "gamma", "delta", "drop", "table", "rotate", "keys"]
+
+
+def _rule(
+    rule_id: str, decision: str = "HOLD", risk: str = "medium", **extra: Any
+) -> dict[str, Any]:
+    return {
+        "id": rule_id,
+        "description": rule_id,
+        "decision": decision,
+        "risk_level": risk,
+        **extra,
+    }
+
+
+def _expression_rules() -> list[dict[str, Any]]:
+    return [
+        _rule("KW", keywords=["gamma del"]),
+        _rule("TERM", match={"term": "rotate"}),
+        _rule("PREFIX", match={"term": "bet*"}),
+        _rule("PHRASE", match={"phrase": "drop table"}),
+        _rule("REGEX", match={"regex": r"keys\s+alpha"}),
+        _rule("ALL", match={"all": ["alpha", "keys"]}),
+        _rule("NONE", match={"none": ["zeta"]}),
+    ]
+
+
+def _large_rules() -> list[dict[str, Any]]:
+    rng = random.Random(5)
+    return [
+        _rule(f"R{i}", keywords=["".join(rng.choices("abcdet ", k=rng.randint(3, 6)))])
+        for i in range(LINEAR_SCAN_MAX_KEYWORDS + 1)
+    ]
+
+
+def _chunks(text: str, size: int) -> list[str]:
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+class TestChunkedEvaluation:
+    """Test that chunked evaluation agrees with whole-text evaluation."""
+
+    @pytest.mark.parametrize("rules", [_expression_rules(), _large_rules()])
+    def test_agrees_with_whole_text(self, rules: list[dict[str, Any]]) -> None:
+        policy = compile_policy(rules)
+        rng = random.Random(3)
+        for _ in range(100):
+            text = " ".join(rng.choices(WORDS, k=rng.randint(1, 200)))
+            size = rng.randint(1, 40)
+            result = policy.evaluate_chunks(_chunks(text, size), stop_early=False)
+            assert result.outcome == policy.evaluate(text)
+            assert result.chars == len(text)
+
+    def test_matches_across_a_boundary(self) -> None:
+        policy = compile_policy(_expression_rules())
+        result = policy.evaluate_chunks(["... keys al", "pha gamma de", "lta"])
+        matched = {m["rule_id"] for m in result.outcome.matched}
+        assert {"KW", "REGEX", "ALL"} <= matched
+
+    def test_words_are_not_split(self) -> None:
+        policy = compile_policy([_rule("TERM", match={"term": "rot"})])
+        result = policy.evaluate_chunks(["rot", "ate"])
+        assert result.outcome.matched == []
+
+
+class TestEarlyStop:
+    """Test that reading stops once a critical escalation is certain."""
+
+    @staticmethod
+    def _counted(chunks: list[str], read: list[str]) -> Iterator[str]:
+        for chunk in chunks:
+            read.append(chunk)
+            yield chunk
+
+    def test_stops_at_critical_escalation(self) -> None:
+        policy = compile_policy(
+            [_rule("DROP", "ESCALATE", "critical", keywords=["drop table"])]
+        )
+        read: list[str] = []
+        chunks = ["select 1; dr", "op table users; ", "more " * 10, "end"]
+        result = policy.evaluate_chunks(self._counted(chunks, read))
+        assert result.stopped_early
+        assert result.outcome.decision == "ESCALATE"
+        assert len(read) == 2
+        assert result.chars == len("".join(chunks[:2]))
+
+    def test_waits_for_required_rules(self) -> None:
+        rules = [
+            _rule("DROP", "ESCALATE", "critical", keywords=["drop"]),
+            _rule("AUDIT", keywords=["audit"], llm="required"),
+        ]
+        result = compile_policy(rules).evaluate_chunks(["drop", " x", " audit"])
+        assert not result.stopped_early
+        assert result.outcome.llm_route == "required"
+
+    def test_negated_rule_does_not_stop(self) -> None:
+        rule = _rule("UNTESTED", "ESCALATE", "critical", match={"none": ["test"]})
+        result = compile_policy([rule]).evaluate_chunks(["deploy ", "test"])
+        assert not result.stopped_early
+        assert result.outcome.matched == []
+
+
+class TestExcerpt:
+    """Test the excerpt kept for the Decision Card and the LLM."""
+
+    def test_short_text_is_kept_whole(self) -> None:
+        result = compile_policy([]).evaluate_chunks(["hello ", "world"])
+        assert result.excerpt == "hello world"
+
+    def test_long_text_keeps_both_ends(self) -> None:
+        text = "START " + "x" * 1000 + " END"
+        result = compile_policy([]).evaluate_chunks(_chunks(text, 7), excerpt_chars=10)
+        assert result.excerpt.startswith("START xxxx\n")
+        assert result.excerpt.endswith("\nxxxxxx END")
+        assert f"[... {len(text) - 20} characters omitted ...]" in result.excerpt
+
+
+class TestReadTextChunks:
+    """Test the memory-mapped file reader."""
+
+    def test_multibyte_characters_survive_chunking(self, tmp_path: Path) -> None:
+        path = tmp_path / "request.txt"
+        text = "naïve café ✓ " * 50
+        path.write_text(text, encoding="utf-8")
+        chunks = list(read_text_chunks(path, chunk_bytes=7))
+        assert "".join(chunks) == text
+        assert len(chunks) > 1
+
+    def test_empty_file(self, tmp_path: Path) -> None:
+        path = tmp_path / "empty.txt"
+        path.write_bytes(b"")
+        assert list(read_text_chunks(path)) == []
+
+
+class TestEvaluateFile:
+    """Test file evaluation through the engine and the CLI."""
+
+    def test_engine_stops_early_and_skips_llm(self, tmp_path: Path) -> None:
+        path = tmp_path / "dump.sql"
+        path.write_text("DROP TABLE users;\n" + "INSERT INTO t VALUES (1);\n" * 5000)
+        engine = Gatekeeper(Settings(llm_provider="local", policy_path=RULES_PATH))
+        card = engine.evaluate_file(str(path), chunk_bytes=4096)
+        assert card.decision.value == "ESCALATE"
+        assert card.metadata["llm_skipped"]
+        scan = card.metadata["policy_scan"]
+        assert scan["stopped_early"]
+        assert scan["chars"] < path.stat().st_size
+        assert len(card.request) == scan["chars"]
+
+    def test_engine_assesses_with_llm(self, tmp_path: Path) -> None:
+        path = tmp_path / "notes.txt"
+        path.write_text("Summarize these meeting notes. " * 2000)
+        engine = Gatekeeper(
+            Settings(
+                llm_provider="local", policy_path=RULES_PATH, llm_cache_enabled=False
+            )
+        )
+        card = engine.evaluate_file(str(path), chunk_bytes=1000)
+        assert not card.metadata["llm_skipped"]
+        assert card.metadata["policy_scan"]["chunks"] > 1
+        assert len(card.request) < path.stat().st_size
+
+    def test_cli_request_file(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setenv("LLM_PROVIDER", "local")
+        path = tmp_path / "request.txt"
+        path.write_text("Please drop the staging database")
+        result = CliRunner().invoke(
+            main,
+            [
+                "evaluate",
+                "--request-file",
+                str(path),
+                "--json-output",
+                "-p",
+                RULES_PATH,
+            ],
+        )
+        assert result.exit_code == 0, result.output
+        assert '"decision": "ESCALATE"' in result.output
+
+    def test_cli_needs_exactly_one_request(self) -> None:
+        result = CliRunner().invoke(main, ["evaluate"])
+        assert result.exit_code == 2
+        assert "exactly one of --request or --request-file" in result.output
@@ -0,0 +1,172 @@
+"""Tests for rule match expressions and the token index."""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from autonomy_gatekeeper.policy.expressions import (
+    Expression,
+    RequestText,
+    TokenIndex,
+    parse_expression,
+)
+from autonomy_gatekeeper.policy.loader import validate_rules
+from autonomy_gatekeeper.policy.matcher import compile_policy
+
+RULES = [
+    {
+        "id": "READ",
+        "description": "Reads",
+        "match": {"terms": ["get", "list*"]},
+        "decision": "ACT",
+        "risk_level": "low",
+    },
+    {
+        "id": "DEPLOY",
+        "description": "Deploys",
+        "keywords": ["deploy"],
+        "decision": "ESCALATE",
+        "risk_level": "critical",
+    },
+    {
+        "id": "BOTH",
+        "description": "Either form",
+        "keywords": ["truncate"],
+        "match": {"phrase": "drop table"},
+        "decision": "HOLD",
+        "risk_level": "high",
+    },
+]
+
+
+def _matches(node: object, request: str) -> bool:
+    return parse_expression(node).matches(RequestText(request))
+
+
+class TestExpressions:
+    """Test each expression form on its own."""
+
+    @pytest.mark.parametrize(
+        ("node", "text", "expected"),
+        [
+            ("get", "get the pod status", True),
+            ("get", "retarget the load balancer", False),
+            ({"term": "log"}, "update the catalog", False),
+            ({"term": "LOG"}, "tail the log, please", True),
+            ("permission*", "review permissions", True),
+            ("permission*", "permit the change", False),
+            ({"terms": ["read", "list"]}, "list buckets", True),
+            ("environment variable", "set an environment variable", True),
+            ({"phrase": "environment variable"}, "variable environment", False),
+            ({"regex": r"v\d+\.\d+"}, "Deploy model V2.3", True),
+            ({"regex": r"v\d+\.\d+"}, "Deploy model two", False),
+        ],
+    )
+    def test_leaves(self, node: object, text: str, expected: bool) -> None:
+        assert _matches(node, text) is expected
+
+    def test_combinators(self) -> None:
+        node = {
+            "all": ["drop", {"any": ["table", "database"]}],
+            "none": ["staging"],
+        }
+        assert _matches(node, "drop the production database")
+        assert not _matches(node, "drop the staging database")
+        assert not _matches(node, "drop everything")
+
+    def test_multiple_keys_must_all_hold(self) -> None:
+        node = {"term": "rotate", "phrase": "api key"}
+        assert _matches(node, "rotate the api key")
+        assert not _matches(node, "rotate the logs")
+
+    def test_bare_list_is_any_of(self) -> None:
+        assert _matches(["grant", "revoke"], "revoke access")
+
+    @pytest.mark.parametrize(
+        ("node", "message"),
+        [
+            ({"regex": "("}, "invalid regex"),
+            ({"words": ["x"]}, "unknown match keys"),
+            ({"all": []}, "'all' needs a non-empty list"),
+            ("   ", "empty term"),
+            ("two words*", "multi-word prefix"),
+            (42, "invalid match expression"),
+        ],
+    )
+    def test_invalid_expressions(self, node: object, message: str) -> None:
+        with pytest.raises(ValueError, match=message):
+            parse_expression(node, "R1")
+
+    def test_expression_subclasses_must_implement_matches(self) -> None:
+        class Incomplete(Expression):
+            pass
+
+        with pytest.raises(TypeError):
+            Incomplete()  # type: ignore[abstract]
+
+    def test_validation_checks_match(self) -> None:
+        rule = {"id": "R1", "description": "x", "match": {"regex": "["}}
+        with pytest.raises(ValueError, match="Rule R1 has invalid regex"):
+            validate_rules([rule])
+
+
+class TestTokenIndex:
+    """Test candidate pruning and agreement with brute-force evaluation."""
+
+    def test_only_anchored_rules_are_candidates(self) -> None:
+        index = TokenIndex(
+            [
+                (0, parse_expression("deploy")),
+                (1, parse_expression({"all": ["drop", "table"]})),
+                (2, parse_expression("metric*")),
+                (3, parse_expression({"regex": "prod"})),
+            ]
+        )
+        request = RequestText("show metrics for the users table")
+        # "all" is anchored on one required word, so "table" alone is not enough.
+        assert index.candidates(request) == {2, 3}
+        assert index.find(request) == {2}
+
+    def test_matches_brute_force(self) -> None:
+        rng = random.Random(13)
+        words = [f"w{i}" for i in range(40)]
+
+        def random_node(depth: int = 0) -> object:
+            kind = rng.choice(["term", "prefix", "phrase", "all", "any", "none"])
+            if depth >= 2 or kind == "term":
+                return rng.choice(words)
+            if kind == "prefix":
+                return rng.choice(words)[:2] + "*"
+            if kind == "phrase":
+                return " ".join(rng.sample(words, 2))
+            return {kind: [random_node(depth + 1) for _ in range(rng.randint(1, 3))]}
+
+        expressions = [parse_expression(random_node()) for _ in range(200)]
+        index = TokenIndex(enumerate(expressions))
+        for _ in range(100):
+            request = RequestText(" ".join(rng.choices(words, k=rng.randint(0, 12))))
+            expected = {i for i, e in enumerate(expressions) if e.matches(request)}
+            assert index.find(request) == expected
+
+
+class TestCompiledPolicy:
+    """Test expressions alongside keyword rules."""
+
+    def _ids(self, request: str) -> list[str]:
+        outcome = compile_policy(RULES).evaluate(request)
+        return [m["rule_id"] for m in outcome.matched]
+
+    def test_word_boundaries(self) -> None:
+        assert self._ids("retarget the listener") == ["READ"]
+        assert self._ids("target the deployment") == ["DEPLOY"]
+
+    def test_keywords_or_match(self) -> None:
+        assert self._ids("truncate logs") == ["BOTH"]
+        assert self._ids("get pods then drop table users") == ["READ", "BOTH"]
+
+    def test_keyword_only_rules_still_load(self) -> None:
+        rules = [{k: v for k, v in r.items() if k != "match"} for r in RULES[1:]]
+        validate_rules(rules)
+        assert compile_policy(rules).evaluate("deploy").decision == "ESCALATE"
@@ -0,0 +1,197 @@
+"""Tests for precompiled policy artifacts and hot reload."""
+
+from __future__ import annotations
+
+import os
+import pickle
+import time
+from pathlib import Path
+
+import pytest
+import yaml
+from click.testing import CliRunner
+
+from autonomy_gatekeeper.cli import main
+from autonomy_gatekeeper.config import Settings
+from autonomy_gatekeeper.engine import Gatekeeper
+from autonomy_gatekeeper.policy import loader
+from autonomy_gatekeeper.policy.loader import (
+    PolicyWatcher,
+    artifact_path,
+    load_policy,
+    read_artifact,
+    validate_rules,
+    write_artifact,
+)
+
+RULE = {
+    "id": "DEPLOY",
+    "description": "Deployment",
+    "keywords": ["deploy"],
+    "decision": "ESCALATE",
+    "risk_level": "critical",
+}
+
+
+def _write_rules(path: Path, *rules: dict) -> Path:
+    path.write_text(yaml.safe_dump({"rules": list(rules)}))
+    return path
+
+
+def _touch_later(path: Path) -> None:
+    """Bump mtime past the filesystem's timestamp granularity."""
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2_000_000_000))
+
+
+@pytest.fixture()
+def rules_file(tmp_path: Path) -> Path:
+    return _write_rules(tmp_path / "rules.yaml", RULE)
+
+
+class TestArtifact:
+    """Test writing and reusing precompiled artifacts."""
+
+    def test_loader_uses_fresh_artifact(
+        self, rules_file: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        target, _ = write_artifact(rules_file)
+        assert target == artifact_path(rules_file)
+
+        def no_yaml(path: str) -> list:
+            raise AssertionError("YAML should not be parsed")
+
+        monkeypatch.setattr(loader, "load_policy_rules", no_yaml)
+        policy = load_policy(str(rules_file))
+        assert policy.evaluate("deploy now").decision == "ESCALATE"
+
+    def test_stale_artifact_is_ignored(self, rules_file: Path) -> None:
+        write_artifact(rules_file)
+        _write_rules(rules_file, {**RULE, "decision": "HOLD", "risk_level": "low"})
+        _touch_later(rules_file)
+
+        assert read_artifact(rules_file) is None
+        assert load_policy(str(rules_file)).evaluate("deploy").decision == "HOLD"
+
+    def test_version_mismatch_is_ignored(self, rules_file: Path) -> None:
+        target, _ = write_artifact(rules_file)
+        payload = pickle.loads(target.read_bytes())
+        payload["version"] = -1
+        target.write_bytes(pickle.dumps(payload))
+        assert read_artifact(rules_file) is None
+
+    def test_corrupt_artifact_is_ignored(self, rules_file: Path) -> None:
+        artifact_path(rules_file).write_bytes(b"not a pickle")
+        assert read_artifact(rules_file) is None
+
+    @pytest.mark.parametrize("payload", [["not", "a", "dict"], {"policy": 1}])
+    def test_unexpected_payload_is_ignored(
+        self, rules_file: Path, payload: object
+    ) -> None:
+        write_artifact(rules_file)
+        if isinstance(payload, dict):
+            stamp = rules_file.stat().st_mtime_ns, rules_file.stat().st_size
+            payload = {"version": loader.ARTIFACT_VERSION, "source": stamp, **payload}
+        artifact_path(rules_file).write_bytes(pickle.dumps(payload))
+        assert read_artifact(rules_file) is None
+
+    def test_yaml_rules_are_validated(self, rules_file: Path) -> None:
+        _write_rules(rules_file, {"keywords": ["deploy"], "decision": "MAYBE"})
+        with pytest.raises(ValueError, match="has no id"):
+            load_policy(str(rules_file))
+
+    @pytest.mark.parametrize(
+        ("rules", "message"),
+        [
+            ([RULE, RULE], "Duplicate rule id DEPLOY"),
+            ([{**RULE, "decision": "MAYBE"}], "invalid decision"),
+            ([{**RULE, "risk_level": "extreme"}], "invalid risk level"),
+            ([{"description": "no id"}], "has no id"),
+        ],
+    )
+    def test_validation(self, rules: list, message: str) -> None:
+        with pytest.raises(ValueError, match=message):
+            validate_rules(rules)
+
+
+class TestCompilePolicyCommand:
+    """Test the compile-policy CLI command."""
+
+    def test_writes_artifact(self, rules_file: Path) -> None:
+        result = CliRunner().invoke(main, ["compile-policy", "-p", str(rules_file)])
+        assert result.exit_code == 0, result.output
+        assert "Compiled 1 rules" in result.output
+        assert artifact_path(rules_file).exists()
+
+    def test_invalid_rules_fail(self, tmp_path: Path) -> None:
+        path = _write_rules(tmp_path / "bad.yaml", {**RULE, "decision": "MAYBE"})
+        result = CliRunner().invoke(main, ["compile-policy", "-p", str(path)])
+        assert result.exit_code == 1
+        assert not artifact_path(path).exists()
+
+
+class TestHotReload:
+    """Test swapping in edited rules on a running engine."""
+
+    def test_watcher_detects_change(self, rules_file: Path) -> None:
+        changes: list[int] = []
+        watcher = PolicyWatcher(rules_file, lambda: changes.append(1))
+        assert watcher.check() is False
+        _write_rules(rules_file, RULE, {**RULE, "id": "OTHER"})
+        _touch_later(rules_file)
+        assert watcher.check() is True
+        assert changes == [1]
+
+    def test_reload_swaps_policy(self, rules_file: Path) -> None:
+        engine = Gatekeeper(Settings(policy_path=str(rules_file)))
+        old_policy = engine.policy
+        _write_rules(
+            rules_file,
+            RULE,
+            {**RULE, "id": "DROP", "keywords": ["drop"], "description": "Drop"},
+        )
+
+        assert engine.reload_policy() is True
+        assert engine.policy is not old_policy
+        card = engine.evaluate("drop the table")
+        assert [p.rule_id for p in card.matched_policies] == ["DROP"]
+
+    def test_failed_reload_keeps_rules(
+        self, rules_file: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        engine = Gatekeeper(Settings(policy_path=str(rules_file)))
+        policy = engine.policy
+
+        def broken(path: str) -> None:
+            raise yaml.YAMLError("bad yaml")
+
+        monkeypatch.setattr("autonomy_gatekeeper.engine.load_policy", broken)
+        assert engine.reload_policy() is False
+        assert engine.policy is policy
+
+    def test_invalid_rules_are_not_swapped_in(self, rules_file: Path) -> None:
+        engine = Gatekeeper(Settings(policy_path=str(rules_file)))
+        policy = engine.policy
+        _write_rules(rules_file, {"keywords": ["deploy"], "decision": "MAYBE"})
+        assert engine.reload_policy() is False
+        assert engine.policy is policy
+        assert engine.evaluate("deploy it").decision.value == "ESCALATE"
+
+    def test_engine_watches_file(self, rules_file: Path) -> None:
+        engine = Gatekeeper(
+            Settings(
+                policy_path=str(rules_file),
+                policy_watch=True,
+                policy_watch_interval_seconds=0.01,
+            )
+        )
+        try:
+            old_policy = engine.policy
+            _write_rules(rules_file, RULE, {**RULE, "id": "OTHER"})
+            _touch_later(rules_file)
+            deadline = time.monotonic() + 5
+            while engine.policy is old_policy and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert len(engine.policy) == 2
+        finally:
+            engine.close()
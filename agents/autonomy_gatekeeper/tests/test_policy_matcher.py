@@ -0,0 +1,97 @@
+"""Tests for the compiled Aho-Corasick policy matcher."""
+
+from __future__ import annotations
+
+import random
+import string
+
+import pytest
+
+from autonomy_gatekeeper.policy.matcher import (
+    LINEAR_SCAN_MAX_KEYWORDS,
+    KeywordMatcher,
+    compile_policy,
+)
+
+
+def _linear_scan(request: str, rules: list[dict]) -> list[int]:
+    request_lower = request.lower()
+    return [
+        index
+        for index, rule in enumerate(rules)
+        if any(kw.lower() in request_lower for kw in rule.get("keywords", []))
+    ]
+
+
+class TestKeywordMatcher:
+    """Test the automaton in isolation."""
+
+    def test_overlapping_patterns(self) -> None:
+        matcher = KeywordMatcher([("he", 0), ("she", 1), ("his", 2), ("hers", 3)])
+        assert matcher.find("ushers") == {0, 1, 3}
+
+    def test_pattern_found_via_failure_link(self) -> None:
+        matcher = KeywordMatcher([("abcd", 0), ("bc", 1)])
+        assert matcher.find("xabcx") == {1}
+
+    def test_empty_pattern_always_matches(self) -> None:
+        matcher = KeywordMatcher([("", 0), ("x", 1)])
+        assert matcher.find("nothing here") == {0}
+
+    def test_no_patterns(self) -> None:
+        assert KeywordMatcher([]).find("anything") == set()
+
+
+class TestCompiledPolicy:
+    """Test that compiled evaluation matches the original keyword loop."""
+
+    @pytest.fixture()
+    def large_rules(self) -> list[dict]:
+        rng = random.Random(7)
+        return [
+            {
+                "id": f"R{i}",
+                "description": f"Rule {i}",
+                "keywords": [
+                    "".join(rng.choices("abcde", k=rng.randint(2, 5))) for _ in range(3)
+                ],
+                "decision": rng.choice(["ACT", "HOLD", "ESCALATE"]),
+                "risk_level": rng.choice(["low", "medium", "high", "critical"]),
+            }
+            for i in range(LINEAR_SCAN_MAX_KEYWORDS)
+        ]
+
+    def test_automaton_agrees_with_linear_scan(self, large_rules: list[dict]) -> None:
+        policy = compile_policy(large_rules)
+        rng = random.Random(11)
+        for _ in range(200):
+            request = "".join(rng.choices("abcdeABCDE " + string.digits, k=60))
+            assert policy.match_indices(request) == _linear_scan(request, large_rules)
+
+    def test_strongest_outcome_wins(self) -> None:
+        rules = [
+            {
+                "id": "A",
+                "description": "act",
+                "keywords": ["safe"],
+                "decision": "ACT",
+                "risk_level": "low",
+            },
+            {
+                "id": "E",
+                "description": "escalate",
+                "keywords": ["danger"],
+                "decision": "ESCALATE",
+                "risk_level": "high",
+            },
+        ]
+        outcome = compile_policy(rules).evaluate("Safe but DANGER")
+        assert outcome.decision == "ESCALATE"
+        assert outcome.risk_level == "high"
+        assert [m["rule_id"] for m in outcome.matched] == ["A", "E"]
+
+    def test_no_match_defaults(self) -> None:
+        outcome = compile_policy([]).evaluate("anything")
+        assert outcome.decision == "ACT"
+        assert outcome.risk_level == "low"
+        assert outcome.matched == []
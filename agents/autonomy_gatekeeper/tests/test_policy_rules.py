@@ -32,10 +32,13 @@ class TestPolicyLoading:
 
     def test_each_rule_has_required_fields(self) -> None:
         rules = load_policy_rules(RULES_PATH)
-        required_fields = {"id", "description", "keywords", "decision", "risk_level"}
+        required_fields = {"id", "description", "decision", "risk_level"}
         for rule in rules:
             missing = required_fields - set(rule.keys())
             assert not missing, f"Rule {rule.get('id', '?')} missing fields: {missing}"
+            assert rule.keys() & {"keywords", "match"}, (
+                f"Rule {rule['id']} has neither keywords nor match"
+            )
 
     def test_all_decisions_are_valid(self) -> None:
         rules = load_policy_rules(RULES_PATH)
@@ -0,0 +1,251 @@
+"""Tests for per-tenant policy sets and their LRU cache."""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+import yaml
+from click.testing import CliRunner
+
+from autonomy_gatekeeper import graph
+from autonomy_gatekeeper.cli import main
+from autonomy_gatekeeper.config import Settings
+from autonomy_gatekeeper.engine import Gatekeeper
+from autonomy_gatekeeper.policy import loader, tenants
+from autonomy_gatekeeper.policy.tenants import (
+    PolicySetCache,
+    UnknownTenantError,
+    estimate_size,
+)
+from autonomy_gatekeeper.server import GatekeeperServer, create_server
+
+
+def _rule(rule_id: str, keyword: str, decision: str) -> dict[str, Any]:
+    return {
+        "id": rule_id,
+        "description": f"{decision} on {keyword}",
+        "keywords": [keyword],
+        "decision": decision,
+        "risk_level": "low" if decision == "ACT" else "high",
+        "llm": "skip",
+    }
+
+
+def _write(policy_dir: Path, tenant: str, *rules: dict[str, Any]) -> Path:
+    path = policy_dir / f"{tenant}.yaml"
+    path.write_text(yaml.safe_dump({"rules": list(rules)}))
+    return path
+
+
+@pytest.fixture()
+def policy_dir(tmp_path: Path) -> Path:
+    # "drop" is routine for the data team and escalated for payments.
+    _write(tmp_path, "data", _rule("DATA_DROP", "drop", "ACT"))
+    _write(tmp_path, "payments", _rule("PAY_DROP", "drop", "ESCALATE"))
+    _write(
+        tmp_path,
+        "large",
+        *[_rule(f"BIG_{i}", f"keyword{i}", "HOLD") for i in range(200)],
+    )
+    return tmp_path
+
+
+class TestPolicySetCache:
+    """Test lazy loading, LRU eviction and the stats."""
+
+    def test_loads_lazily_and_hits_after(self, policy_dir: Path) -> None:
+        cache = PolicySetCache(policy_dir)
+        assert len(cache) == 0
+        first = cache.get("data")
+        assert cache.get("data") is first
+        stats = cache.stats
+        assert (stats.misses, stats.hits, stats.entries) == (1, 1, 1)
+        assert stats.bytes == estimate_size(first) > 0
+        assert stats.to_dict()["hit_rate"] == 0.5
+        assert cache.tenants() == ["data", "large", "payments"]
+
+    def test_evicts_least_recently_used_by_size(self, policy_dir: Path) -> None:
+        small = estimate_size(PolicySetCache(policy_dir).get("data"))
+        cache = PolicySetCache(policy_dir, max_bytes=int(small * 2.5))
+        cache.get("data")
+        cache.get("payments")
+        cache.get("data")
+        cache.get("large")  # Over budget on its own: everything else goes.
+        assert "large" in cache and len(cache) == 1
+        assert cache.stats.evictions == 2
+        cache.get("payments")
+        assert "payments" in cache and "large" not in cache
+        assert cache.stats.bytes <= cache.max_bytes
+
+    def test_recency_decides_what_is_evicted(self, policy_dir: Path) -> None:
+        small = estimate_size(PolicySetCache(policy_dir).get("data"))
+        cache = PolicySetCache(policy_dir, max_bytes=int(small * 2.5))
+        _write(policy_dir, "search", _rule("SEARCH", "drop", "HOLD"))
+        cache.get("data")
+        cache.get("payments")
+        cache.get("data")
+        cache.get("search")
+        assert "payments" not in cache
+        assert "data" in cache and "search" in cache
+
+    @pytest.mark.parametrize("tenant", ["missing", "../data", ".hidden", ""])
+    def test_unknown_tenants(self, policy_dir: Path, tenant: str) -> None:
+        cache = PolicySetCache(policy_dir)
+        with pytest.raises(UnknownTenantError):
+            cache.get(tenant)
+        assert len(cache) == 0
+
+    def test_reloads_edited_policy_sets(self, policy_dir: Path) -> None:
+        cache = PolicySetCache(policy_dir, recheck_seconds=0)
+        assert cache.get("data").rules[0]["id"] == "DATA_DROP"
+        path = _write(policy_dir, "data", _rule("DATA_NEW", "drop", "HOLD"))
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert cache.get("data").rules[0]["id"] == "DATA_NEW"
+        assert cache.stats.reloads == 1
+
+    def test_reloads_after_the_recheck_interval(self, policy_dir: Path) -> None:
+        cache = PolicySetCache(policy_dir, recheck_seconds=0.05)
+        first = cache.get("data")
+        path = _write(policy_dir, "data", _rule("DATA_NEW", "drop", "HOLD"))
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert cache.get("data") is first  # Not due for a check yet.
+        time.sleep(0.06)
+        assert cache.get("data").rules[0]["id"] == "DATA_NEW"
+        assert cache.stats.reloads == 1
+
+    def test_concurrent_first_use_loads_once(
+        self, policy_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        loads = 0
+        load_policy = loader.load_policy
+
+        def counting_load(path: str) -> Any:
+            nonlocal loads
+            loads += 1
+            return load_policy(path)
+
+        monkeypatch.setattr(tenants, "load_policy", counting_load)
+        cache = PolicySetCache(policy_dir)
+        barrier = threading.Barrier(8)
+
+        def get() -> None:
+            barrier.wait()
+            cache.get("large")
+
+        threads = [threading.Thread(target=get) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert loads == 1
+        assert cache.stats.misses + cache.stats.hits == 8
+
+
+class TestTenantEvaluation:
+    """Test selecting a policy set per evaluation."""
+
+    def _engine(self, policy_dir: Path) -> Gatekeeper:
+        return Gatekeeper(Settings(llm_provider="local", policy_dir=str(policy_dir)))
+
+    def test_tenants_get_their_own_decisions(self, policy_dir: Path) -> None:
+        engine = self._engine(policy_dir)
+        data = engine.evaluate("drop the staging table", tenant="data")
+        payments = engine.evaluate("drop the staging table", tenant="payments")
+        assert data.decision.value == "ACT"
+        assert payments.decision.value == "ESCALATE"
+        assert data.metadata["tenant"] == "data"
+        assert "tenant" not in engine.evaluate("drop it").metadata
+        assert engine.policy_sets is not None
+        assert engine.policy_sets.stats.entries == 2
+
+    def test_batch_evaluation_with_a_tenant(self, policy_dir: Path) -> None:
+        engine = self._engine(policy_dir)
+        cards = engine.evaluate_many(["drop a", "drop b"], tenant="payments")
+        assert [c.decision.value for c in cards] == ["ESCALATE", "ESCALATE"]
+
+    def test_llm_cache_keys_are_per_tenant(self, policy_dir: Path) -> None:
+        _write(policy_dir, "other", _rule("DATA_DROP", "drop", "ACT"))
+        engine = self._engine(policy_dir)
+        settings = engine.settings
+        data = engine._evaluate_policy("drop it", tenant="data")
+        other = engine._evaluate_policy("drop it", tenant="other")
+        assert graph._cache_key(data, settings) != graph._cache_key(other, settings)
+
+    def test_errors(self, policy_dir: Path) -> None:
+        with pytest.raises(UnknownTenantError):
+            self._engine(policy_dir).evaluate("drop it", tenant="nobody")
+        with pytest.raises(ValueError, match="POLICY_DIR"):
+            Gatekeeper(Settings(llm_provider="local")).evaluate("x", tenant="data")
+
+    def test_cli_tenant(self, policy_dir: Path) -> None:
+        result = CliRunner().invoke(
+            main,
+            [
+                "evaluate",
+                "-r",
+                "drop the staging table",
+                "--tenant",
+                "payments",
+                "--policy-dir",
+                str(policy_dir),
+                "--json-output",
+            ],
+        )
+        assert result.exit_code == 0, result.output
+        assert '"ESCALATE"' in result.output
+        assert '"payments"' in result.output
+
+
+@pytest.fixture()
+def server(policy_dir: Path) -> Iterator[GatekeeperServer]:
+    engine = Gatekeeper(Settings(llm_provider="local", policy_dir=str(policy_dir)))
+    server = create_server(engine, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    assert server.ready.wait(10)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _call(server: GatekeeperServer, path: str, payload: Any = None) -> Any:
+    data = None if payload is None else json.dumps(payload).encode()
+    request = urllib.request.Request(server.url + path, data=data)
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+class TestServerTenants:
+    """Test tenants over the HTTP API."""
+
+    def test_tenant_requests(self, server: GatekeeperServer) -> None:
+        status, card = _call(
+            server, "/v1/evaluate", {"request": "drop it", "tenant": "payments"}
+        )
+        assert status == 200 and card["decision"] == "ESCALATE"
+        status, body = _call(
+            server, "/v1/evaluate/batch", {"requests": ["drop it"], "tenant": "data"}
+        )
+        assert status == 200 and body["cards"][0]["decision"] == "ACT"
+        status, body = _call(
+            server, "/v1/evaluate", {"request": "drop it", "tenant": "nobody"}
+        )
+        assert status == 404 and "nobody" in body["error"]
+        assert _call(server, "/v1/evaluate", {"request": "x", "tenant": 3})[0] == 400
+        stats = _call(server, "/stats")[1]
+        assert stats["policy_sets"]["entries"] == 2
+        assert stats["policy_sets"]["misses"] == 3
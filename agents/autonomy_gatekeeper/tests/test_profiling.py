@@ -0,0 +1,145 @@
+"""Tests for the per-stage profiler and the CLI's --profile option."""
+
+from __future__ import annotations
+
+import json
+import pstats
+import shutil
+import time
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from autonomy_gatekeeper import profiling
+from autonomy_gatekeeper.cli import main
+from autonomy_gatekeeper.config import Settings
+from autonomy_gatekeeper.engine import Gatekeeper
+from autonomy_gatekeeper.profiling import Profiler
+
+RULES_PATH = (
+    Path(__file__).parent.parent
+    / "src"
+    / "autonomy_gatekeeper"
+    / "policy"
+    / "rules.yaml"
+)
+
+
+def _spin(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class TestProfiler:
+    """Test stage accounting and the files written."""
+
+    def test_stage_times_are_exclusive(self, tmp_path: Path) -> None:
+        with Profiler(tmp_path, trace_memory=False) as profiler:
+            with profiling.stage("outer"):
+                _spin(0.05)
+                with profiling.stage("inner"):
+                    _spin(0.05)
+            with profiling.stage("inner"):
+                pass
+        stats = {s.name: s for s in profiler.stats()}
+        assert set(stats) == {"other", "outer", "inner"}
+        assert stats["inner"].calls == 2
+        assert 0.04 < stats["outer"].wall_seconds < 0.09
+        assert 0.04 < stats["inner"].wall_seconds < 0.09
+        assert stats["outer"].cpu_seconds > 0.03
+        assert sum(s.wall_seconds for s in stats.values()) <= profiler.wall_seconds
+
+    def test_memory_is_attributed_to_stages(self, tmp_path: Path) -> None:
+        with (
+            Profiler(tmp_path, allocation_sites=True) as profiler,
+            profiling.stage("allocate"),
+        ):
+            kept = [bytes(1024) for _ in range(1024)]
+        stats = {s.name: s for s in profiler.stats()}
+        assert stats["allocate"].alloc_bytes >= 1024 * 1024
+        assert stats["allocate"].peak_bytes >= 1024 * 1024
+        profiler.write()
+        sites = (tmp_path / "allocate.alloc.txt").read_text()
+        assert Path(__file__).name in sites.splitlines()[0]
+        del kept
+
+    def test_write(self, tmp_path: Path) -> None:
+        with (
+            Profiler(tmp_path, trace_memory=False) as profiler,
+            profiling.stage("busy"),
+        ):
+            _spin(0.1)
+        written = {path.name for path in profiler.write()}
+        assert {"busy.pstats", "busy.collapsed", "all.collapsed", "profile.json"} <= (
+            written
+        )
+        stats = pstats.Stats(str(tmp_path / "busy.pstats"))
+        functions = stats.stats  # type: ignore[attr-defined]
+        assert any(name == "_spin" for _, _, name in functions)
+        for line in (tmp_path / "busy.collapsed").read_text().splitlines():
+            stack, count = line.rsplit(" ", 1)
+            assert int(count) > 0
+        assert "_spin (test_profiling.py:" in stack
+        assert "(profiling.py:" not in stack
+        assert (tmp_path / "all.collapsed").read_text().startswith("busy;")
+        summary = json.loads((tmp_path / "profile.json").read_text())
+        assert summary["stages"][0]["name"] == "busy"
+        assert summary["stages"][0]["wall_ms"] >= 100
+
+    def test_inactive_stages_are_free(self) -> None:
+        assert profiling.active() is None
+        with profiling.stage("nothing"):
+            pass
+        assert profiling.staged("node", lambda state: state + 1)(1) == 2
+
+    def test_one_profiler_at_a_time(self, tmp_path: Path) -> None:
+        with (
+            Profiler(tmp_path, trace_memory=False),
+            pytest.raises(RuntimeError, match="already running"),
+        ):
+            Profiler(tmp_path).start()
+        assert profiling.active() is None
+
+
+class TestPipelineProfiling:
+    """Test the stages recorded for an evaluation."""
+
+    def test_engine_stages(self, tmp_path: Path) -> None:
+        with Profiler(tmp_path, trace_memory=False) as profiler:
+            engine = Gatekeeper(
+                Settings(llm_provider="local", policy_path=str(RULES_PATH))
+            )
+            engine.evaluate("Delete all production data and drop the database")
+            engine.evaluate("Restart the worker")
+        stages = {s.name: s.calls for s in profiler.stats()}
+        assert stages["policy_load"] == 1
+        assert stages["evaluate_policy"] == 2
+        assert stages["build_decision"] == 2
+        assert stages["decision_card"] == 2
+        assert stages["graph_compile"] == 1
+        assert stages["llm_assess"] == 1
+
+    @pytest.mark.parametrize("command", ["evaluate", "evaluate-batch"])
+    def test_cli_profile(self, tmp_path: Path, command: str) -> None:
+        # A private copy of the rules keeps the CLI from reusing a cached
+        # engine that was built without profiling.
+        rules = tmp_path / f"{command}.yaml"
+        shutil.copy(RULES_PATH, rules)
+        requests = tmp_path / "requests.jsonl"
+        requests.write_text('{"request": "drop the users table"}\n')
+        args = {
+            "evaluate": ["-r", "drop the users table"],
+            "evaluate-batch": ["-i", str(requests), "-o", str(tmp_path / "out")],
+        }[command]
+        out = tmp_path / "profile"
+        result = CliRunner().invoke(
+            main, [command, *args, "-p", str(rules), "--profile", str(out)]
+        )
+        assert result.exit_code == 0, result.output
+        assert "evaluate_policy" in result.output
+        stages = json.loads((out / "profile.json").read_text())["stages"]
+        assert {"settings", "policy_load", "build_decision", "render"} <= {
+            s["name"] for s in stages
+        }
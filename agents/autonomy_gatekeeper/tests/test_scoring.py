@@ -0,0 +1,95 @@
+"""Tests for multi-process offline policy scoring."""
+
+from __future__ import annotations
+
+import io
+import json
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from autonomy_gatekeeper.cli import main
+from autonomy_gatekeeper.scoring import score_file, score_lines
+
+RULES_PATH = str(
+    Path(__file__).parent.parent
+    / "src"
+    / "autonomy_gatekeeper"
+    / "policy"
+    / "rules.yaml"
+)
+
+REQUESTS = [
+    "Deploy model v2.3 to production",
+    "List all running services",
+    "Update the database configuration",
+    "Write a summary of the quarterly report",
+]
+
+
+def _lines(count: int) -> list[str]:
+    return [
+        json.dumps({"request": REQUESTS[i % len(REQUESTS)]}) + "\n"
+        for i in range(count)
+    ]
+
+
+def _records(text: str) -> list[dict]:
+    return [json.loads(line) for line in text.splitlines()]
+
+
+class TestScoreLines:
+    """Test chunked scoring in and out of the process pool."""
+
+    def test_single_process_scores(self) -> None:
+        chunks = list(score_lines(RULES_PATH, _lines(4), workers=1))
+        records = _records("".join(chunk.text for chunk in chunks))
+        assert [r["line"] for r in records] == [1, 2, 3, 4]
+        assert records[0]["decision"] == "ESCALATE"
+        assert records[0]["matched_rules"] == ["PROD_DEPLOY"]
+        assert records[1]["llm_route"] == "auto"
+        assert records[3]["matched_rules"] == []
+
+    def test_pool_preserves_order(self) -> None:
+        lines = _lines(200)
+        serial = "".join(c.text for c in score_lines(RULES_PATH, lines, workers=1))
+        pooled = "".join(
+            c.text for c in score_lines(RULES_PATH, lines, workers=2, chunk_size=7)
+        )
+        assert pooled == serial
+        assert [r["line"] for r in _records(pooled)] == list(range(1, 201))
+
+    def test_malformed_and_blank_lines(self) -> None:
+        source = io.StringIO('{"request": "List pods"}\n\nnot json\n{"x": 1}\n')
+        sink = io.StringIO()
+        stats = score_file(RULES_PATH, source, sink, workers=1)
+        records = _records(sink.getvalue())
+        assert [r["line"] for r in records] == [1, 3, 4]
+        assert "error" in records[1] and "error" in records[2]
+        assert (stats.processed, stats.errors) == (3, 2)
+
+
+class TestScoreCommand:
+    """Test the score CLI command."""
+
+    def test_writes_records(self, tmp_path: Path) -> None:
+        source = tmp_path / "requests.jsonl"
+        source.write_text("".join(_lines(10)))
+        target = tmp_path / "scores.jsonl"
+        result = CliRunner().invoke(
+            main,
+            [
+                "score",
+                "-i",
+                str(source),
+                "-o",
+                str(target),
+                "-w",
+                "2",
+                "-p",
+                RULES_PATH,
+            ],
+        )
+        assert result.exit_code == 0, result.output
+        assert "Scored 10 requests" in result.output
+        assert len(_records(target.read_text())) == 10
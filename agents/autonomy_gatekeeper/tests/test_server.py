@@ -0,0 +1,189 @@
+"""Tests for the HTTP service mode."""
+
+from __future__ import annotations
+
+import json
+import socket
+import threading
+import urllib.error
+import urllib.request
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from autonomy_gatekeeper.config import Settings
+from autonomy_gatekeeper.engine import Gatekeeper
+from autonomy_gatekeeper.server import GatekeeperServer, PolicyBatcher, create_server
+
+RULES_PATH = str(
+    Path(__file__).parent.parent
+    / "src"
+    / "autonomy_gatekeeper"
+    / "policy"
+    / "rules.yaml"
+)
+
+
+def _engine(**overrides: Any) -> Gatekeeper:
+    return Gatekeeper(
+        Settings(llm_provider="local", policy_path=RULES_PATH, **overrides)
+    )
+
+
+@pytest.fixture()
+def server() -> Iterator[GatekeeperServer]:
+    server = create_server(_engine(metrics_enabled=True), port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    assert server.ready.wait(10)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _call(
+    server: GatekeeperServer, path: str, payload: Any = None, raw: bytes | None = None
+) -> tuple[int, Any]:
+    data = raw if raw is not None else None
+    if payload is not None:
+        data = json.dumps(payload).encode()
+    request = urllib.request.Request(server.url + path, data=data)
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            body = response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        body, status = e.read(), e.code
+    try:
+        return status, json.loads(body)
+    except ValueError:
+        return status, body.decode()
+
+
+class TestEndpoints:
+    """Test the JSON API."""
+
+    def test_health_and_readiness(self, server: GatekeeperServer) -> None:
+        assert _call(server, "/healthz") == (200, {"status": "ok"})
+        assert _call(server, "/readyz") == (200, {"status": "ready"})
+
+    def test_not_ready_until_warm(self) -> None:
+        server = GatekeeperServer(_engine(), port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            assert _call(server, "/readyz") == (503, {"status": "warming"})
+            server.warm_up()
+            assert _call(server, "/readyz")[0] == 200
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_evaluate(self, server: GatekeeperServer) -> None:
+        status, card = _call(
+            server, "/v1/evaluate", {"request": "Drop the users table"}
+        )
+        assert status == 200
+        assert card["decision"] == "ESCALATE"
+        assert card["metadata"]["llm_skipped"]
+
+    def test_evaluate_batch_keeps_order(self, server: GatekeeperServer) -> None:
+        requests = ["Summarize the report", "Drop the users table"] * 2
+        status, body = _call(server, "/v1/evaluate/batch", {"requests": requests})
+        assert status == 200
+        assert [c["request"] for c in body["cards"]] == requests
+        assert [c["decision"] for c in body["cards"]][1::2] == ["ESCALATE"] * 2
+
+    @pytest.mark.parametrize(
+        ("path", "payload", "raw", "status"),
+        [
+            ("/v1/evaluate", None, b"{not json", 400),
+            ("/v1/evaluate", {"text": "x"}, None, 400),
+            ("/v1/evaluate/batch", {"requests": []}, None, 400),
+            ("/v1/unknown", {"request": "x"}, None, 404),
+        ],
+    )
+    def test_client_errors(
+        self,
+        server: GatekeeperServer,
+        path: str,
+        payload: Any,
+        raw: bytes | None,
+        status: int,
+    ) -> None:
+        code, body = _call(server, path, payload, raw)
+        assert code == status
+        assert "error" in body
+
+    @pytest.mark.parametrize("path", ["/v1/evaluate", "/v1/unknown"])
+    @pytest.mark.parametrize("length", ["-1", "abc", "1_0"])
+    def test_invalid_content_length(
+        self, server: GatekeeperServer, path: str, length: str
+    ) -> None:
+        host, port = server.server_address[:2]
+        with socket.create_connection((host, port), timeout=5) as conn:
+            conn.sendall(
+                f"POST {path} HTTP/1.1\r\nHost: x\r\n"
+                f"Content-Length: {length}\r\n\r\n{{}}".encode()
+            )
+            reply = conn.makefile("rb").read()
+        assert reply.startswith(b"HTTP/1.0 400") or reply.startswith(b"HTTP/1.1 400")
+        assert b"Invalid Content-Length" in reply
+
+    def test_stats_and_metrics(self, server: GatekeeperServer) -> None:
+        _call(server, "/v1/evaluate", {"request": "Drop the users table"})
+        status, stats = _call(server, "/stats")
+        assert status == 200
+        assert stats["ready"]
+        assert stats["requests"]["evaluate"] == 1
+        assert stats["routing"]["evaluated"] == 1
+        assert stats["batching"]["requests"] == 1
+        assert set(stats["latency"]) >= {"p50_ms", "p99_ms"}
+        assert stats["llm_guard"]["breaker_state"] == "closed"
+        status, text = _call(server, "/metrics")
+        assert status == 200
+        assert "gatekeeper_decisions_total" in text
+
+
+class TestPolicyBatcher:
+    """Test micro-batching of policy evaluation."""
+
+    def test_concurrent_requests_are_coalesced(self, server: GatekeeperServer) -> None:
+        requests = [f"Drop table t{i}" for i in range(32)]
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = list(
+                pool.map(
+                    lambda r: _call(server, "/v1/evaluate", {"request": r}), requests
+                )
+            )
+        assert all(status == 200 for status, _ in results)
+        stats = server.batcher.stats
+        assert stats.requests == len(requests)
+        assert stats.batches <= len(requests)
+
+    def test_waits_to_fill_a_batch(self) -> None:
+        batcher = PolicyBatcher(_engine(), max_batch=8, max_wait_seconds=0.2)
+        try:
+            states = batcher.evaluate(["List services"] * 5 + ["Drop the table"])
+        finally:
+            batcher.close()
+        assert batcher.stats.batches == 1
+        assert batcher.stats.largest_batch == 6
+        assert states[-1]["policy_decision"] == "ESCALATE"
+        assert states[0] is not states[1]
+
+    def test_errors_reach_every_caller(self) -> None:
+        engine = _engine()
+        batcher = PolicyBatcher(engine, max_wait_seconds=0.05)
+
+        def fail(requests: Any, tenant: Any = None) -> Any:
+            raise RuntimeError("boom")
+
+        engine.evaluate_policies = fail  # type: ignore[method-assign]
+        futures = [batcher.submit("x"), batcher.submit("y")]
+        batcher.close()
+        for future in futures:
+            with pytest.raises(RuntimeError, match="boom"):
+                future.result()
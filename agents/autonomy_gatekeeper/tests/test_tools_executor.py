@@ -0,0 +1,307 @@
+"""Tests for concurrent execution of approved tool calls."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import pytest
+import yaml
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from autonomy_gatekeeper import graph
+from autonomy_gatekeeper.config import Settings
+from autonomy_gatekeeper.engine import Gatekeeper
+from autonomy_gatekeeper.tools.executor import ToolExecutor, parse_tool_calls
+from autonomy_gatekeeper.tools.registry import ToolRegistry
+
+
+@dataclass
+class SleepTool:
+    """Sleeps, then echoes its arguments; records peak concurrency."""
+
+    name: str
+    seconds: float = 0.1
+    description: str = "sleeps"
+    fail: bool = False
+    active: int = 0
+    peak: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def __call__(self, **kwargs: Any) -> Any:
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.seconds)
+            if self.fail:
+                raise RuntimeError("tool failed")
+            return {"tool": self.name, **kwargs}
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+@dataclass
+class AsyncTool:
+    name: str = "async_echo"
+    description: str = "async echo"
+
+    async def __call__(self, **kwargs: Any) -> Any:
+        await asyncio.sleep(0.01)
+        return kwargs
+
+
+def _registry(*tools: Any, **limits: Any) -> ToolRegistry:
+    registry = ToolRegistry()
+    for tool in tools:
+        registry.register(tool, **limits.get(tool.name, {}))
+    return registry
+
+
+@pytest.fixture()
+def executor() -> Iterator[ToolExecutor]:
+    registry = _registry(
+        SleepTool("a"),
+        SleepTool("b"),
+        SleepTool("c"),
+        SleepTool("slow", seconds=1.0),
+        SleepTool("broken", seconds=0.0, fail=True),
+        AsyncTool(),
+        slow={"timeout_seconds": 0.1},
+    )
+    executor = ToolExecutor(registry, max_workers=8)
+    yield executor
+    executor.close()
+
+
+def _calls(*actions: dict[str, Any]) -> Any:
+    return parse_tool_calls(actions)
+
+
+class TestToolExecutor:
+    """Test scheduling, limits and results."""
+
+    def test_independent_calls_run_concurrently(self, executor: ToolExecutor) -> None:
+        started = time.perf_counter()
+        results = list(
+            executor.run(_calls({"tool": "a"}, {"tool": "b"}, {"tool": "c"}))
+        )
+        assert time.perf_counter() - started < 0.25
+        assert [r.status for r in results] == ["ok"] * 3
+
+    def test_dependencies_wait(self, executor: ToolExecutor) -> None:
+        calls = _calls(
+            {"tool": "a", "id": "first"},
+            {"tool": "b", "id": "second", "depends_on": ["first"]},
+        )
+        started = time.perf_counter()
+        results = list(executor.run(calls))
+        assert time.perf_counter() - started >= 0.2
+        assert [r.id for r in results] == ["first", "second"]
+
+    def test_per_tool_concurrency_cap(self) -> None:
+        tool = SleepTool("capped", seconds=0.05)
+        executor = ToolExecutor(_registry(tool, capped={"max_concurrency": 2}))
+        try:
+            results = list(executor.run(_calls(*[{"tool": "capped"}] * 6)))
+        finally:
+            executor.close()
+        assert len(results) == 6
+        assert tool.peak == 2
+
+    def test_cap_is_shared_across_runs(self) -> None:
+        tool = SleepTool("capped", seconds=0.1)
+        executor = ToolExecutor(_registry(tool, capped={"max_concurrency": 1}))
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                runs = [
+                    pool.submit(lambda: list(executor.run(_calls({"tool": "capped"}))))
+                    for _ in range(2)
+                ]
+                results = [r for run in runs for r in run.result()]
+            elapsed = time.perf_counter() - started
+        finally:
+            executor.close()
+        assert [r.status for r in results] == ["ok", "ok"]
+        assert tool.peak == 1
+        # The blocked run is woken as soon as the slot is given back.
+        assert 0.2 <= elapsed < 0.35
+
+    def test_closed_executor_gives_back_the_slot(self) -> None:
+        executor = ToolExecutor(_registry(SleepTool("a")))
+        executor.close()
+        with pytest.raises(RuntimeError):
+            list(executor.run(_calls({"tool": "a"})))
+        assert executor._in_flight == {"a": 0}
+
+    def test_timeout_skips_dependents(self, executor: ToolExecutor) -> None:
+        calls = _calls(
+            {"tool": "slow", "id": "s"},
+            {"tool": "a", "id": "after", "depends_on": "s"},
+        )
+        started = time.perf_counter()
+        results = {r.id: r for r in executor.run(calls)}
+        assert time.perf_counter() - started < 0.5
+        assert results["s"].status == "timeout"
+        assert results["after"].status == "skipped"
+
+    def test_errors_and_unknown_tools(self, executor: ToolExecutor) -> None:
+        results = {
+            r.tool: r
+            for r in executor.run(_calls({"tool": "broken"}, {"tool": "nope"}))
+        }
+        assert results["broken"].status == "error"
+        assert "tool failed" in (results["broken"].error or "")
+        assert results["nope"].error == "unknown tool nope"
+
+    def test_results_stream_in_completion_order(self, executor: ToolExecutor) -> None:
+        results = executor.run(_calls({"tool": "slow"}, {"tool": "broken"}))
+        assert next(results).tool == "broken"
+
+    def test_async_tools_and_arun(self, executor: ToolExecutor) -> None:
+        async def collect() -> list[Any]:
+            calls = _calls({"tool": "async_echo", "arguments": {"x": 1}}, {"tool": "a"})
+            return [r async for r in executor.arun(calls)]
+
+        results = {r.tool: r for r in asyncio.run(collect())}
+        assert results["async_echo"].result == {"x": 1}
+        assert results["a"].ok
+
+    @pytest.mark.parametrize(
+        ("actions", "message"),
+        [
+            ([{"arguments": {}}], "has no tool"),
+            ([{"tool": "a", "id": "x"}, {"tool": "b", "id": "x"}], "Duplicate"),
+            ([{"tool": "a", "depends_on": ["1"]}, {"tool": "b"}], "not an earlier"),
+        ],
+    )
+    def test_invalid_plans(self, actions: list[dict[str, Any]], message: str) -> None:
+        with pytest.raises(ValueError, match=message):
+            parse_tool_calls(actions)
+
+
+@pytest.fixture()
+def rules_path(tmp_path: Path) -> str:
+    path = tmp_path / "rules.yaml"
+    rules = [
+        {
+            "id": "READ_ONLY",
+            "description": "Read-only request",
+            "keywords": ["list"],
+            "decision": "ACT",
+            "risk_level": "low",
+            "llm": "skip",
+        },
+        {
+            "id": "DROP",
+            "description": "Destructive",
+            "keywords": ["drop"],
+            "decision": "ESCALATE",
+            "risk_level": "critical",
+        },
+    ]
+    path.write_text(yaml.safe_dump({"rules": rules}))
+    return str(path)
+
+
+ACTIONS: list[dict[str, Any]] = [
+    {"tool": "a", "id": "a"},
+    {"tool": "b", "id": "b"},
+    {"tool": "c", "id": "c", "depends_on": ["a"]},
+]
+
+
+class TestEngineExecution:
+    """Test the execution stage after the Decision Card."""
+
+    def _engine(self, rules_path: str) -> Gatekeeper:
+        return Gatekeeper(
+            Settings(llm_provider="local", policy_path=rules_path),
+            tools=_registry(SleepTool("a"), SleepTool("b"), SleepTool("c")),
+        )
+
+    def test_approved_request_runs_actions(self, rules_path: str) -> None:
+        engine = self._engine(rules_path)
+        card = engine.evaluate("list services", actions=ACTIONS)
+        assert card.decision.value == "ACT"
+        assert [a["id"] for a in card.metadata["actions"]] == ["a", "b", "c"]
+        assert card.metadata["actions"][2]["result"] == {"tool": "c"}
+        # a and b overlap, then c: about two calls long, not three.
+        assert card.metadata["actions_ms"] < 280
+        engine.close()
+
+    def test_escalated_request_does_not_act(self, rules_path: str) -> None:
+        engine = self._engine(rules_path)
+        card = engine.evaluate("drop everything", actions=ACTIONS)
+        assert card.decision.value == "ESCALATE"
+        assert "actions" not in card.metadata
+        engine.close()
+
+    def test_stream_yields_tool_results(self, rules_path: str) -> None:
+        engine = self._engine(rules_path)
+        events = list(engine.stream("list services", actions=ACTIONS))
+        tool_events = [e for e in events if e["event"] == "tool_result"]
+        assert {e["id"] for e in tool_events} == {"a", "b", "c"}
+        assert events[-1]["event"] == "card"
+        engine.close()
+
+    def test_graph_node_after_llm(
+        self, rules_path: str, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        reply = json.dumps(
+            {
+                "decision": "ACT",
+                "risk_level": "low",
+                "reasoning": "Fine.",
+                "recommended_action": "Proceed.",
+            }
+        )
+        monkeypatch.setattr(
+            graph, "create_llm", lambda settings: FakeListChatModel(responses=[reply])
+        )
+        engine = self._engine(rules_path)
+        events = list(engine.stream("restart the worker", actions=ACTIONS))
+        assert [e["event"] for e in events].count("tool_result") == 3
+        assert not events[-1]["card"].metadata["llm_skipped"]
+        card = asyncio.run(engine.aevaluate("restart the worker", actions=ACTIONS))
+        assert len(card.metadata["actions"]) == 3
+        engine.close()
+
+    def test_llm_fallback_does_not_act(self, rules_path: str) -> None:
+        tools = [SleepTool("a"), SleepTool("b"), SleepTool("c")]
+        engine = Gatekeeper(
+            Settings(
+                llm_provider="local",
+                policy_path=rules_path,
+                llm_cache_enabled=False,
+                local_llm_error_rate=1.0,
+                llm_max_retries=0,
+            ),
+            tools=_registry(*tools),
+        )
+        cards = [
+            engine.evaluate("restart the worker", actions=ACTIONS),
+            asyncio.run(engine.aevaluate("restart the worker", actions=ACTIONS)),
+        ]
+        for card in cards:
+            assert card.decision.value == "ACT"
+            assert card.metadata["llm_fallback"]
+            actions = card.metadata["actions"]
+            assert [a["status"] for a in actions] == ["skipped"] * 3
+            assert "LLM fallback (error)" in actions[0]["error"]
+        assert all(tool.peak == 0 for tool in tools)
+        engine.close()
+
+    def test_actions_need_tools(self, rules_path: str) -> None:
+        engine = Gatekeeper(Settings(llm_provider="local", policy_path=rules_path))
+        with pytest.raises(ValueError, match="created with tools"):
+            engine.evaluate("list services", actions=ACTIONS)